@@ -20,6 +20,11 @@ interface DetectionEvent {
   model_used: string;
   processing_time_ms: number;
   detection_count: number;
+  cached?: boolean; // Boxes reused from a near-identical earlier frame
+  // Set when objectDetection tracking is enabled: only track starts/ends are published
+  event_type?: "detection" | "track_start" | "track_end";
+  started_track_ids?: number[];
+  ended_track_ids?: number[];
   boxes: Array<{
     class_id: number;
     class_name: string;
@@ -28,6 +33,7 @@ interface DetectionEvent {
     y1: number;
     x2: number;
     y2: number;
+    track_id?: number | null;
   }>;
 }
 
@@ -84,6 +90,14 @@ export class DetectionEventSubscriber {
    * Process a detection event - write to DB, emit to clients, raise event.
    */
   private async processDetection(event: DetectionEvent): Promise<void> {
+    // Track end only reports objects leaving - they were recorded at track start
+    if (event.event_type === "track_end") {
+      console.log(
+        `Tracks ended: camera=${event.camera_id}, ids=${(event.ended_track_ids || []).join(",")}`
+      );
+      return;
+    }
+
     const detectionId = makeID();
 
     // Get camera name for event message
@@ -23,6 +23,11 @@ interface DetectionEvent {
   model_used: string;
   processing_time_ms: number;
   detection_count: number;
+  cached?: boolean; // Boxes reused from a near-identical earlier frame
+  // Set when objectDetection tracking is enabled: only track starts/ends are published
+  event_type?: "detection" | "track_start" | "track_end";
+  started_track_ids?: number[];
+  ended_track_ids?: number[];
   boxes: Array<{
     class_id: number;
     class_name: string;
@@ -31,6 +36,7 @@ interface DetectionEvent {
     y1: number;
     x2: number;
     y2: number;
+    track_id?: number | null;
   }>;
 }
 
@@ -75,6 +81,8 @@ export class ClipExtractor {
       await this.subscriber.pSubscribe(pattern, async (message, channel) => {
         try {
           const event: DetectionEvent = JSON.parse(message);
+          // Track end events have no new detection record to attach a clip to
+          if (event.event_type === "track_end") return;
           // Process all detection events (motion detected = clip worthy)
           this.queueClipExtraction(event);
         } catch (error) {
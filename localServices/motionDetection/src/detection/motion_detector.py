@@ -303,6 +303,7 @@ class MotionDetector:
             # Analyze mask for motion in zones
             result = self._analyzer.analyze(fg_mask, state.settings, state.camera_name)
             result.processing_time_ms = (time.time() - start) * 1000
+            result.decoded_frame = fg_mask.frame
 
             return result
 
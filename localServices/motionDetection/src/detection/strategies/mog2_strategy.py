@@ -137,6 +137,7 @@ class MOG2Strategy(ProcessingStrategy):
             camera_id=frame_input.camera_id,
             mask=fg_mask,
             frame_shape=frame.shape,
+            frame=frame,
         )
 
     def _process_cpu(self, frame: np.ndarray, detector: Any) -> np.ndarray:
@@ -90,6 +90,7 @@ class SimpleDiffStrategy(ProcessingStrategy):
                 camera_id=camera_id,
                 mask=np.zeros(frame.shape[:2], dtype=np.uint8),
                 frame_shape=frame.shape,
+                frame=frame,
             )
 
         # Process using GPU or CPU
@@ -105,6 +106,7 @@ class SimpleDiffStrategy(ProcessingStrategy):
             camera_id=camera_id,
             mask=fg_mask,
             frame_shape=frame.shape,
+            frame=frame,
         )
 
     def _process_cpu(
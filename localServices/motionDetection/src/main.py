@@ -17,7 +17,7 @@ import redis
 from config import CameraConfigManager
 from detection import MotionDetector
 from streaming import FrameStreamConsumer
-from output import MotionLogger, MotionPublisher
+from output import MotionLogger, MotionPublisher, SharedFrameStore
 
 # Configure logging
 LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
@@ -43,12 +43,28 @@ def main():
     consumer_group = os.getenv('CONSUMER_GROUP', 'motion-detectors')
     consumer_name = os.getenv('HOSTNAME', 'worker-1')
     block_timeout_ms = int(os.getenv('BLOCK_TIMEOUT_MS', '50'))
+    motion_transport = os.getenv('MOTION_TRANSPORT', 'pubsub')
+    motion_stream_key = os.getenv('MOTION_STREAM_KEY', 'motion:frames')
+    motion_stream_maxlen = int(os.getenv('MOTION_STREAM_MAXLEN', '1000'))
+    # Shared-memory frame store for object detection on the same host
+    # (shared IPC namespace); empty name sends frames inline as base64 JPEG
+    frame_store_name = os.getenv('FRAME_STORE_NAME', '')
+    # Slots must outlast every frame object detection holds at once:
+    # MAX_PENDING_FRAMES + (2 * PIPELINE_DEPTH + 3) * MAX_BATCH_SIZE +
+    # DECODE_WORKERS, 126 with its defaults
+    frame_store_slots = int(os.getenv('FRAME_STORE_SLOTS', '128'))
+    frame_store_slot_mb = float(os.getenv('FRAME_STORE_SLOT_MB', '8'))
+    # Keep the base64 JPEG next to frame handles as a fallback; only disable
+    # when object detection always shares the IPC namespace (pubsub transport)
+    frame_store_inline = os.getenv('FRAME_STORE_INLINE', 'true').lower() == 'true'
 
     logger.info("Configuration:")
     logger.info(f"  Redis: {redis_host}:{redis_port}/{redis_db}")
     logger.info(f"  Consumer group: {consumer_group}")
     logger.info(f"  Consumer name: {consumer_name}")
     logger.info(f"  Block timeout: {block_timeout_ms}ms")
+    logger.info(f"  Motion transport: {motion_transport}")
+    logger.info(f"  Frame store: {frame_store_name or 'disabled'}")
 
     # Connect to Redis
     try:
@@ -66,6 +82,7 @@ def main():
 
     # Initialize components with dependency injection
     config_manager = None
+    frame_store = None
     try:
         # 1. Motion detector (strategies created per-camera based on detection model)
         detector = MotionDetector()
@@ -77,7 +94,20 @@ def main():
 
         # 3. Output handlers (injected dependencies)
         motion_logger = MotionLogger()
-        motion_publisher = MotionPublisher(redis_client)
+        if frame_store_name:
+            frame_store = SharedFrameStore(
+                frame_store_name,
+                slot_count=frame_store_slots,
+                slot_bytes=int(frame_store_slot_mb * 1024 * 1024),
+            )
+        motion_publisher = MotionPublisher(
+            redis_client,
+            transport=motion_transport,
+            stream_key=motion_stream_key,
+            stream_maxlen=motion_stream_maxlen,
+            frame_store=frame_store,
+            inline_frames=frame_store_inline,
+        )
         logger.info("Output handlers initialized")
 
         # 4. Frame stream consumer (orchestrates everything)
@@ -123,6 +153,9 @@ def main():
             config_manager.stop()
             logger.info("Camera config manager stopped")
 
+        if frame_store:
+            frame_store.close()
+
         try:
             redis_client.close()
             logger.info("Redis connection closed")
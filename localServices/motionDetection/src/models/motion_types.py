@@ -31,6 +31,7 @@ class ForegroundMask:
     camera_id: str
     mask: np.ndarray
     frame_shape: Tuple[int, int, int]  # Original frame shape
+    frame: Optional[np.ndarray] = None  # Decoded BGR frame, for the shared frame store
 
 
 @dataclass
@@ -69,6 +70,7 @@ class MotionResult:
     zone_results: List[ZoneMotionResult] = field(default_factory=list)
     mask: Optional[np.ndarray] = None  # Foreground mask for visualization
     original_frame: Optional[bytes] = None  # JPEG bytes for object detection forwarding
+    decoded_frame: Optional[np.ndarray] = None  # Decoded BGR frame (not serialized)
 
     def to_dict(self) -> dict:
         """Convert to dictionary for JSON serialization."""
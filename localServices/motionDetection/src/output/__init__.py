@@ -2,8 +2,10 @@
 
 from .motion_logger import MotionLogger
 from .motion_publisher import MotionPublisher
+from .frame_store import SharedFrameStore
 
 __all__ = [
     "MotionLogger",
     "MotionPublisher",
+    "SharedFrameStore",
 ]
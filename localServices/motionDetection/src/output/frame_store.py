@@ -0,0 +1,136 @@
+"""Shared-memory ring buffer of decoded frames for same-host object detection."""
+
+import logging
+import struct
+import threading
+import uuid
+from multiprocessing import shared_memory
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Segment layout - must match objectDetection/src/streaming/frame_store.py:
+#   header: magic, version, slot_count, slot_bytes, instance id (uuid4 hex)
+#   slot_count x (slot header + slot_bytes of frame data)
+# A slot header's sequence is 0 while the slot is being written
+MAGIC = b'SFRM'
+VERSION = 1
+SEGMENT_HEADER = struct.Struct('<4sIIQ32s')
+SEGMENT_HEADER_BYTES = 64
+SLOT_HEADER = struct.Struct('<QqIHHB')  # sequence, timestamp, length, height, width, channels
+SLOT_HEADER_BYTES = 32
+
+
+class SharedFrameStore:
+    """
+    Writes decoded frames into a named shared-memory ring buffer.
+
+    - Frames go into fixed-size slots round-robin; a slot is overwritten
+      slot_count frames later, so readers must use a frame promptly
+    - Each write returns a small handle (store, instance, slot, sequence)
+      that is published with the frame's event; readers map the slot
+      zero-copy and use the sequence to detect that it has been overwritten
+    - slot_count must cover every frame the reader holds at once, or frames
+      are overwritten before they are detected
+    - The instance id changes on every restart, so readers re-attach to a
+      recreated segment instead of reading a stale one
+    - Frames larger than a slot are not stored - callers fall back to
+      sending the JPEG inline
+    """
+
+    def __init__(self, name: str, slot_count: int = 128, slot_bytes: int = 8 * 1024 * 1024):
+        """
+        Create the shared-memory segment.
+
+        Args:
+            name: Segment name (/dev/shm/<name>), shared with the reader
+            slot_count: Number of frames kept before slots are reused
+            slot_bytes: Max decoded frame size (1080p BGR is ~6.2MB)
+        """
+        self._name = name
+        self._slot_count = slot_count
+        self._slot_bytes = slot_bytes
+        self._slot_stride = SLOT_HEADER_BYTES + slot_bytes
+        self._instance = uuid.uuid4().hex
+
+        size = SEGMENT_HEADER_BYTES + slot_count * self._slot_stride
+        self._segment = self._create_segment(name, size)
+        SEGMENT_HEADER.pack_into(
+            self._segment.buf, 0,
+            MAGIC, VERSION, slot_count, slot_bytes, self._instance.encode(),
+        )
+
+        self._next_slot = 0
+        self._next_sequence = 1
+        self._lock = threading.Lock()
+
+        logger.info(
+            f"Shared frame store '{name}' created: {slot_count} slots x "
+            f"{slot_bytes / 1024 / 1024:.1f}MB"
+        )
+
+    def put(self, frame: np.ndarray, timestamp: int) -> Optional[dict]:
+        """
+        Copy a decoded frame into the next slot.
+
+        Args:
+            frame: uint8 HxWxC (or HxW) image
+            timestamp: Frame capture timestamp
+
+        Returns:
+            Handle for the motion event, or None if the frame doesn't fit
+        """
+        if frame.dtype != np.uint8 or frame.nbytes > self._slot_bytes:
+            return None
+
+        height, width = frame.shape[:2]
+        channels = frame.shape[2] if frame.ndim == 3 else 1
+
+        with self._lock:
+            slot = self._next_slot
+            sequence = self._next_sequence
+            self._next_slot = (slot + 1) % self._slot_count
+            self._next_sequence += 1
+
+            offset = SEGMENT_HEADER_BYTES + slot * self._slot_stride
+            buf = self._segment.buf
+
+            # Mark the slot as being written so readers reject it mid-copy
+            struct.pack_into('<Q', buf, offset, 0)
+            data = np.ndarray(
+                frame.shape, dtype=np.uint8, buffer=buf, offset=offset + SLOT_HEADER_BYTES
+            )
+            data[...] = frame
+            SLOT_HEADER.pack_into(
+                buf, offset, sequence, timestamp, frame.nbytes, height, width, channels
+            )
+            del data  # Release the export so the segment can be closed
+
+        return {
+            'store': self._name,
+            'instance': self._instance,
+            'slot': slot,
+            'sequence': sequence,
+        }
+
+    def close(self) -> None:
+        """Close and remove the segment."""
+        try:
+            self._segment.close()
+            self._segment.unlink()
+        except (BufferError, FileNotFoundError) as e:
+            logger.warning(f"Failed to remove shared frame store '{self._name}': {e}")
+
+    @staticmethod
+    def _create_segment(name: str, size: int) -> shared_memory.SharedMemory:
+        """Create the segment, replacing one left behind by a previous run."""
+        try:
+            return shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+            logger.info(f"Removed stale shared frame store '{name}'")
+            return shared_memory.SharedMemory(name=name, create=True, size=size)
@@ -10,6 +10,7 @@ import numpy as np
 import redis
 
 from models import MotionResult, RedisMotionEvent, RedisZoneMotionResult
+from .frame_store import SharedFrameStore
 
 logger = logging.getLogger(__name__)
 
@@ -20,12 +21,32 @@ class MotionPublisher:
 
     Separates Redis publishing from detection logic.
     Injected as a dependency into the frame consumer.
+
+    Transports:
+    - pubsub: full event (including original frame) on motion:{camera_id}
+    - stream: events carrying an original frame are also appended to a
+      MAXLEN-trimmed stream for object detection consumer groups; the
+      pub/sub event is published without the frame for live viewers
+
+    With a shared frame store (object detection on the same host), the
+    decoded frame is written to shared memory and the event carries a
+    frame_handle next to the base64 JPEG, so consumers skip the decode. The
+    JPEG stays inline as the fallback for consumers that can't attach the
+    store or find the slot already reused. Only with inline_frames=False on
+    the pubsub transport does the handle replace it - stream entries are
+    redelivered and claimed long after their slot is overwritten, so they
+    always keep it. Frames the store can't take are sent inline as before.
     """
 
     def __init__(
         self,
         redis_client: redis.Redis,
         channel_prefix: str = 'motion:',
+        transport: str = 'pubsub',
+        stream_key: str = 'motion:frames',
+        stream_maxlen: int = 1000,
+        frame_store: Optional[SharedFrameStore] = None,
+        inline_frames: bool = True,
     ):
         """
         Initialize motion publisher.
@@ -33,9 +54,23 @@ class MotionPublisher:
         Args:
             redis_client: Redis client instance
             channel_prefix: Prefix for motion event channels
+            transport: 'pubsub' or 'stream' for object detection frames
+            stream_key: Stream key for the 'stream' transport
+            stream_maxlen: Approximate max stream length (older entries trimmed)
+            frame_store: Shared-memory store for decoded frames, or None to send JPEGs inline
+            inline_frames: Also send the JPEG with a frame handle; False only when every
+                consumer shares the store (ignored for the 'stream' transport)
         """
+        if transport not in ('pubsub', 'stream'):
+            raise ValueError(f"Unknown motion transport: {transport}")
+
         self._redis = redis_client
         self._channel_prefix = channel_prefix
+        self._transport = transport
+        self._stream_key = stream_key
+        self._stream_maxlen = stream_maxlen
+        self._frame_store = frame_store
+        self._inline_frames = inline_frames or transport == 'stream'
 
     def publish(
         self,
@@ -50,9 +85,9 @@ class MotionPublisher:
             original_timestamp: Original frame capture timestamp
         """
         try:
-            event = self._build_event(result, original_timestamp)
-            channel = f"{self._channel_prefix}{result.camera_id}"
-            self._redis.publish(channel, json.dumps(event))
+            pipeline = self._redis.pipeline()
+            self._queue_event(pipeline, result, original_timestamp)
+            pipeline.execute()
 
         except Exception as e:
             logger.error(f"Failed to publish motion event: {e}")
@@ -75,15 +110,36 @@ class MotionPublisher:
 
             for result, timestamp in results:
                 # Publish motion event (includes mask if available)
-                event = self._build_event(result, timestamp)
-                channel = f"{self._channel_prefix}{result.camera_id}"
-                pipeline.publish(channel, json.dumps(event))
+                self._queue_event(pipeline, result, timestamp)
 
             pipeline.execute()
 
         except Exception as e:
             logger.error(f"Failed to publish motion batch: {e}")
 
+    def _queue_event(
+        self,
+        pipeline: redis.client.Pipeline,
+        result: MotionResult,
+        timestamp: int,
+    ) -> None:
+        """Add the publish (and stream append) commands for one result to a pipeline."""
+        event = self._build_event(result, timestamp)
+        channel = f"{self._channel_prefix}{result.camera_id}"
+
+        if self._transport == 'stream' and (event['original_frame'] or 'frame_handle' in event):
+            pipeline.xadd(
+                self._stream_key,
+                {'camera_id': result.camera_id, 'event': json.dumps(event)},
+                maxlen=self._stream_maxlen,
+                approximate=True,
+            )
+            # Live viewers don't need the frame - keep pub/sub messages small
+            event = {**event, 'original_frame': ''}
+            event.pop('frame_handle', None)
+
+        pipeline.publish(channel, json.dumps(event))
+
     def _encode_mask(self, mask: Optional[np.ndarray]) -> str:
         """
         Encode mask as base64 JPEG.
@@ -113,6 +169,21 @@ class MotionPublisher:
             return ''
         return base64.b64encode(frame).decode('utf-8')
 
+    def _store_frame(self, result: MotionResult, timestamp: int) -> Optional[dict]:
+        """
+        Put a forwarded frame into the shared frame store.
+
+        Returns:
+            Frame handle, or None if the frame should be sent inline
+        """
+        if self._frame_store is None or result.original_frame is None or result.decoded_frame is None:
+            return None
+        try:
+            return self._frame_store.put(result.decoded_frame, timestamp)
+        except Exception as e:
+            logger.error(f"Failed to write frame to shared store: {e}")
+            return None
+
     def _build_event(
         self,
         result: MotionResult,
@@ -131,12 +202,22 @@ class MotionPublisher:
             for z in result.zone_results
         ]
 
-        return {
+        frame_handle = self._store_frame(result, timestamp)
+
+        event = {
             'camera_id': result.camera_id,
             'timestamp': timestamp,
             'motion_detected': result.has_motion,
             'processing_time_ms': round(result.processing_time_ms, 2),
             'zone_results': zone_results,
             'mask': self._encode_mask(result.mask),
-            'original_frame': self._encode_original_frame(result.original_frame),
+            'original_frame': (
+                '' if frame_handle and not self._inline_frames
+                else self._encode_original_frame(result.original_frame)
+            ),
         }
+        # Only present when set, after original_frame (consumers pre-filter on
+        # an empty trailing original_frame)
+        if frame_handle:
+            event['frame_handle'] = frame_handle
+        return event
@@ -0,0 +1,47 @@
+import sys
+import unittest
+import uuid
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_ROOT = PROJECT_ROOT / "src"
+if str(SRC_ROOT) not in sys.path:
+    sys.path.insert(0, str(SRC_ROOT))
+
+from output.frame_store import SEGMENT_HEADER_BYTES, SLOT_HEADER, SLOT_HEADER_BYTES, SharedFrameStore
+
+
+class SharedFrameStoreTests(unittest.TestCase):
+    def setUp(self):
+        self.slot_bytes = 8 * 6 * 3
+        self.store = SharedFrameStore(f"test-{uuid.uuid4().hex[:8]}", slot_count=2, slot_bytes=self.slot_bytes)
+
+    def tearDown(self):
+        self.store.close()
+
+    def read_slot(self, slot):
+        offset = SEGMENT_HEADER_BYTES + slot * (SLOT_HEADER_BYTES + self.slot_bytes)
+        sequence, timestamp, _, height, width, channels = SLOT_HEADER.unpack_from(self.store._segment.buf, offset)
+        data = bytes(self.store._segment.buf[offset + SLOT_HEADER_BYTES:offset + SLOT_HEADER_BYTES + height * width * channels])
+        return sequence, timestamp, np.frombuffer(data, np.uint8).reshape(height, width, channels)
+
+    def test_put_writes_frames_round_robin(self):
+        frames = [np.full((6, 8, 3), i, dtype=np.uint8) for i in range(3)]
+        handles = [self.store.put(frame, 1000 + i) for i, frame in enumerate(frames)]
+
+        self.assertEqual([h["slot"] for h in handles], [0, 1, 0])
+        self.assertEqual([h["sequence"] for h in handles], [1, 2, 3])
+
+        # Slot 0 now holds the third frame
+        sequence, timestamp, data = self.read_slot(0)
+        self.assertEqual((sequence, timestamp), (3, 1002))
+        np.testing.assert_array_equal(data, frames[2])
+
+    def test_put_rejects_frames_larger_than_a_slot(self):
+        self.assertIsNone(self.store.put(np.zeros((12, 8, 3), dtype=np.uint8), 1000))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,168 @@
+import importlib.util
+import itertools
+import json
+import sys
+import unittest
+import uuid
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_ROOT = PROJECT_ROOT / "src"
+if str(SRC_ROOT) not in sys.path:
+    sys.path.insert(0, str(SRC_ROOT))
+
+from models import MotionResult, ZoneMotionResult
+from output.frame_store import SharedFrameStore
+from output.motion_publisher import MotionPublisher
+
+
+# Object detection's pre-parse filter, loaded by path - its package names clash with ours
+_DECODER_PATH = PROJECT_ROOT.parent / "objectDetection" / "src" / "streaming" / "message_decoder.py"
+_decoder_spec = importlib.util.spec_from_file_location("object_detection_message_decoder", _DECODER_PATH)
+message_decoder = importlib.util.module_from_spec(_decoder_spec)
+_decoder_spec.loader.exec_module(message_decoder)
+
+
+class FakePipeline:
+    def __init__(self, sent):
+        self.sent = sent
+
+    def publish(self, channel, message):
+        self.sent.append(("publish", json.loads(message)))
+
+    def xadd(self, key, fields, maxlen, approximate):
+        self.sent.append(("xadd", json.loads(fields["event"])))
+
+    def execute(self):
+        pass
+
+
+class FakeRedis:
+    def __init__(self):
+        self.sent = []
+
+    def pipeline(self):
+        return FakePipeline(self.sent)
+
+
+class MotionPublisherFrameStoreTests(unittest.TestCase):
+    def setUp(self):
+        self.store = SharedFrameStore(f"test-{uuid.uuid4().hex[:8]}", slot_count=2, slot_bytes=8 * 6 * 3)
+        self.redis = FakeRedis()
+
+    def tearDown(self):
+        self.store.close()
+
+    def publish(self, **kwargs):
+        publisher = MotionPublisher(self.redis, frame_store=self.store, **kwargs)
+        result = MotionResult(
+            camera_id="cam",
+            has_motion=True,
+            original_frame=b"jpeg",
+            decoded_frame=np.zeros((6, 8, 3), dtype=np.uint8),
+        )
+        publisher.publish(result, 1000)
+        return self.redis.sent
+
+    def test_jpeg_stays_inline_with_the_handle_by_default(self):
+        (_, event), = self.publish()
+
+        self.assertIn("frame_handle", event)
+        self.assertTrue(event["original_frame"])
+
+    def test_handle_replaces_jpeg_when_inline_frames_is_off(self):
+        (_, event), = self.publish(inline_frames=False)
+
+        self.assertIn("frame_handle", event)
+        self.assertEqual(event["original_frame"], "")
+
+    def test_stream_entries_always_keep_the_jpeg(self):
+        (_, entry), (_, live) = self.publish(transport="stream", inline_frames=False)
+
+        self.assertIn("frame_handle", entry)
+        self.assertTrue(entry["original_frame"])
+        self.assertEqual(live["original_frame"], "")
+        self.assertNotIn("frame_handle", live)
+
+
+
+class RawPipeline:
+    """Keeps the serialized payloads exactly as they would go over the wire."""
+
+    def __init__(self, sent):
+        self.sent = sent
+
+    def publish(self, channel, message):
+        self.sent.append(message.encode())
+
+    def xadd(self, key, fields, maxlen, approximate):
+        self.sent.append(fields["event"].encode())
+
+    def execute(self):
+        pass
+
+
+class RawRedis(FakeRedis):
+    def pipeline(self):
+        return RawPipeline(self.sent)
+
+
+class NeedsDetectionContractTests(unittest.TestCase):
+    """Object detection's byte-level pre-check agrees with a full parse of our events."""
+
+    def setUp(self):
+        self.store = SharedFrameStore(f"test-{uuid.uuid4().hex[:8]}", slot_count=4, slot_bytes=8 * 6 * 3)
+
+    def tearDown(self):
+        self.store.close()
+
+    def payloads(self):
+        zones = [
+            ZoneMotionResult(f"zone-{i}", f"Zone {i}", i == 0, 12.5, 3, 4000)
+            for i in range(8)
+        ]
+        for has_motion, frame, mask, stored, transport, inline_frames in itertools.product(
+            (True, False),
+            (b"jpeg", None),
+            (np.zeros((6, 8), dtype=np.uint8), None),
+            (True, False),
+            ("pubsub", "stream"),
+            (True, False),
+        ):
+            redis_client = RawRedis()
+            publisher = MotionPublisher(
+                redis_client,
+                transport=transport,
+                frame_store=self.store if stored else None,
+                inline_frames=inline_frames,
+            )
+            result = MotionResult(
+                camera_id="cam",
+                has_motion=has_motion,
+                processing_time_ms=1.234,
+                zone_results=zones,
+                mask=mask,
+                original_frame=frame,
+                decoded_frame=np.zeros((6, 8, 3), dtype=np.uint8),
+            )
+            publisher.publish(result, 1000)
+            yield from redis_client.sent
+
+    def test_pre_check_matches_full_parse(self):
+        payloads = list(self.payloads())
+        self.assertGreater(len(payloads), 64)
+
+        for raw in payloads:
+            event = json.loads(raw)
+            needed = event["motion_detected"] and bool(
+                event["original_frame"] or event.get("frame_handle")
+            )
+            with self.subTest(event={k: v for k, v in event.items() if k != "zone_results"}):
+                self.assertEqual(message_decoder.needs_detection(raw), needed)
+                self.assertEqual(message_decoder.needs_detection(raw.decode()), needed)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,466 @@
+"""End-to-end throughput/latency benchmark for MotionEventConsumer.
+
+Publishes synthetic motion events (base64 JPEG frames) for N cameras at a
+fixed rate into an in-process fake Redis server, runs the real consumer ->
+detector -> publisher path against it, and listens on detection:* for the
+results. One scenario runs per (model, max batch size) combination.
+
+Reported per scenario:
+    - sent / published events per second over the measurement window
+    - drop rate (events never published) split into backpressure drops,
+      deadline expiries and decode-pool skips
+    - scheduler and pipeline queue depth (mean / max, sampled)
+    - p50 / p95 / p99 event-to-publish latency (capture timestamp -> result
+      received on the detection channel)
+
+Runs on CPU with a nano model by default and needs no external services:
+
+    python benchmarks/consumer_benchmark.py --weights-dir /path/to/weights \\
+        --models yolo11n --batch-sizes 1,4,8 --cameras 4 --fps 5
+
+Weights missing from --weights-dir are downloaded by ultralytics. Needs
+fakeredis (pip install fakeredis), which the service itself does not.
+
+fakeredis ignores XREADGROUP BLOCK and answers an empty read at once, so with
+--transport stream the consumer's read loop is throttled by a short sleep on
+empty reads; stream-mode latencies include up to EMPTY_READ_SLEEP_S of that
+polling, which a real Redis server does not add.
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+import redis
+import redis.asyncio as aioredis
+from fakeredis import TcpFakeServer
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from config import CameraConfigManager
+from detection import ObjectDetector
+from output import DetectionPublisher
+from streaming import MotionEventConsumer
+
+
+CAMERA_CONFIG_CHANNEL = 'camera:config'
+MOTION_CHANNEL_PREFIX = 'motion:'
+DETECTION_CHANNEL_PREFIX = 'detection:'
+MOTION_STREAM_KEY = 'motion:frames'
+
+# Distinct frames pre-encoded per camera, cycled while publishing
+FRAMES_PER_CAMERA = 8
+
+# How often queue depths are sampled during the measurement window
+SAMPLE_INTERVAL_S = 0.25
+
+# Pause after an empty stream read, standing in for the BLOCK fakeredis ignores
+EMPTY_READ_SLEEP_S = 0.005
+
+# Enabled classes for every synthetic camera - low thresholds so
+# postprocessing sees real candidate boxes
+CLASS_CONFIGS = [
+    {'class': 'person', 'confidence': 0.1},
+    {'class': 'car', 'confidence': 0.1},
+    {'class': 'dog', 'confidence': 0.1},
+]
+
+
+class StaticModelConfig:
+    """Stands in for GlobalConfigManager - the model is fixed per scenario."""
+
+    def __init__(self, model: str):
+        self.model = model
+
+    def on_model_change(self, callback) -> None:
+        pass
+
+
+def throttle_empty_stream_reads() -> None:
+    """
+    Make blocking XREADGROUP calls wait briefly when nothing was read.
+
+    fakeredis returns an empty read immediately even with BLOCK, which turns
+    the consumer's stream loop into a busy spin that starves the inference
+    and publish threads of CPU and skews every stream-mode measurement.
+    """
+    xreadgroup = aioredis.Redis.xreadgroup
+
+    async def throttled_xreadgroup(self, *args, **kwargs):
+        entries = await xreadgroup(self, *args, **kwargs)
+        if not entries and kwargs.get('block') is not None:
+            await asyncio.sleep(EMPTY_READ_SLEEP_S)
+        return entries
+
+    aioredis.Redis.xreadgroup = throttled_xreadgroup
+
+
+def start_fake_redis() -> Tuple[TcpFakeServer, int]:
+    """Start a fake Redis server on a free local port (serving thread is a daemon)."""
+    server = TcpFakeServer(('127.0.0.1', 0), server_type='redis')
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='fake-redis', daemon=True).start()
+    return server, server.server_address[1]
+
+
+def make_frames(camera_index: int, width: int, height: int) -> List[str]:
+    """Base64 JPEGs of a noisy scene with a block moving across it."""
+    rng = np.random.default_rng(camera_index)
+    background = rng.integers(0, 255, (height, width, 3), dtype=np.uint8)
+    background = cv2.GaussianBlur(background, (0, 0), 3)
+
+    frames = []
+    box_w, box_h = width // 6, height // 3
+    for i in range(FRAMES_PER_CAMERA):
+        frame = background.copy()
+        x = int((width - box_w) * i / max(1, FRAMES_PER_CAMERA - 1))
+        y = height // 2 - box_h // 2
+        cv2.rectangle(frame, (x, y), (x + box_w, y + box_h), (40, 60, 200), -1)
+        _, jpeg = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 80])
+        frames.append(base64.b64encode(jpeg.tobytes()).decode())
+    return frames
+
+
+def build_event(camera_id: str, timestamp: int, frame: str) -> str:
+    """Motion event in the motion service's publish format (key order matters)."""
+    return json.dumps({
+        'camera_id': camera_id,
+        'timestamp': timestamp,
+        'motion_detected': True,
+        'processing_time_ms': 1.0,
+        'zone_results': [],
+        'mask': '',
+        'original_frame': frame,
+    })
+
+
+class EventGenerator:
+    """Publishes motion events for all cameras at a fixed aggregate rate."""
+
+    def __init__(
+        self,
+        client: redis.Redis,
+        cameras: List[str],
+        fps_per_camera: float,
+        frames: Dict[str, List[str]],
+        transport: str,
+    ):
+        self._client = client
+        self._cameras = cameras
+        self._interval_s = 1.0 / (fps_per_camera * len(cameras))
+        self._frames = frames
+        self._transport = transport
+        self._last_timestamp: Dict[str, int] = {}
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+        # (camera_id, timestamp) of every event sent
+        self.sent: List[Tuple[str, int]] = []
+
+    def start(self) -> None:
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name='event-generator', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._running = False
+        if self._thread:
+            self._thread.join()
+
+    def _run(self) -> None:
+        start = time.monotonic()
+        sent = 0
+        while self._running:
+            # Fixed schedule - a generator that falls behind catches up
+            # immediately instead of lowering the offered rate
+            delay = start + sent * self._interval_s - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+            camera_id = self._cameras[sent % len(self._cameras)]
+            frame = self._frames[camera_id][(sent // len(self._cameras)) % FRAMES_PER_CAMERA]
+            self._publish(camera_id, frame)
+            sent += 1
+
+    def _publish(self, camera_id: str, frame: str) -> None:
+        # Capture timestamps are unique per camera (results are keyed on them)
+        timestamp = max(int(time.time() * 1000), self._last_timestamp.get(camera_id, 0) + 1)
+        self._last_timestamp[camera_id] = timestamp
+
+        event = build_event(camera_id, timestamp, frame)
+        if self._transport == 'stream':
+            self._client.xadd(MOTION_STREAM_KEY, {'camera_id': camera_id, 'event': event})
+        else:
+            self._client.publish(f"{MOTION_CHANNEL_PREFIX}{camera_id}", event)
+        self.sent.append((camera_id, timestamp))
+
+
+class ResultListener:
+    """Records when each detection result arrives on detection:*."""
+
+    def __init__(self, client: redis.Redis):
+        self._pubsub = client.pubsub(ignore_subscribe_messages=True)
+        self._pubsub.psubscribe(f"{DETECTION_CHANNEL_PREFIX}*")
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+        # (camera_id, timestamp) -> wall-clock receive time in ms
+        self.received: Dict[Tuple[str, int], float] = {}
+
+    def start(self) -> None:
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name='result-listener', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._running = False
+        if self._thread:
+            self._thread.join()
+        self._pubsub.close()
+
+    def _run(self) -> None:
+        while self._running:
+            message = self._pubsub.get_message(timeout=0.1)
+            if message and message['type'] == 'pmessage':
+                received_ms = time.time() * 1000
+                result = json.loads(message['data'])
+                self.received[(result['camera_id'], result['timestamp'])] = received_ms
+
+
+def register_cameras(client: redis.Redis, camera_config: CameraConfigManager, cameras: List[str]) -> None:
+    """Announce cameras on the config channel until the manager has picked them all up."""
+    deadline = time.monotonic() + 10.0
+    while len(camera_config.get_enabled_cameras()) < len(cameras):
+        if time.monotonic() > deadline:
+            raise RuntimeError("Camera config manager did not register the benchmark cameras")
+        for camera_id in cameras:
+            client.publish(CAMERA_CONFIG_CHANNEL, json.dumps({
+                'action': 'created',
+                'camera': {
+                    'externalID': camera_id,
+                    'name': camera_id,
+                    'objectDetectionEnabled': True,
+                    'classConfigs': CLASS_CONFIGS,
+                    'motionZones': [],
+                },
+            }))
+        time.sleep(0.2)
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    return round(float(np.percentile(values, q)), 1) if values else None
+
+
+def run_scenario(args: argparse.Namespace, port: int, model: str, batch_size: int) -> dict:
+    """Run one (model, max batch size) scenario and return its measurements."""
+    client = redis.Redis(host='127.0.0.1', port=port)
+    client.flushall()
+
+    cameras = [f"bench-cam-{i}" for i in range(args.cameras)]
+    width, height = args.frame_size
+    frames = {camera_id: make_frames(i, width, height) for i, camera_id in enumerate(cameras)}
+
+    camera_config = CameraConfigManager(
+        redis_host='127.0.0.1', redis_port=port, config_channel=CAMERA_CONFIG_CHANNEL
+    )
+    camera_config.start()
+
+    detector = ObjectDetector(
+        global_config=StaticModelConfig(model),
+        weights_dir=args.weights_dir,
+        backend=args.backend,
+        devices=[args.device],
+        max_batch_size=batch_size,
+    )
+    detector.start()
+
+    publisher = DetectionPublisher(
+        redis_host='127.0.0.1', redis_port=port, channel_prefix=DETECTION_CHANNEL_PREFIX
+    )
+    consumer = MotionEventConsumer(
+        redis_host='127.0.0.1',
+        redis_port=port,
+        detector=detector,
+        camera_config=camera_config,
+        publisher=publisher,
+        channel_prefix=MOTION_CHANNEL_PREFIX,
+        max_pending_frames=args.max_pending_frames,
+        max_pending_frames_per_camera=max(1, args.max_pending_frames // args.cameras),
+        max_batch_size=batch_size,
+        max_wait_ms=args.max_wait_ms,
+        target_batch_latency_ms=args.target_latency_ms,
+        frame_deadline_ms=args.frame_deadline_ms,
+        transport=args.transport,
+        stream_key=MOTION_STREAM_KEY,
+    )
+
+    register_cameras(client, camera_config, cameras)
+    consumer_thread = threading.Thread(target=consumer.start, name='consumer', daemon=True)
+    consumer_thread.start()
+
+    listener = ResultListener(redis.Redis(host='127.0.0.1', port=port))
+    listener.start()
+    time.sleep(1.0)  # Let the consumer subscribe (or create its group) before events flow
+
+    generator = EventGenerator(client, cameras, args.fps, frames, args.transport)
+    generator.start()
+
+    # Warm-up: let batch latency estimates and queues settle
+    time.sleep(args.warmup)
+    window_start_ms = time.time() * 1000
+    start_stats = consumer.get_stats()
+    depth_samples: List[Tuple[int, int]] = []
+
+    window_end = time.monotonic() + args.duration
+    while time.monotonic() < window_end:
+        stats = consumer.get_stats()
+        depth_samples.append((stats['queue_depth'], stats['pipeline_queue_depth']))
+        time.sleep(SAMPLE_INTERVAL_S)
+    window_end_ms = time.time() * 1000
+    end_stats = consumer.get_stats()
+
+    generator.stop()
+    # Results still in flight at the end of the window are published or
+    # expire within the frame deadline
+    time.sleep(args.frame_deadline_ms / 1000 + 0.5)
+
+    consumer.stop()
+    consumer_thread.join(timeout=10)
+    listener.stop()
+    publisher.close()
+    detector.stop()
+    camera_config.stop()
+    client.close()
+
+    window_s = (window_end_ms - window_start_ms) / 1000
+    sent = [key for key in generator.sent if window_start_ms <= key[1] < window_end_ms]
+    latencies = [
+        listener.received[key] - key[1] for key in sent if key in listener.received
+    ]
+    published_in_window = sum(
+        1 for received_ms in listener.received.values()
+        if window_start_ms <= received_ms < window_end_ms
+    )
+
+    def delta(name: str) -> int:
+        return end_stats[name] - start_stats[name]
+
+    scheduler_depths = [d for d, _ in depth_samples] or [0]
+    pipeline_depths = [d for _, d in depth_samples] or [0]
+    return {
+        'model': model,
+        'max_batch_size': batch_size,
+        'offered_fps': round(len(sent) / window_s, 1),
+        'published_fps': round(published_in_window / window_s, 1),
+        'drop_rate': round(1 - len(latencies) / len(sent), 3) if sent else None,
+        'dropped_backpressure': delta('dropped_frames'),
+        'dropped_deadline': delta('expired_frames'),
+        'skipped_decodes': delta('skipped_decodes'),
+        'queue_depth_mean': round(float(np.mean(scheduler_depths)), 1),
+        'queue_depth_max': int(max(scheduler_depths)),
+        'pipeline_depth_mean': round(float(np.mean(pipeline_depths)), 1),
+        'pipeline_depth_max': int(max(pipeline_depths)),
+        'latency_p50_ms': percentile(latencies, 50),
+        'latency_p95_ms': percentile(latencies, 95),
+        'latency_p99_ms': percentile(latencies, 99),
+    }
+
+
+def print_report(results: List[dict]) -> None:
+    columns = [
+        ('model', 'model'),
+        ('max_batch_size', 'batch'),
+        ('offered_fps', 'sent/s'),
+        ('published_fps', 'pub/s'),
+        ('drop_rate', 'drop'),
+        ('dropped_backpressure', 'bp'),
+        ('dropped_deadline', 'late'),
+        ('skipped_decodes', 'skip'),
+        ('queue_depth_mean', 'q avg'),
+        ('queue_depth_max', 'q max'),
+        ('pipeline_depth_mean', 'pipe avg'),
+        ('latency_p50_ms', 'p50 ms'),
+        ('latency_p95_ms', 'p95 ms'),
+        ('latency_p99_ms', 'p99 ms'),
+    ]
+    rows = [[str(header) for _, header in columns]]
+    rows += [[str(result[key]) for key, _ in columns] for result in results]
+    widths = [max(len(row[i]) for row in rows) for i in range(len(columns))]
+    for row in rows:
+        print('  '.join(cell.rjust(width) for cell, width in zip(row, widths)))
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--models', default='yolo11n', help='Comma-separated model names')
+    parser.add_argument('--batch-sizes', default='1,4,8', help='Comma-separated max batch sizes')
+    parser.add_argument('--cameras', type=int, default=4)
+    parser.add_argument('--fps', type=float, default=5.0, help='Events per second per camera')
+    parser.add_argument('--duration', type=float, default=20.0, help='Measurement window (s)')
+    parser.add_argument('--warmup', type=float, default=5.0, help='Unmeasured lead-in (s)')
+    parser.add_argument('--frame-size', default='640x360', help='Synthetic frame WxH')
+    parser.add_argument('--weights-dir', default=os.path.join(os.path.dirname(__file__), 'weights'))
+    parser.add_argument('--backend', choices=('torch', 'onnx'), default='torch')
+    parser.add_argument('--device', default='cpu')
+    parser.add_argument('--transport', choices=('pubsub', 'stream'), default='pubsub')
+    parser.add_argument('--max-pending-frames', type=int, default=12)
+    parser.add_argument('--max-wait-ms', type=float, default=15.0)
+    parser.add_argument('--target-latency-ms', type=float, default=100.0)
+    parser.add_argument('--frame-deadline-ms', type=float, default=2000.0)
+    parser.add_argument('--json', help='Also write results to this file')
+    parser.add_argument('--verbose', action='store_true', help='Show service logs')
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.frame_size.lower().split('x'))
+    args.frame_size = (width, height)
+    args.models = [m.strip() for m in args.models.split(',') if m.strip()]
+    args.batch_sizes = [int(b) for b in args.batch_sizes.split(',') if b.strip()]
+    return args
+
+
+def main() -> None:
+    args = parse_args()
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.WARNING,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        stream=sys.stdout,
+    )
+
+    if args.transport == 'stream':
+        throttle_empty_stream_reads()
+
+    server, port = start_fake_redis()
+    results = []
+    try:
+        for model in args.models:
+            for batch_size in args.batch_sizes:
+                print(f"Running {model} with max batch size {batch_size}...", flush=True)
+                results.append(run_scenario(args, port, model, batch_size))
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    print()
+    print(
+        f"{args.cameras} cameras x {args.fps:g} fps, {args.frame_size[0]}x{args.frame_size[1]}, "
+        f"{args.transport} transport, {args.duration:g}s window"
+    )
+    print_report(results)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -19,6 +19,7 @@ class CameraConfigManager:
     Per-camera settings:
     - objectDetectionEnabled
     - classConfigs
+    - objectDetectionPriority (optional, scheduling weight, default 1.0)
 
     Global settings (model, clip durations) are managed by GlobalConfigManager.
     """
@@ -198,6 +199,7 @@ class CameraConfigManager:
         return CameraObjectDetectionSettings(
             class_configs=class_configs,
             motion_zones=motion_zones,
+            priority=float(camera_data.get('objectDetectionPriority', 1.0)),
         )
 
     def _notify_change(
@@ -28,5 +28,78 @@ class Settings:
     # Motion channel prefix for subscribing
     motion_channel_prefix: str = os.getenv('MOTION_CHANNEL_PREFIX', 'motion:')
 
+    # Motion event transport: 'pubsub' (motion:{camera_id} channels) or
+    # 'stream' (shared stream read through a consumer group)
+    motion_transport: str = os.getenv('MOTION_TRANSPORT', 'pubsub')
+    motion_stream_key: str = os.getenv('MOTION_STREAM_KEY', 'motion:frames')
+    motion_stream_group: str = os.getenv('MOTION_STREAM_GROUP', 'object-detectors')
+    consumer_name: str = os.getenv('HOSTNAME', 'object-detector-1')
+    # Pending entries idle this long are reclaimed from dead consumers
+    motion_stream_claim_idle_ms: int = int(os.getenv('MOTION_STREAM_CLAIM_IDLE_MS', '30000'))
+
     # Weights directory
     weights_dir: str = os.getenv('WEIGHTS_DIR', '/app/src/models/weights')
+
+    # Inference backend: 'torch' (ultralytics) or 'onnx' (ONNX Runtime /
+    # OpenVINO, for CPU-only installs). ONNX_PRECISION is fp32, fp16 or int8;
+    # ONNX_THREADS=0 lets ONNX Runtime pick the thread count
+    detection_backend: str = os.getenv('DETECTION_BACKEND', 'torch')
+    onnx_threads: int = int(os.getenv('ONNX_THREADS', '0'))
+    onnx_precision: str = os.getenv('ONNX_PRECISION', 'fp32')
+
+    # Disk budget for exported models cached in WEIGHTS_DIR/cache (LRU evicted)
+    model_cache_max_gb: float = float(os.getenv('MODEL_CACHE_MAX_GB', '5'))
+
+    # Inference worker processes (1 = in-process, torch backend only). Workers are assigned
+    # round-robin to INFERENCE_DEVICES (e.g. "cuda:0,cuda:1" or "cpu");
+    # empty means every visible GPU, or CPU if there are none
+    inference_workers: int = int(os.getenv('INFERENCE_WORKERS', '1'))
+    inference_devices: str = os.getenv('INFERENCE_DEVICES', '')
+
+    # Inference optimizations - FP16 applies on CUDA only; MODEL_COMPILE is a
+    # torch.compile mode (default, reduce-overhead, ...) or empty to disable
+    model_half: bool = os.getenv('MODEL_HALF', 'false').lower() == 'true'
+    model_compile: str = os.getenv('MODEL_COMPILE', '')
+
+    # Batching
+    max_pending_frames: int = int(os.getenv('MAX_PENDING_FRAMES', '12'))
+    max_pending_frames_per_camera: int = int(os.getenv('MAX_PENDING_FRAMES_PER_CAMERA', '6'))
+    # Byte caps on the same queue (JPEG size, or decoded size for shared
+    # frames) - decoded 4K frames are ~24MB, 720p ~3MB. 0 disables a cap
+    max_pending_mb: float = float(os.getenv('MAX_PENDING_MB', '256'))
+    max_pending_mb_per_camera: float = float(os.getenv('MAX_PENDING_MB_PER_CAMERA', '96'))
+    max_batch_size: int = int(os.getenv('MAX_BATCH_SIZE', '16'))
+    batch_max_wait_ms: float = float(os.getenv('BATCH_MAX_WAIT_MS', '15'))
+    batch_target_latency_ms: float = float(os.getenv('BATCH_TARGET_LATENCY_MS', '100'))
+
+    # Motion event decode pool (JSON parsing + base64 decoding off the pubsub thread)
+    decode_workers: int = int(os.getenv('DECODE_WORKERS', '2'))
+
+    # Batches buffered between the decode -> infer -> publish pipeline stages
+    pipeline_depth: int = int(os.getenv('PIPELINE_DEPTH', '2'))
+
+    # Near-duplicate result reuse: a frame whose motion area differs from the
+    # camera's last inferred frame by less than RESULT_CACHE_DIFF_THRESHOLD
+    # (mean abs grayscale diff) reuses its detections, for up to
+    # RESULT_CACHE_MAX_FRAMES frames / RESULT_CACHE_MAX_AGE_MS. Off by default
+    # (0 frames); reused results may miss objects that barely moved
+    result_cache_max_frames: int = int(os.getenv('RESULT_CACHE_MAX_FRAMES', '0'))
+    result_cache_max_age_ms: float = float(os.getenv('RESULT_CACHE_MAX_AGE_MS', '1000'))
+    result_cache_diff_threshold: float = float(os.getenv('RESULT_CACHE_DIFF_THRESHOLD', '3.0'))
+
+    # Object tracking (off by default): persistent track ids, inference on
+    # every TRACKER_DETECT_EVERY-th frame while tracking, and detection events
+    # only published when tracks start or end
+    tracking_enabled: bool = os.getenv('TRACKING_ENABLED', 'false').lower() == 'true'
+    tracker_detect_every: int = int(os.getenv('TRACKER_DETECT_EVERY', '3'))
+    tracker_iou_threshold: float = float(os.getenv('TRACKER_IOU_THRESHOLD', '0.3'))
+    tracker_max_age_ms: float = float(os.getenv('TRACKER_MAX_AGE_MS', '3000'))
+
+    # Frames older than this (from capture time) are dropped before inference
+    frame_deadline_ms: float = float(os.getenv('FRAME_DEADLINE_MS', '2000'))
+
+    # Prometheus-format metrics endpoint (GET /metrics); off by default (port 0)
+    # and bound to localhost unless METRICS_HOST says otherwise. Stage timings
+    # and drop counters are also summarized in the log every minute
+    metrics_port: int = int(os.getenv('METRICS_PORT', '0'))
+    metrics_host: str = os.getenv('METRICS_HOST', '127.0.0.1')
@@ -1,6 +1,9 @@
 """Detection module - YOLO inference."""
 
 from .object_detector import ObjectDetector
-from .zone_filter import filter_detections_by_zones
+from .result_cache import DetectionResultCache
+from .tracker import MultiCameraTracker
+from .zone_filter import CompiledZones, filter_detections_by_zones
 
-__all__ = ['ObjectDetector', 'filter_detections_by_zones']
+__all__ = ['ObjectDetector', 'DetectionResultCache', 'MultiCameraTracker',
+           'CompiledZones', 'filter_detections_by_zones']
@@ -0,0 +1,182 @@
+"""Persistent cache for exported/optimized model artifacts."""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, asdict
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = "artifacts.json"
+HASH_CHUNK_BYTES = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class ArtifactKey:
+    """Identifies one exported model variant."""
+    model_name: str
+    backend: str  # e.g. onnx, torchscript, engine
+    imgsz: int
+    batch: int  # 0 = dynamic batch
+    precision: str  # fp32, fp16, int8
+
+    @property
+    def filename(self) -> str:
+        extension = {'onnx': '.onnx', 'torchscript': '.torchscript', 'engine': '.engine'}.get(
+            self.backend, f'.{self.backend}'
+        )
+        batch = 'dyn' if self.batch == 0 else f'b{self.batch}'
+        return f"{self.model_name}_{self.imgsz}_{batch}_{self.precision}{extension}"
+
+
+class ModelArtifactCache:
+    """
+    Disk cache of exported models with integrity checks and LRU eviction.
+
+    - Artifacts live in cache_dir, named after their ArtifactKey
+    - An index file records each artifact's sha256, size and last use
+    - Artifacts whose hash no longer matches are discarded and rebuilt
+    - After adding an artifact, least recently used ones are evicted until
+      the cache fits in max_bytes (the new artifact is always kept)
+
+    Assumes a single writer process per cache_dir.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int):
+        self._cache_dir = cache_dir
+        self._max_bytes = max_bytes
+        self._index_path = os.path.join(cache_dir, INDEX_FILE)
+        self._lock = threading.Lock()
+        self._index: Dict[str, dict] = self._read_index()
+
+    def get(self, key: ArtifactKey) -> Optional[str]:
+        """
+        Get a cached artifact's path.
+
+        Returns:
+            Path to the verified artifact, or None if missing or corrupt
+        """
+        with self._lock:
+            entry = self._index.get(key.filename)
+            if entry is None:
+                return None
+
+            path = os.path.join(self._cache_dir, key.filename)
+            if not os.path.exists(path) or _sha256(path) != entry['sha256']:
+                logger.warning(f"Cached artifact {key.filename} is missing or corrupt - discarding")
+                self._remove(key.filename)
+                self._write_index()
+                return None
+
+            entry['last_used'] = time.time()
+            self._write_index()
+            return path
+
+    def put(self, key: ArtifactKey, source_path: str) -> str:
+        """
+        Move a freshly built artifact into the cache.
+
+        Args:
+            key: Artifact identity
+            source_path: Built file; moved (not copied) into the cache
+
+        Returns:
+            Path of the cached artifact
+        """
+        with self._lock:
+            os.makedirs(self._cache_dir, exist_ok=True)
+            path = os.path.join(self._cache_dir, key.filename)
+            os.replace(source_path, path)
+
+            self._index[key.filename] = {
+                **asdict(key),
+                'sha256': _sha256(path),
+                'size': os.path.getsize(path),
+                'last_used': time.time(),
+            }
+            self._evict(keep=key.filename)
+            self._write_index()
+
+        logger.info(f"Cached model artifact {key.filename}")
+        return path
+
+    def get_or_build(self, key: ArtifactKey, build: Callable[[str], None]) -> str:
+        """
+        Get a cached artifact, building it on a miss.
+
+        Args:
+            key: Artifact identity
+            build: Writes the artifact to the path it is given
+
+        Returns:
+            Path of the cached artifact
+        """
+        path = self.get(key)
+        if path is not None:
+            logger.info(f"Using cached model artifact {key.filename}")
+            return path
+
+        os.makedirs(self._cache_dir, exist_ok=True)
+        partial_path = os.path.join(self._cache_dir, f".{key.filename}.partial")
+        try:
+            build(partial_path)
+            return self.put(key, partial_path)
+        finally:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+
+    def total_bytes(self) -> int:
+        """Total size of cached artifacts."""
+        with self._lock:
+            return sum(entry['size'] for entry in self._index.values())
+
+    def _evict(self, keep: str) -> None:
+        """Drop least recently used artifacts until under budget. Lock held."""
+        total = sum(entry['size'] for entry in self._index.values())
+        by_age = sorted(self._index.items(), key=lambda item: item[1]['last_used'])
+
+        for filename, entry in by_age:
+            if total <= self._max_bytes:
+                break
+            if filename == keep:
+                continue
+            logger.info(f"Evicting model artifact {filename} ({entry['size'] / 1e6:.1f} MB)")
+            self._remove(filename)
+            total -= entry['size']
+
+    def _remove(self, filename: str) -> None:
+        """Delete an artifact and its index entry. Lock held."""
+        self._index.pop(filename, None)
+        path = os.path.join(self._cache_dir, filename)
+        if os.path.exists(path):
+            os.remove(path)
+
+    def _read_index(self) -> Dict[str, dict]:
+        if not os.path.exists(self._index_path):
+            return {}
+        try:
+            with open(self._index_path) as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Unreadable artifact index, starting empty: {e}")
+            return {}
+
+    def _write_index(self) -> None:
+        """Atomically rewrite the index file. Lock held."""
+        os.makedirs(self._cache_dir, exist_ok=True)
+        tmp_path = f"{self._index_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self._index, f, indent=2)
+        os.replace(tmp_path, self._index_path)
+
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
@@ -1,17 +1,31 @@
 """Object detector - runs YOLO on frames with zone filtering."""
 
 import logging
+import os
 import threading
 import time
-from typing import List, Optional, Set, Tuple
+from concurrent.futures import Executor
+from typing import Dict, List, Optional, Set, Tuple
+
+import torch
 
 from config import GlobalConfigManager
-from models import DetectionResult, CameraObjectDetectionSettings
-from .strategies import YOLOStrategy, BaseDetectionStrategy
-from .zone_filter import filter_detections_by_zones
+from metrics import BATCH_SIZE_BUCKETS, STAGE_BUCKETS_MS, MetricsRegistry
+from models import DetectionBox, DetectionResult, CameraObjectDetectionSettings
+from .model_cache import ModelArtifactCache
+from .result_cache import DetectionResultCache
+from .tracker import MultiCameraTracker
+from .strategies import (
+    YOLOStrategy, MultiProcessStrategy, OnnxStrategy, BaseDetectionStrategy, FrameData,
+    decode_frame,
+)
+from .zone_filter import CompiledZones
 
 logger = logging.getLogger(__name__)
 
+# How long stop() waits for a model that is still loading
+LOADER_STOP_TIMEOUT_S = 30.0
+
 
 class ObjectDetector:
     """
@@ -20,19 +34,78 @@ class ObjectDetector:
     - Uses global model from GlobalConfigManager
     - Keeps model loaded in GPU memory until model changes
     - Filters detections by zones with motion
+    - backend='onnx' runs inference through ONNX Runtime instead of torch
+    - With num_workers > 1, runs inference in worker processes spread
+      round-robin over devices (one model per process)
+    - Model changes load and warm up the new model in the background while
+      the old one keeps serving, then swap atomically (both models are
+      resident in memory briefly during the switch)
+    - Frames nearly identical to a camera's last inferred frame reuse its
+      detections (marked cached) instead of running inference
+    - With a tracker, boxes get persistent track ids, inference runs on
+      every k-th frame while objects are tracked, and results are marked
+      track_start / track_update / track_end
+    - Every load is followed by warm-up batches at the sizes the batch
+      scheduler produces, so real frames never pay first-call costs
+    - With a metrics registry, records per-batch stage timings (decode,
+      preprocess, inference, postprocess, zone filter), batch sizes and peak
+      CUDA memory
     """
 
     def __init__(
         self,
         global_config: GlobalConfigManager,
         weights_dir: str = "/app/src/models/weights",
+        backend: str = "torch",
+        onnx_threads: int = 0,
+        onnx_precision: str = "fp32",
+        model_cache_max_bytes: int = 5 * 1024 ** 3,
+        num_workers: int = 1,
+        devices: Optional[List[str]] = None,
+        max_batch_size: int = 1,
+        half: bool = False,
+        compile_mode: Optional[str] = None,
+        result_cache: Optional[DetectionResultCache] = None,
+        tracker: Optional[MultiCameraTracker] = None,
+        metrics: Optional[MetricsRegistry] = None,
     ):
+        if backend not in ("torch", "onnx"):
+            raise ValueError(f"Unknown detection backend: {backend}")
+
         self._global_config = global_config
         self._weights_dir = weights_dir
+        self._backend = backend
+        self._onnx_threads = onnx_threads
+        self._onnx_precision = onnx_precision
+        self._artifact_cache = ModelArtifactCache(
+            os.path.join(weights_dir, "cache"), max_bytes=model_cache_max_bytes
+        )
+        self._num_workers = max(1, num_workers)
+        self._devices = devices or self._default_devices()
+        self._warmup_batch_sizes = self._batch_sizes_up_to(max_batch_size)
+        self._half = half
+        self._compile_mode = compile_mode
+        self._result_cache = result_cache or DetectionResultCache(max_reuse_frames=0)
+        self._tracker = tracker
+        self._metrics = metrics
+        if metrics:
+            metrics.histogram('stage_ms', STAGE_BUCKETS_MS, 'Time per batch in each stage (ms)')
+            metrics.histogram('batch_size', BATCH_SIZE_BUCKETS, 'Frames scheduled / inferred per batch')
+            metrics.gauge('cuda_max_memory_allocated_bytes', 'Peak torch.cuda memory per device')
+            metrics.add_collector(self._collect_metrics)
+
+        # camera_id -> zones compiled from that camera's current config
+        self._compiled_zones: Dict[str, CompiledZones] = {}
         self._strategy: Optional[BaseDetectionStrategy] = None
         self._current_model: Optional[str] = None
         self._lock = threading.Lock()  # Protects model swap during inference
 
+        # Background model loading (latest requested model wins)
+        self._swap_lock = threading.Lock()
+        self._pending_model: Optional[str] = None
+        self._loader_thread: Optional[threading.Thread] = None
+        self._stopped = False
+
         # Register for model change callbacks
         global_config.on_model_change(self._on_model_change)
 
@@ -42,33 +115,248 @@ class ObjectDetector:
 
     def stop(self) -> None:
         """Unload the model."""
-        if self._strategy:
-            self._strategy.unload()
-            self._strategy = None
+        with self._swap_lock:
+            self._stopped = True
+            self._pending_model = None
+            loader = self._loader_thread
+        if loader:
+            loader.join(timeout=LOADER_STOP_TIMEOUT_S)
+
+        with self._lock:
+            strategy, self._strategy = self._strategy, None
             self._current_model = None
+        if strategy:
+            strategy.unload()
 
     def _on_model_change(self, old_model: str, new_model: str) -> None:
-        """Handle model change from global config."""
+        """Handle model change from global config - loads in the background."""
         logger.info(f"Model change detected: {old_model} -> {new_model}")
-        self._load_model(new_model)
+        with self._swap_lock:
+            if self._stopped:
+                return
+            self._pending_model = new_model
+            if self._loader_thread is None:
+                self._loader_thread = threading.Thread(
+                    target=self._loader_loop,
+                    daemon=True,
+                    name="model-loader",
+                )
+                self._loader_thread.start()
+
+    def _loader_loop(self) -> None:
+        """Load requested models until no change is pending."""
+        while True:
+            with self._swap_lock:
+                model_name, self._pending_model = self._pending_model, None
+                if model_name is None or self._stopped:
+                    self._loader_thread = None
+                    return
+
+            if model_name == self._current_model:
+                continue
+
+            try:
+                self._load_model(model_name)
+            except Exception as e:
+                logger.error(
+                    f"Failed to load model {model_name}, keeping {self._current_model}: {e}"
+                )
 
     def _load_model(self, model_name: str) -> None:
-        """Load a new model, unloading the previous one. Thread-safe."""
-        with self._lock:
-            if self._strategy:
-                self._strategy.unload()
+        """
+        Load and warm up a model, then swap it in. Thread-safe.
+
+        Inference keeps using the previous model until the swap; the
+        previous model is unloaded afterwards. A model that finishes loading
+        after stop() is unloaded instead of swapped in.
+        """
+        start_time = time.perf_counter()
+        strategy = self._create_strategy(model_name)
+        try:
+            strategy.load()
+            load_ms = (time.perf_counter() - start_time) * 1000
+            for batch_size in self._warmup_batch_sizes:
+                strategy.warmup(batch_size)
+            strategy.take_stage_timings()  # Warm-up isn't real traffic
+        except Exception:
+            strategy.unload()
+            raise
+
+        # stop() may have run during the load - it can no longer unload this one
+        with self._swap_lock:
+            stopped = self._stopped
+            if not stopped:
+                with self._lock:
+                    old_strategy, self._strategy = self._strategy, strategy
+                    self._current_model = model_name
+        if stopped:
+            strategy.unload()
+            logger.info(f"Model {model_name} finished loading after stop - unloaded")
+            return
+
+        if old_strategy:
+            old_strategy.unload()
 
-            self._strategy = YOLOStrategy(
+        ready_ms = (time.perf_counter() - start_time) * 1000
+        logger.info(
+            f"Model {model_name} loaded and ready in {ready_ms:.0f}ms "
+            f"(load {load_ms:.0f}ms, warm-up {ready_ms - load_ms:.0f}ms "
+            f"at batch sizes {self._warmup_batch_sizes})"
+        )
+
+    def expire_tracks(self) -> List[DetectionResult]:
+        """
+        End tracks that stopped being detected, e.g. after motion stopped.
+
+        Returns:
+            One track_end result per camera with ended tracks (empty if tracking
+            is off), stamped with the camera's own frame clock
+        """
+        if not self._tracker:
+            return []
+
+        return [
+            DetectionResult(
+                camera_id=camera_id,
+                timestamp=camera_now_ms,
+                model_used=self._current_model,
+                processing_time_ms=0.0,
+                boxes=ended,
+                event_type="track_end",
+                ended_track_ids=[box.track_id for box in ended],
+            )
+            for camera_id, (camera_now_ms, ended) in self._tracker.expire().items()
+        ]
+
+    def _get_compiled_zones(
+        self,
+        camera_id: str,
+        settings: CameraObjectDetectionSettings,
+    ) -> CompiledZones:
+        """Compiled zones for a camera, recompiled when its config is replaced."""
+        compiled = self._compiled_zones.get(camera_id)
+        if compiled is None or compiled.zones is not settings.motion_zones:
+            compiled = self._compiled_zones[camera_id] = CompiledZones(settings.motion_zones)
+        return compiled
+
+    def _apply_tracking(self, result: DetectionResult, tracked: bool) -> None:
+        """Tag boxes with track ids and set the result's track event type."""
+        if not tracked:
+            # Predicted from tracks - nothing new to report
+            result.event_type = "track_update"
+            return
+
+        update = self._tracker.update(result.camera_id, result.timestamp, result.boxes)
+        result.started_track_ids = update.started
+        result.ended_track_ids = [box.track_id for box in update.ended]
+
+        if update.started:
+            result.boxes = update.boxes
+            result.event_type = "track_start"
+        elif update.ended:
+            result.boxes = update.ended
+            result.event_type = "track_end"
+        else:
+            result.boxes = update.boxes
+            result.event_type = "track_update"
+
+    def _create_strategy(self, model_name: str) -> BaseDetectionStrategy:
+        """Build the strategy for a model from the configured backend."""
+        if self._backend == "onnx":
+            return OnnxStrategy(
                 model_name=model_name,
                 weights_dir=self._weights_dir,
+                num_threads=self._onnx_threads,
+                precision=self._onnx_precision,
+                cache=self._artifact_cache,
             )
-            self._strategy.load()
-            self._current_model = model_name
-            logger.info(f"Model {model_name} loaded and ready")
+
+        if self._num_workers == 1:
+            return YOLOStrategy(
+                model_name=model_name,
+                weights_dir=self._weights_dir,
+                device=self._devices[0],
+                half=self._half,
+                compile_mode=self._compile_mode,
+            )
+
+        return MultiProcessStrategy(
+            model_name=model_name,
+            weights_dir=self._weights_dir,
+            devices=[self._devices[i % len(self._devices)] for i in range(self._num_workers)],
+            half=self._half,
+            compile_mode=self._compile_mode,
+        )
+
+    @staticmethod
+    def _batch_sizes_up_to(max_batch_size: int) -> List[int]:
+        """Powers of two below max_batch_size, plus max_batch_size itself."""
+        sizes = []
+        size = 1
+        while size < max_batch_size:
+            sizes.append(size)
+            size *= 2
+        sizes.append(max(1, max_batch_size))
+        return sizes
+
+    @staticmethod
+    def _default_devices() -> List[str]:
+        """Every visible GPU, or CPU if there are none."""
+        if torch.cuda.is_available():
+            return [f"cuda:{i}" for i in range(torch.cuda.device_count())]
+        return ["cpu"]
+
+    def decode_frames(
+        self,
+        frames: List[Tuple[str, int, FrameData, CameraObjectDetectionSettings, Set[str]]],
+        pool: Optional[Executor] = None,
+    ) -> List[Tuple[str, int, FrameData, CameraObjectDetectionSettings, Set[str]]]:
+        """
+        Decode JPEG frames ahead of detect_batch (pipeline decode stage).
+
+        Frames are left as JPEG when the strategy decodes in its own worker
+        processes or the camera has no enabled classes. Frames that fail to
+        decode are passed through so the strategy reports them.
+
+        Args:
+            frames: Frame tuples as taken by detect_batch
+            pool: Executor to decode frames in parallel (OpenCV releases the GIL)
+
+        Returns:
+            The same frame tuples with decoded BGR frames where useful
+        """
+        strategy = self._strategy
+        if strategy is None or not strategy.prefers_decoded_frames:
+            return frames
+
+        start_time = time.perf_counter()
+        if pool is not None and len(frames) > 1:
+            decoded = list(pool.map(self._decode_frame_tuple, frames))
+        else:
+            decoded = [self._decode_frame_tuple(frame) for frame in frames]
+
+        if self._metrics and any(isinstance(frame[2], bytes) for frame in frames):
+            self._metrics.observe(
+                'stage_ms', (time.perf_counter() - start_time) * 1000, stage='decode'
+            )
+        return decoded
+
+    @staticmethod
+    def _decode_frame_tuple(
+        frame_tuple: Tuple[str, int, FrameData, CameraObjectDetectionSettings, Set[str]],
+    ) -> Tuple[str, int, FrameData, CameraObjectDetectionSettings, Set[str]]:
+        camera_id, timestamp, frame, settings, zones_with_motion = frame_tuple
+        if not isinstance(frame, bytes) or not settings.get_enabled_classes():
+            return frame_tuple
+
+        image = decode_frame(frame)
+        if image is None:
+            return frame_tuple
+        return camera_id, timestamp, image, settings, zones_with_motion
 
     def detect_batch(
         self,
-        frames: List[Tuple[str, int, bytes, CameraObjectDetectionSettings, Set[str]]],
+        frames: List[Tuple[str, int, FrameData, CameraObjectDetectionSettings, Set[str]]],
     ) -> List[DetectionResult]:
         """
         Run object detection on a batch of frames.
@@ -77,7 +365,7 @@ class ObjectDetector:
             frames: List of tuples:
                 - camera_id: Camera identifier
                 - timestamp: Frame timestamp
-                - jpeg_bytes: JPEG frame data
+                - frame: JPEG bytes or decoded BGR frame
                 - settings: Per-camera settings (classConfigs, zones)
                 - zones_with_motion: Set of zone IDs that have motion
 
@@ -87,53 +375,126 @@ class ObjectDetector:
         if not frames:
             return []
 
+        start_time = time.perf_counter()
+
+        # Frames between tracker detection frames use predicted track boxes
+        predicted: Dict[int, List[DetectionBox]] = {}
+        if self._tracker:
+            for i, (camera_id, timestamp, _, _, _) in enumerate(frames):
+                if not self._tracker.should_detect(camera_id):
+                    predicted[i] = self._tracker.predict(camera_id, timestamp)
+
+        # Thumbnails for near-duplicate checks (cheap reduced-size decode)
+        thumbnails = [
+            self._result_cache.thumbnail(frame)
+            if self._result_cache.enabled and i not in predicted else None
+            for i, (_, _, frame, _, _) in enumerate(frames)
+        ]
+
         # Lock to prevent model swap during inference
         with self._lock:
             if not self._strategy or not self._strategy.is_loaded:
                 logger.error("Model not loaded")
                 return []
 
-            start_time = time.perf_counter()
             current_model = self._current_model  # Capture model name under lock
 
-            # Prepare frames for batch detection
-            detection_inputs = [
-                (jpeg_bytes, settings)
-                for _, _, jpeg_bytes, settings, _ in frames
-            ]
+            # Reuse detections for frames nearly identical to the last inferred one
+            all_boxes: List[Optional[List[DetectionBox]]] = [predicted.get(i) for i in range(len(frames))]
+            cache_hits = set()
+            for i, (camera_id, timestamp, _, settings, zones_with_motion) in enumerate(frames):
+                if thumbnails[i] is not None:
+                    all_boxes[i] = self._result_cache.lookup(
+                        camera_id, timestamp, thumbnails[i], current_model,
+                        settings.motion_zones, zones_with_motion,
+                    )
+                    if all_boxes[i] is not None:
+                        cache_hits.add(i)
+            to_infer = [i for i, boxes in enumerate(all_boxes) if boxes is None]
 
-            # Run batch detection
-            all_boxes = self._strategy.detect(detection_inputs)
+            # Run batch detection on the rest
+            detect_ms = 0.0
+            stage_timings: Dict[str, float] = {}
+            if to_infer:
+                detection_inputs = [(frames[i][2], frames[i][3]) for i in to_infer]
+                detect_start = time.perf_counter()
+                for i, boxes in zip(to_infer, self._strategy.detect(detection_inputs)):
+                    all_boxes[i] = boxes
+                detect_ms = (time.perf_counter() - detect_start) * 1000
+                stage_timings = self._strategy.take_stage_timings()
 
-        # Build results with zone filtering (outside lock, using captured values)
-        # Calculate per-frame processing time once (total inference time / frame count)
-        total_inference_ms = (time.perf_counter() - start_time) * 1000
-        per_frame_ms = total_inference_ms / len(frames)
+        for i in to_infer:
+            if thumbnails[i] is not None:
+                camera_id, timestamp = frames[i][0], frames[i][1]
+                self._result_cache.store(
+                    camera_id, timestamp, thumbnails[i], current_model, all_boxes[i]
+                )
+        inferred = set(to_infer)
 
+        # Inferred frames share the model call; cached/predicted frames only
+        # pay for their own lookup and zone filtering
+        per_inferred_ms = detect_ms / len(to_infer) if to_infer else 0.0
+
+        # Build results with zone filtering (outside lock, using captured values)
         results = []
+        zone_filter_ms = 0.0
         for i, (camera_id, timestamp, _, settings, zones_with_motion) in enumerate(frames):
             boxes = all_boxes[i]
 
             # Filter by zones with motion
-            filtered_boxes = filter_detections_by_zones(
-                boxes=boxes,
-                zones=settings.motion_zones,
-                zones_with_motion=zones_with_motion,
+            filter_start = time.perf_counter()
+            filtered_boxes = self._get_compiled_zones(camera_id, settings).filter(
+                boxes, zones_with_motion
             )
+            frame_filter_ms = (time.perf_counter() - filter_start) * 1000
+            zone_filter_ms += frame_filter_ms
 
-            results.append(DetectionResult(
+            result = DetectionResult(
                 camera_id=camera_id,
                 timestamp=timestamp,
                 model_used=current_model,
-                processing_time_ms=per_frame_ms,
+                processing_time_ms=(per_inferred_ms if i in inferred else 0.0) + frame_filter_ms,
                 boxes=filtered_boxes,
-            ))
+                cached=i in cache_hits,
+            )
+            if self._tracker:
+                self._apply_tracking(result, tracked=i not in predicted)
+            results.append(result)
 
         total_time_ms = (time.perf_counter() - start_time) * 1000
         total_detections = sum(len(r.boxes) for r in results)
         logger.debug(
-            f"Batch detection: {len(frames)} frames, {total_detections} detections, "
-            f"{total_time_ms:.1f}ms total"
+            f"Batch detection: {len(frames)} frames ({len(cache_hits)} cached, "
+            f"{len(predicted)} predicted), "
+            f"{total_detections} detections, {total_time_ms:.1f}ms total"
         )
 
+        if self._metrics:
+            self._record_batch_metrics(len(frames), len(to_infer), stage_timings, zone_filter_ms)
+
         return results
+
+    def _record_batch_metrics(
+        self,
+        batch_size: int,
+        inferred: int,
+        stage_timings: Dict[str, float],
+        zone_filter_ms: float,
+    ) -> None:
+        """Record one detect_batch call's sizes and stage timings."""
+        self._metrics.observe('batch_size', batch_size, frames='scheduled')
+        if inferred:
+            self._metrics.observe('batch_size', inferred, frames='inferred')
+        for stage, ms in stage_timings.items():
+            self._metrics.observe('stage_ms', ms, stage=stage)
+        self._metrics.observe('stage_ms', zone_filter_ms, stage='zone_filter')
+
+    def _collect_metrics(self):
+        """Peak CUDA memory of the current model's devices (metrics collector)."""
+        strategy = self._strategy
+        if strategy is None:
+            return []
+        return [
+            ('cuda_max_memory_allocated_bytes', {'device': device}, allocated)
+            for device, allocated in strategy.max_memory_allocated().items()
+        ]
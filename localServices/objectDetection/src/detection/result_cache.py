@@ -0,0 +1,202 @@
+"""Reuse detections for near-duplicate frames from the same camera."""
+
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple, Union
+
+import cv2
+import numpy as np
+
+from models import DetectionBox, MotionZone
+
+logger = logging.getLogger(__name__)
+
+# Width of the grayscale thumbnail frames are compared at
+THUMBNAIL_WIDTH = 64
+
+# JPEG decode at 1/8 scale - far cheaper than a full decode
+_REDUCED_DECODE_FACTOR = 8
+
+
+@dataclass
+class FrameThumbnail:
+    """Small grayscale copy of a frame used for similarity checks."""
+    pixels: np.ndarray  # uint8 (height, THUMBNAIL_WIDTH)
+    scale: float  # Original frame pixels -> thumbnail pixels
+
+
+@dataclass
+class _CacheEntry:
+    thumbnail: FrameThumbnail  # Last frame that went through inference
+    boxes: List[DetectionBox]  # Its detections, before zone filtering
+    model_name: str
+    timestamp: int
+    reuses: int = 0
+
+
+class DetectionResultCache:
+    """
+    Per-camera cache of the last inferred frame and its detections.
+
+    - A new frame is compared with the camera's last inferred frame as
+      downsampled grayscale thumbnails, restricted to the bounding box of
+      the zones that have motion
+    - If the mean absolute pixel difference is below diff_threshold, the
+      cached detections are reused instead of running inference
+    - A cached result is reused for at most max_reuse_frames frames and
+      max_age_ms after the inferred frame, and never across model changes
+    """
+
+    def __init__(
+        self,
+        max_reuse_frames: int = 5,
+        max_age_ms: float = 1000.0,
+        diff_threshold: float = 3.0,
+    ):
+        """
+        Args:
+            max_reuse_frames: Frames that may reuse one inference; 0 disables the cache
+            max_age_ms: Max time since the inferred frame for reuse
+            diff_threshold: Max mean absolute difference (0-255 grayscale)
+        """
+        self._max_reuse_frames = max_reuse_frames
+        self._max_age_ms = max_age_ms
+        self._diff_threshold = diff_threshold
+        self._entries: Dict[str, _CacheEntry] = {}
+        self._lock = threading.Lock()
+
+        # Counters for monitoring
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._max_reuse_frames > 0
+
+    def thumbnail(self, frame: Union[bytes, np.ndarray]) -> Optional[FrameThumbnail]:
+        """Make a small grayscale thumbnail from JPEG bytes or a decoded BGR frame."""
+        if isinstance(frame, np.ndarray):
+            # Already decoded - shrink first, then convert the few remaining pixels
+            height, width = frame.shape[:2]
+            thumb_height = max(1, round(height * THUMBNAIL_WIDTH / width))
+            small = cv2.resize(frame, (THUMBNAIL_WIDTH, thumb_height), interpolation=cv2.INTER_AREA)
+            pixels = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY) if small.ndim == 3 else small
+            return FrameThumbnail(pixels=pixels, scale=THUMBNAIL_WIDTH / width)
+
+        # JPEG - decode straight to a reduced-size grayscale image
+        nparr = np.frombuffer(frame, np.uint8)
+        reduced = cv2.imdecode(nparr, cv2.IMREAD_REDUCED_GRAYSCALE_8)
+        if reduced is None:
+            return None
+
+        height, width = reduced.shape
+        thumb_height = max(1, round(height * THUMBNAIL_WIDTH / width))
+        pixels = cv2.resize(reduced, (THUMBNAIL_WIDTH, thumb_height), interpolation=cv2.INTER_AREA)
+        return FrameThumbnail(
+            pixels=pixels,
+            scale=THUMBNAIL_WIDTH / (width * _REDUCED_DECODE_FACTOR),
+        )
+
+    def lookup(
+        self,
+        camera_id: str,
+        timestamp: int,
+        thumbnail: FrameThumbnail,
+        model_name: str,
+        zones: List[MotionZone],
+        zones_with_motion: Set[str],
+    ) -> Optional[List[DetectionBox]]:
+        """
+        Get reusable detections for a frame.
+
+        Returns:
+            The cached (unfiltered) boxes, or None if the frame needs inference
+        """
+        with self._lock:
+            entry = self._entries.get(camera_id)
+            if entry is None or not self._is_reusable(entry, timestamp, thumbnail, model_name):
+                self.misses += 1
+                return None
+
+            roi = _motion_roi(zones, zones_with_motion, thumbnail)
+            previous = entry.thumbnail.pixels[roi].astype(np.int16)
+            current = thumbnail.pixels[roi].astype(np.int16)
+            if previous.size == 0 or np.abs(current - previous).mean() >= self._diff_threshold:
+                self.misses += 1
+                return None
+
+            entry.reuses += 1
+            self.hits += 1
+            return entry.boxes
+
+    def store(
+        self,
+        camera_id: str,
+        timestamp: int,
+        thumbnail: FrameThumbnail,
+        model_name: str,
+        boxes: List[DetectionBox],
+    ) -> None:
+        """Remember an inferred frame and its (unfiltered) detections."""
+        with self._lock:
+            self._entries[camera_id] = _CacheEntry(
+                thumbnail=thumbnail,
+                boxes=boxes,
+                model_name=model_name,
+                timestamp=timestamp,
+            )
+
+    def _is_reusable(
+        self,
+        entry: _CacheEntry,
+        timestamp: int,
+        thumbnail: FrameThumbnail,
+        model_name: str,
+    ) -> bool:
+        """Check reuse limits that don't need a pixel comparison. Lock held."""
+        age_ms = timestamp - entry.timestamp
+        return (
+            entry.model_name == model_name
+            and entry.reuses < self._max_reuse_frames
+            and 0 <= age_ms <= self._max_age_ms
+            and entry.thumbnail.pixels.shape == thumbnail.pixels.shape
+        )
+
+    def get_stats(self) -> dict:
+        """Get cache statistics."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / total, 3) if total else 0.0,
+            }
+
+
+def _motion_roi(
+    zones: List[MotionZone],
+    zones_with_motion: Set[str],
+    thumbnail: FrameThumbnail,
+) -> Tuple[slice, slice]:
+    """Thumbnail slices covering the bounding box of zones with motion."""
+    full_frame = (slice(None), slice(None))
+
+    points = []
+    for zone in zones:
+        if zone.id not in zones_with_motion:
+            continue
+        if zone.is_full_frame():
+            return full_frame
+        points.extend(zone.points)
+
+    if not points:
+        return full_frame
+
+    coords = np.array(points, dtype=np.float32) * thumbnail.scale
+    height, width = thumbnail.pixels.shape
+    x1 = int(np.clip(np.floor(coords[:, 0].min()), 0, width - 1))
+    y1 = int(np.clip(np.floor(coords[:, 1].min()), 0, height - 1))
+    x2 = int(np.clip(np.ceil(coords[:, 0].max()), x1 + 1, width))
+    y2 = int(np.clip(np.ceil(coords[:, 1].max()), y1 + 1, height))
+    return slice(y1, y2), slice(x1, x2)
@@ -1,6 +1,19 @@
 """Detection strategies."""
 
-from .base_strategy import BaseDetectionStrategy
+from .base_strategy import (
+    BaseDetectionStrategy, FrameData, StageTimer, decode_frame, frame_nbytes,
+)
 from .yolo_strategy import YOLOStrategy
+from .multiprocess_strategy import MultiProcessStrategy
+from .onnx_strategy import OnnxStrategy
 
-__all__ = ['BaseDetectionStrategy', 'YOLOStrategy']
+__all__ = [
+    'BaseDetectionStrategy',
+    'FrameData',
+    'StageTimer',
+    'decode_frame',
+    'frame_nbytes',
+    'YOLOStrategy',
+    'MultiProcessStrategy',
+    'OnnxStrategy',
+]
@@ -1,14 +1,79 @@
 """Abstract base class for detection strategies."""
 
+import time
 from abc import ABC, abstractmethod
-from typing import List, Tuple
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+import cv2
+import numpy as np
 
 from models import DetectionBox, CameraObjectDetectionSettings
 
+# Blank frame used for warm-up inference (height, width). Matches the
+# common 16:9 camera shape so letterboxed input shapes match real frames.
+WARMUP_FRAME_SIZE = (720, 1280)
+
+# Warm-up threshold. A blank frame scores far below any real threshold (with
+# yolo11n nothing reaches 0.01), so it must be tiny for candidates to reach
+# NMS; at 1.0 nothing passes and NMS is skipped entirely
+WARMUP_CONFIDENCE = 1e-4
+
+# A frame is either JPEG bytes or an already decoded BGR image (e.g. a view
+# into the motion service's shared frame store)
+FrameData = Union[bytes, np.ndarray]
+
+
+def decode_frame(frame: FrameData) -> Optional[np.ndarray]:
+    """Decode JPEG bytes to BGR; decoded frames are returned as-is. None if undecodable."""
+    if isinstance(frame, np.ndarray):
+        return frame
+    return cv2.imdecode(np.frombuffer(frame, np.uint8), cv2.IMREAD_COLOR)
+
+
+def frame_nbytes(frame: FrameData) -> int:
+    """Payload size of a frame - JPEG length or decoded image size."""
+    return frame.nbytes if isinstance(frame, np.ndarray) else len(frame)
+
+
+class StageTimer:
+    """Accumulates milliseconds per stage (decode, preprocess, inference, postprocess)."""
+
+    def __init__(self):
+        self._ms: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time the enclosed block as part of a stage."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, (time.perf_counter() - start) * 1000)
+
+    def add(self, name: str, ms: float) -> None:
+        self._ms[name] = self._ms.get(name, 0.0) + ms
+
+    def merge(self, timings: Dict[str, float]) -> None:
+        for name, ms in timings.items():
+            self.add(name, ms)
+
+    def take(self) -> Dict[str, float]:
+        """Timings accumulated since the last take()."""
+        timings, self._ms = self._ms, {}
+        return timings
+
 
 class BaseDetectionStrategy(ABC):
     """Abstract detection strategy interface with batch support."""
 
+    # Whether callers should decode JPEGs before detect() (e.g. on a pipeline
+    # decode thread). False for strategies that decode in worker processes
+    prefers_decoded_frames = True
+
+    # Subclasses time their detect() stages into this; replaced per instance
+    _stage_timer: StageTimer
+
     @abstractmethod
     def load(self) -> None:
         """Load the model into memory."""
@@ -22,19 +87,49 @@ class BaseDetectionStrategy(ABC):
     @abstractmethod
     def detect(
         self,
-        frames: List[Tuple[bytes, CameraObjectDetectionSettings]],
+        frames: List[Tuple[FrameData, CameraObjectDetectionSettings]],
     ) -> List[List[DetectionBox]]:
         """
         Run detection on a batch of frames.
 
         Args:
-            frames: List of (JPEG bytes, per-camera settings) tuples
+            frames: List of (JPEG bytes or decoded frame, per-camera settings) tuples
 
         Returns:
             List of detection box lists, one per input frame
         """
         pass
 
+    def warmup(self, batch_size: int = 1) -> None:
+        """
+        Run a dummy batch so the first real batch doesn't pay one-off setup costs.
+
+        Args:
+            batch_size: Number of blank frames in the warm-up batch
+        """
+        height, width = WARMUP_FRAME_SIZE
+        _, jpeg = cv2.imencode('.jpg', np.zeros((height, width, 3), dtype=np.uint8))
+        # One enabled class at a low threshold so inference, NMS and box
+        # building all run
+        settings = CameraObjectDetectionSettings(
+            class_configs=[{'class': 'person', 'confidence': WARMUP_CONFIDENCE}],
+            motion_zones=[],
+        )
+        self.detect([(jpeg.tobytes(), settings)] * batch_size)
+
+    def take_stage_timings(self) -> Dict[str, float]:
+        """
+        Milliseconds spent per stage since the previous call.
+
+        Stages are decode, preprocess, inference and postprocess; strategies
+        that run work in parallel (worker processes) report summed worker time.
+        """
+        return self._stage_timer.take()
+
+    def max_memory_allocated(self) -> Dict[str, int]:
+        """Peak torch.cuda memory allocated in bytes per CUDA device (empty on CPU)."""
+        return {}
+
     @property
     @abstractmethod
     def model_name(self) -> str:
@@ -0,0 +1,420 @@
+"""Multi-process detection strategy - one model per worker process."""
+
+import logging
+import multiprocessing as mp
+import os
+import time
+from multiprocessing import shared_memory
+from multiprocessing.connection import Connection, wait
+from typing import Dict, List, Optional, Tuple, Type
+
+import numpy as np
+
+from models import DetectionBox, CameraObjectDetectionSettings
+from .base_strategy import BaseDetectionStrategy, FrameData, StageTimer, frame_nbytes
+
+logger = logging.getLogger(__name__)
+
+# Initial shared-memory input buffer per worker; grown on demand
+DEFAULT_BUFFER_BYTES = 32 * 1024 * 1024
+
+# Max time to wait for a worker's model to load / a chunk to finish
+LOAD_TIMEOUT_S = 300.0
+DETECT_TIMEOUT_S = 30.0
+
+
+def _worker_main(
+    worker_id: int,
+    model_name: str,
+    weights_dir: str,
+    device: str,
+    half: bool,
+    compile_mode: Optional[str],
+    num_threads: int,
+    request_queue: mp.Queue,
+    result_conn: Connection,
+    strategy_class: Optional[Type[BaseDetectionStrategy]] = None,
+) -> None:
+    """Worker process: load the model once, then serve detect requests."""
+    logging.basicConfig(
+        level=logging.INFO,
+        format=f'%(asctime)s - inference-worker-{worker_id} - %(levelname)s - %(message)s',
+    )
+
+    try:
+        import torch
+        from .yolo_strategy import YOLOStrategy
+
+        if device == 'cpu' and num_threads > 0:
+            torch.set_num_threads(num_threads)
+
+        strategy = (strategy_class or YOLOStrategy)(
+            model_name=model_name,
+            weights_dir=weights_dir,
+            device=device,
+            half=half,
+            compile_mode=compile_mode,
+        )
+        strategy.load()
+    except Exception as e:
+        result_conn.send(('error', worker_id, None, f"Failed to load model: {e}"))
+        return
+
+    result_conn.send(('ready', worker_id, None, None))
+
+    # Only the newest input buffer is mapped - the parent never goes back to
+    # a replaced one, so it is closed as soon as a request names another
+    segment: Optional[shared_memory.SharedMemory] = None
+    frames = []
+    try:
+        while True:
+            request = request_queue.get()
+            if request is None:
+                break
+
+            request_id, segment_name, spans, settings_list = request
+            try:
+                if segment is None or segment.name != segment_name:
+                    if segment is not None:
+                        segment.close()
+                        segment = None
+                    # Workers share the parent's resource tracker, so attaching
+                    # doesn't take ownership - the parent still unlinks
+                    segment = shared_memory.SharedMemory(name=segment_name)
+
+                # JPEGs are copied out; decoded frames are viewed in place
+                frames = [
+                    (
+                        np.ndarray(shape, dtype=np.uint8, buffer=segment.buf, offset=offset)
+                        if shape is not None
+                        else bytes(segment.buf[offset:offset + length]),
+                        settings,
+                    )
+                    for (offset, length, shape), settings in zip(spans, settings_list)
+                ]
+                boxes = strategy.detect(frames)
+                stats = (strategy.take_stage_timings(), strategy.max_memory_allocated())
+                result_conn.send(('result', worker_id, request_id, (boxes, stats)))
+            except Exception as e:
+                result_conn.send(('error', worker_id, request_id, str(e)))
+            finally:
+                frames = []  # Release views before the buffer is reused or closed
+    finally:
+        if segment is not None:
+            segment.close()
+        strategy.unload()
+
+
+class _Worker:
+    """Parent-side handle for one inference process."""
+
+    def __init__(self, worker_id: int, device: str, num_threads: int):
+        self.worker_id = worker_id
+        self.device = device
+        self.num_threads = num_threads  # Reused when the process is restarted
+        self.process: Optional[mp.Process] = None
+        self.request_queue: Optional[mp.Queue] = None
+        self.result_conn: Optional[Connection] = None  # Receiving end of the result pipe
+        self.buffer: Optional[shared_memory.SharedMemory] = None
+
+    def ensure_buffer(self, size: int) -> shared_memory.SharedMemory:
+        """Return an input buffer of at least size bytes, replacing a smaller one."""
+        if self.buffer is None or self.buffer.size < size:
+            self.release_buffer()
+            capacity = max(DEFAULT_BUFFER_BYTES, size * 2)
+            self.buffer = shared_memory.SharedMemory(create=True, size=capacity)
+        return self.buffer
+
+    def release_buffer(self) -> None:
+        """
+        Unlink the input buffer; the next request gets a new one.
+
+        A process still reading an abandoned request keeps its own mapping of
+        the old buffer, so its frames are never overwritten underneath it.
+        """
+        if self.buffer is not None:
+            self.buffer.close()
+            self.buffer.unlink()
+            self.buffer = None
+
+    def close_result_conn(self) -> None:
+        if self.result_conn is not None:
+            self.result_conn.close()
+            self.result_conn = None
+
+
+class MultiProcessStrategy(BaseDetectionStrategy):
+    """
+    Runs YOLOStrategy in N worker processes for parallel inference.
+
+    - One process per device entry (e.g. one per GPU, or several on CPU)
+    - Each process loads the model once and keeps it resident
+    - Frames (JPEG bytes or decoded images) reach workers through a
+      per-worker shared-memory buffer; only offsets, shapes and per-camera
+      settings go through the request queue
+    - Each worker answers on its own pipe, written synchronously: a worker
+      killed mid-send only breaks its own pipe, which is replaced with it
+    - A batch is split into contiguous chunks, one per worker, and results
+      are merged back in input order
+    - A chunk that times out is abandoned together with its buffer, so the
+      next batch never writes into frames a stuck worker may still be reading
+    - Crashed workers are restarted with their original thread count at the
+      start of the next detect(); the pool counts as loaded meanwhile, so a
+      worker dying while idle never switches detection off
+    """
+
+    # Workers decode in parallel - shipping JPEGs is far cheaper than raw frames
+    prefers_decoded_frames = False
+
+    def __init__(
+        self,
+        model_name: str,
+        weights_dir: str = "/app/src/models/weights",
+        devices: Optional[List[str]] = None,
+        half: bool = False,
+        compile_mode: Optional[str] = None,
+        strategy_class: Optional[Type[BaseDetectionStrategy]] = None,
+    ):
+        """
+        Args:
+            model_name: Model name (e.g. yolo11n)
+            weights_dir: Directory containing local .pt weights
+            devices: One worker process per entry
+            half: FP16 inference on CUDA devices
+            compile_mode: torch.compile mode, or None
+            strategy_class: Strategy each worker runs (YOLOStrategy by default);
+                must be importable by the spawned worker processes
+        """
+        self._model_name = model_name
+        self._weights_dir = weights_dir
+        self._devices = devices or ['cpu']
+        self._half = half
+        self._compile_mode = compile_mode
+        self._strategy_class = strategy_class
+        self._ctx = mp.get_context('spawn')  # CUDA can't be used in forked children
+        self._workers: List[_Worker] = []
+        self._next_request_id = 0
+        self._stage_timer = StageTimer()
+        self._memory_allocated: Dict[str, int] = {}  # Peak per CUDA device, as last reported
+
+    @property
+    def model_name(self) -> str:
+        return self._model_name
+
+    @property
+    def is_loaded(self) -> bool:
+        # Dead workers are restarted by the next detect()
+        return bool(self._workers)
+
+    def load(self) -> None:
+        """Start worker processes and wait for every model to load."""
+        if self._workers:
+            return
+
+        # Split CPU threads between CPU workers so they don't oversubscribe cores
+        cpu_workers = sum(1 for d in self._devices if d == 'cpu')
+        num_threads = max(1, (os.cpu_count() or 1) // cpu_workers) if cpu_workers else 0
+
+        for worker_id, device in enumerate(self._devices):
+            worker = _Worker(worker_id, device, num_threads if device == 'cpu' else 0)
+            self._start_worker(worker)
+            self._workers.append(worker)
+
+        pending = {w.worker_id for w in self._workers}
+        deadline = time.monotonic() + LOAD_TIMEOUT_S
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self.unload()
+                raise RuntimeError(f"Inference workers {sorted(pending)} did not load in time")
+
+            for kind, worker_id, _, error in self._receive(timeout=min(remaining, 1.0)):
+                if kind == 'error':
+                    self.unload()
+                    raise RuntimeError(f"Inference worker {worker_id}: {error}")
+                pending.discard(worker_id)
+
+            lost = [w.worker_id for w in self._workers if w.worker_id in pending and w.result_conn is None]
+            if lost:
+                self.unload()
+                raise RuntimeError(f"Inference workers {lost} exited while loading")
+
+        logger.info(
+            f"Model {self._model_name} loaded in {len(self._workers)} worker processes "
+            f"({', '.join(self._devices)})"
+        )
+
+    def unload(self) -> None:
+        """Stop worker processes and release shared memory."""
+        for worker in self._workers:
+            if worker.process is not None and worker.process.is_alive():
+                worker.request_queue.put(None)
+
+        for worker in self._workers:
+            if worker.process is not None:
+                worker.process.join(timeout=10.0)
+                if worker.process.is_alive():
+                    worker.process.terminate()
+                    worker.process.join(timeout=1.0)
+            worker.release_buffer()
+            worker.close_result_conn()
+
+        if self._workers:
+            logger.info(f"Model {self._model_name} unloaded from {len(self._workers)} workers")
+        self._workers = []
+
+    def warmup(self, batch_size: int = 1) -> None:
+        """Warm up every worker - batches smaller than the worker count skip some."""
+        super().warmup(batch_size=max(batch_size, len(self._workers)))
+
+    def detect(
+        self,
+        frames: List[Tuple[FrameData, CameraObjectDetectionSettings]],
+    ) -> List[List[DetectionBox]]:
+        """
+        Run detection across worker processes.
+
+        Args:
+            frames: List of (JPEG bytes or decoded frame, per-camera settings) tuples
+
+        Returns:
+            List of detection box lists, one per input frame
+        """
+        if not frames:
+            return []
+
+        if not self._workers:
+            self.load()
+        self._reap_dead_workers({})
+
+        all_boxes: List[List[DetectionBox]] = [[] for _ in frames]
+
+        # request_id -> (worker, first frame index)
+        in_flight: Dict[int, Tuple[_Worker, int]] = {}
+        for worker, start, chunk in self._split(frames):
+            request_id = self._next_request_id
+            self._next_request_id += 1
+
+            # Pack the chunk's frames back to back into the worker's buffer
+            buffer = worker.ensure_buffer(sum(frame_nbytes(frame) for frame, _ in chunk))
+            spans = []
+            offset = 0
+            for frame, _ in chunk:
+                length = frame_nbytes(frame)
+                if isinstance(frame, np.ndarray):
+                    np.ndarray(frame.shape, dtype=np.uint8, buffer=buffer.buf, offset=offset)[...] = frame
+                    spans.append((offset, length, frame.shape))
+                else:
+                    buffer.buf[offset:offset + length] = frame
+                    spans.append((offset, length, None))
+                offset += length
+
+            worker.request_queue.put(
+                (request_id, buffer.name, spans, [settings for _, settings in chunk])
+            )
+            in_flight[request_id] = (worker, start)
+
+        deadline = time.monotonic() + DETECT_TIMEOUT_S
+        while in_flight:
+            messages = self._receive(timeout=1.0)
+            if not messages:
+                if time.monotonic() > deadline or self._reap_dead_workers(in_flight):
+                    break
+                continue
+
+            for kind, worker_id, request_id, payload in messages:
+                entry = in_flight.pop(request_id, None)
+                if entry is None:
+                    continue  # 'ready' or a stale result from an abandoned request
+
+                _, start = entry
+                if kind == 'result':
+                    boxes, (timings, memory_allocated) = payload
+                    all_boxes[start:start + len(boxes)] = boxes
+                    self._stage_timer.merge(timings)
+                    self._memory_allocated.update(memory_allocated)
+                else:
+                    logger.error(f"Inference worker {worker_id} failed: {payload}")
+
+        if in_flight:
+            logger.error(f"{len(in_flight)} inference chunk(s) lost or timed out - returning no detections")
+            # The workers may still be reading these chunks - hand them fresh
+            # buffers next time instead of overwriting the frames
+            for worker, _ in in_flight.values():
+                worker.release_buffer()
+
+        return all_boxes
+
+    def max_memory_allocated(self) -> Dict[str, int]:
+        """Peak torch.cuda memory per device, as reported with worker results."""
+        return dict(self._memory_allocated)
+
+    def _split(
+        self,
+        frames: List[Tuple[FrameData, CameraObjectDetectionSettings]],
+    ) -> List[Tuple[_Worker, int, List[Tuple[FrameData, CameraObjectDetectionSettings]]]]:
+        """Split frames into contiguous, evenly sized chunks - one per worker."""
+        workers = self._workers[:len(frames)]
+        base, extra = divmod(len(frames), len(workers))
+
+        chunks = []
+        start = 0
+        for i, worker in enumerate(workers):
+            size = base + (1 if i < extra else 0)
+            chunks.append((worker, start, frames[start:start + size]))
+            start += size
+        return chunks
+
+    def _receive(self, timeout: float) -> List[tuple]:
+        """
+        Messages waiting on any worker's result pipe, after up to timeout seconds.
+
+        A pipe at EOF (its worker exited, possibly mid-message) is closed;
+        the worker is restarted by _reap_dead_workers().
+        """
+        conns = {w.result_conn: w for w in self._workers if w.result_conn is not None}
+        messages = []
+        for conn in wait(list(conns), timeout):
+            try:
+                while conn.poll():
+                    messages.append(conn.recv())
+            except (EOFError, OSError):
+                conns[conn].close_result_conn()
+        return messages
+
+    def _reap_dead_workers(self, in_flight: Dict[int, Tuple[_Worker, int]]) -> bool:
+        """Restart crashed workers. Returns True if an in-flight chunk was lost."""
+        lost = False
+        for worker in self._workers:
+            if worker.process is not None and not worker.process.is_alive():
+                logger.error(
+                    f"Inference worker {worker.worker_id} died "
+                    f"(exit code {worker.process.exitcode}) - restarting"
+                )
+                lost = lost or any(w is worker for w, _ in in_flight.values())
+                self._start_worker(worker)
+        return lost
+
+    def _start_worker(self, worker: _Worker) -> None:
+        worker.close_result_conn()  # Drops whatever the previous process left unread
+        worker.request_queue = self._ctx.Queue()
+        worker.result_conn, result_sender = self._ctx.Pipe(duplex=False)
+        worker.process = self._ctx.Process(
+            target=_worker_main,
+            args=(
+                worker.worker_id,
+                self._model_name,
+                self._weights_dir,
+                worker.device,
+                self._half,
+                self._compile_mode,
+                worker.num_threads,
+                worker.request_queue,
+                result_sender,
+                self._strategy_class,
+            ),
+            name=f"inference-worker-{worker.worker_id}",
+            daemon=True,
+        )
+        worker.process.start()
+        result_sender.close()  # Only the worker writes; lets its exit show as EOF
@@ -0,0 +1,332 @@
+"""ONNX Runtime detection strategy for CPU-only deployments."""
+
+import logging
+import os
+import shutil
+from contextlib import nullcontext
+from dataclasses import replace
+from typing import FrozenSet, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from models import DetectionBox, CameraObjectDetectionSettings
+from ..model_cache import ArtifactKey, ModelArtifactCache
+from .base_strategy import BaseDetectionStrategy, FrameData, StageTimer, decode_frame
+from .yolo_strategy import COCO_CLASS_IDS, boxes_for_camera, resolve_weights_path
+
+try:
+    import onnxruntime as ort
+except ImportError:  # onnxruntime is optional - only needed for the onnx backend
+    ort = None
+
+logger = logging.getLogger(__name__)
+
+PRECISIONS = ('fp32', 'fp16', 'int8')
+
+# Match ultralytics predict defaults so results line up with YOLOStrategy
+NMS_IOU_THRESHOLD = 0.7
+MAX_DETECTIONS = 300
+LETTERBOX_FILL = 114
+
+# Artifact cache budget when no shared cache is passed in
+DEFAULT_CACHE_BYTES = 5 * 1024 ** 3
+
+
+class OnnxStrategy(BaseDetectionStrategy):
+    """
+    YOLO detection via ONNX Runtime.
+
+    - Exports the model to ONNX (dynamic batch) on first use and reuses the
+      export from the model artifact cache afterwards
+    - Uses the OpenVINO execution provider when installed
+      (onnxruntime-openvino), plain CPU execution otherwise
+    - Precision: fp32, int8 (dynamically quantized copy of the export) or
+      fp16 (OpenVINO only - falls back to fp32 on the CPU provider)
+    - Letterbox, decode and NMS run in numpy/OpenCV and mirror the
+      ultralytics pipeline (square padding), so thresholds behave like YOLOStrategy
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        weights_dir: str = "/app/src/models/weights",
+        imgsz: int = 640,
+        num_threads: int = 0,
+        precision: str = 'fp32',
+        cache: Optional[ModelArtifactCache] = None,
+    ):
+        """
+        Args:
+            model_name: Model name (e.g. yolo11n)
+            weights_dir: Directory containing local .pt weights
+            imgsz: Square network input size
+            num_threads: Intra-op threads; 0 lets ONNX Runtime decide
+            precision: One of fp32, fp16, int8
+            cache: Exported model cache; defaults to one in weights_dir/cache
+        """
+        if precision not in PRECISIONS:
+            raise ValueError(f"Unknown precision {precision!r}, expected one of {PRECISIONS}")
+
+        self._model_name = model_name
+        self._weights_dir = weights_dir
+        self._imgsz = imgsz
+        self._num_threads = num_threads
+        self._precision = precision
+        self._cache = cache or ModelArtifactCache(
+            os.path.join(weights_dir, "cache"), max_bytes=DEFAULT_CACHE_BYTES
+        )
+        self._session: Optional["ort.InferenceSession"] = None
+        self._input_name: Optional[str] = None
+        self._stage_timer = StageTimer()
+
+    @property
+    def model_name(self) -> str:
+        return self._model_name
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._session is not None
+
+    def load(self) -> None:
+        """Export (if needed) and open the ONNX model."""
+        if self._session is not None:
+            return
+
+        if ort is None:
+            raise RuntimeError("onnxruntime is not installed - required for the onnx backend")
+
+        onnx_path = self._get_onnx_path()
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if self._num_threads > 0:
+            options.intra_op_num_threads = self._num_threads
+
+        providers = self._get_providers()
+        self._session = ort.InferenceSession(onnx_path, sess_options=options, providers=providers)
+        self._input_name = self._session.get_inputs()[0].name
+
+        logger.info(
+            f"Model {self._model_name} loaded with ONNX Runtime "
+            f"({self._session.get_providers()[0]}, {self._precision}, "
+            f"threads={self._num_threads or 'auto'})"
+        )
+
+    def unload(self) -> None:
+        """Release the inference session."""
+        if self._session is not None:
+            self._session = None
+            logger.info(f"Model {self._model_name} unloaded")
+
+    def detect(
+        self,
+        frames: List[Tuple[FrameData, CameraObjectDetectionSettings]],
+    ) -> List[List[DetectionBox]]:
+        """
+        Run batch detection on frames.
+
+        Args:
+            frames: List of (JPEG bytes or decoded frame, per-camera settings) tuples
+
+        Returns:
+            List of detection box lists, one per input frame
+        """
+        if not frames:
+            return []
+
+        # Lazy load
+        if self._session is None:
+            self.load()
+
+        all_boxes: List[List[DetectionBox]] = [[] for _ in frames]
+
+        indices: List[int] = []
+        class_sets: List[FrozenSet[int]] = []
+        inputs: List[np.ndarray] = []
+        transforms: List[Tuple[float, float, float, int, int]] = []
+
+        for i, (frame, settings) in enumerate(frames):
+            class_ids = frozenset(
+                COCO_CLASS_IDS[name]
+                for name in settings.get_enabled_classes()
+                if name in COCO_CLASS_IDS
+            )
+            # No enabled classes - nothing to detect, skip decode entirely
+            if not class_ids:
+                continue
+
+            # Only JPEG decoding counts - pre-decoded frames pass straight through
+            with self._stage_timer.stage('decode') if isinstance(frame, bytes) else nullcontext():
+                img = decode_frame(frame)
+            if img is None:
+                logger.warning(f"Failed to decode frame {i}")
+                continue
+
+            with self._stage_timer.stage('preprocess'):
+                tensor, transform = self._letterbox(img)
+            indices.append(i)
+            class_sets.append(class_ids)
+            inputs.append(tensor)
+            transforms.append(transform)
+
+        if not inputs:
+            return all_boxes
+
+        with self._stage_timer.stage('preprocess'):
+            batch = np.stack(inputs)
+        with self._stage_timer.stage('inference'):
+            outputs = self._session.run(None, {self._input_name: batch})[0]
+
+        with self._stage_timer.stage('postprocess'):
+            for row, frame_idx in enumerate(indices):
+                settings = frames[frame_idx][1]
+                min_conf = settings.get_min_confidence()
+                class_ids, confidences, coords = self._postprocess(
+                    outputs[row],
+                    class_sets[row],
+                    1.0 if min_conf is None else min_conf,
+                    transforms[row],
+                )
+                all_boxes[frame_idx] = boxes_for_camera(class_ids, confidences, coords, settings)
+
+        return all_boxes
+
+    def _letterbox(self, img: np.ndarray) -> Tuple[np.ndarray, Tuple[float, float, float, int, int]]:
+        """
+        Resize with unchanged aspect ratio and pad to imgsz x imgsz.
+
+        Returns:
+            (CHW float32 RGB tensor in [0, 1], (ratio, pad_x, pad_y, width, height))
+        """
+        height, width = img.shape[:2]
+        ratio = min(self._imgsz / height, self._imgsz / width)
+        new_w, new_h = round(width * ratio), round(height * ratio)
+        pad_x = (self._imgsz - new_w) / 2
+        pad_y = (self._imgsz - new_h) / 2
+
+        if (new_w, new_h) != (width, height):
+            img = cv2.resize(img, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+
+        top, bottom = round(pad_y - 0.1), round(pad_y + 0.1)
+        left, right = round(pad_x - 0.1), round(pad_x + 0.1)
+        img = cv2.copyMakeBorder(
+            img, top, bottom, left, right,
+            cv2.BORDER_CONSTANT, value=(LETTERBOX_FILL,) * 3,
+        )
+
+        tensor = img[:, :, ::-1].transpose(2, 0, 1)  # BGR HWC -> RGB CHW
+        tensor = np.ascontiguousarray(tensor, dtype=np.float32) / 255.0
+        return tensor, (ratio, left, top, width, height)
+
+    def _postprocess(
+        self,
+        output: np.ndarray,
+        class_ids: FrozenSet[int],
+        min_conf: float,
+        transform: Tuple[float, float, float, int, int],
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Decode one image's raw output into (class_ids, confidences, xyxy).
+
+        Handles both the standard (4 + num_classes, anchors) head and
+        NMS-free end-to-end heads that emit (max_det, 6) rows.
+        """
+        if output.ndim == 2 and output.shape[1] == 6:
+            # End-to-end head: x1, y1, x2, y2, conf, class - already NMS'd
+            keep = (output[:, 4] >= min_conf) & np.isin(output[:, 5].astype(int), list(class_ids))
+            output = output[keep]
+            coords = output[:, :4].copy()
+            confidences = output[:, 4]
+            classes = output[:, 5].astype(int)
+        else:
+            predictions = output.T  # (anchors, 4 + num_classes)
+            enabled = np.array(sorted(class_ids))
+            scores = predictions[:, 4 + enabled]
+
+            best = scores.argmax(axis=1)
+            confidences = scores[np.arange(len(scores)), best]
+            keep = confidences >= min_conf
+            if not keep.any():
+                return np.empty(0, dtype=int), np.empty(0), np.empty((0, 4))
+
+            xywh = predictions[keep, :4]
+            confidences = confidences[keep]
+            classes = enabled[best[keep]]
+
+            # Class-aware NMS on top-left xywh boxes
+            top_left = xywh.copy()
+            top_left[:, :2] -= xywh[:, 2:] / 2
+            kept = cv2.dnn.NMSBoxesBatched(
+                top_left.tolist(), confidences.tolist(), classes.tolist(),
+                min_conf, NMS_IOU_THRESHOLD, top_k=MAX_DETECTIONS,
+            )
+            kept = np.asarray(kept, dtype=int).reshape(-1)
+
+            coords = np.concatenate([top_left[kept, :2], top_left[kept, :2] + xywh[kept, 2:]], axis=1)
+            confidences = confidences[kept]
+            classes = classes[kept]
+
+        # Undo letterbox and clip to the original image
+        ratio, pad_x, pad_y, width, height = transform
+        coords[:, [0, 2]] = ((coords[:, [0, 2]] - pad_x) / ratio).clip(0, width)
+        coords[:, [1, 3]] = ((coords[:, [1, 3]] - pad_y) / ratio).clip(0, height)
+        return classes, confidences, coords
+
+    def _get_providers(self) -> list:
+        """OpenVINO if available, otherwise the default CPU provider."""
+        available = ort.get_available_providers()
+        if 'OpenVINOExecutionProvider' in available:
+            options = {
+                'device_type': 'CPU',
+                'precision': 'FP16' if self._precision == 'fp16' else 'FP32',
+            }
+            if self._num_threads > 0:
+                options['num_of_threads'] = str(self._num_threads)
+            return [('OpenVINOExecutionProvider', options), 'CPUExecutionProvider']
+
+        if self._precision == 'fp16':
+            logger.warning("fp16 needs the OpenVINO execution provider - running fp32")
+        return ['CPUExecutionProvider']
+
+    def _get_onnx_path(self) -> str:
+        """Path to the cached ONNX file for this model/size/precision, exporting if missing."""
+        # fp16 is applied by the execution provider, so it shares the fp32 export
+        fp32_key = ArtifactKey(
+            model_name=self._model_name,
+            backend='onnx',
+            imgsz=self._imgsz,
+            batch=0,
+            precision='fp32',
+        )
+        fp32_path = self._cache.get_or_build(fp32_key, self._export)
+
+        if self._precision != 'int8':
+            return fp32_path
+
+        return self._cache.get_or_build(
+            replace(fp32_key, precision='int8'),
+            lambda path: self._quantize(fp32_path, path),
+        )
+
+    def _export(self, onnx_path: str) -> None:
+        """Export .pt weights to ONNX with a dynamic batch dimension."""
+        from ultralytics import YOLO
+
+        logger.info(f"Exporting {self._model_name} to ONNX (imgsz={self._imgsz})")
+        model = YOLO(resolve_weights_path(self._model_name, self._weights_dir))
+        exported = model.export(
+            format='onnx',
+            imgsz=self._imgsz,
+            dynamic=True,
+            simplify=False,
+            device='cpu',
+        )
+        shutil.move(exported, onnx_path)
+
+    def _quantize(self, fp32_path: str, int8_path: str) -> None:
+        """Write a dynamically quantized int8 copy of an fp32 export."""
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        logger.info(f"Quantizing {self._model_name} to int8")
+        quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QUInt8)
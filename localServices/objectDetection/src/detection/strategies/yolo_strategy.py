@@ -2,15 +2,17 @@
 
 import logging
 import os
-from typing import List, Optional, Tuple
+import shutil
+from contextlib import nullcontext
+from typing import Dict, FrozenSet, List, Optional, Tuple
 
-import cv2
 import numpy as np
 import torch
 from ultralytics import YOLO
+from ultralytics.cfg import DEFAULT_CFG_DICT
 
 from models import DetectionBox, CameraObjectDetectionSettings
-from .base_strategy import BaseDetectionStrategy
+from .base_strategy import BaseDetectionStrategy, FrameData, StageTimer, decode_frame
 
 logger = logging.getLogger(__name__)
 
@@ -35,6 +37,67 @@ COCO_CLASSES = {
     79: "toothbrush",
 }
 
+# Reverse mapping for resolving per-camera class names to model class IDs
+COCO_CLASS_IDS = {name: class_id for class_id, name in COCO_CLASSES.items()}
+
+
+def resolve_weights_path(model_name: str, weights_dir: str) -> str:
+    """Get path to model weights."""
+    # Check for local weights file
+    local_path = os.path.join(weights_dir, f"{model_name}.pt")
+    if os.path.exists(local_path):
+        logger.info(f"Using local weights: {local_path}")
+        return local_path
+
+    # Use model name directly - ultralytics will auto-download
+    logger.info(f"Local weights not found, will download {model_name}")
+    return f"{model_name}.pt"
+
+
+def boxes_for_camera(
+    class_ids: np.ndarray,
+    confidences: np.ndarray,
+    coords: np.ndarray,
+    settings: CameraObjectDetectionSettings,
+) -> List[DetectionBox]:
+    """
+    Build DetectionBoxes for one frame, keeping classes enabled for the camera.
+
+    Args:
+        class_ids: (N,) COCO class IDs
+        confidences: (N,) confidence scores
+        coords: (N, 4) xyxy boxes in original image pixels
+        settings: Per-camera settings with class thresholds
+
+    Returns:
+        Boxes that pass the camera's per-class confidence thresholds
+    """
+    frame_boxes = []
+    for class_id, confidence, xyxy in zip(class_ids, confidences, coords):
+        # Get class name from COCO mapping
+        class_name = COCO_CLASSES.get(int(class_id))
+        if class_name is None:
+            continue
+
+        # Check if class is enabled and passes per-camera threshold
+        threshold = settings.get_confidence_threshold(class_name)
+        if threshold is None:
+            continue
+        if confidence < threshold:
+            continue
+
+        frame_boxes.append(DetectionBox(
+            class_id=int(class_id),
+            class_name=class_name,
+            confidence=float(confidence),
+            x1=float(xyxy[0]),
+            y1=float(xyxy[1]),
+            x2=float(xyxy[2]),
+            y2=float(xyxy[3]),
+        ))
+
+    return frame_boxes
+
 
 class YOLOStrategy(BaseDetectionStrategy):
     """
@@ -48,11 +111,31 @@ class YOLOStrategy(BaseDetectionStrategy):
         self,
         model_name: str,
         weights_dir: str = "/app/src/models/weights",
+        sub_batch_split_cost: int = 32,
+        device: Optional[str] = None,
+        half: bool = False,
+        compile_mode: Optional[str] = None,
     ):
+        """
+        Args:
+            model_name: Model name (e.g. yolo11n)
+            weights_dir: Directory containing local .pt weights
+            sub_batch_split_cost: Extra class-frames an extra predict call is
+                worth; higher values favour fewer, larger sub-batches
+            device: Torch device (e.g. cuda:1); defaults to cuda if available
+            half: Run FP16 inference (CUDA only, ignored on CPU)
+            compile_mode: torch.compile mode (e.g. default, reduce-overhead),
+                or None to run eagerly
+        """
         self._model_name = model_name
         self._weights_dir = weights_dir
+        self._sub_batch_split_cost = sub_batch_split_cost
         self._model: Optional[YOLO] = None
-        self._device: str = "cuda" if torch.cuda.is_available() else "cpu"
+        self._device: str = device or ("cuda" if torch.cuda.is_available() else "cpu")
+        self._half = half and self._device.startswith("cuda")
+        self._compile_mode = compile_mode
+        self._predict_options = self._build_predict_options()
+        self._stage_timer = StageTimer()
 
     @property
     def model_name(self) -> str:
@@ -72,7 +155,12 @@ class YOLOStrategy(BaseDetectionStrategy):
 
         self._model = YOLO(weights_path)
         self._model.to(self._device)
-        logger.info(f"Model {self._model_name} loaded successfully")
+        self._keep_downloaded_weights()
+        # Conv+BN fusion is done by the ultralytics predictor on first predict
+        logger.info(
+            f"Model {self._model_name} loaded successfully "
+            f"(half={self._half}, compile={self._compile_mode or 'off'})"
+        )
 
     def unload(self) -> None:
         """Unload model from memory."""
@@ -85,13 +173,16 @@ class YOLOStrategy(BaseDetectionStrategy):
 
     def detect(
         self,
-        frames: List[Tuple[bytes, CameraObjectDetectionSettings]],
+        frames: List[Tuple[FrameData, CameraObjectDetectionSettings]],
     ) -> List[List[DetectionBox]]:
         """
         Run batch YOLO detection on frames.
 
+        Frames are grouped into sub-batches by their enabled classes so that
+        NMS only runs over classes some camera in the sub-batch cares about.
+
         Args:
-            frames: List of (JPEG bytes, per-camera settings) tuples
+            frames: List of (JPEG bytes or decoded frame, per-camera settings) tuples
 
         Returns:
             List of detection box lists, one per input frame
@@ -103,95 +194,163 @@ class YOLOStrategy(BaseDetectionStrategy):
         if self._model is None:
             self.load()
 
-        # Decode all frames and find minimum confidence
-        images = []
-        settings_list = []
-        min_conf = 1.0
+        all_boxes: List[List[DetectionBox]] = [[] for _ in frames]
+
+        # Decode frames and resolve enabled class IDs per frame
+        images: List[Optional[np.ndarray]] = []
+        class_sets: List[FrozenSet[int]] = []
 
-        for jpeg_bytes, settings in frames:
-            np_arr = np.frombuffer(jpeg_bytes, np.uint8)
-            img = cv2.imdecode(np_arr, cv2.IMREAD_COLOR)
+        for frame, settings in frames:
+            class_ids = frozenset(
+                COCO_CLASS_IDS[name]
+                for name in settings.get_enabled_classes()
+                if name in COCO_CLASS_IDS
+            )
+            class_sets.append(class_ids)
 
+            # No enabled classes - nothing to detect, skip decode entirely
+            if not class_ids:
+                images.append(None)
+                continue
+
+            # Only JPEG decoding counts - pre-decoded frames pass straight through
+            with self._stage_timer.stage('decode') if isinstance(frame, bytes) else nullcontext():
+                img = decode_frame(frame)
             if img is None:
                 logger.warning("Failed to decode frame in batch")
-                images.append(None)
-            else:
-                images.append(img)
+            images.append(img)
 
-            settings_list.append(settings)
+        valid_indices = [i for i, img in enumerate(images) if img is not None]
+        if not valid_indices:
+            return all_boxes
+
+        for indices, classes in self._plan_sub_batches(valid_indices, class_sets):
+            # Minimum confidence across the sub-batch's cameras
+            # (None means no class is enabled; 0.0 is a valid threshold)
+            thresholds = [frames[i][1].get_min_confidence() for i in indices]
+            min_conf = min(1.0 if conf is None else conf for conf in thresholds)
+
+            results = self._model.predict(
+                [images[i] for i in indices],
+                conf=min_conf,
+                classes=sorted(classes),
+                verbose=False,
+                device=self._device,
+                **self._predict_options,
+            )
+
+            # Ultralytics reports each stage per image (batch time / batch size)
+            for result in results:
+                self._stage_timer.merge(result.speed)
+
+            with self._stage_timer.stage('postprocess'):
+                for frame_idx, result in zip(indices, results):
+                    all_boxes[frame_idx] = self._extract_boxes(result, frames[frame_idx][1])
 
-            # Track global minimum confidence for batch inference
-            frame_min = settings.get_min_confidence()
-            if frame_min is not None and frame_min < min_conf:
-                min_conf = frame_min
+        return all_boxes
 
-        # Filter out None images and track indices
-        valid_indices = [i for i, img in enumerate(images) if img is not None]
-        valid_images = [images[i] for i in valid_indices]
+    def max_memory_allocated(self) -> Dict[str, int]:
+        """Peak torch.cuda memory allocated on this strategy's device."""
+        if not self._device.startswith("cuda") or not torch.cuda.is_available():
+            return {}
+        return {self._device: torch.cuda.max_memory_allocated(self._device)}
+
+    def _build_predict_options(self) -> Dict[str, object]:
+        """Precision/compile predict arguments supported by the installed ultralytics."""
+        options: Dict[str, object] = {}
+        if self._half:
+            # Newer ultralytics replaces the deprecated half flag with quantize
+            if 'quantize' in DEFAULT_CFG_DICT:
+                options['quantize'] = 16
+            else:
+                options['half'] = True
+        if self._compile_mode:
+            if 'compile' in DEFAULT_CFG_DICT:
+                options['compile'] = self._compile_mode
+            else:
+                logger.warning("Installed ultralytics has no compile option - running eagerly")
+        return options
 
-        if not valid_images:
-            return [[] for _ in frames]
+    def _plan_sub_batches(
+        self,
+        indices: List[int],
+        class_sets: List[FrozenSet[int]],
+    ) -> List[Tuple[List[int], FrozenSet[int]]]:
+        """
+        Group frames into sub-batches keyed by their union of enabled classes.
 
-        # Run batch inference
-        results = self._model.predict(
-            valid_images,
-            conf=min_conf,
-            verbose=False,
-            device=self._device,
-        )
+        Starts with one group per distinct class set and greedily merges the
+        pair whose merge is cheapest, as long as the extra class-frames the
+        merged group has to carry through NMS cost less than one additional
+        predict call (sub_batch_split_cost).
 
-        # Process results for each frame
-        all_boxes: List[List[DetectionBox]] = [[] for _ in frames]
+        Returns:
+            List of (frame indices, class IDs) tuples
+        """
+        groups: Dict[FrozenSet[int], List[int]] = {}
+        for i in indices:
+            groups.setdefault(class_sets[i], []).append(i)
+
+        planned = [(members, classes) for classes, members in groups.items()]
+
+        while len(planned) > 1:
+            best: Optional[Tuple[int, int, int]] = None
+            for a in range(len(planned)):
+                for b in range(a + 1, len(planned)):
+                    members_a, classes_a = planned[a]
+                    members_b, classes_b = planned[b]
+                    union = classes_a | classes_b
+                    extra = (
+                        len(members_a) * (len(union) - len(classes_a))
+                        + len(members_b) * (len(union) - len(classes_b))
+                    )
+                    if best is None or extra < best[0]:
+                        best = (extra, a, b)
+
+            extra, a, b = best
+            if extra > self._sub_batch_split_cost:
+                break
+
+            members_b, classes_b = planned.pop(b)
+            members_a, classes_a = planned[a]
+            planned[a] = (members_a + members_b, classes_a | classes_b)
+
+        # Keep frame order stable within each sub-batch
+        return [(sorted(members), classes) for members, classes in planned]
+
+    def _extract_boxes(
+        self,
+        result,
+        settings: CameraObjectDetectionSettings,
+    ) -> List[DetectionBox]:
+        """Convert one ultralytics result into per-camera filtered boxes."""
+        if result.boxes is None or len(result.boxes) == 0:
+            return []
 
-        for result_idx, result in enumerate(results):
-            frame_idx = valid_indices[result_idx]
-            settings = settings_list[frame_idx]
+        # Materialise tensors once per frame rather than per box
+        class_ids = result.boxes.cls.cpu().numpy().astype(int)
+        confidences = result.boxes.conf.cpu().numpy()
+        coords = result.boxes.xyxy.cpu().numpy()
 
-            if result.boxes is None:
-                continue
+        return boxes_for_camera(class_ids, confidences, coords, settings)
 
-            frame_boxes = []
-            for box in result.boxes:
-                class_id = int(box.cls[0])
-                confidence = float(box.conf[0])
-
-                # Get class name from COCO mapping
-                class_name = COCO_CLASSES.get(class_id)
-                if class_name is None:
-                    continue
-
-                # Check if class is enabled and passes per-camera threshold
-                threshold = settings.get_confidence_threshold(class_name)
-                if threshold is None:
-                    continue
-                if confidence < threshold:
-                    continue
-
-                # Extract coordinates
-                xyxy = box.xyxy[0].cpu().numpy()
-
-                frame_boxes.append(DetectionBox(
-                    class_id=class_id,
-                    class_name=class_name,
-                    confidence=confidence,
-                    x1=float(xyxy[0]),
-                    y1=float(xyxy[1]),
-                    x2=float(xyxy[2]),
-                    y2=float(xyxy[3]),
-                ))
-
-            all_boxes[frame_idx] = frame_boxes
+    def _keep_downloaded_weights(self) -> None:
+        """Copy auto-downloaded weights into weights_dir so restarts skip the download."""
+        local_path = os.path.join(self._weights_dir, f"{self._model_name}.pt")
+        downloaded = getattr(self._model, 'ckpt_path', None)
+        if os.path.exists(local_path) or not downloaded or not os.path.exists(downloaded):
+            return
 
-        return all_boxes
+        try:
+            os.makedirs(self._weights_dir, exist_ok=True)
+            # Copy then rename so concurrent workers never see a partial file
+            tmp_path = f"{local_path}.{os.getpid()}.tmp"
+            shutil.copy2(downloaded, tmp_path)
+            os.replace(tmp_path, local_path)
+            logger.info(f"Saved downloaded weights to {local_path}")
+        except OSError as e:
+            logger.warning(f"Could not save weights to {local_path}: {e}")
 
     def _get_weights_path(self) -> str:
         """Get path to model weights."""
-        # Check for local weights file
-        local_path = os.path.join(self._weights_dir, f"{self._model_name}.pt")
-        if os.path.exists(local_path):
-            logger.info(f"Using local weights: {local_path}")
-            return local_path
-
-        # Use model name directly - ultralytics will auto-download
-        logger.info(f"Local weights not found, will download {self._model_name}")
-        return f"{self._model_name}.pt"
+        return resolve_weights_path(self._model_name, self._weights_dir)
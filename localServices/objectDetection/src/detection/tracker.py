@@ -0,0 +1,256 @@
+"""Lightweight IoU tracker giving detections persistent track ids."""
+
+import itertools
+import logging
+import threading
+import time
+from dataclasses import dataclass, field, replace
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from models import DetectionBox
+
+logger = logging.getLogger(__name__)
+
+# Weight of the newest observation in the smoothed velocity estimate
+VELOCITY_SMOOTHING = 0.5
+
+
+def iou_matrix(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    Pairwise IoU between two sets of xyxy boxes.
+
+    Args:
+        a: (N, 4) boxes
+        b: (M, 4) boxes
+
+    Returns:
+        (N, M) IoU matrix
+    """
+    if len(a) == 0 or len(b) == 0:
+        return np.zeros((len(a), len(b)), dtype=np.float32)
+
+    top_left = np.maximum(a[:, None, :2], b[None, :, :2])
+    bottom_right = np.minimum(a[:, None, 2:], b[None, :, 2:])
+    intersection = np.clip(bottom_right - top_left, 0, None).prod(axis=2)
+
+    area_a = (a[:, 2:] - a[:, :2]).prod(axis=1)
+    area_b = (b[:, 2:] - b[:, :2]).prod(axis=1)
+    union = area_a[:, None] + area_b[None, :] - intersection
+    return intersection / np.maximum(union, 1e-9)
+
+
+def _as_array(boxes: List[DetectionBox]) -> np.ndarray:
+    return np.array([[b.x1, b.y1, b.x2, b.y2] for b in boxes], dtype=np.float32).reshape(-1, 4)
+
+
+@dataclass
+class Track:
+    """One tracked object."""
+    track_id: int
+    box: DetectionBox  # Last matched detection, tagged with track_id
+    last_seen: int  # Timestamp (ms) of the last matched detection
+    velocity: np.ndarray = field(default_factory=lambda: np.zeros(4, dtype=np.float32))  # px/ms
+
+    def predict(self, timestamp: int) -> DetectionBox:
+        """Box extrapolated to timestamp at constant velocity."""
+        x1, y1, x2, y2 = _as_array([self.box])[0] + self.velocity * (timestamp - self.last_seen)
+        return replace(self.box, x1=float(x1), y1=float(y1), x2=float(x2), y2=float(y2))
+
+
+@dataclass
+class TrackUpdate:
+    """Outcome of feeding one frame's detections to the tracker."""
+    boxes: List[DetectionBox]  # Frame detections, tagged with track ids
+    started: List[int] = field(default_factory=list)  # New track ids
+    ended: List[DetectionBox] = field(default_factory=list)  # Last boxes of ended tracks
+
+
+class MultiCameraTracker:
+    """
+    Per-camera IoU tracker with frame skipping.
+
+    - Detections are matched to existing tracks of the same class by IoU
+      against each track's constant-velocity prediction (greedy, highest
+      IoU first); unmatched detections start new tracks
+    - Tracks not matched for max_age_ms end
+    - While a camera has active tracks, only every detect_every-th frame
+      needs inference; frames in between use the predicted track boxes
+    - All ages are on the camera's capture clock (frame timestamps). The
+      background sweep advances each camera's clock from its latest frame
+      by the monotonic time since that frame, so a sender's clock offset or
+      pipeline delay never ends tracks early
+    """
+
+    def __init__(
+        self,
+        iou_threshold: float = 0.3,
+        max_age_ms: float = 3000.0,
+        detect_every: int = 1,
+    ):
+        """
+        Args:
+            iou_threshold: Minimum IoU to match a detection to a track
+            max_age_ms: Time without a match after which a track ends
+            detect_every: Run inference on every k-th frame while tracking
+        """
+        self._iou_threshold = iou_threshold
+        self._max_age_ms = max_age_ms
+        self._detect_every = max(1, detect_every)
+
+        self._tracks: Dict[str, List[Track]] = {}
+        self._frames_since_detect: Dict[str, int] = {}
+        # camera_id -> (latest frame timestamp ms, time.monotonic() when it arrived)
+        self._clocks: Dict[str, Tuple[int, float]] = {}
+        self._next_id = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def should_detect(self, camera_id: str) -> bool:
+        """
+        Whether this camera's next frame needs inference. Counts the frame.
+
+        A frame chosen for inference restarts the count right away, so of
+        several frames from one camera in a batch only every k-th is inferred.
+        """
+        with self._lock:
+            count = self._frames_since_detect.get(camera_id, 0) + 1
+            if not self._tracks.get(camera_id) or count >= self._detect_every:
+                self._frames_since_detect[camera_id] = 0
+                return True
+            self._frames_since_detect[camera_id] = count
+            return False
+
+    def predict(self, camera_id: str, timestamp: int) -> List[DetectionBox]:
+        """Predicted boxes of a camera's active tracks at timestamp."""
+        with self._lock:
+            self._advance_clock(camera_id, timestamp)
+            return [track.predict(timestamp) for track in self._tracks.get(camera_id, [])]
+
+    def update(self, camera_id: str, timestamp: int, boxes: List[DetectionBox]) -> TrackUpdate:
+        """
+        Match a frame's detections to tracks.
+
+        Args:
+            camera_id: Camera identifier
+            timestamp: Frame timestamp (ms)
+            boxes: Zone-filtered detections for the frame
+
+        Returns:
+            Tagged boxes plus started track ids and ended tracks
+        """
+        with self._lock:
+            self._advance_clock(camera_id, timestamp)
+            ended = self._expire(camera_id, timestamp)
+            tracks = self._tracks.setdefault(camera_id, [])
+
+            matches = self._match(tracks, boxes, timestamp)
+            matched_boxes = set()
+            tagged: List[DetectionBox] = list(boxes)
+            for track_idx, box_idx in matches:
+                track = tracks[track_idx]
+                tagged[box_idx] = replace(boxes[box_idx], track_id=track.track_id)
+                self._observe(track, tagged[box_idx], timestamp)
+                matched_boxes.add(box_idx)
+
+            started = []
+            for box_idx, box in enumerate(boxes):
+                if box_idx in matched_boxes:
+                    continue
+                track_id = next(self._next_id)
+                tagged[box_idx] = replace(box, track_id=track_id)
+                tracks.append(Track(track_id=track_id, box=tagged[box_idx], last_seen=timestamp))
+                started.append(track_id)
+
+            return TrackUpdate(boxes=tagged, started=started, ended=ended)
+
+    def expire(self, now: Optional[float] = None) -> Dict[str, Tuple[int, List[DetectionBox]]]:
+        """
+        End tracks on every camera that haven't been matched for max_age_ms.
+
+        Args:
+            now: time.monotonic() value to evaluate at (defaults to the current one)
+
+        Returns:
+            camera_id -> (camera time in ms, last boxes of its ended tracks)
+        """
+        if now is None:
+            now = time.monotonic()
+
+        with self._lock:
+            ended = {}
+            for camera_id in list(self._tracks):
+                camera_now_ms = self._camera_time(camera_id, now)
+                if camera_now_ms is None:
+                    continue
+                camera_ended = self._expire(camera_id, camera_now_ms)
+                if camera_ended:
+                    ended[camera_id] = (camera_now_ms, camera_ended)
+            return ended
+
+    def _advance_clock(self, camera_id: str, timestamp: int) -> None:
+        """Record a camera's newest frame timestamp. Lock held."""
+        clock = self._clocks.get(camera_id)
+        if clock is None or timestamp >= clock[0]:
+            self._clocks[camera_id] = (timestamp, time.monotonic())
+
+    def _camera_time(self, camera_id: str, now: float) -> Optional[int]:
+        """Camera clock (ms) at monotonic time now, or None before any frame. Lock held."""
+        clock = self._clocks.get(camera_id)
+        if clock is None:
+            return None
+        timestamp, seen_at = clock
+        return timestamp + int(max(now - seen_at, 0.0) * 1000)
+
+    def _expire(self, camera_id: str, now_ms: int) -> List[DetectionBox]:
+        """End stale tracks for one camera. Lock held."""
+        tracks = self._tracks.get(camera_id, [])
+        alive = [t for t in tracks if now_ms - t.last_seen <= self._max_age_ms]
+        if len(alive) == len(tracks):
+            return []
+
+        self._tracks[camera_id] = alive
+        return [t.box for t in tracks if now_ms - t.last_seen > self._max_age_ms]
+
+    def _match(
+        self,
+        tracks: List[Track],
+        boxes: List[DetectionBox],
+        timestamp: int,
+    ) -> List[Tuple[int, int]]:
+        """Greedy class-aware IoU matching. Returns (track index, box index) pairs."""
+        if not tracks or not boxes:
+            return []
+
+        predicted = _as_array([t.predict(timestamp) for t in tracks])
+        ious = iou_matrix(predicted, _as_array(boxes))
+
+        # Only same-class pairs can match
+        track_classes = np.array([t.box.class_id for t in tracks])
+        box_classes = np.array([b.class_id for b in boxes])
+        ious[track_classes[:, None] != box_classes[None, :]] = 0.0
+
+        matches = []
+        used_tracks, used_boxes = set(), set()
+        order = np.argsort(ious, axis=None)[::-1]
+        for track_idx, box_idx in zip(*np.unravel_index(order, ious.shape)):
+            if ious[track_idx, box_idx] < self._iou_threshold:
+                break
+            if track_idx in used_tracks or box_idx in used_boxes:
+                continue
+            used_tracks.add(track_idx)
+            used_boxes.add(box_idx)
+            matches.append((int(track_idx), int(box_idx)))
+        return matches
+
+    @staticmethod
+    def _observe(track: Track, box: DetectionBox, timestamp: int) -> None:
+        """Update a matched track's box and smoothed velocity."""
+        dt = timestamp - track.last_seen
+        if dt > 0:
+            velocity = (_as_array([box])[0] - _as_array([track.box])[0]) / dt
+            track.velocity = (
+                VELOCITY_SMOOTHING * velocity + (1 - VELOCITY_SMOOTHING) * track.velocity
+            )
+        track.box = box
+        track.last_seen = timestamp
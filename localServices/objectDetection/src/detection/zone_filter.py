@@ -1,7 +1,7 @@
 """Filter detections by motion zones."""
 
 import logging
-from typing import List, Set, Tuple
+from typing import Dict, List, Set, Tuple
 
 import cv2
 import numpy as np
@@ -30,6 +30,111 @@ def point_in_polygon(point: Tuple[float, float], polygon: List[Tuple[int, int]])
     return result >= 0  # >= 0 means inside or on edge
 
 
+class CompiledZones:
+    """
+    Zones pre-converted for vectorized point-in-polygon tests.
+
+    Compile once per camera config and reuse for every frame. All polygon
+    edges are stacked into flat arrays, so every box center is tested
+    against every zone in a handful of NumPy operations. Results are
+    identical to point_in_polygon (cv2.pointPolygonTest, edges count as
+    inside): it is the same crossing test in the same float32 arithmetic.
+    """
+
+    def __init__(self, zones: List[MotionZone]):
+        self.zones = zones  # Source list - identifies the config this was compiled from
+        self._full_frame: Set[str] = {z.id for z in zones if z.is_full_frame()}
+
+        polygons = [
+            (z.id, np.array(z.points, dtype=np.int32).astype(np.float32))
+            for z in zones
+            if not z.is_full_frame()
+        ]
+        self._columns: Dict[str, int] = {zone_id: i for i, (zone_id, _) in enumerate(polygons)}
+
+        # Edge k runs from start[k] to end[k]; each polygon is closed
+        starts = [polygon for _, polygon in polygons]
+        ends = [np.roll(polygon, 1, axis=0) for _, polygon in polygons]
+        start = np.concatenate(starts) if polygons else np.empty((0, 2), dtype=np.float32)
+        end = np.concatenate(ends) if polygons else np.empty((0, 2), dtype=np.float32)
+
+        self._x0, self._y0 = end[:, 0], end[:, 1]
+        self._x1, self._y1 = start[:, 0], start[:, 1]
+        self._dx = (self._x1 - self._x0).astype(np.float64)
+        self._dy = (self._y1 - self._y0).astype(np.float64)
+        self._downward = self._y1 < self._y0
+        # First edge index of each polygon, for per-zone reductions
+        self._offsets = np.cumsum([0] + [len(p) for _, p in polygons[:-1]])
+
+    def contains(self, zone_id: str, points: np.ndarray) -> np.ndarray:
+        """
+        Test points against one zone.
+
+        Args:
+            zone_id: Zone to test
+            points: (N, 2) float32 x, y coordinates
+
+        Returns:
+            (N,) bool mask - True if inside or on the edge
+        """
+        if zone_id in self._full_frame:
+            return np.ones(len(points), dtype=bool)
+
+        column = self._columns.get(zone_id)
+        if column is None:
+            return np.zeros(len(points), dtype=bool)
+
+        return self._inside(points)[:, column]
+
+    def filter(self, boxes: List[DetectionBox], zones_with_motion: Set[str]) -> List[DetectionBox]:
+        """Keep boxes whose center is inside any zone with motion."""
+        if not boxes:
+            return []
+
+        if not self.zones:
+            # No zones defined - shouldn't happen but return all boxes
+            return boxes
+
+        if not self._full_frame.isdisjoint(zones_with_motion):
+            return list(boxes)
+
+        columns = [self._columns[zone_id] for zone_id in zones_with_motion if zone_id in self._columns]
+        if not columns:
+            return []
+
+        centers = np.array([box.center for box in boxes], dtype=np.float32)
+        keep = self._inside(centers)[:, columns].any(axis=1)
+        return [box for box, kept in zip(boxes, keep) if kept]
+
+    def _inside(self, points: np.ndarray) -> np.ndarray:
+        """
+        Vectorized port of cv2.pointPolygonTest (measureDist=False) >= 0.
+
+        Returns:
+            (N, num_polygons) bool - point inside or on the edge of each polygon
+        """
+        px, py = points[:, :1], points[:, 1:]
+        x0, y0, x1, y1 = self._x0, self._y0, self._x1, self._y1
+
+        # Edges entirely above/below the point, or left of it, can't cross
+        # the ray - but the point may still sit on the vertex or a horizontal edge
+        skip = ((y0 <= py) & (y1 <= py)) | ((y0 > py) & (y1 > py)) | ((x0 < px) & (x1 < px))
+        on_edge = skip & (py == y1) & (
+            (px == x1)
+            | ((py == y0) & (((x0 <= px) & (px <= x1)) | ((x1 <= px) & (px <= x0))))
+        )
+
+        crossing = ~skip
+        dist = (py - y0).astype(np.float64) * self._dx - (px - x0).astype(np.float64) * self._dy
+        on_edge |= crossing & (dist == 0)
+        dist[:, self._downward] *= -1
+        crossings = (crossing & (dist > 0)).astype(np.int32)
+
+        counts = np.add.reduceat(crossings, self._offsets, axis=1)
+        on_edge = np.logical_or.reduceat(on_edge, self._offsets, axis=1)
+        return on_edge | (counts % 2 == 1)
+
+
 def filter_detections_by_zones(
     boxes: List[DetectionBox],
     zones: List[MotionZone],
@@ -42,6 +147,9 @@ def filter_detections_by_zones(
     1. Has motion detected
     2. OR is a full-frame zone with motion
 
+    Compiles the zones on every call - use CompiledZones directly to reuse
+    them across frames.
+
     Args:
         boxes: List of detection boxes
         zones: List of motion zone definitions
@@ -50,35 +158,4 @@ def filter_detections_by_zones(
     Returns:
         Filtered list of detection boxes
     """
-    if not boxes:
-        return []
-
-    if not zones:
-        # No zones defined - shouldn't happen but return all boxes
-        return boxes
-
-    # Build zone lookup
-    zone_map = {z.id: z for z in zones}
-
-    # Filter boxes
-    filtered = []
-    for box in boxes:
-        center = box.center
-
-        # Check each zone with motion
-        for zone_id in zones_with_motion:
-            zone = zone_map.get(zone_id)
-            if zone is None:
-                continue
-
-            # Full frame zone - include all detections
-            if zone.is_full_frame():
-                filtered.append(box)
-                break
-
-            # Polygon zone - check if center is inside
-            if point_in_polygon(center, zone.points):
-                filtered.append(box)
-                break
-
-    return filtered
+    return CompiledZones(zones).filter(boxes, zones_with_motion)
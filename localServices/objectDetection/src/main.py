@@ -13,8 +13,9 @@ import sys
 import torch
 
 from config import Settings, GlobalConfigManager, CameraConfigManager
-from detection import ObjectDetector
-from streaming import MotionEventConsumer
+from detection import ObjectDetector, DetectionResultCache, MultiCameraTracker
+from metrics import MetricsRegistry, MetricsServer
+from streaming import MotionEventConsumer, SharedFrameReader
 from output import DetectionPublisher
 
 logging.basicConfig(
@@ -76,11 +77,34 @@ def main() -> None:
     )
     camera_config.start()
 
+    # Stage timings, batch sizes, queue depths and drop counters
+    metrics = MetricsRegistry()
+
     # Initialize detector (uses global config for model)
     logger.info("Initializing object detector...")
     detector = ObjectDetector(
         global_config=global_config,
         weights_dir=settings.weights_dir,
+        backend=settings.detection_backend,
+        onnx_threads=settings.onnx_threads,
+        onnx_precision=settings.onnx_precision,
+        model_cache_max_bytes=int(settings.model_cache_max_gb * 1024 ** 3),
+        num_workers=settings.inference_workers,
+        devices=[d.strip() for d in settings.inference_devices.split(',') if d.strip()],
+        max_batch_size=settings.max_batch_size,
+        half=settings.model_half,
+        compile_mode=settings.model_compile or None,
+        result_cache=DetectionResultCache(
+            max_reuse_frames=settings.result_cache_max_frames,
+            max_age_ms=settings.result_cache_max_age_ms,
+            diff_threshold=settings.result_cache_diff_threshold,
+        ),
+        tracker=MultiCameraTracker(
+            iou_threshold=settings.tracker_iou_threshold,
+            max_age_ms=settings.tracker_max_age_ms,
+            detect_every=settings.tracker_detect_every,
+        ) if settings.tracking_enabled else None,
+        metrics=metrics,
     )
     detector.start()
 
@@ -91,6 +115,17 @@ def main() -> None:
         channel_prefix=settings.detection_channel_prefix,
     )
 
+    # Maps frames the motion service shares by handle (same host only). The
+    # store must hold every frame in flight: the pending queue, pipeline_depth
+    # batches before each of the infer and publish stages, one batch in each
+    # of the three stages and one frame per decode worker
+    frames_in_flight = (
+        settings.max_pending_frames
+        + (2 * settings.pipeline_depth + 3) * settings.max_batch_size
+        + settings.decode_workers
+    )
+    frame_reader = SharedFrameReader(min_slots=frames_in_flight)
+
     # Initialize and start consumer
     consumer = MotionEventConsumer(
         redis_host=settings.redis_host,
@@ -99,12 +134,38 @@ def main() -> None:
         camera_config=camera_config,
         publisher=publisher,
         channel_prefix=settings.motion_channel_prefix,
+        max_pending_frames=settings.max_pending_frames,
+        max_pending_frames_per_camera=settings.max_pending_frames_per_camera,
+        max_pending_bytes=int(settings.max_pending_mb * 1024 ** 2),
+        max_pending_bytes_per_camera=int(settings.max_pending_mb_per_camera * 1024 ** 2),
+        max_batch_size=settings.max_batch_size,
+        max_wait_ms=settings.batch_max_wait_ms,
+        target_batch_latency_ms=settings.batch_target_latency_ms,
+        frame_deadline_ms=settings.frame_deadline_ms,
+        decode_workers=settings.decode_workers,
+        transport=settings.motion_transport,
+        stream_key=settings.motion_stream_key,
+        consumer_group=settings.motion_stream_group,
+        consumer_name=settings.consumer_name,
+        claim_min_idle_ms=settings.motion_stream_claim_idle_ms,
+        frame_reader=frame_reader,
+        pipeline_depth=settings.pipeline_depth,
+        metrics=metrics,
     )
 
+    # Metrics endpoint (GET /metrics)
+    metrics_server = None
+    if settings.metrics_port:
+        metrics_server = MetricsServer(metrics, host=settings.metrics_host, port=settings.metrics_port)
+        metrics_server.start()
+
     # Graceful shutdown handler
     def shutdown_handler(signum, frame):
         logger.info(f"Received signal {signum}, initiating graceful shutdown...")
         consumer.stop()
+        if metrics_server:
+            metrics_server.stop()
+        frame_reader.close()
         publisher.close()
         detector.stop()
         camera_config.stop()
@@ -124,6 +185,9 @@ def main() -> None:
     finally:
         logger.info("Shutting down...")
         consumer.stop()
+        if metrics_server:
+            metrics_server.stop()
+        frame_reader.close()
         publisher.close()
         detector.stop()
         camera_config.stop()
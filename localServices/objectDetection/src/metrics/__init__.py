@@ -0,0 +1,6 @@
+"""Metrics module - stage timings, histograms and the metrics endpoint."""
+
+from .registry import BATCH_SIZE_BUCKETS, STAGE_BUCKETS_MS, MetricsRegistry
+from .server import MetricsServer
+
+__all__ = ['BATCH_SIZE_BUCKETS', 'STAGE_BUCKETS_MS', 'MetricsRegistry', 'MetricsServer']
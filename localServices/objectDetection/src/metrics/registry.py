@@ -0,0 +1,220 @@
+"""In-process metrics registry - histograms plus pulled counters/gauges."""
+
+import bisect
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Metric names are exported with this prefix
+PREFIX = 'object_detection_'
+
+# Per-batch stage durations (ms)
+STAGE_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+# Frames per batch
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64)
+
+# (name, labels, value) reported by a collector
+Sample = Tuple[str, Dict[str, str], float]
+
+_LabelKey = Tuple[Tuple[str, str], ...]
+
+
+@dataclass
+class _Family:
+    """Metadata for one metric name."""
+    kind: str  # histogram, counter or gauge
+    help: str
+    buckets: Tuple[float, ...] = ()
+
+
+class Histogram:
+    """Fixed-bucket histogram (Prometheus semantics: le upper bounds, +Inf last)."""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    def snapshot(self) -> Tuple[List[int], float]:
+        """Per-bucket (non-cumulative) counts and the sum of observations."""
+        with self._lock:
+            return list(self._counts), self._sum
+
+
+def bucket_quantile(buckets: Sequence[float], counts: Sequence[int], q: float) -> Optional[float]:
+    """
+    Estimate a quantile from per-bucket counts by linear interpolation.
+
+    Values in the +Inf bucket are reported as the last finite bound.
+    """
+    total = sum(counts)
+    if total == 0:
+        return None
+
+    rank = q * total
+    seen = 0
+    for i, count in enumerate(counts):
+        if count and seen + count >= rank:
+            if i == len(buckets):
+                return float(buckets[-1])
+            lower = buckets[i - 1] if i > 0 else 0.0
+            return lower + (buckets[i] - lower) * (rank - seen) / count
+        seen += count
+    return float(buckets[-1])
+
+
+class MetricsRegistry:
+    """
+    Holds the service's metrics and renders them for scraping and logs.
+
+    - Histograms are observed by the code doing the work (stage timings,
+      batch sizes)
+    - Counters and gauges are pulled from collectors at render time, so
+      components keep their own counters and just describe them here
+    - render() produces Prometheus text format; summary() a one-line digest
+      of what changed since the previous summary
+    """
+
+    def __init__(self):
+        self._families: Dict[str, _Family] = {}
+        self._histograms: Dict[Tuple[str, _LabelKey], Histogram] = {}
+        self._collectors: List[Callable[[], Iterable[Sample]]] = []
+        self._lock = threading.Lock()
+
+        # Histogram counts and counter values at the previous summary()
+        self._last_histograms: Dict[Tuple[str, _LabelKey], Tuple[List[int], float]] = {}
+        self._last_counters: Dict[Tuple[str, _LabelKey], float] = {}
+
+    def histogram(self, name: str, buckets: Sequence[float], help: str) -> None:
+        """Declare a histogram; observe() creates one series per label set."""
+        self._families[name] = _Family('histogram', help, tuple(buckets))
+
+    def counter(self, name: str, help: str) -> None:
+        """Declare a counter reported by a collector (monotonic total)."""
+        self._families[name] = _Family('counter', help)
+
+    def gauge(self, name: str, help: str) -> None:
+        """Declare a gauge reported by a collector."""
+        self._families[name] = _Family('gauge', help)
+
+    def add_collector(self, collector: Callable[[], Iterable[Sample]]) -> None:
+        """Register a callable returning current counter/gauge samples."""
+        with self._lock:
+            self._collectors.append(collector)
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        """Record one observation in a declared histogram."""
+        key = (name, tuple(sorted(labels.items())))
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.get(key)
+                if histogram is None:
+                    histogram = self._histograms[key] = Histogram(self._families[name].buckets)
+        histogram.observe(value)
+
+    def render(self) -> str:
+        """All metrics in Prometheus text exposition format."""
+        lines: List[str] = []
+        histograms = self._histogram_series()
+        samples = self._collect()
+
+        for name, family in self._families.items():
+            full_name = f"{PREFIX}{name}"
+            lines.append(f"# HELP {full_name} {family.help}")
+            lines.append(f"# TYPE {full_name} {family.kind}")
+
+            if family.kind == 'histogram':
+                for labels, histogram in histograms.get(name, []):
+                    counts, total = histogram.snapshot()
+                    cumulative = 0
+                    for bound, count in zip(family.buckets + (float('inf'),), counts):
+                        cumulative += count
+                        le = '+Inf' if bound == float('inf') else f'{bound:g}'
+                        bucket_labels = _format_labels(labels + (('le', le),))
+                        lines.append(f"{full_name}_bucket{bucket_labels} {cumulative}")
+                    lines.append(f"{full_name}_sum{_format_labels(labels)} {total:.3f}")
+                    lines.append(f"{full_name}_count{_format_labels(labels)} {cumulative}")
+            else:
+                for labels, value in samples.get(name, []):
+                    lines.append(f"{full_name}{_format_labels(labels)} {value:g}")
+
+        return '\n'.join(lines) + '\n'
+
+    def summary(self) -> str:
+        """
+        Digest since the previous call: histogram mean/p50/p95 and counts,
+        counter increases, current gauge values.
+        """
+        parts: List[str] = []
+
+        for name, series in self._histogram_series().items():
+            buckets = self._families[name].buckets
+            for labels, histogram in series:
+                counts, total = histogram.snapshot()
+                key = (name, labels)
+                previous, previous_total = self._last_histograms.get(key, ([0] * len(counts), 0.0))
+                self._last_histograms[key] = (counts, total)
+                window = [now - before for now, before in zip(counts, previous)]
+                observed = sum(window)
+                if not observed:
+                    continue
+                label = name + ''.join(f"[{v}]" for _, v in labels)
+                mean = (total - previous_total) / observed
+                p50 = bucket_quantile(buckets, window, 0.5)
+                p95 = bucket_quantile(buckets, window, 0.95)
+                parts.append(
+                    f"{label} mean {mean:.1f} p50 {p50:.1f} p95 {p95:.1f} (n={observed})"
+                )
+
+        for name, series in self._collect().items():
+            kind = self._families[name].kind
+            for labels, value in series:
+                label = name + ''.join(f"[{v}]" for _, v in labels)
+                if kind == 'counter':
+                    key = (name, labels)
+                    increase = value - self._last_counters.get(key, 0.0)
+                    self._last_counters[key] = value
+                    if increase:
+                        parts.append(f"{label} +{increase:g}")
+                else:
+                    parts.append(f"{label} {value:g}")
+
+        return ', '.join(parts) if parts else 'no activity'
+
+    def _histogram_series(self) -> Dict[str, List[Tuple[_LabelKey, Histogram]]]:
+        with self._lock:
+            items = list(self._histograms.items())
+        series: Dict[str, List[Tuple[_LabelKey, Histogram]]] = {}
+        for (name, labels), histogram in sorted(items, key=lambda item: item[0]):
+            series.setdefault(name, []).append((labels, histogram))
+        return series
+
+    def _collect(self) -> Dict[str, List[Tuple[_LabelKey, float]]]:
+        with self._lock:
+            collectors = list(self._collectors)
+        samples: Dict[str, List[Tuple[_LabelKey, float]]] = {}
+        for collector in collectors:
+            for name, labels, value in collector():
+                if name in self._families:
+                    samples.setdefault(name, []).append((tuple(sorted(labels.items())), value))
+        return samples
+
+
+def _format_labels(labels: _LabelKey) -> str:
+    if not labels:
+        return ''
+    inner = ','.join(f'{key}="{_escape(value)}"' for key, value in labels)
+    return '{' + inner + '}'
+
+
+def _escape(value: object) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
@@ -0,0 +1,75 @@
+"""HTTP endpoint serving the metrics registry in Prometheus text format."""
+
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+from .registry import MetricsRegistry
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class MetricsServer:
+    """
+    Serves GET /metrics from a background thread (stdlib only).
+
+    Rendering pulls collector values at request time, so a scrape always
+    sees current queue depths and counters.
+    """
+
+    def __init__(self, registry: MetricsRegistry, host: str = '127.0.0.1', port: int = 9100):
+        self._registry = registry
+        self._host = host
+        self._port = port
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def port(self) -> int:
+        """Bound port (resolved if constructed with port 0)."""
+        return self._server.server_address[1] if self._server else self._port
+
+    def start(self) -> None:
+        """Bind and start serving."""
+        registry = self._registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?', 1)[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                try:
+                    body = registry.render().encode()
+                except Exception as e:
+                    logger.error(f"Failed to render metrics: {e}")
+                    self.send_error(500)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', CONTENT_TYPE)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Scrapes would flood the service log
+
+        self._server = ThreadingHTTPServer((self._host, self._port), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name='metrics-server', daemon=True
+        )
+        self._thread.start()
+        logger.info(f"Metrics endpoint listening on {self._host}:{self.port}/metrics")
+
+    def stop(self) -> None:
+        """Stop serving and release the port."""
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if self._thread:
+            self._thread.join(timeout=5.0)
+            self._thread = None
@@ -21,6 +21,7 @@ class CameraObjectDetectionSettings:
     """Per-camera object detection settings (from Redis cameras)."""
     class_configs: List[Dict]  # Raw from Redis: [{"class": "person", "confidence": 0.5}]
     motion_zones: List[MotionZone]  # Zone definitions with polygon points
+    priority: float = 1.0  # Weight for fair scheduling under overload
 
     def get_confidence_threshold(self, class_name: str) -> Optional[float]:
         """Get confidence threshold for a class, or None if not enabled."""
@@ -29,6 +30,10 @@ class CameraObjectDetectionSettings:
                 return config.get('confidence')
         return None
 
+    def get_enabled_classes(self) -> List[str]:
+        """Get names of all enabled classes."""
+        return [c['class'] for c in self.class_configs if c.get('class')]
+
     def is_class_enabled(self, class_name: str) -> bool:
         """Check if a class is enabled for detection."""
         return any(c.get('class') == class_name for c in self.class_configs)
@@ -65,6 +70,7 @@ class DetectionBox:
     y1: float
     x2: float
     y2: float
+    track_id: Optional[int] = None  # Set when tracking is enabled
 
     @property
     def center(self) -> Tuple[float, float]:
@@ -80,6 +86,16 @@ class DetectionResult:
     model_used: str
     processing_time_ms: float
     boxes: List[DetectionBox] = field(default_factory=list)
+    cached: bool = False  # Boxes reused from a near-identical earlier frame
+    # detection (tracking off), or track_start / track_update / track_end
+    event_type: str = 'detection'
+    started_track_ids: List[int] = field(default_factory=list)
+    ended_track_ids: List[int] = field(default_factory=list)
+
+    @property
+    def should_publish(self) -> bool:
+        """track_update results carry nothing new for the backend."""
+        return self.event_type != 'track_update'
 
     @property
     def has_detections(self) -> bool:
@@ -100,6 +116,10 @@ class MotionEvent:
     zone_results: List[ZoneMotionResult]
     mask: str  # Base64 encoded JPEG, empty string if not present
     original_frame: str  # Base64 encoded JPEG, empty string if not present
+    # Shared frame store handle (store, instance, slot, sequence) sent with
+    # original_frame (or instead of it, if so configured) when motion
+    # detection runs on the same host
+    frame_handle: Optional[dict] = None
 
     @classmethod
     def from_dict(cls, data: dict) -> 'MotionEvent':
@@ -121,12 +141,17 @@ class MotionEvent:
             zone_results=zone_results,
             mask=data.get('mask', ''),
             original_frame=data.get('original_frame', ''),
+            frame_handle=data.get('frame_handle'),
         )
 
     def has_original_frame(self) -> bool:
         """Check if original frame is present."""
         return bool(self.original_frame)
 
+    def has_frame(self) -> bool:
+        """Check if a frame is attached, inline or by shared store handle."""
+        return self.has_original_frame() or self.frame_handle is not None
+
     def get_zones_with_motion(self) -> List[str]:
         """Get list of zone IDs that have motion."""
         return [z.zone_id for z in self.zone_results if z.has_motion]
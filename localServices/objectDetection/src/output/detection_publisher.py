@@ -17,6 +17,7 @@ class DetectionPublisher:
 
     Channel format: detection:{camera_id}
     Backend subscribes to process results (DB writes, clip extraction).
+    With tracking enabled only track_start / track_end results are published.
     """
 
     def __init__(
@@ -30,6 +31,9 @@ class DetectionPublisher:
 
     def publish(self, result: DetectionResult) -> None:
         """Publish single detection result."""
+        if not result.should_publish:
+            return
+
         try:
             event = self._build_event(result)
             channel = f"{self._channel_prefix}{result.camera_id}"
@@ -47,6 +51,8 @@ class DetectionPublisher:
             pipeline = self._redis.pipeline()
 
             for result in results:
+                if not result.should_publish:
+                    continue
                 event = self._build_event(result)
                 channel = f"{self._channel_prefix}{result.camera_id}"
                 pipeline.publish(channel, json.dumps(event))
@@ -68,6 +74,10 @@ class DetectionPublisher:
             'model_used': result.model_used,
             'processing_time_ms': round(result.processing_time_ms, 2),
             'detection_count': len(result.boxes),
+            'cached': result.cached,
+            'event_type': result.event_type,
+            'started_track_ids': result.started_track_ids,
+            'ended_track_ids': result.ended_track_ids,
             'boxes': [
                 {
                     'class_id': box.class_id,
@@ -77,6 +87,7 @@ class DetectionPublisher:
                     'y1': round(box.y1, 2),
                     'x2': round(box.x2, 2),
                     'y2': round(box.y2, 2),
+                    'track_id': box.track_id,
                 }
                 for box in result.boxes
             ],
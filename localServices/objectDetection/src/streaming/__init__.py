@@ -1,5 +1,6 @@
 """Streaming module - motion event consumption."""
 
 from .motion_event_consumer import MotionEventConsumer
+from .frame_store import SharedFrameReader
 
-__all__ = ['MotionEventConsumer']
+__all__ = ['MotionEventConsumer', 'SharedFrameReader']
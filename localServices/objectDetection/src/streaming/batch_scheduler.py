@@ -0,0 +1,296 @@
+"""Deadline-aware dynamic batching for object detection frames."""
+
+import logging
+import math
+import threading
+import time
+from collections import deque, defaultdict
+from dataclasses import dataclass
+from typing import Deque, Dict, List, Set, Tuple, Union
+
+import numpy as np
+
+from detection.strategies import frame_nbytes
+from models import CameraObjectDetectionSettings
+from .fair_queue import FairFrameQueue
+
+logger = logging.getLogger(__name__)
+
+# Type alias for frame tuple
+# (camera_id, timestamp, frame, settings, zones_with_motion) - frame is JPEG
+# bytes or a decoded BGR image from the shared frame store
+FrameTuple = Tuple[str, int, Union[bytes, np.ndarray], CameraObjectDetectionSettings, Set[str]]
+
+
+@dataclass
+class ScheduledFrame:
+    """Frame waiting for inference, with its alert deadline."""
+    frame: FrameTuple
+    deadline_ms: float  # Wall-clock ms after which the result is no longer useful
+
+    @property
+    def camera_id(self) -> str:
+        return self.frame[0]
+
+
+class BatchLatencyModel:
+    """
+    Estimates batch latency as overhead + per_frame * batch_size.
+
+    Fitted by least squares over a window of recent (batch_size, latency_ms)
+    samples. Falls back to a pure per-frame estimate until batches of at
+    least two different sizes have been observed (fits_overhead is False
+    until then).
+    """
+
+    def __init__(self, window: int = 64):
+        self._samples: Deque[Tuple[int, float]] = deque(maxlen=window)
+        self.overhead_ms = 0.0
+        self.per_frame_ms = 0.0
+        self.fits_overhead = False
+
+    @property
+    def largest_batch_size(self) -> int:
+        """Largest batch size in the sample window (0 without samples)."""
+        return max((s for s, _ in self._samples), default=0)
+
+    @property
+    def has_samples(self) -> bool:
+        return len(self._samples) > 0
+
+    def record(self, batch_size: int, latency_ms: float) -> None:
+        """Add a measured batch and refit."""
+        if batch_size <= 0:
+            return
+        self._samples.append((batch_size, latency_ms))
+        self._fit()
+
+    def predict(self, batch_size: int) -> float:
+        """Predicted latency in ms for a batch of the given size."""
+        return self.overhead_ms + self.per_frame_ms * batch_size
+
+    def _fit(self) -> None:
+        n = len(self._samples)
+        mean_x = sum(s for s, _ in self._samples) / n
+        mean_y = sum(l for _, l in self._samples) / n
+        var_x = sum((s - mean_x) ** 2 for s, _ in self._samples)
+
+        if var_x == 0:
+            # Only one batch size seen - can't separate overhead from per-frame cost
+            self.overhead_ms = 0.0
+            self.per_frame_ms = mean_y / mean_x
+            self.fits_overhead = False
+            return
+
+        cov = sum((s - mean_x) * (l - mean_y) for s, l in self._samples)
+        per_frame = max(cov / var_x, 0.0)
+        self.fits_overhead = True
+        self.per_frame_ms = per_frame
+        self.overhead_ms = max(mean_y - per_frame * mean_x, 0.0)
+
+
+class BatchScheduler:
+    """
+    Collects frames into batches for inference.
+
+    - Per-camera bounded queues with weighted-fair dequeue (backpressure
+      drops a camera's own oldest frame, never another camera's), capped
+      by frame count and by payload bytes (JPEG or decoded frame size)
+    - Waits up to max_wait_ms after the first frame for a fuller batch
+    - Target batch size is the largest batch predicted to finish within
+      target_batch_latency_ms, from measured per-batch latency. While only
+      one batch size has been measured and frames are backing up, a batch
+      twice that size is tried so fixed overhead can be told apart from
+      per-frame cost; if not even one frame fits the target, batches grow
+      (from the backlog) until the overhead per frame is at most the
+      per-frame cost
+    - Each frame's deadline is its capture timestamp + frame_deadline_ms;
+      frames that can't finish before their deadline are dropped before inference
+    """
+
+    def __init__(
+        self,
+        max_pending_frames: int = 12,
+        max_pending_frames_per_camera: int = 6,
+        max_pending_bytes: int = 0,
+        max_pending_bytes_per_camera: int = 0,
+        max_batch_size: int = 16,
+        max_wait_ms: float = 15.0,
+        target_batch_latency_ms: float = 100.0,
+        frame_deadline_ms: float = 2000.0,
+        track_discards: bool = False,
+    ):
+        self._max_batch_size = max_batch_size
+        self._max_wait_s = max_wait_ms / 1000
+        self._target_batch_latency_ms = target_batch_latency_ms
+        self._frame_deadline_ms = frame_deadline_ms
+
+        self._queue: FairFrameQueue[ScheduledFrame] = FairFrameQueue(
+            max_items=max_pending_frames,
+            max_items_per_camera=max_pending_frames_per_camera,
+            max_bytes=max_pending_bytes,
+            max_bytes_per_camera=max_pending_bytes_per_camera,
+            size_of=lambda scheduled: frame_nbytes(scheduled.frame[2]),
+        )
+        self._lock = threading.Lock()
+        self._frames_available = threading.Condition(self._lock)
+        self._closed = False
+
+        self._latency = BatchLatencyModel()
+
+        # Counters for monitoring
+        self.dropped_frames = 0  # Backpressure drops
+        self.expired_frames = 0  # Deadline drops
+        self.expired_by_camera: Dict[str, int] = defaultdict(int)
+
+        # Dropped/expired frames kept for pop_discarded() (stream transport acks)
+        self._track_discards = track_discards
+        self._discarded: List[FrameTuple] = []
+
+    @property
+    def target_batch_size(self) -> int:
+        """Largest batch predicted to complete within the batch latency target."""
+        latency = self._latency
+        if not latency.has_samples or latency.per_frame_ms <= 0:
+            return self._max_batch_size
+
+        queued = len(self._queue)
+        if not latency.fits_overhead and queued > latency.largest_batch_size:
+            # The per-frame estimate still includes the whole batch overhead,
+            # which makes larger batches look no better - measure one
+            return min(2 * latency.largest_batch_size, self._max_batch_size)
+
+        if latency.predict(1) > self._target_batch_latency_ms:
+            # Target out of reach at any size: batch just enough of the backlog
+            # to amortize the overhead down to the per-frame cost, for
+            # throughput without piling more latency onto every frame
+            size = math.ceil(latency.overhead_ms / latency.per_frame_ms)
+            return max(1, min(size, queued, self._max_batch_size))
+
+        budget = self._target_batch_latency_ms - latency.overhead_ms
+        size = int(budget / latency.per_frame_ms)
+        return max(1, min(size, self._max_batch_size))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._queue)
+
+    def put(self, frame: FrameTuple) -> None:
+        """Queue a frame, dropping an older frame if the queue is full."""
+        queued = ScheduledFrame(
+            frame=frame,
+            deadline_ms=frame[1] + self._frame_deadline_ms,
+        )
+        settings = frame[3]
+
+        with self._frames_available:
+            dropped = self._queue.append(
+                queued.camera_id, queued, weight=settings.priority
+            )
+
+            for scheduled in dropped:
+                self._discard(scheduled)
+                self.dropped_frames += 1
+                if self.dropped_frames % 10 == 1:  # Log every 10th drop
+                    logger.warning(
+                        f"Backpressure: dropped frame from camera {scheduled.camera_id} "
+                        f"(total: {self.dropped_frames})"
+                    )
+
+            self._frames_available.notify()
+
+    def next_batch(self, timeout: float = 0.1) -> List[FrameTuple]:
+        """
+        Wait for and return the next batch.
+
+        Returns an empty list if no frames arrived within timeout, every
+        queued frame had expired, or the scheduler was closed.
+        """
+        with self._frames_available:
+            # Wait for the first frame
+            if not self._queue and not self._closed:
+                self._frames_available.wait(timeout=timeout)
+            if not self._queue or self._closed:
+                return []
+
+            # Wait briefly for the batch to fill up to the target size
+            target = self.target_batch_size
+            fill_deadline = time.monotonic() + self._max_wait_s
+            while not self._closed and len(self._queue) < target:
+                remaining = fill_deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._frames_available.wait(timeout=remaining)
+
+            return self._take_batch(target)
+
+    def record_batch(self, batch_size: int, latency_ms: float) -> None:
+        """Feed a measured batch latency back into the target batch size."""
+        with self._lock:
+            self._latency.record(batch_size, latency_ms)
+
+    def close(self) -> None:
+        """Wake any waiting consumer and stop handing out batches."""
+        with self._frames_available:
+            self._closed = True
+            self._frames_available.notify_all()
+
+    def drain(self) -> List[FrameTuple]:
+        """Remove and return all queued frames, regardless of deadline."""
+        with self._lock:
+            return [scheduled.frame for scheduled in self._queue.clear()]
+
+    def pop_discarded(self) -> List[FrameTuple]:
+        """Return and forget frames dropped since the last call (track_discards only)."""
+        with self._lock:
+            discarded, self._discarded = self._discarded, []
+            return discarded
+
+    def _discard(self, scheduled: ScheduledFrame) -> None:
+        """Remember a dropped frame if tracking discards. Lock held."""
+        if self._track_discards:
+            self._discarded.append(scheduled.frame)
+
+    def _take_batch(self, target: int) -> List[FrameTuple]:
+        """Pop up to target frames, dropping any that would miss their deadline. Lock held."""
+        predicted_done_ms = time.time() * 1000 + self._latency.predict(
+            min(target, len(self._queue))
+        )
+
+        batch: List[FrameTuple] = []
+        expired = 0
+        while self._queue and len(batch) < target:
+            scheduled = self._queue.popleft()
+            if scheduled.deadline_ms < predicted_done_ms:
+                expired += 1
+                self.expired_by_camera[scheduled.camera_id] += 1
+                self._discard(scheduled)
+                continue
+            batch.append(scheduled.frame)
+
+        if expired:
+            self.expired_frames += expired
+            logger.debug(
+                f"Dropped {expired} frame(s) past deadline (total: {self.expired_frames})"
+            )
+
+        return batch
+
+    def get_stats(self) -> dict:
+        """Get scheduler statistics."""
+        with self._lock:
+            return {
+                'queue_depth': len(self._queue),
+                'queue_bytes': self._queue.nbytes,
+                'queue_depth_high_water': self._queue.high_water_items,
+                'queue_bytes_high_water': self._queue.high_water_bytes,
+                'target_batch_size': self.target_batch_size,
+                'dropped_frames': self.dropped_frames,
+                'expired_frames': self.expired_frames,
+                'queue_depth_by_camera': self._queue.depths(),
+                'queue_bytes_by_camera': self._queue.bytes_by_camera(),
+                'dropped_by_camera': dict(self._queue.dropped),
+                'expired_by_camera': dict(self.expired_by_camera),
+                'batch_overhead_ms': round(self._latency.overhead_ms, 2),
+                'per_frame_ms': round(self._latency.per_frame_ms, 2),
+            }
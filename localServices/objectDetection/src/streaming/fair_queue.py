@@ -0,0 +1,202 @@
+"""Per-camera bounded queues with weighted-fair dequeue."""
+
+from collections import deque, defaultdict
+from typing import Callable, Deque, Dict, Generic, Iterator, List, Optional, Tuple, TypeVar
+
+T = TypeVar('T')
+
+# Lower bound for priority weights so every camera is eventually served
+MIN_WEIGHT = 0.01
+
+
+class FairFrameQueue(Generic[T]):
+    """
+    Bounded multi-queue with one sub-queue per camera.
+
+    - Each camera's sub-queue drops its own oldest item when full, so a busy
+      camera can never push out frames from a quiet one
+    - A global cap bounds total memory; when hit, the oldest item of the
+      camera with the longest weighted backlog is dropped
+    - Caps are item counts and, optionally, payload bytes (size_of), since
+      frame sizes differ ~10x between 720p and 4K cameras. An item larger
+      than a byte cap is still admitted into an otherwise empty queue, so
+      oversized frames are processed rather than starving the camera
+    - popleft() uses deficit round-robin: each camera earns its weight in
+      credits per round and spends one credit per dequeued item
+    - High-water marks record the most items / bytes ever queued at once
+
+    Not thread-safe - callers hold their own lock.
+    """
+
+    def __init__(
+        self,
+        max_items: int,
+        max_items_per_camera: int,
+        max_bytes: int = 0,
+        max_bytes_per_camera: int = 0,
+        size_of: Optional[Callable[[T], int]] = None,
+    ):
+        """
+        Args:
+            max_items: Max queued items across all cameras
+            max_items_per_camera: Max queued items per camera
+            max_bytes: Max queued payload bytes across all cameras (0 = no byte cap)
+            max_bytes_per_camera: Max queued payload bytes per camera (0 = no byte cap)
+            size_of: Payload size of an item in bytes; required for byte caps
+        """
+        if (max_bytes or max_bytes_per_camera) and size_of is None:
+            raise ValueError("Byte caps need a size_of function")
+
+        self._max_items = max_items
+        self._max_items_per_camera = max_items_per_camera
+        self._max_bytes = max_bytes
+        self._max_bytes_per_camera = max_bytes_per_camera
+        self._size_of = size_of or (lambda item: 0)
+
+        # camera_id -> (item, payload bytes) in arrival order
+        self._queues: Dict[str, Deque[Tuple[T, int]]] = {}
+        self._camera_bytes: Dict[str, int] = defaultdict(int)
+        self._weights: Dict[str, float] = {}
+        self._deficit: Dict[str, float] = defaultdict(float)
+
+        # Round-robin order of cameras with queued items
+        self._active: Deque[str] = deque()
+        self._head_credited = False
+        self._size = 0
+        self._bytes = 0
+
+        self.high_water_items = 0
+        self.high_water_bytes = 0
+
+        # camera_id -> items dropped due to backpressure
+        self.dropped: Dict[str, int] = defaultdict(int)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[T]:
+        for queue in self._queues.values():
+            for item, _ in queue:
+                yield item
+
+    @property
+    def nbytes(self) -> int:
+        """Queued payload bytes across all cameras."""
+        return self._bytes
+
+    def append(self, camera_id: str, item: T, weight: float = 1.0) -> List[T]:
+        """
+        Queue an item for a camera.
+
+        Returns:
+            The items dropped to make room (oldest first; several when a
+            large frame displaces smaller ones)
+        """
+        self._weights[camera_id] = max(weight, MIN_WEIGHT)
+        queue = self._queues.get(camera_id)
+        if queue is None:
+            queue = self._queues[camera_id] = deque()
+
+        size = self._size_of(item)
+        dropped: List[T] = []
+
+        # Make room within the camera's own budget first
+        while queue and (
+            len(queue) >= self._max_items_per_camera
+            or self._over(self._max_bytes_per_camera, self._camera_bytes[camera_id], size)
+        ):
+            dropped.append(self._drop_oldest(camera_id))
+
+        # Then within the global budget, from the most backlogged camera
+        while self._size and (
+            self._size >= self._max_items or self._over(self._max_bytes, self._bytes, size)
+        ):
+            dropped.append(self._drop_oldest(self._most_backlogged()))
+
+        if not queue:
+            self._active.append(camera_id)
+        queue.append((item, size))
+        self._size += 1
+        self._bytes += size
+        self._camera_bytes[camera_id] += size
+
+        self.high_water_items = max(self.high_water_items, self._size)
+        self.high_water_bytes = max(self.high_water_bytes, self._bytes)
+        return dropped
+
+    def popleft(self) -> T:
+        """Dequeue the next item in weighted round-robin order."""
+        if not self._size:
+            raise IndexError("pop from an empty FairFrameQueue")
+
+        while True:
+            camera_id = self._active[0]
+            if not self._head_credited:
+                self._deficit[camera_id] += self._weights[camera_id]
+                self._head_credited = True
+
+            if self._deficit[camera_id] >= 1:
+                self._deficit[camera_id] -= 1
+                return self._remove_oldest(camera_id)
+
+            # Out of credit - move to the back of the round
+            self._active.rotate(-1)
+            self._head_credited = False
+
+    def clear(self) -> List[T]:
+        """Remove and return all items."""
+        items = list(self)
+        self._queues.clear()
+        self._camera_bytes.clear()
+        self._deficit.clear()
+        self._active.clear()
+        self._head_credited = False
+        self._size = 0
+        self._bytes = 0
+        return items
+
+    def depths(self) -> Dict[str, int]:
+        """Queued item count per camera."""
+        return {camera_id: len(queue) for camera_id, queue in self._queues.items() if queue}
+
+    def bytes_by_camera(self) -> Dict[str, int]:
+        """Queued payload bytes per camera."""
+        return {camera_id: size for camera_id, size in self._camera_bytes.items() if size}
+
+    @staticmethod
+    def _over(limit: int, used: int, size: int) -> bool:
+        """Whether adding size bytes would exceed a byte cap (0 = uncapped)."""
+        return bool(limit) and used + size > limit
+
+    def _most_backlogged(self) -> str:
+        """Camera with the longest backlog relative to its weight (by bytes if byte-capped)."""
+        if self._max_bytes:
+            return max(
+                self._active,
+                key=lambda camera_id: self._camera_bytes[camera_id] / self._weights[camera_id],
+            )
+        return max(
+            self._active,
+            key=lambda camera_id: len(self._queues[camera_id]) / self._weights[camera_id],
+        )
+
+    def _drop_oldest(self, camera_id: str) -> T:
+        self.dropped[camera_id] += 1
+        return self._remove_oldest(camera_id)
+
+    def _remove_oldest(self, camera_id: str) -> T:
+        queue = self._queues[camera_id]
+        item, size = queue.popleft()
+        self._size -= 1
+        self._bytes -= size
+        self._camera_bytes[camera_id] -= size
+        if not queue:
+            self._deactivate(camera_id)
+        return item
+
+    def _deactivate(self, camera_id: str) -> None:
+        """Remove an emptied camera from the round-robin order."""
+        if self._active and self._active[0] == camera_id:
+            self._head_credited = False
+        self._active.remove(camera_id)
+        self._deficit[camera_id] = 0.0
@@ -0,0 +1,166 @@
+"""Zero-copy reader for the motion service's shared-memory frame store."""
+
+import logging
+import struct
+import threading
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Segment layout - must match motionDetection/src/output/frame_store.py
+MAGIC = b'SFRM'
+VERSION = 1
+SEGMENT_HEADER = struct.Struct('<4sIIQ32s')  # magic, version, slot_count, slot_bytes, instance
+SEGMENT_HEADER_BYTES = 64
+SLOT_HEADER = struct.Struct('<QqIHHB')  # sequence, timestamp, length, height, width, channels
+SLOT_HEADER_BYTES = 32
+
+
+class _Segment:
+    """One attached store segment."""
+
+    def __init__(self, name: str):
+        self.memory = _attach(name)
+        magic, version, self.slot_count, self.slot_bytes, instance = SEGMENT_HEADER.unpack_from(
+            self.memory.buf, 0
+        )
+        if magic != MAGIC or version != VERSION:
+            self.memory.close()
+            raise ValueError(f"Shared memory '{name}' is not a version {VERSION} frame store")
+        self.instance = instance.decode()
+
+    def slot_offset(self, slot: int) -> int:
+        return SEGMENT_HEADER_BYTES + slot * (SLOT_HEADER_BYTES + self.slot_bytes)
+
+    def sequence(self, slot: int) -> int:
+        return struct.unpack_from('<Q', self.memory.buf, self.slot_offset(slot))[0]
+
+
+class SharedFrameReader:
+    """
+    Maps frames published by handle into numpy arrays without copying.
+
+    - Segments are attached lazily by name on the first handle that
+      references them, and re-attached when the writer restarts
+    - A frame view stays valid only until the writer reuses its slot;
+      is_current() tells whether that has happened, so results computed
+      from an overwritten frame can be discarded
+    - Handles for stores that can't be attached (e.g. motion detection runs
+      on another host) resolve to None - the event's inline JPEG, if any,
+      is used instead
+    - A store with fewer slots than min_slots (the frames the consumer can
+      hold at once) is still used, but logged: its frames will be overwritten
+      before detection under load
+    """
+
+    def __init__(self, min_slots: int = 0):
+        """
+        Args:
+            min_slots: Slots a store needs so no held frame is overwritten
+        """
+        self._min_slots = min_slots
+        self._segments: Dict[str, _Segment] = {}
+        self._unavailable: Dict[str, str] = {}  # name -> instance that failed to attach
+        self._lock = threading.Lock()
+
+    def get(self, handle: dict) -> Optional[np.ndarray]:
+        """
+        Map a frame handle to a read-only view of the decoded frame.
+
+        Args:
+            handle: Handle from a motion event (store, instance, slot, sequence)
+
+        Returns:
+            uint8 HxWxC view into shared memory, or None if unavailable or overwritten
+        """
+        segment = self._segment(handle)
+        if segment is None:
+            return None
+
+        slot = handle['slot']
+        if not 0 <= slot < segment.slot_count:
+            return None
+
+        offset = segment.slot_offset(slot)
+        sequence, _, length, height, width, channels = SLOT_HEADER.unpack_from(
+            segment.memory.buf, offset
+        )
+        if sequence != handle['sequence'] or length != height * width * channels:
+            return None
+
+        shape = (height, width, channels) if channels > 1 else (height, width)
+        frame = np.ndarray(
+            shape, dtype=np.uint8, buffer=segment.memory.buf, offset=offset + SLOT_HEADER_BYTES
+        )
+        frame.flags.writeable = False
+
+        # Slot reused while the header was being read
+        if segment.sequence(slot) != sequence:
+            return None
+        return frame
+
+    def is_current(self, handle: dict) -> bool:
+        """Whether a handle's slot still holds its frame."""
+        with self._lock:
+            segment = self._segments.get(handle['store'])
+        return (
+            segment is not None
+            and segment.instance == handle['instance']
+            and segment.sequence(handle['slot']) == handle['sequence']
+        )
+
+    def close(self) -> None:
+        """Detach from all segments (views must no longer be in use)."""
+        with self._lock:
+            for segment in self._segments.values():
+                try:
+                    segment.memory.close()
+                except BufferError:
+                    pass  # Still referenced by a frame view - released with it
+            self._segments.clear()
+
+    def _segment(self, handle: dict) -> Optional[_Segment]:
+        """Attached segment for a handle, (re-)attaching if needed."""
+        name, instance = handle['store'], handle['instance']
+        with self._lock:
+            segment = self._segments.get(name)
+            if segment is not None and segment.instance == instance:
+                return segment
+            if self._unavailable.get(name) == instance:
+                return None
+
+            try:
+                segment = _Segment(name)
+            except (FileNotFoundError, ValueError) as e:
+                logger.warning(f"Shared frame store '{name}' unavailable - using inline frames: {e}")
+                self._unavailable[name] = instance
+                return None
+
+            if segment.instance != instance:
+                # Handle from a writer instance that no longer exists
+                segment.memory.close()
+                self._unavailable[name] = instance
+                return None
+
+            # Views into a replaced segment keep its mapping alive until released
+            self._segments[name] = segment
+            self._unavailable.pop(name, None)
+            logger.info(f"Attached shared frame store '{name}' ({segment.slot_count} slots)")
+            if segment.slot_count < self._min_slots:
+                logger.warning(
+                    f"Shared frame store '{name}' has {segment.slot_count} slots but up to "
+                    f"{self._min_slots} frames can be in flight - raise FRAME_STORE_SLOTS"
+                )
+            return segment
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Attach to an existing segment without taking ownership of it."""
+    memory = shared_memory.SharedMemory(name=name)
+    # Python < 3.13 registers attached segments with this process's resource
+    # tracker, which would unlink the writer's segment when we exit
+    resource_tracker.unregister(memory._name, 'shared_memory')
+    return memory
@@ -0,0 +1,47 @@
+"""Fast parsing helpers for motion event messages."""
+
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # orjson is optional - fall back to stdlib json
+    orjson = None
+
+# Motion events are published with json.dumps() key order:
+# camera_id, timestamp, motion_detected, ..., mask, original_frame
+# Both spaced (json) and compact (orjson) separators are matched.
+_NO_MOTION_MARKERS = (b'"motion_detected": false', b'"motion_detected":false')
+_NO_FRAME_MARKERS = (b'"original_frame": ""}', b'"original_frame":""}')
+
+# motion_detected always appears within the first few fields
+_HEAD_BYTES = 256
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Parse JSON with orjson when installed, stdlib json otherwise."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def needs_detection(data: Union[bytes, str]) -> bool:
+    """
+    Cheap pre-check on a raw motion event before full parsing.
+
+    Returns False when the message clearly has no motion or no original
+    frame. May return True for messages that turn out not to need
+    detection - callers still check the parsed event.
+    """
+    if isinstance(data, str):
+        data = data.encode()
+
+    head = data[:_HEAD_BYTES]
+    if any(marker in head for marker in _NO_MOTION_MARKERS):
+        return False
+
+    tail = data[-32:].rstrip()
+    if any(tail.endswith(marker) for marker in _NO_FRAME_MARKERS):
+        return False
+
+    return True
@@ -1,33 +1,66 @@
-"""Consumes motion events from Redis pub/sub and runs object detection."""
+"""Consumes motion events from Redis (pub/sub or streams) and runs object detection."""
 
+import asyncio
 import base64
-import json
 import logging
+import queue
 import threading
-from collections import deque
-from typing import Deque, List, Optional, Set, Tuple
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, FrozenSet, List, Optional, Tuple, Union
 
 import redis
+import redis.asyncio as aioredis
 
 from config import CameraConfigManager
 from detection import ObjectDetector
+from detection.strategies import FrameData
+from metrics import STAGE_BUCKETS_MS, MetricsRegistry
 from models import MotionEvent, CameraObjectDetectionSettings, DetectionResult
 from output import DetectionPublisher
+from .batch_scheduler import BatchScheduler, FrameTuple
+from .frame_store import SharedFrameReader
+from .message_decoder import loads, needs_detection
+from .pipeline_stats import StageStats
 
 logger = logging.getLogger(__name__)
 
-# Type alias for frame tuple
-FrameTuple = Tuple[str, int, bytes, CameraObjectDetectionSettings, Set[str]]
+# How often ended tracks are swept for cameras that stopped sending frames
+TRACK_EXPIRY_INTERVAL_S = 1.0
+
+# How often pipeline stage occupancy (and the metrics summary) is logged
+PIPELINE_STATS_INTERVAL_S = 60.0
+
+# Passed down the pipeline queues on shutdown
+_STOP = object()
 
 
 class MotionEventConsumer:
     """
     Consumes motion events and runs object detection.
 
-    - Subscribes to motion:{camera_id} channels for all enabled cameras
-    - Uses async worker thread for inference (consumer never blocks)
-    - Automatic backpressure: drops oldest frames when queue is full
-    - Dynamic batching: worker processes whatever frames are available
+    - Pattern-subscribes to motion:* on an asyncio event loop and filters
+      messages against the enabled-camera set (no per-camera subscriptions)
+    - Alternatively ('stream' transport) reads a shared motion stream through
+      a consumer group, so several detectors can split the load and events
+      survive restarts; entries are acked after publish, and entries left
+      pending by dead workers are reclaimed with XAUTOCLAIM
+    - Parses and base64-decodes messages on a decode worker pool, so the
+      pubsub thread only receives and hands off raw bytes
+    - Events carrying a shared frame store handle are mapped zero-copy to the
+      decoded frame instead; results for frames whose slot was overwritten
+      before publishing are dropped
+    - Scheduled batches flow through a three-thread pipeline - decode ->
+      infer -> publish - joined by bounded queues, so the next batch is
+      decoded while the current one is on the GPU and the previous one is
+      being published (consumer never blocks)
+    - Automatic backpressure: per-camera queues bounded by frame count and
+      payload bytes drop each camera's oldest frames
+    - A batch whose detection or publish fails is dropped and its stream
+      entries acked, so a poison batch isn't reclaimed and retried forever
+    - Deadline-aware dynamic batching via BatchScheduler
+    - With a metrics registry, records publish time and exports queue depth
+      and dropped-frame counters; its summary is logged with the pipeline stats
     """
 
     def __init__(
@@ -39,96 +72,191 @@ class MotionEventConsumer:
         publisher: DetectionPublisher,
         channel_prefix: str = 'motion:',
         max_pending_frames: int = 12,
+        max_pending_frames_per_camera: int = 6,
+        max_pending_bytes: int = 0,
+        max_pending_bytes_per_camera: int = 0,
         max_batch_size: int = 16,
+        max_wait_ms: float = 15.0,
+        target_batch_latency_ms: float = 100.0,
+        frame_deadline_ms: float = 2000.0,
+        decode_workers: int = 2,
+        max_pending_decodes: int = 32,
+        transport: str = 'pubsub',
+        stream_key: str = 'motion:frames',
+        consumer_group: str = 'object-detectors',
+        consumer_name: str = 'object-detector-1',
+        stream_read_count: int = 32,
+        claim_min_idle_ms: int = 30000,
+        frame_reader: Optional[SharedFrameReader] = None,
+        pipeline_depth: int = 2,
+        metrics: Optional[MetricsRegistry] = None,
     ):
-        self._redis = redis.Redis(host=redis_host, port=redis_port, decode_responses=True)
+        if transport not in ('pubsub', 'stream'):
+            raise ValueError(f"Unknown motion transport: {transport}")
+
+        self._redis_host = redis_host
+        self._redis_port = redis_port
+        self._transport = transport
+        self._stream_key = stream_key
+        self._consumer_group = consumer_group
+        self._consumer_name = consumer_name
+        self._stream_read_count = stream_read_count
+        self._claim_min_idle_ms = claim_min_idle_ms
         self._detector = detector
         self._camera_config = camera_config
         self._publisher = publisher
         self._channel_prefix = channel_prefix
-        self._max_batch_size = max_batch_size
+        self._frame_reader = frame_reader
+        self._metrics = metrics
 
         self._running = False
-        self._pubsub: Optional[redis.client.PubSub] = None
-
-        # Frame queue with automatic backpressure (drops oldest when full)
-        # Frame tuple: (camera_id, timestamp, jpeg_bytes, settings, zones_with_motion)
-        self._frame_queue: Deque[FrameTuple] = deque(maxlen=max_pending_frames)
-        self._queue_lock = threading.Lock()
-        self._frames_available = threading.Condition(self._queue_lock)
 
-        # Worker thread for inference
-        self._worker_thread: Optional[threading.Thread] = None
-        self._dropped_frames = 0  # Counter for monitoring
-
-        # Lock for pubsub operations (accessed from main thread and config callback thread)
-        self._pubsub_lock = threading.Lock()
+        # Enabled cameras - replaced wholesale on config change, read lock-free
+        self._enabled_cameras: FrozenSet[str] = frozenset()
+
+        # Frame scheduler with automatic backpressure (drops oldest when full)
+        # and per-frame deadlines derived from capture timestamps
+        self._scheduler = BatchScheduler(
+            max_pending_frames=max_pending_frames,
+            max_pending_frames_per_camera=max_pending_frames_per_camera,
+            max_pending_bytes=max_pending_bytes,
+            max_pending_bytes_per_camera=max_pending_bytes_per_camera,
+            max_batch_size=max_batch_size,
+            max_wait_ms=max_wait_ms,
+            target_batch_latency_ms=target_batch_latency_ms,
+            frame_deadline_ms=frame_deadline_ms,
+            track_discards=transport == 'stream' or frame_reader is not None,
+        )
+
+        # Decode pool for JSON parsing and base64 decoding (bounded in-flight count)
+        self._decode_pool = ThreadPoolExecutor(
+            max_workers=decode_workers, thread_name_prefix='motion-decode'
+        )
+        self._decode_slots = threading.BoundedSemaphore(max_pending_decodes)
+        self._skipped_decodes = 0  # Messages dropped because the decode pool was saturated
+
+        # JPEG -> BGR decoding for the pipeline decode stage, parallel within a batch
+        self._frame_decode_pool = ThreadPoolExecutor(
+            max_workers=decode_workers, thread_name_prefix='frame-decode'
+        )
+
+        # Stream transport: entry IDs waiting for XACK, flushed by the publish thread
+        self._ack_redis: Optional[redis.Redis] = None
+        self._ack_lock = threading.Lock()  # Also guards _frame_handles and _failed_frames
+        self._ack_ids: List[bytes] = []
+        self._frame_message_ids: Dict[Tuple[str, int], bytes] = {}
+
+        # Shared frame store handles of queued frames, checked before publishing
+        self._frame_handles: Dict[Tuple[str, int], dict] = {}
+        self._unresolved_frames = 0  # Handles that couldn't be mapped (no inline fallback)
+        self._overwritten_frames = 0  # Results dropped because the slot was reused
+        self._failed_frames = 0  # Frames whose detection or publish raised
+
+        # Pipeline: decode -> infer -> publish threads joined by bounded queues
+        # of batches; a full queue blocks the stage before it
+        self._decoded: queue.Queue = queue.Queue(maxsize=pipeline_depth)
+        self._inferred: queue.Queue = queue.Queue(maxsize=pipeline_depth)
+        self._stage_stats = {
+            'decode': StageStats('decode', lambda: len(self._scheduler), max_pending_frames),
+            'infer': StageStats('infer', self._decoded.qsize, pipeline_depth),
+            'publish': StageStats('publish', self._inferred.qsize, pipeline_depth),
+        }
+        self._stage_threads: List[threading.Thread] = []
+        self._last_track_expiry = 0.0
+        self._last_stats_log = time.monotonic()
+
+        if metrics:
+            metrics.histogram('stage_ms', STAGE_BUCKETS_MS, 'Time per batch in each stage (ms)')
+            metrics.gauge('queue_depth', 'Frames waiting in the batch scheduler')
+            metrics.gauge('queue_bytes', 'Frame payload bytes waiting in the batch scheduler')
+            metrics.gauge('queue_depth_high_water', 'Most frames ever queued in the scheduler')
+            metrics.gauge('queue_bytes_high_water', 'Most payload bytes ever queued in the scheduler')
+            metrics.gauge('pipeline_queue_depth', 'Batches waiting between pipeline stages')
+            metrics.gauge('target_batch_size', 'Batch size the scheduler currently aims for')
+            metrics.counter('dropped_frames_total', 'Frames dropped without a result, by reason')
+            metrics.add_collector(self._collect_metrics)
 
         # Register for camera config changes
         camera_config.on_change(self._on_camera_change)
 
     def start(self) -> None:
         """Start consuming motion events."""
-        logger.info("Starting motion event consumer")
+        logger.info(f"Starting motion event consumer ({self._transport} transport)")
         self._running = True
 
-        # Start worker thread for inference
-        self._worker_thread = threading.Thread(target=self._worker_loop, daemon=True)
-        self._worker_thread.start()
-        logger.info("Worker thread started")
+        if self._transport == 'stream':
+            self._ack_redis = redis.Redis(host=self._redis_host, port=self._redis_port)
 
-        # Subscribe to all enabled cameras
-        self._pubsub = self._redis.pubsub()
-        self._subscribe_to_cameras()
+        # Start pipeline stage threads
+        self._stage_threads = [
+            threading.Thread(target=target, name=f'pipeline-{name}', daemon=True)
+            for name, target in (
+                ('decode', self._decode_loop),
+                ('infer', self._infer_loop),
+                ('publish', self._publish_loop),
+            )
+        ]
+        for thread in self._stage_threads:
+            thread.start()
+        logger.info("Pipeline threads started")
+
+        self._refresh_enabled_cameras()
 
         # Start message consumption loop (blocks main thread)
-        self._consume_loop()
+        asyncio.run(self._consume_loop())
 
     def stop(self) -> None:
         """Stop consuming and flush pending frames."""
         self._running = False
 
-        # Wake up worker thread if waiting
-        with self._frames_available:
-            self._frames_available.notify_all()
+        # Let in-flight decodes land in the scheduler before draining it
+        self._decode_pool.shutdown(wait=True)
 
-        # Wait for worker to finish current batch
-        if self._worker_thread:
-            self._worker_thread.join(timeout=10)
-            if self._worker_thread.is_alive():
-                logger.warning("Worker thread did not stop gracefully")
+        # Wake up the decode stage if waiting
+        self._scheduler.close()
 
-        # Process any remaining frames
-        remaining = []
-        with self._queue_lock:
-            remaining = list(self._frame_queue)
-            self._frame_queue.clear()
+        # Stages exit in order, finishing batches already in the pipeline
+        for thread in self._stage_threads:
+            thread.join(timeout=10)
+            if thread.is_alive():
+                logger.warning(f"Pipeline thread {thread.name} did not stop gracefully")
 
+        # Process any remaining frames
+        remaining = self._scheduler.drain()
         if remaining:
             logger.info(f"Processing {len(remaining)} remaining frames before shutdown")
             self._process_batch(remaining)
 
-        with self._pubsub_lock:
-            if self._pubsub:
-                self._pubsub.close()
-
-        # Close Redis connection
-        self._redis.close()
-
-        if self._dropped_frames > 0:
-            logger.warning(f"Total frames dropped due to backpressure: {self._dropped_frames}")
+        self._frame_decode_pool.shutdown(wait=True)
+        self._release_frames(self._scheduler.pop_discarded())
+        if self._ack_redis:
+            self._flush_acks()
+            self._ack_redis.close()
+
+        if self._skipped_decodes > 0:
+            logger.warning(f"Total messages skipped by saturated decode pool: {self._skipped_decodes}")
+        if self._scheduler.dropped_frames > 0:
+            logger.warning(
+                f"Total frames dropped due to backpressure: {self._scheduler.dropped_frames}"
+            )
+        if self._scheduler.expired_frames > 0:
+            logger.warning(
+                f"Total frames dropped past deadline: {self._scheduler.expired_frames}"
+            )
+        if self._unresolved_frames > 0:
+            logger.warning(f"Total shared frames that couldn't be mapped: {self._unresolved_frames}")
+        if self._overwritten_frames > 0:
+            logger.warning(
+                f"Total results dropped for overwritten shared frames: {self._overwritten_frames}"
+            )
+        if self._failed_frames > 0:
+            logger.warning(f"Total frames dropped by failed detection or publish: {self._failed_frames}")
 
-    def _subscribe_to_cameras(self) -> None:
-        """Subscribe to motion channels for all enabled cameras."""
-        cameras = self._camera_config.get_enabled_cameras()
-        if not cameras:
+    def _refresh_enabled_cameras(self) -> None:
+        """Rebuild the enabled-camera set from config (atomic reference swap)."""
+        self._enabled_cameras = frozenset(self._camera_config.get_enabled_cameras())
+        if not self._enabled_cameras:
             logger.info("No cameras with object detection enabled")
-            return
-
-        channels = [f"{self._channel_prefix}{camera_id}" for camera_id in cameras]
-        with self._pubsub_lock:
-            self._pubsub.subscribe(*channels)
-        logger.info(f"Subscribed to {len(channels)} motion channels")
 
     def _on_camera_change(
         self,
@@ -137,38 +265,163 @@ class MotionEventConsumer:
         camera_name: str,
         settings: Optional[CameraObjectDetectionSettings],
     ) -> None:
-        """Handle camera config changes - update subscriptions."""
-        if not self._pubsub:
-            return
+        """Handle camera config changes - update the enabled-camera filter."""
+        self._refresh_enabled_cameras()
+        if action in ('created', 'updated') and settings:
+            logger.info(f"Accepting motion events from {camera_id}")
+        elif action == 'deleted':
+            logger.info(f"Ignoring motion events from {camera_id}")
+
+    async def _consume_loop(self) -> None:
+        """Main consumption loop - awaits messages and hands them to the decode pool."""
+        # Binary mode - messages are handed to the decode pool as raw bytes
+        client = aioredis.Redis(
+            host=self._redis_host, port=self._redis_port, decode_responses=False
+        )
+        try:
+            if self._transport == 'stream':
+                await self._consume_stream(client)
+            else:
+                await self._consume_pubsub(client)
+        finally:
+            await client.aclose()
+
+    async def _consume_pubsub(self, client: aioredis.Redis) -> None:
+        """Pattern-subscribe to motion channels and hand off messages."""
+        pubsub = client.pubsub()
+        pattern = f"{self._channel_prefix}*"
+
+        try:
+            await pubsub.psubscribe(pattern)
+            logger.info(f"Subscribed to {pattern}")
+
+            while self._running:
+                # Awaits without polling; timeout only bounds the shutdown check
+                message = await pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=1.0
+                )
+                if message and message['type'] == 'pmessage':
+                    self._handle_message(message)
+        finally:
+            await pubsub.aclose()
 
-        channel = f"{self._channel_prefix}{camera_id}"
+    async def _consume_stream(self, client: aioredis.Redis) -> None:
+        """Read the motion stream through a consumer group and hand off entries."""
+        try:
+            await client.xgroup_create(
+                self._stream_key, self._consumer_group, id='$', mkstream=True
+            )
+        except redis.ResponseError as e:
+            if 'BUSYGROUP' not in str(e):
+                raise
+
+        logger.info(
+            f"Reading {self._stream_key} as {self._consumer_name} "
+            f"in group {self._consumer_group}"
+        )
+
+        claim_interval_s = self._claim_min_idle_ms / 1000
+        next_claim = time.monotonic()
+
+        while self._running:
+            if time.monotonic() >= next_claim:
+                await self._claim_stale_entries(client)
+                next_claim = time.monotonic() + claim_interval_s
+
+            entries = await client.xreadgroup(
+                self._consumer_group,
+                self._consumer_name,
+                {self._stream_key: '>'},
+                count=self._stream_read_count,
+                block=1000,
+            )
+            for _, messages in entries or []:
+                for message_id, fields in messages:
+                    self._handle_stream_entry(message_id, fields)
 
-        with self._pubsub_lock:
-            if action in ('created', 'updated') and settings:
-                self._pubsub.subscribe(channel)
-                logger.info(f"Subscribed to {channel}")
-            elif action == 'deleted':
-                self._pubsub.unsubscribe(channel)
-                logger.info(f"Unsubscribed from {channel}")
+    async def _claim_stale_entries(self, client: aioredis.Redis) -> None:
+        """Take over entries left pending by crashed or stalled consumers."""
+        start_id = '0-0'
+        claimed = 0
 
-    def _consume_loop(self) -> None:
-        """Main consumption loop - reads messages and queues frames."""
         while self._running:
-            # Check for new messages (non-blocking with short timeout)
-            with self._pubsub_lock:
-                message = self._pubsub.get_message(timeout=0.01)
+            result = await client.xautoclaim(
+                self._stream_key,
+                self._consumer_group,
+                self._consumer_name,
+                min_idle_time=self._claim_min_idle_ms,
+                start_id=start_id,
+                count=self._stream_read_count,
+            )
+            start_id, messages = result[0], result[1]
+
+            for message_id, fields in messages:
+                claimed += 1
+                if fields:
+                    self._handle_stream_entry(message_id, fields)
+                else:
+                    # Entry was trimmed from the stream - nothing left to process
+                    self._mark_done(message_id)
 
-            if message and message['type'] == 'message':
-                self._handle_message(message)
+            if start_id in (b'0-0', '0-0'):
+                break
+
+        if claimed:
+            logger.info(f"Claimed {claimed} stale stream entries")
 
     def _handle_message(self, message: dict) -> None:
-        """Handle incoming motion event message - add to queue."""
+        """Hand a raw pub/sub motion event to the decode pool (event loop thread)."""
+        channel = message['channel']
+        if isinstance(channel, bytes):
+            channel = channel.decode()
+        if channel[len(self._channel_prefix):] not in self._enabled_cameras:
+            return
+
+        data = message['data']
+
+        # Cheap prefix/suffix check - skip events without motion or frame
+        if not needs_detection(data):
+            return
+
+        self._submit_decode(data)
+
+    def _handle_stream_entry(self, message_id: bytes, fields: dict) -> None:
+        """Hand a motion stream entry to the decode pool (event loop thread)."""
+        camera_id = fields.get(b'camera_id', b'').decode()
+        data = fields.get(b'event')
+
+        if camera_id not in self._enabled_cameras or not data or not needs_detection(data):
+            self._mark_done(message_id)
+            return
+
+        self._submit_decode(data, message_id)
+
+    def _submit_decode(self, data: Union[bytes, str], message_id: Optional[bytes] = None) -> None:
+        """Queue a raw event on the bounded decode pool."""
+        if not self._decode_slots.acquire(blocking=False):
+            # Stream entries stay pending and are reclaimed later
+            self._skipped_decodes += 1
+            if self._skipped_decodes % 10 == 1:  # Log every 10th skip
+                logger.warning(
+                    f"Decode pool saturated: skipped message (total: {self._skipped_decodes})"
+                )
+            return
+
+        try:
+            self._decode_pool.submit(self._decode_message, data, message_id)
+        except RuntimeError:
+            # Pool already shut down
+            self._decode_slots.release()
+
+    def _decode_message(self, raw: Union[bytes, str], message_id: Optional[bytes] = None) -> None:
+        """Parse a motion event and queue its frame (decode pool thread)."""
+        queued = False
         try:
-            data = json.loads(message['data'])
+            data = loads(raw)
             event = MotionEvent.from_dict(data)
 
-            # Skip if no motion or no original frame
-            if not event.motion_detected or not event.has_original_frame():
+            # Skip if no motion or no frame
+            if not event.motion_detected or not event.has_frame():
                 return
 
             # Get camera settings
@@ -178,70 +431,276 @@ class MotionEventConsumer:
 
             camera_name, settings = camera_info
 
-            # Decode frame
-            jpeg_bytes = base64.b64decode(event.original_frame)
+            # Map the shared frame, or decode the inline JPEG
+            frame = self._resolve_frame(event)
+            if frame is None:
+                return
 
             # Get zones with motion
             zones_with_motion = set(event.get_zones_with_motion())
 
-            # Add to queue (deque with maxlen auto-drops oldest if full)
-            frame: FrameTuple = (
+            # Add to scheduler (auto-drops oldest if full)
+            scheduled: FrameTuple = (
                 event.camera_id,
                 event.timestamp,
-                jpeg_bytes,
+                frame,
                 settings,
                 zones_with_motion,
             )
 
-            with self._frames_available:
-                queue_was_full = len(self._frame_queue) == self._frame_queue.maxlen
-                self._frame_queue.append(frame)
-
-                if queue_was_full:
-                    self._dropped_frames += 1
-                    if self._dropped_frames % 10 == 1:  # Log every 10th drop
-                        logger.warning(
-                            f"Backpressure: dropped frame (total: {self._dropped_frames})"
-                        )
+            with self._ack_lock:
+                if message_id is not None:
+                    self._frame_message_ids[(event.camera_id, event.timestamp)] = message_id
+                if not isinstance(frame, bytes):
+                    self._frame_handles[(event.camera_id, event.timestamp)] = event.frame_handle
 
-                # Notify worker that frames are available
-                self._frames_available.notify()
+            self._scheduler.put(scheduled)
+            queued = True
 
         except Exception as e:
             logger.error(f"Failed to handle motion event: {e}")
+        finally:
+            self._decode_slots.release()
+            if message_id is not None and not queued:
+                self._mark_done(message_id)
 
-    def _worker_loop(self) -> None:
-        """Worker thread - continuously processes available frames."""
-        while self._running:
-            frames: List[FrameTuple] = []
+    def _decode_loop(self) -> None:
+        """Pipeline stage 1 - take scheduled batches and decode their frames."""
+        try:
+            while self._running:
+                frames = self._scheduler.next_batch(timeout=0.1)
 
-            with self._frames_available:
-                # Wait for frames if queue is empty
-                while self._running and len(self._frame_queue) == 0:
-                    self._frames_available.wait(timeout=0.1)
+                if frames:
+                    with self._stage_stats['decode'].busy():
+                        frames = self._decode_batch(frames)
+                    # Blocks while inference is pipeline_depth batches behind
+                    self._decoded.put(frames)
 
-                if not self._running:
-                    break
+                self._release_frames(self._scheduler.pop_discarded())
+        finally:
+            self._decoded.put(_STOP)
 
-                # Grab all available frames (up to max_batch_size)
-                batch_size = min(len(self._frame_queue), self._max_batch_size)
-                for _ in range(batch_size):
-                    frames.append(self._frame_queue.popleft())
+    def _infer_loop(self) -> None:
+        """Pipeline stage 2 - run detection on decoded batches."""
+        try:
+            while True:
+                # End tracks for cameras that stopped sending frames
+                now = time.monotonic()
+                if now - self._last_track_expiry >= TRACK_EXPIRY_INTERVAL_S:
+                    self._last_track_expiry = now
+                    expired = self._detector.expire_tracks()
+                    if expired:
+                        self._inferred.put((None, expired))
+
+                try:
+                    frames = self._decoded.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if frames is _STOP:
+                    break
 
-            # Process batch outside lock
-            if frames:
-                self._process_batch(frames)
+                with self._stage_stats['infer'].busy():
+                    results = self._infer_batch(frames)
+                if results is not None:
+                    self._inferred.put((frames, results))
+        finally:
+            self._inferred.put(_STOP)
+
+    def _publish_loop(self) -> None:
+        """Pipeline stage 3 - publish results and acknowledge their frames."""
+        while True:
+            if self._ack_redis:
+                self._flush_acks()
+            self._log_pipeline_stats()
+
+            try:
+                item = self._inferred.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if item is _STOP:
+                break
+
+            frames, results = item
+            with self._stage_stats['publish'].busy():
+                if frames is None:
+                    self._publisher.publish_batch(results)  # Ended tracks
+                else:
+                    self._publish_results(frames, results)
+
+    def get_stats(self) -> dict:
+        """Scheduler stats plus frames lost before reaching the scheduler or after detection."""
+        stats = self._scheduler.get_stats()
+        stats.update({
+            'skipped_decodes': self._skipped_decodes,
+            'unresolved_frames': self._unresolved_frames,
+            'overwritten_frames': self._overwritten_frames,
+            'failed_frames': self._failed_frames,
+            'pipeline_queue_depth': self._decoded.qsize() + self._inferred.qsize(),
+        })
+        return stats
+
+    def get_pipeline_stats(self) -> Dict[str, dict]:
+        """Per-stage occupancy and queue depth since the previous call."""
+        return {name: stats.snapshot() for name, stats in self._stage_stats.items()}
+
+    def _log_pipeline_stats(self) -> None:
+        """Log stage occupancy every PIPELINE_STATS_INTERVAL_S (publish thread)."""
+        now = time.monotonic()
+        if now - self._last_stats_log < PIPELINE_STATS_INTERVAL_S:
+            return
+        self._last_stats_log = now
+
+        stages = ', '.join(
+            f"{name} {stats['occupancy']:.0%} "
+            f"(queued {stats['queue_depth']}/{stats['queue_capacity']}, {stats['batches']} batches)"
+            for name, stats in self.get_pipeline_stats().items()
+        )
+        logger.info(f"Pipeline occupancy: {stages}")
+        if self._metrics:
+            logger.info(
+                f"Metrics (last {PIPELINE_STATS_INTERVAL_S:.0f}s): {self._metrics.summary()}"
+            )
 
-    def _process_batch(
+    def _collect_metrics(self):
+        """Queue depth gauges and dropped-frame counters (metrics collector)."""
+        stats = self.get_stats()
+        return [
+            ('queue_depth', {}, stats['queue_depth']),
+            ('queue_bytes', {}, stats['queue_bytes']),
+            ('queue_depth_high_water', {}, stats['queue_depth_high_water']),
+            ('queue_bytes_high_water', {}, stats['queue_bytes_high_water']),
+            ('pipeline_queue_depth', {}, stats['pipeline_queue_depth']),
+            ('target_batch_size', {}, stats['target_batch_size']),
+            ('dropped_frames_total', {'reason': 'backpressure'}, stats['dropped_frames']),
+            ('dropped_frames_total', {'reason': 'deadline'}, stats['expired_frames']),
+            ('dropped_frames_total', {'reason': 'decode_pool'}, stats['skipped_decodes']),
+            ('dropped_frames_total', {'reason': 'unresolved'}, stats['unresolved_frames']),
+            ('dropped_frames_total', {'reason': 'overwritten'}, stats['overwritten_frames']),
+            ('dropped_frames_total', {'reason': 'failed'}, stats['failed_frames']),
+        ]
+
+    def _resolve_frame(self, event: MotionEvent) -> Optional[FrameData]:
+        """Shared-memory view of the event's frame, falling back to the inline JPEG."""
+        if event.frame_handle is not None and self._frame_reader is not None:
+            frame = self._frame_reader.get(event.frame_handle)
+            if frame is not None:
+                return frame
+
+        if event.has_original_frame():
+            return base64.b64decode(event.original_frame)
+
+        self._unresolved_frames += 1
+        if self._unresolved_frames % 10 == 1:  # Log every 10th miss
+            logger.warning(
+                f"Shared frame for camera {event.camera_id} unavailable or overwritten "
+                f"(total: {self._unresolved_frames})"
+            )
+        return None
+
+    def _mark_done(self, message_id: bytes) -> None:
+        """Schedule a stream entry for acknowledgement."""
+        with self._ack_lock:
+            self._ack_ids.append(message_id)
+
+    def _release_frames(self, frames: List[FrameTuple]) -> None:
+        """
+        Forget processed or dropped frames' handles and schedule their stream
+        entries for acknowledgement.
+        """
+        if not frames:
+            return
+        with self._ack_lock:
+            for camera_id, timestamp, _, _, _ in frames:
+                self._frame_handles.pop((camera_id, timestamp), None)
+                message_id = self._frame_message_ids.pop((camera_id, timestamp), None)
+                if message_id is not None:
+                    self._ack_ids.append(message_id)
+
+    def _drop_overwritten(
         self,
-        frames: List[Tuple[str, int, bytes, CameraObjectDetectionSettings, Set[str]]],
-    ) -> None:
-        """Run detection on batch and publish results."""
+        frames: List[FrameTuple],
+        results: List[DetectionResult],
+    ) -> List[DetectionResult]:
+        """Drop results for shared frames whose slot was reused during detection."""
+        if self._frame_reader is None:
+            return results
+
+        with self._ack_lock:
+            handles = [
+                self._frame_handles.get((camera_id, timestamp))
+                for camera_id, timestamp, _, _, _ in frames
+            ]
+        stale = {
+            (frame[0], frame[1])
+            for frame, handle in zip(frames, handles)
+            if handle is not None and not self._frame_reader.is_current(handle)
+        }
+        if not stale:
+            return results
+
+        self._overwritten_frames += len(stale)
+        logger.warning(
+            f"Dropped {len(stale)} result(s) for shared frames overwritten during detection "
+            f"(total: {self._overwritten_frames})"
+        )
+        return [r for r in results if (r.camera_id, r.timestamp) not in stale]
+
+    def _flush_acks(self) -> None:
+        """Acknowledge all scheduled stream entries with a single XACK."""
+        with self._ack_lock:
+            ack_ids, self._ack_ids = self._ack_ids, []
+        if not ack_ids:
+            return
+
         try:
+            self._ack_redis.xack(self._stream_key, self._consumer_group, *ack_ids)
+        except Exception as e:
+            # Unacked entries are reclaimed after claim_min_idle_ms
+            logger.error(f"Failed to ack {len(ack_ids)} stream entries: {e}")
+
+    def _process_batch(self, frames: List[FrameTuple]) -> None:
+        """Run all pipeline stages for one batch on the calling thread."""
+        frames = self._decode_batch(frames)
+        results = self._infer_batch(frames)
+        if results is not None:
+            self._publish_results(frames, results)
+
+    def _decode_batch(self, frames: List[FrameTuple]) -> List[FrameTuple]:
+        """Decode JPEGs ahead of inference; on failure the strategy decodes them instead."""
+        try:
+            return self._detector.decode_frames(frames, pool=self._frame_decode_pool)
+        except Exception as e:
+            logger.error(f"Batch decode failed: {e}")
+            return frames
+
+    def _infer_batch(self, frames: List[FrameTuple]) -> Optional[List[DetectionResult]]:
+        """Run detection on a batch. Returns None on failure, with the frames released."""
+        try:
+            start_time = time.perf_counter()
             results = self._detector.detect_batch(frames)
+            self._scheduler.record_batch(
+                len(frames), (time.perf_counter() - start_time) * 1000
+            )
+            return results
+        except Exception as e:
+            logger.error(f"Batch detection failed: {e}")
+            with self._ack_lock:
+                self._failed_frames += len(frames)
+            self._release_frames(frames)
+            return None
+
+    def _publish_results(self, frames: List[FrameTuple], results: List[DetectionResult]) -> None:
+        """Publish a batch's results and release its frames, even if publishing fails."""
+        try:
+            results = self._drop_overwritten(frames, results)
 
             # Publish all results in single batch (more efficient than individual publishes)
+            start_time = time.perf_counter()
             self._publisher.publish_batch(results)
+            if self._metrics:
+                self._metrics.observe(
+                    'stage_ms', (time.perf_counter() - start_time) * 1000, stage='publish'
+                )
 
             # Log individual results
             for result in results:
@@ -250,4 +709,10 @@ class MotionEventConsumer:
                     f"({result.processing_time_ms:.1f}ms)"
                 )
         except Exception as e:
-            logger.error(f"Batch detection failed: {e}")
+            logger.error(f"Failed to publish detections: {e}")
+            with self._ack_lock:
+                self._failed_frames += len(frames)
+        finally:
+            # Done either way - stream entries are acknowledged rather than
+            # reclaimed and retried forever
+            self._release_frames(frames)
@@ -0,0 +1,58 @@
+"""Occupancy accounting for the decode -> infer -> publish pipeline."""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+
+class StageStats:
+    """
+    Tracks how busy one pipeline stage is.
+
+    Occupancy is the fraction of wall time the stage spent working since
+    the last snapshot. A stage near 100% is the bottleneck; stages feeding
+    it should show a full input queue, stages after it a near-empty one.
+    """
+
+    def __init__(self, name: str, queue_depth: Callable[[], int], queue_capacity: int):
+        """
+        Args:
+            name: Stage name for logs
+            queue_depth: Returns the number of batches waiting for this stage
+            queue_capacity: Max batches that can wait for this stage
+        """
+        self.name = name
+        self._queue_depth = queue_depth
+        self._queue_capacity = queue_capacity
+        self._lock = threading.Lock()
+        self._busy_s = 0.0
+        self._batches = 0
+        self._window_start = time.monotonic()
+
+    @contextmanager
+    def busy(self) -> Iterator[None]:
+        """Count the enclosed block as work on one batch."""
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._busy_s += time.monotonic() - start
+                self._batches += 1
+
+    def snapshot(self) -> dict:
+        """Stats since the previous snapshot; starts a new window."""
+        now = time.monotonic()
+        with self._lock:
+            elapsed = now - self._window_start
+            stats = {
+                'occupancy': round(self._busy_s / elapsed, 3) if elapsed > 0 else 0.0,
+                'batches': self._batches,
+                'queue_depth': self._queue_depth(),
+                'queue_capacity': self._queue_capacity,
+            }
+            self._busy_s = 0.0
+            self._batches = 0
+            self._window_start = now
+        return stats
@@ -0,0 +1,131 @@
+import sys
+import time
+import unittest
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_ROOT = PROJECT_ROOT / "src"
+if str(SRC_ROOT) not in sys.path:
+    sys.path.insert(0, str(SRC_ROOT))
+
+from models import CameraObjectDetectionSettings
+from streaming.batch_scheduler import BatchScheduler
+from streaming.fair_queue import FairFrameQueue
+
+
+def make_frame(camera_id, timestamp=None, priority=1.0):
+    if timestamp is None:
+        timestamp = int(time.time() * 1000)
+    settings = CameraObjectDetectionSettings(
+        class_configs=[{"class": "person", "confidence": 0.5}],
+        motion_zones=[],
+        priority=priority,
+    )
+    return (camera_id, timestamp, b"", settings, set())
+
+
+class FairFrameQueueTests(unittest.TestCase):
+    def test_busy_camera_does_not_evict_quiet_camera(self):
+        queue = FairFrameQueue(max_items=8, max_items_per_camera=4)
+
+        queue.append("front-door", "door-0")
+        for i in range(20):
+            queue.append("garden", f"garden-{i}")
+
+        self.assertEqual(queue.depths(), {"front-door": 1, "garden": 4})
+        self.assertEqual(queue.dropped["garden"], 16)
+        self.assertNotIn("front-door", queue.dropped)
+
+    def test_dequeue_is_weighted_round_robin(self):
+        queue = FairFrameQueue(max_items=20, max_items_per_camera=10)
+        for i in range(4):
+            queue.append("a", f"a-{i}", weight=1.0)
+            queue.append("b", f"b-{i}", weight=2.0)
+
+        order = [queue.popleft()[0] for _ in range(6)]
+
+        self.assertEqual(order, ["a", "b", "b", "a", "b", "b"])
+
+    def test_byte_cap_drops_as_many_frames_as_needed(self):
+        queue = FairFrameQueue(
+            max_items=100, max_items_per_camera=100, max_bytes=1000, size_of=len
+        )
+        for i in range(8):
+            queue.append("a", f"{i}" * 100)
+
+        dropped = queue.append("b", "x" * 500)
+
+        self.assertEqual(dropped, ["0" * 100, "1" * 100, "2" * 100])
+        self.assertEqual(queue.nbytes, 1000)
+        self.assertEqual(queue.high_water_bytes, 1000)
+        self.assertEqual(queue.bytes_by_camera(), {"a": 500, "b": 500})
+
+    def test_oversized_frame_is_admitted_alone(self):
+        queue = FairFrameQueue(
+            max_items=10, max_items_per_camera=10, max_bytes_per_camera=100, size_of=len
+        )
+        queue.append("a", "x" * 50)
+
+        dropped = queue.append("a", "y" * 300)
+
+        self.assertEqual(dropped, ["x" * 50])
+        self.assertEqual(queue.depths(), {"a": 1})
+        self.assertEqual(queue.popleft(), "y" * 300)
+        self.assertEqual(queue.nbytes, 0)
+        self.assertEqual(queue.high_water_items, 1)
+
+
+class BatchSchedulerTests(unittest.TestCase):
+    def test_expired_frames_are_dropped_before_batching(self):
+        scheduler = BatchScheduler(max_wait_ms=0, frame_deadline_ms=500)
+        now = int(time.time() * 1000)
+        scheduler.put(make_frame("a", timestamp=now - 5000))
+        scheduler.put(make_frame("b", timestamp=now))
+
+        batch = scheduler.next_batch(timeout=0)
+
+        self.assertEqual([frame[0] for frame in batch], ["b"])
+        self.assertEqual(scheduler.expired_frames, 1)
+
+    def test_target_batch_size_follows_measured_latency(self):
+        scheduler = BatchScheduler(max_batch_size=16, target_batch_latency_ms=50)
+        for batch_size, latency_ms in [(1, 15), (2, 20), (4, 30)]:
+            scheduler.record_batch(batch_size, latency_ms)
+
+        # 10ms overhead + 5ms per frame -> 8 frames fit in 50ms
+        self.assertEqual(scheduler.target_batch_size, 8)
+
+    def test_backlog_probes_larger_batch_when_one_frame_misses_target(self):
+        scheduler = BatchScheduler(
+            max_pending_frames=12, max_pending_frames_per_camera=12,
+            max_batch_size=16, max_wait_ms=0, target_batch_latency_ms=100,
+        )
+        scheduler.record_batch(1, 160)
+        for _ in range(10):
+            scheduler.put(make_frame("a"))
+
+        # Only batch size 1 seen: try 2 to learn the overhead
+        batch = scheduler.next_batch(timeout=0)
+        self.assertEqual(len(batch), 2)
+
+        # 120ms overhead + 40ms per frame: no size meets 100ms, so batch the
+        # backlog until the overhead per frame drops to 40ms
+        scheduler.record_batch(2, 200)
+        self.assertEqual(scheduler.target_batch_size, 3)
+        self.assertEqual(len(scheduler.next_batch(timeout=0)), 3)
+
+        # Never more than is queued
+        scheduler.next_batch(timeout=0)
+        self.assertEqual(len(scheduler), 2)
+        self.assertEqual(scheduler.target_batch_size, 2)
+
+    def test_single_batch_size_without_backlog_keeps_estimate(self):
+        scheduler = BatchScheduler(max_batch_size=16, target_batch_latency_ms=100)
+        scheduler.record_batch(4, 40)
+        scheduler.put(make_frame("a"))
+
+        self.assertEqual(scheduler.target_batch_size, 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
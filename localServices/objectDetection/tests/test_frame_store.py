@@ -0,0 +1,161 @@
+"""Tests for the shared-memory frame reader and the inline JPEG fallback."""
+
+import base64
+import struct
+import sys
+import unittest
+import uuid
+from multiprocessing import resource_tracker, shared_memory
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_ROOT = PROJECT_ROOT / "src"
+if str(SRC_ROOT) not in sys.path:
+    sys.path.insert(0, str(SRC_ROOT))
+
+from models import MotionEvent
+from streaming import MotionEventConsumer, SharedFrameReader
+from streaming.frame_store import (
+    MAGIC, SEGMENT_HEADER, SEGMENT_HEADER_BYTES, SLOT_HEADER, SLOT_HEADER_BYTES, VERSION,
+)
+
+SHAPE = (6, 8, 3)
+SLOT_BYTES = int(np.prod(SHAPE))
+
+
+class _Store:
+    """Writes frames in the motion service's segment layout."""
+
+    def __init__(self, slot_count: int = 2):
+        self.name = f"test-{uuid.uuid4().hex[:8]}"
+        self.instance = uuid.uuid4().hex
+        self.slot_count = slot_count
+        self.memory = shared_memory.SharedMemory(
+            name=self.name, create=True,
+            size=SEGMENT_HEADER_BYTES + slot_count * (SLOT_HEADER_BYTES + SLOT_BYTES),
+        )
+        SEGMENT_HEADER.pack_into(
+            self.memory.buf, 0, MAGIC, VERSION, slot_count, SLOT_BYTES, self.instance.encode()
+        )
+        self.sequence = 0
+
+    def put(self, value: int) -> dict:
+        self.sequence += 1
+        slot = (self.sequence - 1) % self.slot_count
+        offset = SEGMENT_HEADER_BYTES + slot * (SLOT_HEADER_BYTES + SLOT_BYTES)
+        self.memory.buf[offset + SLOT_HEADER_BYTES:offset + SLOT_HEADER_BYTES + SLOT_BYTES] = bytes([value]) * SLOT_BYTES
+        SLOT_HEADER.pack_into(self.memory.buf, offset, self.sequence, 0, SLOT_BYTES, SHAPE[0], SHAPE[1], SHAPE[2])
+        return {'store': self.name, 'instance': self.instance, 'slot': slot, 'sequence': self.sequence}
+
+    def close(self):
+        # Attaching in this same process dropped the segment from our resource
+        # tracker; register it again so unlink() has an entry to remove
+        resource_tracker.register(self.memory._name, 'shared_memory')
+        self.memory.close()
+        self.memory.unlink()
+
+
+class TestSharedFrameReader(unittest.TestCase):
+    """Handles map to frames until their slot is reused."""
+
+    def setUp(self):
+        self.store = _Store()
+        self.reader = SharedFrameReader()
+        self.addCleanup(self.store.close)
+        self.addCleanup(self.reader.close)
+
+    def test_get_maps_the_frame_read_only(self):
+        handle = self.store.put(7)
+
+        frame = self.reader.get(handle)
+
+        self.assertEqual(frame.shape, SHAPE)
+        self.assertTrue((frame == 7).all())
+        self.assertFalse(frame.flags.writeable)
+        del frame
+
+    def test_overwritten_slot_is_detected(self):
+        handle = self.store.put(1)
+        self.store.put(2)
+        self.assertIsNotNone(self.reader.get(handle))
+        self.assertTrue(self.reader.is_current(handle))
+
+        self.store.put(3)  # Reuses slot 0
+
+        self.assertFalse(self.reader.is_current(handle))
+        self.assertIsNone(self.reader.get(handle))
+
+    def test_unreachable_store_resolves_to_none(self):
+        handle = {'store': f"missing-{uuid.uuid4().hex[:8]}", 'instance': 'x', 'slot': 0, 'sequence': 1}
+
+        with self.assertLogs('streaming.frame_store', 'WARNING'):
+            self.assertIsNone(self.reader.get(handle))
+        # Not retried for the same writer instance
+        with self.assertNoLogs('streaming.frame_store', 'WARNING'):
+            self.assertIsNone(self.reader.get(handle))
+        self.assertFalse(self.reader.is_current(handle))
+
+    def test_handle_from_an_old_writer_instance(self):
+        handle = {**self.store.put(1), 'instance': uuid.uuid4().hex}
+        self.assertIsNone(self.reader.get(handle))
+
+    def test_store_smaller_than_frames_in_flight_is_logged(self):
+        reader = SharedFrameReader(min_slots=100)
+        self.addCleanup(reader.close)
+
+        with self.assertLogs('streaming.frame_store', 'WARNING') as logs:
+            self.assertIsNotNone(reader.get(self.store.put(1)))
+
+        self.assertIn('FRAME_STORE_SLOTS', logs.output[0])
+
+
+class _CameraConfig:
+    def on_change(self, callback):
+        pass
+
+
+class TestInlineFallback(unittest.TestCase):
+    """Events keep working from their inline JPEG when the shared frame is gone."""
+
+    def setUp(self):
+        self.store = _Store()
+        self.reader = SharedFrameReader()
+        self.addCleanup(self.store.close)
+        self.addCleanup(self.reader.close)
+        self.consumer = MotionEventConsumer(
+            redis_host='localhost', redis_port=6379, detector=None,
+            camera_config=_CameraConfig(), publisher=None, frame_reader=self.reader,
+        )
+        self.jpeg = b'\xff\xd8jpeg'
+
+    def _event(self, handle, inline=True) -> MotionEvent:
+        return MotionEvent(
+            camera_id='cam', timestamp=0, motion_detected=True, processing_time_ms=0.0,
+            zone_results=[], mask='',
+            original_frame=base64.b64encode(self.jpeg).decode() if inline else '',
+            frame_handle=handle,
+        )
+
+    def test_shared_frame_is_preferred(self):
+        frame = self.consumer._resolve_frame(self._event(self.store.put(5)))
+        self.assertIsInstance(frame, np.ndarray)
+        del frame
+
+    def test_falls_back_when_store_is_unreachable(self):
+        handle = {'store': f"missing-{uuid.uuid4().hex[:8]}", 'instance': 'x', 'slot': 0, 'sequence': 1}
+        with self.assertLogs('streaming.frame_store', 'WARNING'):
+            self.assertEqual(self.consumer._resolve_frame(self._event(handle)), self.jpeg)
+
+    def test_falls_back_when_slot_was_reused(self):
+        handle = self.store.put(1)
+        self.store.put(2)
+        self.store.put(3)
+
+        self.assertEqual(self.consumer._resolve_frame(self._event(handle)), self.jpeg)
+        self.assertIsNone(self.consumer._resolve_frame(self._event(handle, inline=False)))
+
+
+if __name__ == '__main__':
+    unittest.main()
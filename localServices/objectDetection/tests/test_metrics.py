@@ -0,0 +1,109 @@
+"""Tests for the metrics registry and endpoint."""
+
+import sys
+import unittest
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_ROOT = PROJECT_ROOT / "src"
+if str(SRC_ROOT) not in sys.path:
+    sys.path.insert(0, str(SRC_ROOT))
+
+from metrics import MetricsRegistry, MetricsServer
+from metrics.registry import bucket_quantile
+
+
+def _registry() -> MetricsRegistry:
+    registry = MetricsRegistry()
+    registry.histogram('stage_ms', (1, 10, 100), 'Stage time')
+    registry.counter('dropped_frames_total', 'Dropped frames')
+    registry.gauge('queue_depth', 'Queue depth')
+    return registry
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    """Test histogram rendering, collectors and windowed summaries."""
+
+    def test_render_histogram_is_cumulative(self):
+        """Buckets are cumulative with +Inf, sum and count per label set."""
+        registry = _registry()
+        for value in (0.5, 5, 5, 50, 500):
+            registry.observe('stage_ms', value, stage='inference')
+
+        text = registry.render()
+        self.assertIn('object_detection_stage_ms_bucket{stage="inference",le="1"} 1', text)
+        self.assertIn('object_detection_stage_ms_bucket{stage="inference",le="10"} 3', text)
+        self.assertIn('object_detection_stage_ms_bucket{stage="inference",le="+Inf"} 5', text)
+        self.assertIn('object_detection_stage_ms_count{stage="inference"} 5', text)
+        self.assertIn('object_detection_stage_ms_sum{stage="inference"} 560.500', text)
+        self.assertIn('# TYPE object_detection_stage_ms histogram', text)
+
+    def test_collectors_are_pulled_at_render_time(self):
+        """Counters and gauges come from collectors; undeclared names are ignored."""
+        registry = _registry()
+        depth = [3]
+        registry.add_collector(lambda: [
+            ('queue_depth', {}, depth[0]),
+            ('dropped_frames_total', {'reason': 'deadline'}, 7),
+            ('undeclared', {}, 1),
+        ])
+
+        self.assertIn('object_detection_queue_depth 3', registry.render())
+        depth[0] = 9
+        text = registry.render()
+        self.assertIn('object_detection_queue_depth 9', text)
+        self.assertIn('object_detection_dropped_frames_total{reason="deadline"} 7', text)
+        self.assertNotIn('undeclared', text)
+
+    def test_summary_reports_window_deltas(self):
+        """Each summary covers only what happened since the previous one."""
+        registry = _registry()
+        dropped = [4]
+        registry.add_collector(lambda: [('dropped_frames_total', {'reason': 'deadline'}, dropped[0])])
+        registry.observe('stage_ms', 5, stage='decode')
+
+        first = registry.summary()
+        self.assertIn('stage_ms[decode]', first)
+        self.assertIn('(n=1)', first)
+        self.assertIn('dropped_frames_total[deadline] +4', first)
+
+        self.assertEqual(registry.summary(), 'no activity')
+
+        dropped[0] = 6
+        registry.observe('stage_ms', 50, stage='decode')
+        self.assertIn('dropped_frames_total[deadline] +2', registry.summary())
+
+    def test_bucket_quantile(self):
+        """Quantiles interpolate within the bucket holding the rank."""
+        self.assertIsNone(bucket_quantile((1, 10), [0, 0, 0], 0.5))
+        self.assertAlmostEqual(bucket_quantile((1, 10), [0, 10, 0], 0.5), 5.5)
+        # Overflow bucket reports the last finite bound
+        self.assertEqual(bucket_quantile((1, 10), [0, 0, 4], 0.99), 10.0)
+
+
+class TestMetricsServer(unittest.TestCase):
+    """Test the HTTP endpoint."""
+
+    def test_serves_metrics(self):
+        registry = _registry()
+        registry.observe('stage_ms', 2, stage='publish')
+        server = MetricsServer(registry, host='127.0.0.1', port=0)
+        server.start()
+        try:
+            url = f'http://127.0.0.1:{server.port}'
+            with urllib.request.urlopen(f'{url}/metrics', timeout=5) as response:
+                self.assertEqual(response.status, 200)
+                self.assertIn('text/plain', response.headers['Content-Type'])
+                self.assertIn('stage="publish"', response.read().decode())
+
+            with self.assertRaises(urllib.error.HTTPError) as raised:
+                urllib.request.urlopen(f'{url}/other', timeout=5)
+            self.assertEqual(raised.exception.code, 404)
+        finally:
+            server.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+"""Tests for the exported model artifact cache."""
+
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_ROOT = PROJECT_ROOT / "src"
+if str(SRC_ROOT) not in sys.path:
+    sys.path.insert(0, str(SRC_ROOT))
+
+from detection.model_cache import ArtifactKey, ModelArtifactCache
+
+
+def _key(model_name: str) -> ArtifactKey:
+    return ArtifactKey(model_name=model_name, backend='onnx', imgsz=640, batch=0, precision='fp32')
+
+
+def _build(size: int):
+    def build(path: str) -> None:
+        with open(path, 'wb') as f:
+            f.write(os.urandom(size))
+    return build
+
+
+class TestModelArtifactCache(unittest.TestCase):
+    """Test caching, integrity checks and LRU eviction."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache_dir = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_hit_survives_restart(self):
+        """A built artifact is reused by a new cache instance without rebuilding."""
+        cache = ModelArtifactCache(self.cache_dir, max_bytes=1000)
+        path = cache.get_or_build(_key('yolo11n'), _build(100))
+
+        def fail(_path):
+            raise AssertionError("should not rebuild")
+
+        restarted = ModelArtifactCache(self.cache_dir, max_bytes=1000)
+        self.assertEqual(restarted.get_or_build(_key('yolo11n'), fail), path)
+
+    def test_corrupt_artifact_is_rebuilt(self):
+        """An artifact whose hash no longer matches is discarded."""
+        cache = ModelArtifactCache(self.cache_dir, max_bytes=1000)
+        path = cache.get_or_build(_key('yolo11n'), _build(100))
+        with open(path, 'r+b') as f:
+            f.write(b'corrupt')
+
+        self.assertIsNone(cache.get(_key('yolo11n')))
+        self.assertFalse(os.path.exists(path))
+
+    def test_lru_eviction_keeps_recently_used(self):
+        """The least recently used artifact is evicted when over budget."""
+        cache = ModelArtifactCache(self.cache_dir, max_bytes=250)
+        cache.get_or_build(_key('a'), _build(100))
+        cache.get_or_build(_key('b'), _build(100))
+        cache.get(_key('a'))  # a is now more recent than b
+        cache.get_or_build(_key('c'), _build(100))
+
+        self.assertIsNotNone(cache.get(_key('a')))
+        self.assertIsNone(cache.get(_key('b')))
+        self.assertIsNotNone(cache.get(_key('c')))
+        self.assertLessEqual(cache.total_bytes(), 250)
+
+
+if __name__ == '__main__':
+    unittest.main()
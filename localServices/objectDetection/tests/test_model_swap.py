@@ -0,0 +1,117 @@
+"""Tests for background model loading and hot-swapping in ObjectDetector."""
+
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_ROOT = PROJECT_ROOT / "src"
+if str(SRC_ROOT) not in sys.path:
+    sys.path.insert(0, str(SRC_ROOT))
+
+from detection import object_detector
+from detection.object_detector import ObjectDetector
+
+
+class _GlobalConfig:
+    model = 'a'
+
+    def on_model_change(self, callback):
+        self.change = callback
+
+
+class _Strategy:
+    """Loads instantly unless its model name is in `blocking`."""
+
+    def __init__(self, model_name, blocking):
+        self.model_name = model_name
+        self.blocking = blocking
+        self.is_loaded = False
+        self.loading = threading.Event()
+
+    def load(self):
+        self.loading.set()
+        if self.model_name in self.blocking:
+            self.blocking[self.model_name].wait(timeout=10)
+        self.is_loaded = True
+
+    def unload(self):
+        self.is_loaded = False
+
+    def warmup(self, batch_size=1):
+        pass
+
+    def take_stage_timings(self):
+        return {}
+
+
+class TestModelSwap(unittest.TestCase):
+    """The latest requested model wins, and nothing loads after stop()."""
+
+    def setUp(self):
+        self.config = _GlobalConfig()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.detector = ObjectDetector(self.config, weights_dir=self.tmp.name, devices=['cpu'])
+        self.blocking = {}
+        self.created = {}
+
+        def create(model_name):
+            strategy = self.created[model_name] = _Strategy(model_name, self.blocking)
+            return strategy
+
+        self.detector._create_strategy = create
+        self.detector.start()
+
+    def _wait_for_loader(self):
+        deadline = time.monotonic() + 10
+        while self.detector._loader_thread is not None and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def test_latest_requested_model_wins(self):
+        release = self.blocking['b'] = threading.Event()
+        self.config.change('a', 'b')
+        self.assertTrue(self._created_soon('b'))
+        self.created['b'].loading.wait(timeout=10)
+
+        # Requested while b is still loading - only the last one is loaded next
+        self.config.change('b', 'c')
+        self.config.change('c', 'd')
+        release.set()
+        self._wait_for_loader()
+
+        self.assertEqual(self.detector._current_model, 'd')
+        self.assertNotIn('c', self.created)
+        self.assertFalse(self.created['a'].is_loaded)
+        self.assertFalse(self.created['b'].is_loaded)
+        self.assertTrue(self.detector._strategy.is_loaded)
+
+    def test_model_finishing_after_stop_is_unloaded(self):
+        """A load that outlasts stop()'s wait is unloaded, not swapped in."""
+        release = self.blocking['b'] = threading.Event()
+        self.config.change('a', 'b')
+        self.assertTrue(self._created_soon('b'))
+        self.created['b'].loading.wait(timeout=10)
+
+        with mock.patch.object(object_detector, 'LOADER_STOP_TIMEOUT_S', 0.05):
+            self.detector.stop()
+        release.set()
+        self._wait_for_loader()
+
+        self.assertIsNone(self.detector._strategy)
+        self.assertFalse(self.created['a'].is_loaded)
+        self.assertFalse(self.created['b'].is_loaded)
+
+    def _created_soon(self, model_name) -> bool:
+        deadline = time.monotonic() + 10
+        while model_name not in self.created and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return model_name in self.created
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,162 @@
+"""Tests for the multi-process strategy, with a stub model in spawned workers."""
+
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_ROOT = PROJECT_ROOT / "src"
+if str(SRC_ROOT) not in sys.path:
+    sys.path.insert(0, str(SRC_ROOT))
+
+from detection.object_detector import ObjectDetector
+from detection.strategies import multiprocess_strategy
+from detection.strategies.multiprocess_strategy import MultiProcessStrategy
+from models import CameraObjectDetectionSettings, DetectionBox
+
+# Frames whose first pixel has this value make the stub worker hang
+STUCK_VALUE = 255
+STUCK_SECONDS = 3.0
+
+
+class _StubStrategy:
+    """
+    Stands in for YOLOStrategy in the worker: one box per frame.
+
+    x1 is the frame's first pixel value, read after any stall, and the
+    confidence is the worker's torch thread count.
+    """
+
+    def __init__(self, **kwargs):
+        pass
+
+    def load(self):
+        pass
+
+    def unload(self):
+        pass
+
+    def detect(self, frames):
+        import torch
+
+        boxes = []
+        for frame, _ in frames:
+            if frame.flat[0] == STUCK_VALUE:
+                time.sleep(STUCK_SECONDS)
+            boxes.append([DetectionBox(
+                class_id=0, class_name='person', confidence=float(torch.get_num_threads()),
+                x1=float(frame.flat[0]), y1=0.0, x2=1.0, y2=1.0,
+            )])
+        return boxes
+
+    def take_stage_timings(self):
+        return {}
+
+    def max_memory_allocated(self):
+        return {}
+
+
+SETTINGS = CameraObjectDetectionSettings(
+    class_configs=[{'class': 'person', 'confidence': 0.5}], motion_zones=[]
+)
+
+
+def _frames(*values):
+    return [(np.full((4, 4, 3), value, dtype=np.uint8), SETTINGS) for value in values]
+
+
+class TestMultiProcessStrategy(unittest.TestCase):
+    """Batches split across spawned workers, survive crashes and stuck workers."""
+
+    def _strategy(self, workers: int) -> MultiProcessStrategy:
+        strategy = MultiProcessStrategy(
+            'stub', devices=['cpu'] * workers, strategy_class=_StubStrategy
+        )
+        strategy.load()
+        self.addCleanup(strategy.unload)
+        return strategy
+
+    def test_results_merge_in_input_order(self):
+        strategy = self._strategy(workers=2)
+
+        boxes = strategy.detect(_frames(1, 2, 3))
+
+        self.assertEqual([b[0].x1 for b in boxes], [1.0, 2.0, 3.0])
+
+    def test_restarted_worker_keeps_thread_count(self):
+        strategy = self._strategy(workers=1)
+        worker = strategy._workers[0]
+        threads = worker.num_threads
+        self.assertGreater(threads, 0)
+
+        worker.process.kill()
+        worker.process.join()
+
+        boxes = strategy.detect(_frames(2))
+
+        self.assertEqual(boxes[0][0].x1, 2.0)
+        self.assertEqual(boxes[0][0].confidence, float(threads))
+        self.assertEqual(worker.num_threads, threads)
+
+    def test_worker_killed_mid_batch_does_not_block_the_others(self):
+        strategy = self._strategy(workers=2)
+        stuck = strategy._workers[0]  # Gets the first chunk
+        killer = threading.Timer(0.5, stuck.process.kill)
+        killer.start()
+        self.addCleanup(killer.cancel)
+
+        boxes = strategy.detect(_frames(STUCK_VALUE, 3))
+
+        self.assertEqual(boxes, [[], boxes[1]])
+        self.assertEqual(boxes[1][0].x1, 3.0)
+        self.assertEqual([b[0].x1 for b in strategy.detect(_frames(4, 5))], [4.0, 5.0])
+
+    def test_timed_out_chunk_keeps_its_buffer(self):
+        """The next batch after a timeout goes to a new buffer, and the stale result is ignored."""
+        strategy = self._strategy(workers=1)
+        worker = strategy._workers[0]
+
+        with mock.patch.object(multiprocess_strategy, 'DETECT_TIMEOUT_S', 0.5):
+            stuck_buffer = worker.ensure_buffer(1).name
+            self.assertEqual(strategy.detect(_frames(STUCK_VALUE)), [[]])
+        self.assertIsNone(worker.buffer)
+
+        boxes = strategy.detect(_frames(7))
+
+        self.assertEqual(boxes[0][0].x1, 7.0)
+        self.assertNotEqual(worker.buffer.name, stuck_buffer)
+
+class _GlobalConfig:
+    def on_model_change(self, callback):
+        pass
+
+
+class TestObjectDetectorWithWorkers(unittest.TestCase):
+    """A worker dying while the pool is idle must not switch detection off."""
+
+    def test_detect_batch_restarts_a_worker_that_died_idle(self):
+        strategy = MultiProcessStrategy('stub', devices=['cpu'], strategy_class=_StubStrategy)
+        strategy.load()
+        self.addCleanup(strategy.unload)
+        worker = strategy._workers[0]
+
+        with tempfile.TemporaryDirectory() as weights_dir:
+            detector = ObjectDetector(_GlobalConfig(), weights_dir=weights_dir, devices=['cpu'])
+        detector._strategy, detector._current_model = strategy, 'stub'
+
+        worker.process.kill()  # e.g. OOM-killed between batches
+        worker.process.join()
+        results = detector.detect_batch([('cam', 0, _frames(9)[0][0], SETTINGS, set())])
+
+        self.assertEqual([box.x1 for box in results[0].boxes], [9.0])
+        self.assertTrue(worker.process.is_alive())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,192 @@
+"""Tests for the ONNX Runtime strategy's letterbox, postprocess and int8 export."""
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_ROOT = PROJECT_ROOT / "src"
+if str(SRC_ROOT) not in sys.path:
+    sys.path.insert(0, str(SRC_ROOT))
+
+from detection.model_cache import ModelArtifactCache
+from detection.strategies.onnx_strategy import LETTERBOX_FILL, OnnxStrategy, ort
+from detection.strategies.yolo_strategy import COCO_CLASS_IDS
+from models import CameraObjectDetectionSettings
+
+IMGSZ = 64
+NUM_CLASSES = 80
+
+
+def _settings(**thresholds) -> CameraObjectDetectionSettings:
+    return CameraObjectDetectionSettings(
+        class_configs=[{'class': name, 'confidence': conf} for name, conf in thresholds.items()],
+        motion_zones=[],
+    )
+
+
+def _raw_output(rows) -> np.ndarray:
+    """(4 + classes, anchors) head output from (cx, cy, w, h, class_name, score) rows."""
+    output = np.zeros((4 + NUM_CLASSES, len(rows)), dtype=np.float32)
+    for anchor, (cx, cy, w, h, class_name, score) in enumerate(rows):
+        output[:4, anchor] = (cx, cy, w, h)
+        output[4 + COCO_CLASS_IDS[class_name], anchor] = score
+    return output
+
+
+class _Session:
+    """Stands in for an InferenceSession, returning a fixed head output per image."""
+
+    def __init__(self, output: np.ndarray):
+        self.output = output
+        self.batches = []
+
+    def run(self, _names, feeds):
+        batch = next(iter(feeds.values()))
+        self.batches.append(batch.shape)
+        return [np.stack([self.output] * len(batch))]
+
+
+class TestOnnxStrategyProcessing(unittest.TestCase):
+    """Letterbox and postprocess must round-trip boxes to original pixels."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.strategy = OnnxStrategy(
+            'yolo11n',
+            weights_dir=self.tmp.name,
+            imgsz=IMGSZ,
+            cache=ModelArtifactCache(self.tmp.name, max_bytes=1024 ** 2),
+        )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_letterbox_pads_to_square(self):
+        """A 2:1 frame keeps its aspect ratio with equal fill above and below."""
+        img = np.zeros((32, 64, 3), dtype=np.uint8)
+        img[..., 2] = 255  # Red in BGR
+
+        tensor, (ratio, pad_x, pad_y, width, height) = self.strategy._letterbox(img)
+
+        self.assertEqual(tensor.shape, (3, IMGSZ, IMGSZ))
+        self.assertEqual(tensor.dtype, np.float32)
+        self.assertEqual((ratio, pad_x, pad_y, width, height), (1.0, 0, 16, 64, 32))
+        np.testing.assert_allclose(tensor[:, :16], LETTERBOX_FILL / 255.0)
+        np.testing.assert_allclose(tensor[:, 48:], LETTERBOX_FILL / 255.0)
+        # BGR -> RGB: the red image lands in channel 0
+        np.testing.assert_allclose(tensor[0, 16:48], 1.0)
+        np.testing.assert_allclose(tensor[2, 16:48], 0.0)
+
+    def test_postprocess_nms_is_class_aware(self):
+        """Overlapping boxes of one class merge, other classes and thresholds apply."""
+        output = _raw_output([
+            (20, 30, 10, 10, 'person', 0.9),
+            (21, 30, 10, 10, 'person', 0.8),  # Suppressed by the first
+            (20, 30, 10, 10, 'car', 0.7),  # Same box, other class - kept
+            (50, 40, 8, 8, 'person', 0.2),  # Below min confidence
+        ])
+        class_ids = frozenset({COCO_CLASS_IDS['person'], COCO_CLASS_IDS['car']})
+
+        classes, confidences, coords = self.strategy._postprocess(
+            output, class_ids, 0.5, (1.0, 0, 16, 64, 32)
+        )
+
+        self.assertEqual(sorted(classes.tolist()), sorted(class_ids))
+        np.testing.assert_allclose(sorted(confidences), [0.7, 0.9], rtol=1e-6)
+        # Letterbox undone: y shifted up by the 16 px pad
+        np.testing.assert_allclose(coords, [[15, 9, 25, 19]] * 2)
+
+    def test_postprocess_end_to_end_head(self):
+        """NMS-free (max_det, 6) outputs are only filtered and un-letterboxed."""
+        output = np.array([
+            [10, 20, 30, 40, 0.9, COCO_CLASS_IDS['person']],
+            [10, 20, 30, 40, 0.9, COCO_CLASS_IDS['dog']],
+            [10, 20, 30, 40, 0.1, COCO_CLASS_IDS['person']],
+        ], dtype=np.float32)
+
+        classes, confidences, coords = self.strategy._postprocess(
+            output, frozenset({COCO_CLASS_IDS['person']}), 0.5, (0.5, 0, 16, 128, 64)
+        )
+
+        self.assertEqual(classes.tolist(), [COCO_CLASS_IDS['person']])
+        np.testing.assert_allclose(coords, [[20, 8, 60, 48]])
+
+    def test_detect_applies_per_camera_thresholds(self):
+        """detect() batches enabled cameras only and keeps a 0.0 threshold."""
+        self.strategy._session = _Session(_raw_output([
+            (20, 30, 10, 10, 'person', 0.3),
+            (50, 40, 8, 8, 'car', 0.05),
+        ]))
+        self.strategy._input_name = 'images'
+        frame = np.zeros((32, 64, 3), dtype=np.uint8)
+
+        boxes = self.strategy.detect([
+            (frame, _settings(person=0.5)),
+            (frame, _settings()),
+            (frame, _settings(person=0.0, car=0.0)),
+        ])
+
+        self.assertEqual(self.strategy._session.batches, [(2, 3, IMGSZ, IMGSZ)])
+        self.assertEqual(boxes[0], [])
+        self.assertEqual(boxes[1], [])
+        self.assertEqual(sorted(box.class_name for box in boxes[2]), ['car', 'person'])
+
+
+@unittest.skipIf(ort is None, "onnxruntime is not installed")
+class TestOnnxInt8Export(unittest.TestCase):
+    """int8 is a cached quantized copy of the (also cached) fp32 export."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = ModelArtifactCache(self.tmp.name, max_bytes=16 * 1024 ** 2)
+        self.exports = 0
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _export(self, onnx_path: str) -> None:
+        """Write a one-MatMul model in place of a YOLO export."""
+        import onnx
+        from onnx import TensorProto, helper, numpy_helper
+
+        self.exports += 1
+        weights = np.random.default_rng(0).standard_normal((64, 64)).astype(np.float32)
+        graph = helper.make_graph(
+            [helper.make_node('MatMul', ['x', 'w'], ['y'])],
+            'tiny',
+            [helper.make_tensor_value_info('x', TensorProto.FLOAT, ['batch', 64])],
+            [helper.make_tensor_value_info('y', TensorProto.FLOAT, ['batch', 64])],
+            initializer=[numpy_helper.from_array(weights, 'w')],
+        )
+        model = helper.make_model(graph, opset_imports=[helper.make_opsetid('', 17)])
+        model.ir_version = 8  # Loadable by any supported onnxruntime
+        onnx.save(model, onnx_path)
+
+    def _strategy(self, precision: str) -> OnnxStrategy:
+        strategy = OnnxStrategy('tiny', weights_dir=self.tmp.name, precision=precision, cache=self.cache)
+        strategy._export = self._export
+        return strategy
+
+    def test_int8_export_is_quantized_and_cached(self):
+        import onnx
+
+        int8_path = self._strategy('int8')._get_onnx_path()
+        fp32_path = self._strategy('fp32')._get_onnx_path()
+        self.assertEqual(self._strategy('int8')._get_onnx_path(), int8_path)
+
+        self.assertNotEqual(int8_path, fp32_path)
+        self.assertEqual(self.exports, 1)
+        int8_types = {init.data_type for init in onnx.load(int8_path).graph.initializer}
+        self.assertIn(onnx.TensorProto.UINT8, int8_types)
+
+        session = ort.InferenceSession(int8_path, providers=['CPUExecutionProvider'])
+        x = np.ones((2, 64), dtype=np.float32)
+        self.assertEqual(session.run(None, {'x': x})[0].shape, (2, 64))
+
+
+if __name__ == '__main__':
+    unittest.main()
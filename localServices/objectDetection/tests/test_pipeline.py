@@ -0,0 +1,161 @@
+"""Tests for the decode -> infer -> publish pipeline in MotionEventConsumer."""
+
+import sys
+import threading
+import time
+import unittest
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_ROOT = PROJECT_ROOT / "src"
+if str(SRC_ROOT) not in sys.path:
+    sys.path.insert(0, str(SRC_ROOT))
+
+from detection.strategies import decode_frame
+from models import CameraObjectDetectionSettings, DetectionResult
+from streaming import MotionEventConsumer
+
+
+class _CameraConfig:
+    def on_change(self, callback):
+        pass
+
+
+class _Detector:
+    """Records which thread ran each stage and what it was given."""
+
+    def __init__(self):
+        self.inferred_types = set()
+        self.stage_threads = {'decode': set(), 'infer': set()}
+
+    def decode_frames(self, frames, pool=None):
+        self.stage_threads['decode'].add(threading.current_thread().name)
+        return [(c, t, decode_frame(f), s, z) for c, t, f, s, z in frames]
+
+    def detect_batch(self, frames):
+        self.stage_threads['infer'].add(threading.current_thread().name)
+        self.inferred_types.update(type(frame).__name__ for _, _, frame, _, _ in frames)
+        time.sleep(0.01)
+        return [
+            DetectionResult(camera_id=c, timestamp=t, model_used='test', processing_time_ms=0.0, boxes=[])
+            for c, t, _, _, _ in frames
+        ]
+
+    def expire_tracks(self):
+        return []
+
+
+class _Publisher:
+    def __init__(self):
+        self.published = []
+
+    def publish_batch(self, results):
+        self.published.extend((r.camera_id, r.timestamp) for r in results)
+
+
+class _FailingDetector(_Detector):
+    def detect_batch(self, frames):
+        raise RuntimeError('inference failed')
+
+
+class _FailingPublisher:
+    def publish_batch(self, results):
+        raise ConnectionError('redis unavailable')
+
+
+def _consumer(detector, publisher) -> MotionEventConsumer:
+    return MotionEventConsumer(
+        redis_host='localhost',
+        redis_port=6379,
+        detector=detector,
+        camera_config=_CameraConfig(),
+        publisher=publisher,
+        transport='stream',
+        frame_deadline_ms=60_000,
+    )
+
+
+class TestFailedBatches(unittest.TestCase):
+    """Failed batches are released and acked instead of being redelivered forever."""
+
+    def _run_batch(self, consumer):
+        settings = CameraObjectDetectionSettings(
+            class_configs=[{'class': 'person', 'confidence': 0.5}], motion_zones=[]
+        )
+        frame = np.zeros((48, 64, 3), dtype=np.uint8)
+        frames = [('cam', i, frame, settings, set()) for i in range(3)]
+        for camera_id, timestamp, _, _, _ in frames:
+            consumer._frame_message_ids[(camera_id, timestamp)] = f'{timestamp}-0'.encode()
+            consumer._frame_handles[(camera_id, timestamp)] = {'slot': timestamp}
+
+        consumer._process_batch(frames)
+
+        self.assertEqual(consumer._frame_message_ids, {})
+        self.assertEqual(consumer._frame_handles, {})
+        self.assertEqual(consumer._ack_ids, [b'0-0', b'1-0', b'2-0'])
+        self.assertEqual(consumer.get_stats()['failed_frames'], 3)
+
+    def test_failed_detection_acks_frames(self):
+        self._run_batch(_consumer(_FailingDetector(), _Publisher()))
+
+    def test_failed_publish_acks_frames(self):
+        self._run_batch(_consumer(_Detector(), _FailingPublisher()))
+
+
+class TestPipeline(unittest.TestCase):
+    """Frames flow through all three stages and none are lost on shutdown."""
+
+    def test_all_frames_published_in_order_across_stages(self):
+        detector = _Detector()
+        publisher = _Publisher()
+        consumer = MotionEventConsumer(
+            redis_host='localhost',
+            redis_port=6379,
+            detector=detector,
+            camera_config=_CameraConfig(),
+            publisher=publisher,
+            max_pending_frames=100,
+            max_pending_frames_per_camera=100,
+            max_batch_size=4,
+            frame_deadline_ms=60_000,
+        )
+
+        # Pipeline threads only - start() would also connect to Redis
+        consumer._running = True
+        consumer._stage_threads = [
+            threading.Thread(target=target, name=f'pipeline-{name}', daemon=True)
+            for name, target in (
+                ('decode', consumer._decode_loop),
+                ('infer', consumer._infer_loop),
+                ('publish', consumer._publish_loop),
+            )
+        ]
+        for thread in consumer._stage_threads:
+            thread.start()
+
+        settings = CameraObjectDetectionSettings(
+            class_configs=[{'class': 'person', 'confidence': 0.5}], motion_zones=[]
+        )
+        jpeg = cv2.imencode('.jpg', np.zeros((48, 64, 3), dtype=np.uint8))[1].tobytes()
+        now_ms = int(time.time() * 1000)
+        expected = [('cam', now_ms + i) for i in range(40)]
+        for camera_id, timestamp in expected:
+            consumer._scheduler.put((camera_id, timestamp, jpeg, settings, set()))
+
+        # Let the pipeline take some batches; stop() flushes the rest
+        while not publisher.published:
+            time.sleep(0.01)
+        consumer.stop()
+
+        self.assertEqual(publisher.published, expected)
+        self.assertEqual(detector.inferred_types, {'ndarray'})
+        self.assertIn('pipeline-decode', detector.stage_threads['decode'])
+        self.assertIn('pipeline-infer', detector.stage_threads['infer'])
+        self.assertTrue(all(not t.is_alive() for t in consumer._stage_threads))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+"""Tests for near-duplicate detection reuse."""
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_ROOT = PROJECT_ROOT / "src"
+if str(SRC_ROOT) not in sys.path:
+    sys.path.insert(0, str(SRC_ROOT))
+
+from detection.object_detector import ObjectDetector
+from detection.result_cache import DetectionResultCache, FrameThumbnail
+from detection.tracker import MultiCameraTracker
+from models import CameraObjectDetectionSettings, DetectionBox, MotionZone
+
+
+def _thumbnail(value: int) -> FrameThumbnail:
+    return FrameThumbnail(pixels=np.full((36, 64), value, dtype=np.uint8), scale=0.1)
+
+
+def _boxes():
+    return [DetectionBox(class_id=0, class_name='person', confidence=0.9, x1=0, y1=0, x2=10, y2=10)]
+
+
+class TestDetectionResultCache(unittest.TestCase):
+    """Reuse happens only within the diff threshold and the frame / age limits."""
+
+    def setUp(self):
+        self.cache = DetectionResultCache(max_reuse_frames=2, max_age_ms=1000, diff_threshold=3.0)
+        self.cache.store('cam', 0, _thumbnail(100), 'yolo11n', _boxes())
+
+    def _lookup(self, timestamp: int, value: int, model_name: str = 'yolo11n'):
+        return self.cache.lookup('cam', timestamp, _thumbnail(value), model_name, [], set())
+
+    def test_reuses_below_diff_threshold(self):
+        """A frame within the threshold gets the cached boxes, one beyond it doesn't."""
+        self.assertEqual(self._lookup(100, 102), _boxes())
+        self.assertIsNone(self._lookup(200, 103))
+        self.assertEqual(self.cache.get_stats()['hits'], 1)
+        self.assertEqual(self.cache.get_stats()['misses'], 1)
+
+    def test_expires_after_max_frames(self):
+        """One inference is reused for at most max_reuse_frames frames."""
+        self.assertIsNotNone(self._lookup(100, 100))
+        self.assertIsNotNone(self._lookup(200, 100))
+        self.assertIsNone(self._lookup(300, 100))
+
+    def test_expires_after_max_age(self):
+        """Frames past max_age_ms, or older than the inferred one, need inference."""
+        self.assertIsNone(self._lookup(1001, 100))
+        self.assertIsNone(self._lookup(-1, 100))
+        self.assertIsNotNone(self._lookup(1000, 100))
+
+    def test_not_reused_across_models(self):
+        self.assertIsNone(self._lookup(100, 100, model_name='yolo11s'))
+
+    def test_compares_only_zones_with_motion(self):
+        """Changes outside the moving zones' bounding box don't prevent reuse."""
+        changed = _thumbnail(100)
+        changed.pixels[:, 32:] = 200
+        zones = [MotionZone(id='left', name='left', points=[(0, 0), (300, 0), (300, 300), (0, 300)])]
+
+        self.assertIsNotNone(self.cache.lookup('cam', 100, changed, 'yolo11n', zones, {'left'}))
+        self.assertIsNone(self.cache.lookup('cam', 200, changed, 'yolo11n', zones, set()))
+
+    def test_disabled_with_zero_frames(self):
+        self.assertFalse(DetectionResultCache(max_reuse_frames=0).enabled)
+
+
+class _GlobalConfig:
+    def on_model_change(self, callback):
+        pass
+
+
+class _Strategy:
+    is_loaded = True
+
+    def __init__(self):
+        self.inferred = 0
+
+    def detect(self, frames):
+        self.inferred += len(frames)
+        return [_boxes() for _ in frames]
+
+    def take_stage_timings(self):
+        return {}
+
+
+class TestCachedFlag(unittest.TestCase):
+    """ObjectDetector marks reused results cached and skips their inference."""
+
+    def setUp(self):
+        self.settings = CameraObjectDetectionSettings(
+            class_configs=[{'class': 'person', 'confidence': 0.5}], motion_zones=[]
+        )
+        self.frame = np.full((72, 128, 3), 100, dtype=np.uint8)
+        self.strategy = _Strategy()
+
+    def _detector(self, weights_dir, **kwargs) -> ObjectDetector:
+        detector = ObjectDetector(_GlobalConfig(), weights_dir=weights_dir, devices=['cpu'], **kwargs)
+        detector._strategy, detector._current_model = self.strategy, 'yolo11n'
+        return detector
+
+    def test_reused_results_are_marked_cached(self):
+        with tempfile.TemporaryDirectory() as weights_dir:
+            detector = self._detector(
+                weights_dir, result_cache=DetectionResultCache(max_reuse_frames=5)
+            )
+            first = detector.detect_batch([('cam', 0, self.frame, self.settings, set())])
+            second = detector.detect_batch([('cam', 100, self.frame.copy(), self.settings, set())])
+
+        self.assertFalse(first[0].cached)
+        self.assertTrue(second[0].cached)
+        self.assertEqual(len(second[0].boxes), 1)
+        self.assertEqual(self.strategy.inferred, 1)
+
+    def test_tracker_predicted_results_are_not_cached(self):
+        """Frames skipped by the tracker get predicted boxes, not a cache hit."""
+        with tempfile.TemporaryDirectory() as weights_dir:
+            detector = self._detector(weights_dir, tracker=MultiCameraTracker(detect_every=2))
+            first = detector.detect_batch([('cam', 0, self.frame, self.settings, set())])
+            second = detector.detect_batch([('cam', 100, self.frame, self.settings, set())])
+
+        self.assertEqual(self.strategy.inferred, 1)
+        self.assertEqual(len(second[0].boxes), 1)
+        self.assertFalse(first[0].cached)
+        self.assertFalse(second[0].cached)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,244 @@
+"""Tests for the consumer-group stream transport in MotionEventConsumer."""
+
+import asyncio
+import base64
+import json
+import sys
+import time
+import unittest
+from pathlib import Path
+
+import cv2
+import numpy as np
+import redis
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_ROOT = PROJECT_ROOT / "src"
+if str(SRC_ROOT) not in sys.path:
+    sys.path.insert(0, str(SRC_ROOT))
+
+from models import CameraObjectDetectionSettings
+from streaming import MotionEventConsumer
+
+STREAM_KEY = 'motion:frames'
+GROUP = 'object-detectors'
+
+_SETTINGS = CameraObjectDetectionSettings(
+    class_configs=[{'class': 'person', 'confidence': 0.5}], motion_zones=[]
+)
+_JPEG = base64.b64encode(
+    cv2.imencode('.jpg', np.zeros((48, 64, 3), dtype=np.uint8))[1].tobytes()
+).decode()
+
+
+class _CameraConfig:
+    def __init__(self, enabled):
+        self._enabled = enabled
+
+    def on_change(self, callback):
+        pass
+
+    def get_enabled_cameras(self):
+        return list(self._enabled)
+
+    def get_camera(self, camera_id):
+        if camera_id not in self._enabled:
+            return None
+        return camera_id, _SETTINGS
+
+
+class _StreamClient:
+    """
+    Async redis stand-in: serves one XREADGROUP reply and a fixed list of
+    pending entries through XAUTOCLAIM, then stops the consumer.
+    """
+
+    def __init__(self, consumer, entries=(), pending=(), group_exists=False):
+        self._consumer = consumer
+        self._entries = list(entries)
+        self._pending = list(pending)
+        self._group_exists = group_exists
+        self.calls = []
+
+    async def xgroup_create(self, name, groupname, id, mkstream):
+        self.calls.append(('xgroup_create', name, groupname, id, mkstream))
+        if self._group_exists:
+            raise redis.ResponseError('BUSYGROUP Consumer Group name already exists')
+
+    async def xautoclaim(self, name, groupname, consumername, min_idle_time, start_id, count):
+        self.calls.append(('xautoclaim', start_id))
+        # Two entries per page to exercise the cursor
+        page, self._pending = self._pending[:2], self._pending[2:]
+        return [b'1-0' if self._pending else b'0-0', page, []]
+
+    async def xreadgroup(self, groupname, consumername, streams, count, block):
+        self.calls.append(('xreadgroup', streams))
+        self._consumer._running = False
+        entries, self._entries = self._entries, []
+        return [[STREAM_KEY.encode(), entries]] if entries else []
+
+
+class _AckClient:
+    def __init__(self):
+        self.acks = []
+
+    def xack(self, name, groupname, *ids):
+        self.acks.append((name, groupname, ids))
+
+
+def _event(camera_id, timestamp, motion=True, frame=True):
+    """Motion event as motionDetection serializes it (json.dumps key order)."""
+    return json.dumps({
+        'camera_id': camera_id,
+        'timestamp': timestamp,
+        'motion_detected': motion,
+        'processing_time_ms': 1.0,
+        'zone_results': [],
+        'mask': '',
+        'original_frame': _JPEG if frame else '',
+    }).encode()
+
+
+def _entry(message_id, camera_id, timestamp, **kwargs):
+    return message_id, {b'camera_id': camera_id.encode(), b'event': _event(camera_id, timestamp, **kwargs)}
+
+
+def _consumer(**kwargs) -> MotionEventConsumer:
+    consumer = MotionEventConsumer(
+        redis_host='localhost',
+        redis_port=6379,
+        detector=None,
+        camera_config=_CameraConfig({'cam'}),
+        publisher=None,
+        transport='stream',
+        stream_key=STREAM_KEY,
+        consumer_group=GROUP,
+        **kwargs,
+    )
+    consumer._refresh_enabled_cameras()
+    consumer._ack_redis = _AckClient()
+    return consumer
+
+
+def _consume(consumer, client) -> None:
+    """Run the stream read loop once and wait for its decodes to land."""
+    consumer._running = True
+    asyncio.run(consumer._consume_stream(client))
+    consumer._decode_pool.shutdown(wait=True)
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+class TestStreamGroup(unittest.TestCase):
+    def test_group_created_from_new_entries_with_stream(self):
+        consumer = _consumer()
+        client = _StreamClient(consumer)
+        _consume(consumer, client)
+
+        self.assertEqual(client.calls[0], ('xgroup_create', STREAM_KEY, GROUP, '$', True))
+        self.assertIn(('xreadgroup', {STREAM_KEY: '>'}), client.calls)
+
+    def test_existing_group_is_reused(self):
+        consumer = _consumer()
+        client = _StreamClient(consumer, group_exists=True)
+        _consume(consumer, client)
+
+        self.assertIn(('xreadgroup', {STREAM_KEY: '>'}), client.calls)
+
+
+class TestStreamAcks(unittest.TestCase):
+    """Every entry read is acked once it is processed, filtered or dropped."""
+
+    def test_filtered_entries_are_acked_without_decoding(self):
+        consumer = _consumer()
+        now = _now_ms()
+        client = _StreamClient(consumer, entries=[
+            _entry(b'1-0', 'other-cam', now),
+            _entry(b'2-0', 'cam', now, motion=False),
+            _entry(b'3-0', 'cam', now, frame=False),
+            (b'4-0', {b'camera_id': b'cam'}),
+        ])
+        _consume(consumer, client)
+
+        self.assertEqual(consumer._ack_ids, [b'1-0', b'2-0', b'3-0', b'4-0'])
+        self.assertEqual(len(consumer._scheduler), 0)
+
+    def test_queued_entry_is_acked_on_release(self):
+        consumer = _consumer()
+        now = _now_ms()
+        client = _StreamClient(consumer, entries=[_entry(b'1-0', 'cam', now)])
+        _consume(consumer, client)
+
+        self.assertEqual(consumer._ack_ids, [])
+        self.assertEqual(consumer._frame_message_ids, {('cam', now): b'1-0'})
+
+        consumer._release_frames(consumer._scheduler.drain())
+        self.assertEqual(consumer._ack_ids, [b'1-0'])
+        self.assertEqual(consumer._frame_message_ids, {})
+
+    def test_backpressure_drops_are_acked(self):
+        # One decode worker keeps the queueing order
+        consumer = _consumer(max_pending_frames_per_camera=1, decode_workers=1)
+        now = _now_ms()
+        client = _StreamClient(consumer, entries=[
+            _entry(b'1-0', 'cam', now),
+            _entry(b'2-0', 'cam', now + 1),
+        ])
+        _consume(consumer, client)
+
+        consumer._release_frames(consumer._scheduler.pop_discarded())
+        self.assertEqual(consumer._ack_ids, [b'1-0'])
+        self.assertEqual(consumer.get_stats()['dropped_frames'], 1)
+
+    def test_expired_entries_are_acked(self):
+        consumer = _consumer(frame_deadline_ms=1000)
+        stale = _now_ms() - 60_000
+        client = _StreamClient(consumer, entries=[_entry(b'1-0', 'cam', stale)])
+        _consume(consumer, client)
+
+        self.assertEqual(consumer._scheduler.next_batch(timeout=0.01), [])
+        consumer._release_frames(consumer._scheduler.pop_discarded())
+        self.assertEqual(consumer._ack_ids, [b'1-0'])
+        self.assertEqual(consumer.get_stats()['expired_frames'], 1)
+
+    def test_flush_acks_in_one_xack(self):
+        consumer = _consumer()
+        for message_id in (b'1-0', b'2-0', b'3-0'):
+            consumer._mark_done(message_id)
+
+        consumer._flush_acks()
+        consumer._flush_acks()  # Nothing left - no empty XACK
+
+        self.assertEqual(
+            consumer._ack_redis.acks, [(STREAM_KEY, GROUP, (b'1-0', b'2-0', b'3-0'))]
+        )
+        self.assertEqual(consumer._ack_ids, [])
+
+
+class TestStreamClaim(unittest.TestCase):
+    """Entries left pending by other consumers are reclaimed and handled."""
+
+    def test_pending_entries_are_reclaimed_across_pages(self):
+        consumer = _consumer()
+        now = _now_ms()
+        client = _StreamClient(consumer, pending=[
+            _entry(b'1-0', 'cam', now),
+            _entry(b'2-0', 'other-cam', now),
+            (b'3-0', None),  # Trimmed from the stream while pending
+        ])
+        _consume(consumer, client)
+
+        self.assertEqual(
+            [call for call in client.calls if call[0] == 'xautoclaim'],
+            [('xautoclaim', '0-0'), ('xautoclaim', b'1-0')],
+        )
+        # Filtered and trimmed entries are acked, the live one is queued
+        self.assertEqual(consumer._ack_ids, [b'2-0', b'3-0'])
+        self.assertEqual(consumer._frame_message_ids, {('cam', now): b'1-0'})
+        self.assertEqual(len(consumer._scheduler), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+"""Tests for the IoU tracker."""
+
+import sys
+import time
+import unittest
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_ROOT = PROJECT_ROOT / "src"
+if str(SRC_ROOT) not in sys.path:
+    sys.path.insert(0, str(SRC_ROOT))
+
+from detection.tracker import MultiCameraTracker
+from models import DetectionBox
+
+
+def _box(x1, y1, x2, y2, class_id=0):
+    return DetectionBox(
+        class_id=class_id, class_name='person' if class_id == 0 else 'car',
+        confidence=0.9, x1=x1, y1=y1, x2=x2, y2=y2,
+    )
+
+
+class TestTrackMatching(unittest.TestCase):
+    """Detections keep their track id across frames, per class."""
+
+    def test_track_ids_persist_and_new_objects_start_tracks(self):
+        tracker = MultiCameraTracker(iou_threshold=0.3)
+
+        first = tracker.update('cam', 0, [_box(0, 0, 10, 10)])
+        second = tracker.update('cam', 100, [_box(1, 0, 11, 10), _box(50, 50, 60, 60)])
+
+        self.assertEqual(first.started, [1])
+        self.assertEqual(second.boxes[0].track_id, 1)
+        self.assertEqual(second.started, [2])
+        self.assertEqual(second.boxes[1].track_id, 2)
+
+    def test_other_class_does_not_match(self):
+        tracker = MultiCameraTracker()
+        tracker.update('cam', 0, [_box(0, 0, 10, 10, class_id=0)])
+
+        update = tracker.update('cam', 100, [_box(0, 0, 10, 10, class_id=2)])
+
+        self.assertEqual(update.started, [2])
+
+    def test_predict_extrapolates_velocity(self):
+        tracker = MultiCameraTracker()
+        tracker.update('cam', 0, [_box(0, 0, 10, 10)])
+        tracker.update('cam', 100, [_box(2, 0, 12, 10)])
+
+        predicted = tracker.predict('cam', 200)[0]
+
+        # Half-smoothed velocity of 0.02 px/ms -> +1 px in 100ms
+        self.assertAlmostEqual(predicted.x1, 3.0, places=4)
+        self.assertEqual(predicted.track_id, 1)
+
+
+class TestFrameSkipping(unittest.TestCase):
+    """Only every detect_every-th frame is inferred while tracking."""
+
+    def test_without_tracks_every_frame_is_inferred(self):
+        tracker = MultiCameraTracker(detect_every=3)
+        self.assertEqual([tracker.should_detect('cam') for _ in range(3)], [True] * 3)
+
+    def test_frames_in_one_batch_share_the_count(self):
+        """Several frames checked before the batch's update() don't all get inferred."""
+        tracker = MultiCameraTracker(detect_every=3)
+        tracker.update('cam', 0, [_box(0, 0, 10, 10)])
+
+        batch = [tracker.should_detect('cam') for _ in range(6)]
+
+        self.assertEqual(batch, [False, False, True, False, False, True])
+
+    def test_cameras_are_counted_separately(self):
+        tracker = MultiCameraTracker(detect_every=2)
+        tracker.update('a', 0, [_box(0, 0, 10, 10)])
+        tracker.update('b', 0, [_box(0, 0, 10, 10)])
+
+        self.assertFalse(tracker.should_detect('a'))
+        self.assertFalse(tracker.should_detect('b'))
+        self.assertTrue(tracker.should_detect('a'))
+
+
+class TestTrackExpiry(unittest.TestCase):
+    """Tracks age on the camera's capture clock, not the receiver's wall clock."""
+
+    def test_update_ends_tracks_by_frame_timestamp(self):
+        tracker = MultiCameraTracker(max_age_ms=1000)
+        tracker.update('cam', 0, [_box(0, 0, 10, 10)])
+
+        update = tracker.update('cam', 1500, [])
+
+        self.assertEqual([box.track_id for box in update.ended], [1])
+
+    def test_sweep_uses_camera_clock(self):
+        """A camera clock far from ours neither ends tracks early nor keeps them forever."""
+        tracker = MultiCameraTracker(max_age_ms=3000)
+        capture_ms = 5_000  # Sender clock hours behind time.time()
+        tracker.update('cam', capture_ms, [_box(0, 0, 10, 10)])
+        start = time.monotonic()
+
+        self.assertEqual(tracker.expire(now=start + 2.0), {})
+
+        ended = tracker.expire(now=start + 3.5)
+        camera_now_ms, boxes = ended['cam']
+        self.assertEqual([box.track_id for box in boxes], [1])
+        self.assertAlmostEqual(camera_now_ms, capture_ms + 3500, delta=50)
+
+    def test_sweep_skips_cameras_without_frames(self):
+        self.assertEqual(MultiCameraTracker().expire(), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
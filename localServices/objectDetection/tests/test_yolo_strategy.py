@@ -0,0 +1,173 @@
+"""Tests for YOLOStrategy's class-keyed sub-batch planning and result reassembly."""
+
+import sys
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import torch
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_ROOT = PROJECT_ROOT / "src"
+if str(SRC_ROOT) not in sys.path:
+    sys.path.insert(0, str(SRC_ROOT))
+
+from detection.strategies.yolo_strategy import COCO_CLASS_IDS, YOLOStrategy
+from models import CameraObjectDetectionSettings
+
+PERSON = COCO_CLASS_IDS['person']
+CAR = COCO_CLASS_IDS['car']
+DOG = COCO_CLASS_IDS['dog']
+
+
+def _settings(*class_names, confidence=0.5) -> CameraObjectDetectionSettings:
+    return CameraObjectDetectionSettings(
+        class_configs=[{'class': name, 'confidence': confidence} for name in class_names],
+        motion_zones=[],
+    )
+
+
+def _frame(tag: int) -> np.ndarray:
+    """Decoded frame whose first pixel identifies it in the fake model's output."""
+    frame = np.zeros((8, 8, 3), dtype=np.uint8)
+    frame[0, 0, 0] = tag
+    return frame
+
+
+class _Boxes:
+    """Ultralytics Boxes subset read by _extract_boxes."""
+
+    def __init__(self, classes, tag: float):
+        self.cls = torch.tensor([float(c) for c in classes])
+        self.conf = torch.full((len(classes),), 0.9)
+        self.xyxy = torch.tensor([[tag, 0.0, tag + 1, 1.0]] * len(classes))
+
+    def __len__(self):
+        return len(self.cls)
+
+
+class _Model:
+    """Stands in for a YOLO model: one box per image and requested class, x1 = image tag."""
+
+    def __init__(self):
+        self.calls = []
+
+    def predict(self, images, conf, classes, **kwargs):
+        self.calls.append(([int(image[0, 0, 0]) for image in images], classes, conf))
+        return [
+            SimpleNamespace(speed={'inference': 1.0}, boxes=_Boxes(classes, float(image[0, 0, 0])))
+            for image in images
+        ]
+
+
+class TestPlanSubBatches(unittest.TestCase):
+    def _plan(self, class_sets, split_cost=32):
+        strategy = YOLOStrategy('yolo11n', sub_batch_split_cost=split_cost, device='cpu')
+        return strategy._plan_sub_batches(list(range(len(class_sets))), class_sets)
+
+    def test_same_classes_share_one_sub_batch(self):
+        classes = frozenset({PERSON, CAR})
+        self.assertEqual(self._plan([classes] * 4), [([0, 1, 2, 3], classes)])
+
+    def test_cheap_merges_are_made(self):
+        person, person_car = frozenset({PERSON}), frozenset({PERSON, CAR})
+
+        # Merging costs one extra class for each of the two person-only frames
+        plan = self._plan([person, person_car, person, person_car], split_cost=2)
+
+        self.assertEqual(plan, [([0, 1, 2, 3], person_car)])
+
+    def test_expensive_merges_are_split(self):
+        person, person_car = frozenset({PERSON}), frozenset({PERSON, CAR})
+
+        plan = self._plan([person, person_car, person, person_car], split_cost=1)
+
+        self.assertEqual(sorted(plan, key=lambda group: group[0]), [
+            ([0, 2], person),
+            ([1, 3], person_car),
+        ])
+
+    def test_cheapest_pairs_merged_until_split_cost(self):
+        person, car, person_car = frozenset({PERSON}), frozenset({CAR}), frozenset({PERSON, CAR})
+        dog = frozenset({DOG})
+        # car joins person_car first (cost 1), then the two person frames
+        # gain car (cost 2); pulling in the six dog frames would cost 16
+        class_sets = [person, person, person_car, dog, dog, dog, dog, dog, dog, car]
+
+        plan = self._plan(class_sets, split_cost=3)
+
+        self.assertEqual(sorted(plan, key=lambda group: group[0]), [
+            ([0, 1, 2, 9], person_car),
+            ([3, 4, 5, 6, 7, 8], dog),
+        ])
+
+    def test_every_frame_planned_once_in_order(self):
+        rng = np.random.default_rng(0)
+        pool = [frozenset({PERSON}), frozenset({CAR}), frozenset({DOG}), frozenset({PERSON, DOG})]
+        class_sets = [pool[i] for i in rng.integers(0, len(pool), size=40)]
+
+        for split_cost in (0, 4, 32, 1000):
+            plan = self._plan(class_sets, split_cost)
+            members = [i for indices, _ in plan for i in indices]
+            self.assertEqual(sorted(members), list(range(40)))
+            for indices, classes in plan:
+                self.assertEqual(indices, sorted(indices))
+                for i in indices:
+                    self.assertLessEqual(class_sets[i], classes)
+
+        self.assertEqual(len(self._plan(class_sets, split_cost=1000)), 1)
+        self.assertEqual(len(self._plan(class_sets, split_cost=0)), len(pool))
+
+
+class TestDetectReassembly(unittest.TestCase):
+    """Sub-batch results land back at their frame's position in the batch."""
+
+    def setUp(self):
+        self.strategy = YOLOStrategy('yolo11n', sub_batch_split_cost=0, device='cpu')
+        self.model = _Model()
+        self.strategy._model = self.model
+
+    def test_results_follow_input_order(self):
+        person, car = _settings('person'), _settings('car', confidence=0.3)
+        frames = [
+            (_frame(0), person),
+            (_frame(1), car),
+            (_frame(2), _settings()),  # No classes - skipped without a predict
+            (_frame(3), person),
+            (_frame(4), car),
+        ]
+
+        boxes = self.strategy.detect(frames)
+
+        self.assertEqual(len(self.model.calls), 2)
+        self.assertCountEqual(
+            [(tags, classes) for tags, classes, _ in self.model.calls],
+            [([0, 3], [PERSON]), ([1, 4], [CAR])],
+        )
+        self.assertEqual(
+            {tuple(tags): conf for tags, _, conf in self.model.calls},
+            {(0, 3): 0.5, (1, 4): 0.3},
+        )
+
+        self.assertEqual(boxes[2], [])
+        for index, expected in ((0, 'person'), (1, 'car'), (3, 'person'), (4, 'car')):
+            (box,) = boxes[index]
+            self.assertEqual(box.class_name, expected)
+            self.assertEqual(box.x1, float(index))
+
+    def test_merged_sub_batch_filters_per_camera(self):
+        self.strategy._sub_batch_split_cost = 32
+        frames = [(_frame(0), _settings('person')), (_frame(1), _settings('person', 'car'))]
+
+        boxes = self.strategy.detect(frames)
+
+        (call,) = self.model.calls
+        self.assertEqual(call[:2], ([0, 1], [PERSON, CAR]))
+        # The person-only camera doesn't get the car box its sub-batch produced
+        self.assertEqual([box.class_name for box in boxes[0]], ['person'])
+        self.assertEqual(sorted(box.class_name for box in boxes[1]), ['car', 'person'])
+
+
+if __name__ == '__main__':
+    unittest.main()
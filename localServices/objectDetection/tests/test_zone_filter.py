@@ -0,0 +1,63 @@
+"""Tests for vectorized zone filtering."""
+
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_ROOT = PROJECT_ROOT / "src"
+if str(SRC_ROOT) not in sys.path:
+    sys.path.insert(0, str(SRC_ROOT))
+
+from models import DetectionBox, MotionZone
+from detection.zone_filter import CompiledZones, point_in_polygon
+
+
+class TestCompiledZones(unittest.TestCase):
+    """Compiled zones must match cv2.pointPolygonTest exactly."""
+
+    def test_matches_point_in_polygon(self):
+        """Random, lattice, vertex and on-edge points agree with point_in_polygon."""
+        rng = np.random.default_rng(0)
+
+        for _ in range(50):
+            polygon = [tuple(int(v) for v in p) for p in rng.integers(0, 40, (rng.integers(3, 8), 2))]
+            compiled = CompiledZones([MotionZone(id='z', name='z', points=polygon)])
+
+            edge_points = [
+                (a[0] + (b[0] - a[0]) * t, a[1] + (b[1] - a[1]) * t)
+                for a, b in zip(polygon, polygon[1:] + polygon[:1])
+                for t in (0.25, 0.5)
+            ]
+            points = np.concatenate([
+                rng.uniform(-5, 45, (100, 2)),
+                rng.integers(-2, 42, (100, 2)),
+                rng.integers(0, 80, (50, 2)) / 2,
+                np.array(polygon + edge_points, dtype=float),
+            ]).astype(np.float32)
+
+            expected = [point_in_polygon((float(x), float(y)), polygon) for x, y in points]
+            self.assertEqual(compiled.contains('z', points).tolist(), expected)
+
+    def test_filter_keeps_boxes_in_zones_with_motion(self):
+        """Only boxes centred in a zone with motion are kept, in order."""
+        zones = [
+            MotionZone(id='left', name='left', points=[(0, 0), (50, 0), (50, 100), (0, 100)]),
+            MotionZone(id='right', name='right', points=[(50, 0), (100, 0), (100, 100), (50, 100)]),
+        ]
+        boxes = [
+            DetectionBox(class_id=0, class_name='person', confidence=0.9, x1=10, y1=10, x2=20, y2=20),
+            DetectionBox(class_id=0, class_name='person', confidence=0.9, x1=70, y1=10, x2=80, y2=20),
+            DetectionBox(class_id=0, class_name='person', confidence=0.9, x1=45, y1=10, x2=55, y2=20),
+        ]
+        compiled = CompiledZones(zones)
+
+        self.assertEqual(compiled.filter(boxes, {'left'}), [boxes[0], boxes[2]])
+        self.assertEqual(compiled.filter(boxes, {'right'}), [boxes[1], boxes[2]])
+        self.assertEqual(compiled.filter(boxes, set()), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,179 @@
+import multiprocessing as mp
+from dataclasses import fields, is_dataclass
+from queue import Empty, Full
+from typing import Any, Dict, List, Literal, Optional, Tuple
+
+import numpy as np
+
+from frameRingBuffer import SharedFrame
+
+DropPolicy = Literal["drop_newest", "drop_oldest"]
+
+
+def payload_nbytes(item: Any) -> int:
+    """
+    Approximate payload size of a queued item in bytes
+
+    Counts numpy arrays and bytes buffers found in the item, its dataclass
+    fields and any nested lists, tuples or dicts. A SharedFrame is charged
+    the size of the frame it holds in the ring, so the budget still bounds
+    the pixel data a backlog pins. Scalars and strings are ignored - for
+    frames they are noise next to the pixel data.
+    """
+    if isinstance(item, np.ndarray):
+        return item.nbytes
+    if isinstance(item, SharedFrame):
+        return item.nbytes
+    if isinstance(item, (bytes, bytearray, memoryview)):
+        return len(item)
+    if is_dataclass(item) and not isinstance(item, type):
+        return sum(payload_nbytes(getattr(item, f.name)) for f in fields(item))
+    if isinstance(item, (list, tuple)):
+        return sum(payload_nbytes(value) for value in item)
+    if isinstance(item, dict):
+        return sum(payload_nbytes(value) for value in item.values())
+    return 0
+
+
+class ByteBudgetQueue:
+    """
+    Multiprocess queue bounded by payload bytes rather than item count
+
+    A 4K frame is ~9x a 720p one, so an item-count bound either wastes memory
+    on small streams or lets large streams blow past it. Producers reserve the
+    item's bytes before queueing; when the budget is exhausted the configured
+    policy either rejects the new item or evicts the oldest ones. An item
+    larger than the whole budget is still admitted into an empty queue so it
+    is processed rather than starving its stream.
+
+    The byte/item counters and high-water marks live in shared memory, so
+    every process sees the same accounting and the monitor can report it.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        max_items: int = 0,
+        drop_policy: DropPolicy = "drop_newest",
+    ) -> None:
+        """
+        Args:
+            max_bytes: Max queued payload bytes (0 = unbounded)
+            max_items: Max queued items (0 = unbounded)
+            drop_policy: "drop_newest" rejects the incoming item when full,
+                "drop_oldest" evicts queued items to make room for it
+        """
+        if drop_policy not in ("drop_newest", "drop_oldest"):
+            raise ValueError(f"Unknown drop policy: {drop_policy}")
+
+        self.max_bytes = max_bytes
+        self.max_items = max_items
+        self.drop_policy = drop_policy
+
+        self._queue: mp.Queue = mp.Queue()
+        # All counters share the lock of _bytes
+        self._bytes = mp.Value("q", 0)
+        self._items = mp.Value("q", 0, lock=False)
+        self._high_water_bytes = mp.Value("q", 0, lock=False)
+        self._high_water_items = mp.Value("q", 0, lock=False)
+        self._dropped = mp.Value("q", 0, lock=False)
+
+    def put(self, item: Any, nbytes: Optional[int] = None) -> List[Any]:
+        """
+        Queue an item within the byte budget
+
+        Args:
+            item: Item to queue (must be picklable)
+            nbytes: Payload size, computed with payload_nbytes() if omitted
+
+        Returns:
+            The items dropped: [item] if the new item was rejected, otherwise
+            the queued items evicted to make room for it (oldest first). Callers
+            release any resources the dropped items hold.
+        """
+        if nbytes is None:
+            nbytes = payload_nbytes(item)
+
+        dropped: List[Any] = []
+        while True:
+            with self._bytes.get_lock():
+                if self._fits(nbytes):
+                    self._reserve(nbytes)
+                    break
+                if self.drop_policy == "drop_newest":
+                    self._dropped.value += 1
+                    return [item]
+
+            # drop_oldest: evict outside the lock, get() re-takes it
+            try:
+                dropped.append(self._take(block=False)[1])
+            except Empty:
+                # Queued items are still in flight in the feeder thread
+                with self._bytes.get_lock():
+                    self._dropped.value += 1
+                return dropped + [item]
+            with self._bytes.get_lock():
+                self._dropped.value += 1
+
+        self._queue.put((nbytes, item))
+        return dropped
+
+    def get(self, block: bool = True, timeout: Optional[float] = None) -> Any:
+        """Remove and return the oldest item, raising Empty like queue.Queue"""
+        return self._take(block, timeout)[1]
+
+    def get_nowait(self) -> Any:
+        return self.get(block=False)
+
+    def put_nowait(self, item: Any) -> None:
+        """queue.Queue compatible put: raises Full if the item was rejected"""
+        if self.put(item) and self.drop_policy == "drop_newest":
+            raise Full
+
+    def qsize(self) -> int:
+        return self._items.value
+
+    def nbytes(self) -> int:
+        return self._bytes.value
+
+    def empty(self) -> bool:
+        return self._items.value == 0
+
+    def full(self) -> bool:
+        """True when nothing more fits without dropping"""
+        with self._bytes.get_lock():
+            return self._items.value > 0 and not self._fits(1)
+
+    def stats(self) -> Dict[str, int]:
+        """Snapshot of current usage, high-water marks and drop count"""
+        with self._bytes.get_lock():
+            return {
+                "items": self._items.value,
+                "bytes": self._bytes.value,
+                "high_water_items": self._high_water_items.value,
+                "high_water_bytes": self._high_water_bytes.value,
+                "max_bytes": self.max_bytes,
+                "dropped": self._dropped.value,
+            }
+
+    def _fits(self, nbytes: int) -> bool:
+        """Whether nbytes more can be reserved (caller holds the lock)"""
+        if self._items.value == 0:
+            return True
+        if self.max_items and self._items.value >= self.max_items:
+            return False
+        return not self.max_bytes or self._bytes.value + nbytes <= self.max_bytes
+
+    def _reserve(self, nbytes: int) -> None:
+        """Account for a new item (caller holds the lock)"""
+        self._bytes.value += nbytes
+        self._items.value += 1
+        self._high_water_bytes.value = max(self._high_water_bytes.value, self._bytes.value)
+        self._high_water_items.value = max(self._high_water_items.value, self._items.value)
+
+    def _take(self, block: bool = True, timeout: Optional[float] = None) -> Tuple[int, Any]:
+        nbytes, item = self._queue.get(block, timeout)
+        with self._bytes.get_lock():
+            self._bytes.value -= nbytes
+            self._items.value -= 1
+        return nbytes, item
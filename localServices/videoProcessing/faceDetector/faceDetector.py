@@ -1,13 +1,87 @@
+import math
+import threading
+from dataclasses import dataclass
+import cv2
 import numpy as np
 import torch
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 from numpy.typing import NDArray
 import multiprocessing as mp
-from ..faceRecognition.inception_resnet import InceptionResnetV1
+from faceRecognition.inception_resnet import InceptionResnetV1
 from ultralytics.engine.results import Results
 from yoloProcessor import measure_operation
 from ultralytics import YOLO
-from yoloProcessor import Detection, ProcessedFrame
+from yoloProcessor import BoundingBox, Detection, ProcessedFrame
+
+# InceptionResnetV1 input size and the margin added around detected faces
+FACE_SIZE = 160
+FACE_MARGIN = 0.2
+
+# One embedding model per device, shared by every detector on it
+_embedding_models: Dict[str, InceptionResnetV1] = {}
+_embedding_models_lock = threading.Lock()
+
+
+def get_embedding_model(device: str) -> InceptionResnetV1:
+    """
+    Get the shared face embedding model for a device, loading it on first use.
+
+    The model is only used for inference (eval mode, no grad), so concurrent
+    forward passes from several detector threads are safe and one copy of the
+    weights per device is enough.
+
+    Args:
+        device: Device to run inference on ('cpu' or 'cuda')
+
+    Returns:
+        InceptionResnetV1: The shared model
+    """
+    with _embedding_models_lock:
+        model = _embedding_models.get(device)
+        if model is None:
+            model = InceptionResnetV1(pretrained="vggface2").eval().to(device)
+            _embedding_models[device] = model
+        return model
+
+
+@dataclass
+class PersonCrop:
+    """
+    A person region cut from a frame for face detection.
+
+    Attributes:
+        frame_index (int): Index of the source frame in the batch
+        x_offset (int): Left edge of the crop in the source frame
+        y_offset (int): Top edge of the crop in the source frame
+        image (NDArray[np.uint8]): The cropped BGR pixels
+    """
+
+    frame_index: int
+    x_offset: int
+    y_offset: int
+    image: NDArray[np.uint8]
+
+
+@dataclass
+class FaceDetection:
+    """
+    A detected face and its embedding.
+
+    Attributes:
+        frame_id (int): Frame the face was found in
+        stream_id (str): Stream of that frame
+        timestamp (float): Capture time of that frame
+        bbox (BoundingBox): Face box, normalized to the full frame
+        confidence (float): Face detector confidence
+        embedding (NDArray[np.float32]): 512-d L2-normalized face embedding
+    """
+
+    frame_id: int
+    stream_id: str
+    timestamp: float
+    bbox: BoundingBox
+    confidence: float
+    embedding: NDArray[np.float32]
 
 
 class FaceDetector:
@@ -17,12 +91,17 @@ class FaceDetector:
     This class handles the loading and inference of a YOLO model for face detection.
     Each instance represents a worker that can process frames independently.
 
+    A batch of frames goes through the pipeline in one pass per stage:
+    person crops -> one face YOLO call -> aligned 160x160 face crops stacked
+    into one tensor -> one InceptionResnetV1 forward pass.
+
     Attributes:
         model_path (str): Path to the YOLO model file
         device (str): Device to run inference on ('cpu' or 'cuda')
         performance_queue (mp.Queue): Queue for reporting performance metrics
         worker_id (int): Unique identifier for this worker
         model (YOLO): Loaded YOLO model instance
+        resnet (InceptionResnetV1): Embedding model shared by all detectors on the device
     """
 
     def __init__(
@@ -42,7 +121,7 @@ class FaceDetector:
         self.performance_queue = performance_queue
         self.worker_id = worker_id
         self.model = self.load_model()
-        self.resnet = InceptionResnetV1(pretrained="vggface2").eval().to(self.device)
+        self.resnet = get_embedding_model(self.device)
 
     def load_model(self) -> YOLO:
         """
@@ -63,7 +142,7 @@ class FaceDetector:
             model.to(self.device)
             return model
 
-    def _chop_frames(self, frames: List[ProcessedFrame]) -> List[ProcessedFrame]:
+    def _chop_frames(self, frames: List[ProcessedFrame]) -> List[PersonCrop]:
         """
         Chop frames based on person detections.
 
@@ -71,17 +150,17 @@ class FaceDetector:
             frames: List of ProcessedFrame objects containing person detections
 
         Returns:
-            List[ProcessedFrame]: List of new ProcessedFrame objects containing cropped frames
+            List[PersonCrop]: Person regions with their position in the source frame
         """
         with measure_operation(
             self.performance_queue,
             f"facedetector-{self.worker_id}",
             "facedetector_inference_chop",
         ):
-            chopped_frames: List[ProcessedFrame] = []
+            chopped_frames: List[PersonCrop] = []
 
             # Iterate through each input frame
-            for frame in frames:
+            for frame_index, frame in enumerate(frames):
                 # Skip frames with no detections
                 if not frame.detections:
                     continue
@@ -96,52 +175,149 @@ class FaceDetector:
                     # Get frame dimensions
                     height, width = frame.frame.shape[:2]
 
-                    # Convert normalized coordinates to pixel coordinates
-                    y1 = int(det.bbox.y_center * height)
-                    y2 = int((det.bbox.y_center + det.bbox.height) * height)
-                    x1 = int(det.bbox.x_center * width)
-                    x2 = int((det.bbox.x_center + det.bbox.width) * width)
-
-                    # Create cropped frame
-                    chopped_frame: ProcessedFrame = ProcessedFrame(
-                        frame=frame.frame[y1:y2, x1:x2].copy(),
-                        frame_id=frame.frame_id,
-                        stream_id=frame.stream_id,
-                        timestamp=frame.timestamp,
-                        detections=[],
+                    # Convert normalized center/size to pixel corners
+                    x1 = max(0, int((det.bbox.x_center - det.bbox.width / 2) * width))
+                    y1 = max(0, int((det.bbox.y_center - det.bbox.height / 2) * height))
+                    x2 = min(width, int((det.bbox.x_center + det.bbox.width / 2) * width))
+                    y2 = min(height, int((det.bbox.y_center + det.bbox.height / 2) * height))
+                    if x2 <= x1 or y2 <= y1:
+                        continue
+
+                    # Views are enough - the face crops below are copies
+                    chopped_frames.append(
+                        PersonCrop(frame_index, x1, y1, frame.frame[y1:y2, x1:x2])
                     )
-                    chopped_frames.append(chopped_frame)
 
             return chopped_frames
 
-    def produce_embeddings(self, frames: List[ProcessedFrame]) -> List[List[Detection]]:
+    @staticmethod
+    def _align_face(
+        image: NDArray[np.uint8],
+        box: Tuple[float, float, float, float],
+        eyes: Optional[NDArray[np.float32]],
+        out: NDArray[np.uint8],
+    ) -> None:
         """
-        Produce embeddings for each frame.
+        Cut a face into a FACE_SIZE x FACE_SIZE square, rotated so the eyes are level.
+
+        Crop, rotation and resize are a single warpAffine straight into the
+        batch array; areas outside the frame are padded black.
+
+        Args:
+            image: Full BGR frame
+            box: Face box (x1, y1, x2, y2) in frame pixels
+            eyes: Left and right eye (x, y) in frame pixels, if the face model provides landmarks
+            out: FACE_SIZE x FACE_SIZE x 3 destination
         """
-        self.resnet
+        x1, y1, x2, y2 = box
+        center_x, center_y = (x1 + x2) / 2, (y1 + y2) / 2
+        side = max(x2 - x1, y2 - y1) * (1 + FACE_MARGIN)
+        angle = 0.0
+        if eyes is not None and np.all(eyes > 0):
+            (left_x, left_y), (right_x, right_y) = eyes
+            angle = math.degrees(math.atan2(right_y - left_y, right_x - left_x))
+
+        matrix = cv2.getRotationMatrix2D((center_x, center_y), angle, FACE_SIZE / side)
+        matrix[:, 2] += (FACE_SIZE / 2 - center_x, FACE_SIZE / 2 - center_y)
+        cv2.warpAffine(
+            image, matrix, (FACE_SIZE, FACE_SIZE), dst=out,
+            flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_CONSTANT,
+        )
 
-    def detect(self, frames: List[ProcessedFrame]) -> List[List[Detection]]:
+    def produce_embeddings(self, faces: NDArray[np.uint8]) -> NDArray[np.float32]:
         """
-        Perform face detection on a batch of frames.
+        Produce embeddings for a batch of aligned faces in one forward pass.
+
+        Args:
+            faces: N x FACE_SIZE x FACE_SIZE x 3 BGR face crops
+
+        Returns:
+            NDArray[np.float32]: N x 512 L2-normalized embeddings
+        """
+        with measure_operation(
+            self.performance_queue,
+            f"facedetector-{self.worker_id}",
+            "facedetector_embedding",
+        ):
+            # BGR -> RGB, NHWC -> NCHW, and the standardization the model was trained with
+            batch = torch.from_numpy(np.ascontiguousarray(faces[..., ::-1])).to(self.device)
+            batch = (batch.permute(0, 3, 1, 2).float() - 127.5) / 128.0
+            with torch.inference_mode():
+                embeddings = self.resnet(batch)
+            return embeddings.cpu().numpy()
+
+    def detect(self, frames: List[ProcessedFrame]) -> List[List[FaceDetection]]:
+        """
+        Perform face detection and embedding on a batch of frames.
 
         Args:
             frames: List of frames to process
 
         Returns:
-            List[List[Detection]]: Detection results for each frame
+            List[List[FaceDetection]]: Faces found in each input frame, in input order
 
         Note:
             Performance is measured and reported through the performance queue
         """
-        chopped_frames = self._chop_frames(frames)
+        faces_per_frame: List[List[FaceDetection]] = [[] for _ in frames]
+        person_crops = self._chop_frames(frames)
+        if not person_crops:
+            return faces_per_frame
+
         with measure_operation(
             self.performance_queue,
             f"facedetector-{self.worker_id}",
             "facedetector_inference",
         ):
-            results = self.model.predict(chopped_frames)
-            embeddings = self.produce_embeddings(results)
-            return results
+            results: List[Results] = self.model.predict(
+                [crop.image for crop in person_crops], verbose=False
+            )
+
+        # Face boxes (and eye landmarks) in full-frame pixels
+        located: List[Tuple[PersonCrop, Tuple[float, ...], Optional[NDArray[np.float32]], float]] = []
+        for crop, result in zip(person_crops, results):
+            offset = np.array([crop.x_offset, crop.y_offset], dtype=np.float32)
+            boxes = result.boxes.xyxy.cpu().numpy()
+            confidences = result.boxes.conf.cpu().numpy()
+            keypoints = None
+            if result.keypoints is not None and result.keypoints.xy.shape[1] >= 2:
+                keypoints = result.keypoints.xy.cpu().numpy()
+            for i, (bx1, by1, bx2, by2) in enumerate(boxes):
+                box = (bx1 + offset[0], by1 + offset[1], bx2 + offset[0], by2 + offset[1])
+                eyes = keypoints[i, :2] + offset if keypoints is not None else None
+                located.append((crop, box, eyes, float(confidences[i])))
+
+        if not located:
+            return faces_per_frame
+
+        with measure_operation(
+            self.performance_queue,
+            f"facedetector-{self.worker_id}",
+            "facedetector_align",
+        ):
+            aligned = np.empty((len(located), FACE_SIZE, FACE_SIZE, 3), dtype=np.uint8)
+            for i, (crop, box, eyes, _) in enumerate(located):
+                self._align_face(frames[crop.frame_index].frame, box, eyes, aligned[i])
+
+        embeddings = self.produce_embeddings(aligned)
+
+        for (crop, (x1, y1, x2, y2), _, confidence), embedding in zip(located, embeddings):
+            frame = frames[crop.frame_index]
+            height, width = frame.frame.shape[:2]
+            faces_per_frame[crop.frame_index].append(FaceDetection(
+                frame_id=frame.frame_id,
+                stream_id=frame.stream_id,
+                timestamp=frame.timestamp,
+                bbox=BoundingBox(
+                    x_center=float((x1 + x2) / 2 / width),
+                    y_center=float((y1 + y2) / 2 / height),
+                    width=float((x2 - x1) / width),
+                    height=float((y2 - y1) / height),
+                ),
+                confidence=confidence,
+                embedding=embedding,
+            ))
+        return faces_per_frame
 
     def cleanup(self) -> None:
         """
@@ -7,7 +7,7 @@ import numpy as np
 from numpy.typing import NDArray
 import time
 from dataclasses import dataclass
-from .faceDetector import FaceDetector
+from .faceDetector import FaceDetector, FaceDetection
 from yoloProcessor import Detection, ProcessedFrame
 
 
@@ -34,7 +34,8 @@ class FaceDetectorManager:
     Manages a dynamic pool of face detector workers.
 
     Supports dynamic scaling of workers and ensures models are pre-loaded
-    before they're needed.
+    before they're needed. Each worker has its own face YOLO model; the
+    embedding model is shared by all workers on the device.
     """
 
     def __init__(
@@ -66,8 +67,9 @@ class FaceDetectorManager:
         # Thread-safe collections
         self.frame_queue: Queue[Tuple[List[ProcessedFrame], int]] = Queue()
         self.results_lock = threading.Lock()
-        self.workers_lock = threading.Lock()
-        self.results: List = []
+        # Re-entrant: _scale_workers creates/removes workers while holding it
+        self.workers_lock = threading.RLock()
+        self.results: List[List[FaceDetection]] = []
 
         # Worker management
         self.executor = ThreadPoolExecutor(max_workers=max_workers)
@@ -122,9 +124,7 @@ class FaceDetectorManager:
         """
         while True:
             try:
-                frames, target_worker: Tuple[List[ProcessedFrame], int] = self.frame_queue.get(
-                    timeout=1.0
-                )
+                frames, target_worker = self.frame_queue.get(timeout=1.0)
                 if frames is None and target_worker == worker_id:
                     self.frame_queue.task_done()
                     break
@@ -154,6 +154,9 @@ class FaceDetectorManager:
                 continue
             except Exception as e:
                 print(f"Error in worker {worker_id}: {e}")
+                with self.workers_lock:
+                    if worker_id in self.active_workers:
+                        self.active_workers[worker_id].is_processing = False
                 continue
 
     def get_idle_workers(self) -> List[int]:
@@ -214,12 +217,15 @@ class FaceDetectorManager:
                 for worker_id in workers_to_remove:
                     self._remove_worker(worker_id)
 
-    def add_frames(self, frames: List[ProcessedFrame]) -> None:
+    def add_frames(self, frames: List[ProcessedFrame]) -> bool:
         """
-        Add frames to the processing queue.
+        Add a batch of frames to the processing queue.
 
         Args:
-            frames: List of frames to process
+            frames: List of frames to process, detected together in one pass per stage
+
+        Returns:
+            bool: True if an idle worker took the batch, False if all workers are busy
         """
         # Round-robin assignment to workers
         with self.workers_lock:
@@ -230,14 +236,18 @@ class FaceDetectorManager:
             ]
             if available_workers:
                 worker_id = available_workers[0]
+                # Mark busy now so the next batch goes to another worker
+                self.active_workers[worker_id].is_processing = True
                 self.frame_queue.put((frames, worker_id))
+                return True
+            return False
 
-    def get_results(self) -> List:
+    def get_results(self) -> List[List[FaceDetection]]:
         """
         Get all available results and clear the results list.
 
         Returns:
-            List of detection results
+            List of detection results, one list of faces per processed frame
         """
         with self.results_lock:
             current_results = self.results.copy()
@@ -253,8 +263,7 @@ class FaceDetectorManager:
 
         self.executor.shutdown(wait=True)
 
-    @classmethod
-    def process_frames_sync(cls, frames: List[ProcessedFrame]) -> List[ProcessedFrame]:
+    def process_frames_sync(self, frames: List[ProcessedFrame]) -> List[List[FaceDetection]]:
         """
         Process frames synchronously and wait for results.
 
@@ -264,10 +273,11 @@ class FaceDetectorManager:
         Returns:
             List of detection results for the batch
         """
-        cls.add_frames(frames)
+        while not self.add_frames(frames):
+            time.sleep(0.01)
         # Wait until these specific frames are processed
         while True:
-            results = cls.get_results()  # thankfully we process in batches, so the returned amount should be the same as the input
+            results = self.get_results()  # thankfully we process in batches, so the returned amount should be the same as the input
             if results:  # Once we have results, return them
                 return results
             time.sleep(0.01)  # Small sleep to prevent busy waiting
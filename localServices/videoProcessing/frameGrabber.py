@@ -4,10 +4,13 @@ from queue import Queue, Empty, Full
 import time
 import logging
 from dataclasses import dataclass
-from typing import Dict, Optional, List, Any
+from typing import Dict, Optional, List, Any, Union
 import numpy as np
 from numpy.typing import NDArray
 from performanceMonitor import measure_operation
+from byteBudgetQueue import ByteBudgetQueue
+from frameRingBuffer import FrameRingBuffer, SharedFrame, release_frame
+from frameMailbox import LatestFrameMailbox
 import multiprocessing as mp
 import traceback
 
@@ -16,24 +19,38 @@ class FrameData:
     frame_id: int
     stream_id: str
     timestamp: float
-    frame: NDArray[np.uint8]
+    frame: Union[NDArray[np.uint8], SharedFrame]  # SharedFrame when sent through the ring buffer
+
+@dataclass
+class StreamConfig:
+    url: str
+    target_fps: float = 0.0       # Frames per second to decode; 0 decodes every frame
+    decode_width: int = 0         # Downscale decoded frames to fit this size; 0 keeps the source size
+    decode_height: int = 0
+    hw_acceleration: bool = True  # Let FFmpeg pick any available hardware decoder
 
 class FrameGrabber:
     def __init__(
         self, 
-        stream_configs: Dict[str, str], 
-        shared_queue: Queue,
+        stream_configs: Dict[str, Union[str, StreamConfig]], 
+        shared_queue: Union[ByteBudgetQueue, LatestFrameMailbox],
         performance_queue: mp.Queue,
         logging_queue: mp.Queue,
         processed_frames: mp.Value,
-        drop_frames: mp.Value
+        drop_frames: mp.Value,
+        frame_ring: Optional[FrameRingBuffer] = None
     ) -> None:
-        self.stream_configs = stream_configs
+        # Plain URLs keep their old meaning: decode every frame at source size
+        self.stream_configs = {
+            stream_id: StreamConfig(url=config) if isinstance(config, str) else config
+            for stream_id, config in stream_configs.items()
+        }
         self.shared_queue = shared_queue
         self.performance_queue = performance_queue
         self.logging_queue = logging_queue
         self.processed_frames = processed_frames
         self.drop_frames = drop_frames
+        self.frame_ring = frame_ring
         
         self.running = threading.Event()
         self.threads: Dict[str, threading.Thread] = {}
@@ -42,10 +59,10 @@ class FrameGrabber:
     def start(self) -> None:
         self.running.set()
         
-        for stream_id, video_path in self.stream_configs.items():
+        for stream_id, config in self.stream_configs.items():
             thread = threading.Thread(
                 target=self._grab_frames,
-                args=(stream_id, video_path),
+                args=(stream_id, config),
                 daemon=True
             )
             thread.start()
@@ -64,14 +81,49 @@ class FrameGrabber:
             "severity": "info",
             "message": "All frame grabbing threads stopped"
         })
-        
-    def _grab_frames(self, stream_id: str, video_path: str) -> None:
-        """Thread function for continuous frame grabbing from a single stream"""
-        # Construct capture string with optimized parameters
-        cap_string = (f"{video_path}")
-        capture = cv2.VideoCapture(cap_string)
-        #capture.set(cv2.CAP_PROP_BUFFERSIZE, 1)
-        #capture.set(cv2.CAP_PROP_FPS, 60)
+
+    @staticmethod
+    def _open_capture(config: StreamConfig) -> cv2.VideoCapture:
+        """Open a stream, with hardware decoding when the OpenCV build supports it"""
+        capture = None
+        if config.hw_acceleration and hasattr(cv2, "CAP_PROP_HW_ACCELERATION"):
+            capture = cv2.VideoCapture(
+                config.url,
+                cv2.CAP_FFMPEG,
+                [cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY],
+            )
+        if capture is None or not capture.isOpened():
+            capture = cv2.VideoCapture(config.url)
+        if config.decode_width and config.decode_height:
+            # Honoured by some backends (V4L2, GStreamer); FFmpeg ignores it and
+            # frames are downscaled after retrieve instead
+            capture.set(cv2.CAP_PROP_FRAME_WIDTH, config.decode_width)
+            capture.set(cv2.CAP_PROP_FRAME_HEIGHT, config.decode_height)
+        return capture
+
+    @staticmethod
+    def _fit_to_decode_size(frame: NDArray[np.uint8], config: StreamConfig) -> NDArray[np.uint8]:
+        """Downscale a frame to fit the configured decode size, keeping aspect ratio"""
+        if not (config.decode_width and config.decode_height):
+            return frame
+        height, width = frame.shape[:2]
+        scale = min(config.decode_width / width, config.decode_height / height)
+        if scale >= 1.0:
+            return frame
+        size = (max(1, round(width * scale)), max(1, round(height * scale)))
+        return cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+
+    def _grab_frames(self, stream_id: str, config: StreamConfig) -> None:
+        """
+        Thread function for continuous frame grabbing from a single stream
+
+        Every frame is grabbed so the stream never falls behind, but only frames
+        due at the target fps are decoded (retrieve) - skipped frames cost just
+        the demux, not the decode and copy.
+        """
+        capture = self._open_capture(config)
+        frame_interval = 1.0 / config.target_fps if config.target_fps > 0 else 0.0
+        next_due = 0.0
         
         while self.running.is_set():
             
@@ -81,9 +133,7 @@ class FrameGrabber:
                     "message": f"Stream {stream_id}: Connection lost. Attempting to reconnect..."
                 })
                 time.sleep(1.0)  # Wait before retry
-                capture = cv2.VideoCapture(cap_string)
-                #capture.set(cv2.CAP_PROP_BUFFERSIZE, 1)
-                #capture.set(cv2.CAP_PROP_FPS, 60)
+                capture = self._open_capture(config)
                 continue
             
             try:
@@ -92,12 +142,30 @@ class FrameGrabber:
                     if not capture.grab():
                         continue
                 
-                # Only retrieve if queue isn't full
+                # Grab-only skip until the next frame is due at the target fps
+                now = time.monotonic()
+                if now < next_due:
+                    continue
+                # After start-up or a stall, restart the schedule from now
+                # instead of decoding a catch-up frame right behind this one
+                next_due = max(next_due, now) + frame_interval
+
+                # Only retrieve (decode) if the queue has any room left
                 if not self.shared_queue.full():
                     # Measure retrieve time
                     with measure_operation(self.performance_queue, stream_id, "frame_retrieve"):
                         ret, frame = capture.retrieve()
+                        if ret:
+                            frame = self._fit_to_decode_size(frame, config)
                     
+                    if ret and self.frame_ring is not None and self.frame_ring.fits(frame):
+                        # Copy once into shared memory; only the slot reference is queued
+                        frame = self.frame_ring.put(frame)
+                        if frame is None:
+                            # Every slot is still held downstream - consumers are behind
+                            self.drop_frames.value += 1
+                            continue
+
                     if ret:
                         frame_data = FrameData(
                             frame_id=self.frame_count,
@@ -108,12 +176,14 @@ class FrameGrabber:
                         
                         # Measure queue put time
                         with measure_operation(self.performance_queue, stream_id, "queue_put"):
-                            try:
-                                self.shared_queue.put_nowait(frame_data)
+                            # A large frame may evict several older ones
+                            dropped = self.shared_queue.put(frame_data)
+                            for dropped_data in dropped:
+                                release_frame(dropped_data.frame, self.frame_ring)
+                            if not any(data is frame_data for data in dropped):
                                 self.frame_count += 1
                                 self.processed_frames.value += 1
-                            except Full:
-                                self.drop_frames.value += 1
+                            self.drop_frames.value += len(dropped)
                 else:
                     self.drop_frames.value += 1
                     
@@ -0,0 +1,109 @@
+import multiprocessing as mp
+import time
+from queue import Empty, Full
+from typing import Any, Dict, Iterable, List, Optional
+
+
+class LatestFrameMailbox:
+    """
+    One single-slot mailbox per stream that always holds that stream's newest frame
+
+    A FIFO queue hands inference whatever backlog built up while it was busy,
+    so under load every detection describes the past. Here each put()
+    replaces the stream's unread frame, so a consumer never sees more than one
+    frame per stream and that frame is always the most recent one. get()
+    visits streams round-robin, so a batch collects the latest frame of every
+    stream that has one.
+
+    Drop-in for ByteBudgetQueue on the frame path: put() returns the frames it
+    superseded so the caller can release their ring slots and count them.
+    """
+
+    def __init__(self, stream_ids: Iterable[str]) -> None:
+        """
+        Args:
+            stream_ids: Streams that will deliver frames
+        """
+        self._slots: Dict[str, mp.Queue] = {stream_id: mp.Queue(maxsize=1) for stream_id in stream_ids}
+        if not self._slots:
+            raise ValueError("Mailbox needs at least one stream")
+        self._order: List[str] = list(self._slots)
+        self._next = 0
+        self._superseded = mp.Value("q", 0)
+
+    def put(self, item: Any, stream_id: Optional[str] = None) -> List[Any]:
+        """
+        Replace the stream's unread frame with a new one
+
+        Args:
+            item: Frame to deliver (anything with a stream_id attribute)
+            stream_id: Stream to deliver to, defaults to item.stream_id
+
+        Returns:
+            The superseded frames - normally zero or one; [item] itself in the
+            rare case the slot could not be cleared in time
+        """
+        slot = self._slots[stream_id or item.stream_id]
+        superseded: List[Any] = []
+        for _ in range(3):
+            try:
+                slot.put_nowait(item)
+                break
+            except Full:
+                try:
+                    # The unread frame may still be in the pipe, wait briefly for it
+                    superseded.append(slot.get(timeout=0.005))
+                except Empty:
+                    pass  # Consumer took it in the meantime
+        else:
+            superseded.append(item)
+
+        if superseded:
+            with self._superseded.get_lock():
+                self._superseded.value += len(superseded)
+        return superseded
+
+    def get(self, block: bool = True, timeout: Optional[float] = None) -> Any:
+        """Newest frame of the next stream that has one, raising Empty like queue.Queue"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            for _ in range(len(self._order)):
+                stream_id = self._order[self._next]
+                self._next = (self._next + 1) % len(self._order)
+                try:
+                    return self._slots[stream_id].get_nowait()
+                except Empty:
+                    continue
+            if not block or (deadline is not None and time.monotonic() >= deadline):
+                raise Empty
+            time.sleep(0.001)
+
+    def get_nowait(self) -> Any:
+        return self.get(block=False)
+
+    def empty(self) -> bool:
+        return all(slot.empty() for slot in self._slots.values())
+
+    def full(self) -> bool:
+        """Never full - new frames replace unread ones"""
+        return False
+
+    def qsize(self) -> int:
+        return sum(0 if slot.empty() else 1 for slot in self._slots.values())
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Snapshot in the same shape as ByteBudgetQueue.stats() for the monitor
+
+        Frames live in the ring buffer, so no bytes are reported, and the
+        high-water mark is the capacity of one frame per stream.
+        """
+        items = self.qsize()
+        return {
+            "items": items,
+            "bytes": 0,
+            "high_water_items": len(self._slots),
+            "high_water_bytes": 0,
+            "max_bytes": 0,
+            "dropped": self._superseded.value,
+        }
@@ -0,0 +1,153 @@
+import multiprocessing as mp
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Optional, Tuple
+
+import numpy as np
+from numpy.typing import NDArray
+
+
+@dataclass(frozen=True)
+class SharedFrame:
+    """Reference to a frame stored in a FrameRingBuffer slot - this is what crosses the queues"""
+    slot: int
+    shape: Tuple[int, ...]
+    dtype: str = "uint8"
+
+    @property
+    def nbytes(self) -> int:
+        return int(np.prod(self.shape)) * np.dtype(self.dtype).itemsize
+
+
+class FrameRingBuffer:
+    """
+    Fixed-size frame slots in one shared memory block, reused by reference count
+
+    Pickling a 1080p BGR frame through an mp.Queue copies ~6MB three times
+    (pickle, pipe, unpickle). With the ring the producer copies the decoded
+    frame once into a free slot and only a SharedFrame (slot index, shape,
+    dtype) is queued; consumers read the pixels in place.
+
+    Every slot carries a reference count in shared memory:
+    - acquire() hands out a free slot with count 1, owned by the producer
+    - ownership travels with the SharedFrame; whoever passes the frame to
+      more than one consumer calls retain() once per extra consumer
+    - each consumer calls release() when done; at 0 the slot is free again
+
+    A slot is only rewritten after every holder has released it, so views
+    returned by view() stay valid until the caller's own release().
+    """
+
+    def __init__(self, num_slots: int, slot_bytes: int) -> None:
+        """
+        Args:
+            num_slots: Number of frame slots
+            slot_bytes: Capacity of each slot; larger frames cannot use the ring
+        """
+        if num_slots < 1 or slot_bytes < 1:
+            raise ValueError("Ring buffer needs at least one non-empty slot")
+
+        self.num_slots = num_slots
+        self.slot_bytes = slot_bytes
+        self._shm = shared_memory.SharedMemory(create=True, size=num_slots * slot_bytes)
+        self._owner = True
+        # Reference counts and the search cursor share the lock of _refcounts
+        self._refcounts = mp.Array("i", num_slots)
+        self._cursor = mp.Value("i", 0, lock=False)
+
+    def __getstate__(self) -> dict:
+        # Child processes attach to the same block but never unlink it
+        state = self.__dict__.copy()
+        state["_owner"] = False
+        return state
+
+    def fits(self, frame: NDArray) -> bool:
+        return frame.nbytes <= self.slot_bytes
+
+    def acquire(self) -> Optional[int]:
+        """
+        Reserve a free slot for writing.
+
+        Returns:
+            Slot index with a reference count of 1, or None if every slot is in use
+        """
+        with self._refcounts.get_lock():
+            start = self._cursor.value
+            for offset in range(self.num_slots):
+                slot = (start + offset) % self.num_slots
+                if self._refcounts[slot] == 0:
+                    self._refcounts[slot] = 1
+                    self._cursor.value = (slot + 1) % self.num_slots
+                    return slot
+        return None
+
+    def write(self, slot: int, frame: NDArray) -> SharedFrame:
+        """Copy a frame into an acquired slot and return its reference"""
+        if not self.fits(frame):
+            raise ValueError(f"Frame of {frame.nbytes} bytes exceeds slot size {self.slot_bytes}")
+        ref = SharedFrame(slot=slot, shape=tuple(frame.shape), dtype=frame.dtype.str)
+        np.copyto(self._array(ref), frame)
+        return ref
+
+    def put(self, frame: NDArray) -> Optional[SharedFrame]:
+        """
+        Acquire a slot and copy a frame into it.
+
+        Returns:
+            The frame reference, or None if the frame is too large or no slot is free
+        """
+        if not self.fits(frame):
+            return None
+        slot = self.acquire()
+        if slot is None:
+            return None
+        return self.write(slot, frame)
+
+    def view(self, ref: SharedFrame) -> NDArray:
+        """Zero-copy array over a slot; valid until the caller releases it"""
+        return self._array(ref)
+
+    def retain(self, ref: SharedFrame, count: int = 1) -> None:
+        """Add references for additional consumers of a frame"""
+        with self._refcounts.get_lock():
+            if self._refcounts[ref.slot] <= 0:
+                raise ValueError(f"Slot {ref.slot} is not in use")
+            self._refcounts[ref.slot] += count
+
+    def release(self, ref: SharedFrame) -> None:
+        """Drop one reference; the slot is reused once all are released"""
+        with self._refcounts.get_lock():
+            if self._refcounts[ref.slot] > 0:
+                self._refcounts[ref.slot] -= 1
+
+    def in_use(self) -> int:
+        """Number of slots currently holding a frame"""
+        with self._refcounts.get_lock():
+            return sum(1 for count in self._refcounts if count > 0)
+
+    def close(self) -> None:
+        """Detach from the block; the creating process also frees it"""
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+    def _array(self, ref: SharedFrame) -> NDArray:
+        return np.ndarray(
+            ref.shape,
+            dtype=np.dtype(ref.dtype),
+            buffer=self._shm.buf,
+            offset=ref.slot * self.slot_bytes,
+        )
+
+
+def resolve_frame(frame, ring: Optional[FrameRingBuffer]) -> NDArray:
+    """Pixels of a queued frame, whether it travelled inline or through the ring"""
+    if isinstance(frame, SharedFrame):
+        return ring.view(frame)
+    return frame
+
+
+def release_frame(frame, ring: Optional[FrameRingBuffer]) -> None:
+    """Release a queued frame's slot; inline frames need no cleanup"""
+    if isinstance(frame, SharedFrame):
+        ring.release(frame)
@@ -3,41 +3,73 @@ from queue import Queue, Empty
 import os
 import time
 import logging
-from typing import Dict, Optional, List, TypedDict
+from dataclasses import replace
+from typing import Dict, Optional, List, Tuple, TypedDict, Union
 import cv2
 import numpy as np
+import torch
 from numpy.typing import NDArray
-from performanceMonitor import MultiProcessMonitor
-from frameGrabber import FrameGrabber
+from performanceMonitor import MultiProcessMonitor, SharedTimingMetrics
+from byteBudgetQueue import ByteBudgetQueue
+from frameRingBuffer import FrameRingBuffer, resolve_frame, release_frame
+from frameGrabber import FrameGrabber, StreamConfig
+from frameMailbox import LatestFrameMailbox
 from yoloProcessor import YOLOProcessor, Detection
 from visualizer import DetectionVisualizer
 from faceDetector.faceDetectorManager import FaceDetectorManager, ProcessedFrame
 
+# Queue budgets in payload bytes - a 1080p BGR frame is ~6MB, a 4K one ~25MB
+FRAME_QUEUE_MAX_BYTES = 512 * 1024 ** 2
+RESULT_QUEUE_MAX_BYTES = 256 * 1024 ** 2
+
+# Shared-memory frame slots; frames up to 1080p BGR travel as slot references,
+# larger ones fall back to being pickled through the frame queue
+FRAME_SLOT_BYTES = 1920 * 1080 * 3
+FRAME_RING_SLOTS = 64
+
+# "latest": inference always gets each stream's newest frame (single-slot mailbox)
+# "queue": every grabbed frame is queued in order within the byte budget
+FRAME_DELIVERY = "latest"
+
+# Frames with people are batched for the face pipeline: a batch is sent once
+# it is full or its oldest frame has waited this long
+FACE_BATCH_SIZE = 16
+FACE_BATCH_MAX_WAIT = 0.1
+FACE_MAX_PENDING = 4 * FACE_BATCH_SIZE
+
 
 def get_frames_with_people(results: list[ProcessedFrame]) -> tuple[list[ProcessedFrame], list[ProcessedFrame]]:
     leftover: list[ProcessedFrame] = []
     frames_with_people: list[ProcessedFrame] = []
     for result in results:
-        if "person" in [detection.get("class_name") for detection in result.get("detections")]:
+        if "person" in [detection.class_name for detection in result.detections]:
             frames_with_people.append(result)
         else:
             leftover.append(result)
     return frames_with_people, leftover
 
 
-def create_shared_values() -> (
+def create_shared_values(stream_ids: List[str]) -> (
     Tuple[
-        mp.Queue, mp.Queue, mp.Queue, mp.Queue, mp.Value, mp.Value, mp.Value, mp.Value
+        Union[ByteBudgetQueue, LatestFrameMailbox], ByteBudgetQueue, SharedTimingMetrics, mp.Queue, mp.Value, mp.Value, mp.Value, mp.Value,
+        FrameRingBuffer
     ]
 ):
-    frame_queue = mp.Queue(maxsize=120)
-    result_queue = mp.Queue(maxsize=120)
-    performance_queue = mp.Queue()
+    # Stale frames are worth less than fresh ones, so the grabber evicts the
+    # oldest; results are already paid for, so the processor's newest are dropped
+    if FRAME_DELIVERY == "latest":
+        frame_queue = LatestFrameMailbox(stream_ids)
+    else:
+        frame_queue = ByteBudgetQueue(max_bytes=FRAME_QUEUE_MAX_BYTES, drop_policy="drop_oldest")
+    result_queue = ByteBudgetQueue(max_bytes=RESULT_QUEUE_MAX_BYTES, drop_policy="drop_newest")
+    # Timings are recorded into shared memory rather than sent per operation
+    performance_queue = SharedTimingMetrics()
     logging_queue = mp.Queue()
     grabber_drop_frames = mp.Value("i", 0)
     grabber_processed_frames = mp.Value("i", 0)
     processor_drop_frames = mp.Value("i", 0)
     processor_processed_frames = mp.Value("i", 0)
+    frame_ring = FrameRingBuffer(num_slots=FRAME_RING_SLOTS, slot_bytes=FRAME_SLOT_BYTES)
     return (
         frame_queue,
         result_queue,
@@ -47,20 +79,22 @@ def create_shared_values() -> (
         grabber_processed_frames,
         processor_drop_frames,
         processor_processed_frames,
+        frame_ring,
     )
 
 
 def start_services(
-    stream_configs: Dict[str, str],
-    performance_queue: mp.Queue,
+    stream_configs: Dict[str, Union[str, StreamConfig]],
+    performance_queue: SharedTimingMetrics,
     logging_queue: mp.Queue,
-    frame_queue: mp.Queue,
-    result_queue: mp.Queue,
+    frame_queue: Union[ByteBudgetQueue, LatestFrameMailbox],
+    result_queue: ByteBudgetQueue,
     grabber_processed_frames: mp.Value,
     grabber_drop_frames: mp.Value,
     processor_processed_frames: mp.Value,
     processor_drop_frames: mp.Value,
     general_yolo_model_path: str,
+    frame_ring: Optional[FrameRingBuffer] = None,
 ) -> Tuple[FrameGrabber, MultiProcessMonitor, YOLOProcessor, DetectionVisualizer]:
     # Initialize performance monitoring
     multi_process_monitor = MultiProcessMonitor(
@@ -70,6 +104,7 @@ def start_services(
         grabber_drop_frames=grabber_drop_frames,
         processor_processed_frames=processor_processed_frames,
         processor_drop_frames=processor_drop_frames,
+        queues={"frames": frame_queue, "results": result_queue},
         log_interval=5.0,
     )
 
@@ -81,6 +116,7 @@ def start_services(
         logging_queue=logging_queue,
         processed_frames=grabber_processed_frames,
         drop_frames=grabber_drop_frames,
+        frame_ring=frame_ring,
     )
 
     # Initialize YOLO processors
@@ -93,6 +129,7 @@ def start_services(
         processed_frames=processor_processed_frames,
         drop_frames=processor_drop_frames,
         memory_fraction=0.6,
+        frame_ring=frame_ring,
     )
 
     # Initialize detection visualizer
@@ -109,6 +146,9 @@ def main() -> None:
     # Setup logging first, before any other operations
     logger = logging.getLogger(__name__)
 
+    # Cleanup skips whatever startup didn't get to create
+    grabber = multi_process_monitor = processor = visualizer = None
+    face_manager = frame_ring = None
     try:
         # Initialize paths and configs
         BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -119,7 +159,12 @@ def main() -> None:
             BASE_DIR, "yoloModels", "face", "yolov11m-face.pt"
         )
         stream_configs = {
-            "test camera": "udp://192.168.95.234:9000?fifo_size=50000000&overrun_nonfatal=1&flags=low_delay&fflags=nobuffer&probesize=32&analyzeduration=0",  # UDP stream configuration
+            "test camera": StreamConfig(
+                url="udp://192.168.95.234:9000?fifo_size=50000000&overrun_nonfatal=1&flags=low_delay&fflags=nobuffer&probesize=32&analyzeduration=0",  # UDP stream configuration
+                target_fps=15,
+                decode_width=1280,
+                decode_height=720,
+            ),
         }
 
         # Create shared queues
@@ -132,7 +177,8 @@ def main() -> None:
             grabber_processed_frames,
             processor_drop_frames,
             processor_processed_frames,
-        ) = create_shared_values()
+            frame_ring,
+        ) = create_shared_values(list(stream_configs))
         grabber, multi_process_monitor, processor, visualizer = start_services(
             stream_configs,
             performance_queue,
@@ -144,8 +190,17 @@ def main() -> None:
             processor_processed_frames,
             processor_drop_frames,
             GENERAL_YOLO_MODEL_PATH,
-            FACE_YOLO_MODEL_PATH,
+            frame_ring=frame_ring,
+        )
+
+        face_manager = FaceDetectorManager(
+            model_path=FACE_YOLO_MODEL_PATH,
+            initial_workers=1,
+            device="cuda" if torch.cuda.is_available() else "cpu",
+            performance_queue=performance_queue,
         )
+        pending_faces: List[ProcessedFrame] = []
+        pending_since = 0.0
 
         logger.info("System running. Press 'q' to stop.")
 
@@ -159,17 +214,44 @@ def main() -> None:
             if multi_process_monitor.should_log():
                 multi_process_monitor.log_metrics()
 
+            for faces in face_manager.get_results():
+                if faces:
+                    logger.debug(f"{faces[0].stream_id} frame {faces[0].frame_id}: {len(faces)} faces")
+
             try:
                 # Get results with timeout to allow for keyboard interrupt
-                result: list[ProcessedFrame] = result_queue.get(timeout=0.1)
-                if isinstance(result, list):
-                    frames_with_people, leftover = get_frames_with_people(result)
-                    detections = FaceDetectorManager.process_frames_sync(frames_with_people)
+                result: ProcessedFrame = result_queue.get(timeout=0.1)
+            except Empty:
+                result = None
+
+            if result is not None:
+                received = result if isinstance(result, list) else [result]
+                try:
+                    frames_with_people, leftover = get_frames_with_people(received)
+                    # Copy out of the ring - face batches outlive this iteration
+                    pending_faces.extend(
+                        replace(frame, frame=resolve_frame(frame.frame, frame_ring).copy())
+                        for frame in frames_with_people
+                    )
                     #visualizer.update(frames_with_people)
-                        # Send frames to face detection manager
+                finally:
+                    # Last consumer of these frames - free their slots for the grabber
+                    for frame in received:
+                        release_frame(frame.frame, frame_ring)
 
-            except Empty:
-                continue
+            # Send frames to face detection manager in batches
+            if pending_faces and not pending_since:
+                pending_since = time.monotonic()
+            if pending_faces and (
+                len(pending_faces) >= FACE_BATCH_SIZE
+                or time.monotonic() - pending_since >= FACE_BATCH_MAX_WAIT
+            ):
+                if face_manager.add_frames(pending_faces[:FACE_BATCH_SIZE]):
+                    pending_faces = pending_faces[FACE_BATCH_SIZE:]
+                    pending_since = time.monotonic() if pending_faces else 0.0
+                elif len(pending_faces) > FACE_MAX_PENDING:
+                    # All face workers busy - keep only the newest frames
+                    del pending_faces[:len(pending_faces) - FACE_MAX_PENDING]
 
     except KeyboardInterrupt:
         logger.info("\nShutdown signal received")
@@ -183,10 +265,18 @@ def main() -> None:
     finally:
         # Cleanup
         logger.info("Stopping system components...")
-        visualizer.cleanup()
-        grabber.stop()
-        processor.stop()
-        multi_process_monitor.stop()
+        if visualizer:
+            visualizer.cleanup()
+        if grabber:
+            grabber.stop()
+        if processor:
+            processor.stop()
+        if multi_process_monitor:
+            multi_process_monitor.stop()
+        if face_manager:
+            face_manager.shutdown()
+        if frame_ring:
+            frame_ring.close()
         logger.info("Shutdown complete")
 
 
@@ -1,13 +1,46 @@
 from dataclasses import dataclass, field
-from typing import Dict, Any, Optional, Callable, DefaultDict, Literal
+from typing import Dict, Any, Deque, List, Optional, Callable, DefaultDict, Literal, Tuple, Union
 from contextlib import contextmanager
+import math
+import os
 import time
 import logging
-from queue import Queue
+from queue import Queue, Empty
 import threading
-from collections import defaultdict
+from collections import defaultdict, deque
 import functools
 import multiprocessing as mp
+import numpy as np
+from numpy.typing import NDArray
+
+# Log-spaced duration buckets shared by every process: bucket i holds durations
+# in (BUCKET_BASE * BUCKET_GROWTH**i, BUCKET_BASE * BUCKET_GROWTH**(i+1)], the
+# first also takes anything shorter and the last anything longer.
+# 10us * 2**(96/4) covers up to ~168s at ~19% resolution.
+BUCKET_BASE = 1e-5
+BUCKET_GROWTH = 2 ** 0.25
+NUM_BUCKETS = 96
+_LOG_GROWTH = math.log(BUCKET_GROWTH)
+
+
+def bucket_index(duration: float) -> int:
+    """Index of the log bucket holding a duration in seconds"""
+    if duration <= BUCKET_BASE:
+        return 0
+    return min(NUM_BUCKETS - 1, int(math.log(duration / BUCKET_BASE) / _LOG_GROWTH))
+
+
+def bucket_bounds(index: int) -> Tuple[float, float]:
+    """Lower and upper duration bound of a bucket in seconds"""
+    lower = 0.0 if index == 0 else BUCKET_BASE * BUCKET_GROWTH ** index
+    return lower, BUCKET_BASE * BUCKET_GROWTH ** (index + 1)
+
+
+# Percentiles reported by TimingStats.percentiles(), as (label, quantile)
+PERCENTILES = (("p50", 0.50), ("p90", 0.90), ("p99", 0.99), ("p999", 0.999))
+
+# Rolling windows kept by MultiProcessMonitor, in seconds
+ROLLING_WINDOWS = {"1m": 60.0, "5m": 300.0}
 
 
 @dataclass
@@ -16,18 +49,23 @@ class TimingStats:
     A dataclass for tracking timing statistics of operations.
 
     This class maintains running statistics for timing measurements including total time,
-    count of measurements, maximum and minimum values.
+    count of measurements, maximum and minimum values, and a fixed log-bucket
+    histogram (the same buckets SharedTimingMetrics uses) for percentiles.
+    Bucketed stats merge exactly, so per-process or per-interval stats can be
+    combined into one distribution.
 
     Attributes:
         total (float): The sum of all timing measurements.
         count (int): The number of measurements taken.
         max (float): The maximum timing value recorded.
         min (float): The minimum timing value recorded (initialized to infinity).
+        buckets (NDArray[np.int64]): Measurements per log bucket.
     """
     total: float = 0.0
     count: int = 0
     max: float = 0.0
     min: float = field(default=float("inf"))
+    buckets: NDArray[np.int64] = field(default_factory=lambda: np.zeros(NUM_BUCKETS, dtype=np.int64), repr=False)
 
     def update(self, value: float) -> None:
         """
@@ -40,6 +78,93 @@ class TimingStats:
         self.count += 1
         self.max = max(self.max, value)
         self.min = min(self.min, value)
+        self.buckets[bucket_index(value)] += 1
+
+    def add_buckets(self, counts: NDArray[np.int64], total: float) -> None:
+        """
+        Merge measurements aggregated into log buckets.
+
+        Min and max are only known to bucket resolution (~19%) here.
+
+        Args:
+            counts (NDArray[np.int64]): Measurements per bucket.
+            total (float): Sum of the measurements in seconds.
+        """
+        occupied = np.flatnonzero(counts)
+        if not len(occupied):
+            return
+        self.total += total
+        self.count += int(counts.sum())
+        self.max = max(self.max, bucket_bounds(int(occupied[-1]))[1])
+        self.min = min(self.min, bucket_bounds(int(occupied[0]))[0])
+        self.buckets += counts
+
+    def merge(self, other: "TimingStats") -> None:
+        """
+        Add another set of statistics into this one.
+
+        Args:
+            other (TimingStats): Statistics to merge, e.g. from another interval or process.
+        """
+        self.total += other.total
+        self.count += other.count
+        self.max = max(self.max, other.max)
+        self.min = min(self.min, other.min)
+        self.buckets += other.buckets
+
+    def percentile(self, quantile: float) -> float:
+        """
+        Estimate a percentile from the log buckets.
+
+        Interpolates log-linearly within the bucket holding the rank and clamps
+        to the observed min/max, so the error is bounded by the ~19% bucket width.
+
+        Args:
+            quantile (float): Quantile between 0 and 1, e.g. 0.99.
+
+        Returns:
+            float: The estimated value in seconds. Returns 0.0 if no measurements have been taken.
+        """
+        if self.count == 0:
+            return 0.0
+        rank = quantile * self.count
+        cumulative = np.cumsum(self.buckets)
+        index = min(int(np.searchsorted(cumulative, rank)), NUM_BUCKETS - 1)
+        below = int(cumulative[index - 1]) if index > 0 else 0
+        in_bucket = int(self.buckets[index])
+        fraction = (rank - below) / in_bucket if in_bucket else 1.0
+        lower, upper = bucket_bounds(index)
+        if lower > 0:
+            value = lower * (upper / lower) ** fraction
+        else:
+            value = upper * fraction
+        return min(max(value, self.min), self.max)
+
+    def percentiles(self) -> Dict[str, float]:
+        """
+        Standard percentiles of the recorded timings.
+
+        Returns:
+            Dict[str, float]: p50, p90, p99 and p999 in seconds.
+        """
+        return {label: self.percentile(quantile) for label, quantile in PERCENTILES}
+
+    def to_dict(self) -> Dict[str, float]:
+        """
+        Machine-readable summary in milliseconds.
+
+        Returns:
+            Dict[str, float]: count, mean, min, max and percentiles (all times in ms).
+        """
+        summary = {
+            "count": self.count,
+            "mean_ms": self.average * 1000,
+            "min_ms": (self.min if self.count else 0.0) * 1000,
+            "max_ms": self.max * 1000,
+        }
+        for label, value in self.percentiles().items():
+            summary[f"{label}_ms"] = value * 1000
+        return summary
 
     def reset(self) -> None:
         """Reset all statistics to their initial values."""
@@ -64,15 +189,146 @@ def create_timing_stats() -> Dict[str, TimingStats]:
     return defaultdict(TimingStats)
 
 
+class SharedTimingMetrics:
+    """
+    Operation timings recorded straight into shared memory.
+
+    Sending one (stream_id, operation, duration) message per timed operation
+    costs a pickle and a pipe write in the hot path, and at high fps the
+    monitor falls behind draining them. Here every thread gets its own slots
+    - one per (stream_id, operation) it measures - in fixed-size shared
+    arrays of log-bucket counts and duration sums. Recording is two array
+    increments with no lock and no pickling; the monitor reads all slots and
+    merges slots with the same name across threads and processes.
+
+    A slot is allocated (under a lock) the first time a thread measures a
+    (stream_id, operation) pair; after that the thread is its only writer,
+    so the unlocked increments cannot lose updates even when several threads
+    of one process time the same pair. When all slots are taken further new
+    pairs are counted as overflow.
+
+    Attributes:
+        max_series (int): Number of slots across all processes.
+    """
+
+    NAME_BYTES = 64
+    _SEPARATOR = "\x1f"
+
+    def __init__(self, max_series: int = 512) -> None:
+        self.max_series = max_series
+        self._names = mp.RawArray("c", max_series * self.NAME_BYTES)
+        self._counts = mp.RawArray("q", max_series * NUM_BUCKETS)
+        self._sums = mp.RawArray("d", max_series)
+        self._allocated = mp.Value("i", 0)
+        self._overflow = mp.Value("q", 0)
+        self._init_local()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        for key in ("_local", "_counts_view", "_sums_view", "_pid"):
+            state.pop(key)
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._init_local()
+
+    def _init_local(self) -> None:
+        """Per-process state: per-thread slot caches and numpy views over the shared arrays."""
+        self._pid = os.getpid()
+        self._local = threading.local()
+        self._counts_view = np.frombuffer(self._counts, dtype=np.int64).reshape(self.max_series, NUM_BUCKETS)
+        self._sums_view = np.frombuffer(self._sums, dtype=np.float64)
+
+    def record(self, stream_id: str, operation: str, duration: float) -> None:
+        """
+        Record one measurement.
+
+        Args:
+            stream_id (str): Stream or component the operation belongs to.
+            operation (str): Operation name.
+            duration (float): Duration in seconds.
+        """
+        if self._pid != os.getpid():
+            # Forked child: slots cached by the parent belong to the parent
+            self._init_local()
+        slots: Optional[Dict[Tuple[str, str], Optional[int]]] = getattr(self._local, "slots", None)
+        if slots is None:
+            slots = self._local.slots = {}
+        key = (stream_id, operation)
+        slot = slots.get(key, -1)
+        if slot == -1:
+            slot = slots[key] = self._allocate(key)
+        if slot is None:
+            with self._overflow.get_lock():
+                self._overflow.value += 1
+            return
+        # Plain ctypes indexing: ~3x cheaper than numpy scalar access
+        self._counts[slot * NUM_BUCKETS + bucket_index(duration)] += 1
+        self._sums[slot] += duration
+
+    def snapshot(self) -> Dict[Tuple[str, str], Tuple[NDArray[np.int64], float]]:
+        """
+        Cumulative bucket counts and duration sum per (stream_id, operation).
+
+        Returns:
+            Dict mapping (stream_id, operation) to (bucket counts, total seconds),
+            merged across all threads and processes that measured it.
+        """
+        allocated = self._allocated.value
+        counts = self._counts_view[:allocated].copy()
+        sums = self._sums_view[:allocated].copy()
+        merged: Dict[Tuple[str, str], Tuple[NDArray[np.int64], float]] = {}
+        for slot in range(allocated):
+            key = self._name(slot)
+            if key in merged:
+                previous_counts, previous_sum = merged[key]
+                merged[key] = (previous_counts + counts[slot], previous_sum + float(sums[slot]))
+            else:
+                merged[key] = (counts[slot], float(sums[slot]))
+        return merged
+
+    @property
+    def overflow(self) -> int:
+        """Measurements dropped because no slot was free."""
+        return self._overflow.value
+
+    def _allocate(self, key: Tuple[str, str]) -> Optional[int]:
+        encoded = self._SEPARATOR.join(key).encode()[:self.NAME_BYTES]
+        with self._allocated.get_lock():
+            slot = self._allocated.value
+            if slot >= self.max_series:
+                return None
+            start = slot * self.NAME_BYTES
+            self._names[start:start + len(encoded)] = encoded
+            # Publish the slot only once its name is written
+            self._allocated.value = slot + 1
+        return slot
+
+    def _name(self, slot: int) -> Tuple[str, str]:
+        start = slot * self.NAME_BYTES
+        raw = self._names[start:start + self.NAME_BYTES].rstrip(b"\0")
+        stream_id, _, operation = raw.decode(errors="replace").partition(self._SEPARATOR)
+        return stream_id, operation
+
+
 @contextmanager
-def measure_operation(queue: mp.Queue, stream_id: str, operation: str):
-    """Standalone context manager for measuring operation duration"""
-    start = time.time()
+def measure_operation(queue: Union[mp.Queue, SharedTimingMetrics], stream_id: str, operation: str):
+    """
+    Standalone context manager for measuring operation duration
+
+    Records into shared memory when given SharedTimingMetrics, otherwise sends
+    a (stream_id, operation, duration) message on the queue.
+    """
+    start = time.perf_counter()
     try:
         yield
     finally:
-        duration = time.time() - start
-        queue.put((stream_id, operation, duration))
+        duration = time.perf_counter() - start
+        if isinstance(queue, SharedTimingMetrics):
+            queue.record(stream_id, operation, duration)
+        else:
+            queue.put((stream_id, operation, duration))
 
 
 class MultiProcessMonitor:
@@ -89,28 +345,34 @@ class MultiProcessMonitor:
         metrics (DefaultDict[str, Dict[str, TimingStats]]): Nested dictionary storing
             timing statistics for each stream and operation.
         logger (logging.Logger): Logger instance for output.
-        _metrics_lock (threading.Lock): Thread lock for safe metrics access.
-        performance_queue (mp.Queue): Queue for receiving performance metrics.
+        _metrics_lock (threading.RLock): Thread lock for safe metrics access.
+        _history (Deque): (end time, per-interval metrics) of past intervals, kept
+            for the longest rolling window.
+        performance_queue (Union[mp.Queue, SharedTimingMetrics]): Queue for receiving
+            performance metrics, or the shared-memory timings to aggregate.
         logging_queue (mp.Queue): Queue for receiving logging messages.
         frame_counters (Dict): Dictionary containing all frame-related counters.
+        queues (Dict): Named byte-bounded queues whose usage is reported with the metrics.
         last_log_time (float): Timestamp of the last logging event.
     """
 
     def __init__(
         self,
-        performance_queue: mp.Queue,
+        performance_queue: Union[mp.Queue, SharedTimingMetrics],
         logging_queue: mp.Queue,
         grabber_processed_frames: mp.Value,
         grabber_drop_frames: mp.Value,
         processor_processed_frames: mp.Value,
         processor_drop_frames: mp.Value,
+        queues: Optional[Dict[str, Any]] = None,
         log_interval: float = 5.0,
     ) -> None:
         """Initialize the MultiProcessMonitor."""
         self.log_interval = log_interval
         self.metrics = defaultdict(lambda: defaultdict(TimingStats))
         self.logger = logging.getLogger(__name__)
-        self._metrics_lock = threading.Lock()
+        self._metrics_lock = threading.RLock()
+        self._history: Deque[Tuple[float, Dict[str, Dict[str, TimingStats]]]] = deque()
         
         # Store queues and counters
         self.performance_queue = performance_queue
@@ -119,6 +381,9 @@ class MultiProcessMonitor:
             'grabber': {'processed': grabber_processed_frames, 'dropped': grabber_drop_frames},
             'processor': {'processed': processor_processed_frames, 'dropped': processor_drop_frames}
         }
+        self.queues = queues or {}
+        # Cumulative shared-memory snapshot already merged into self.metrics
+        self._last_snapshot: Dict[Tuple[str, str], Tuple[NDArray[np.int64], float]] = {}
         self.last_log_time = time.time()
 
     def process_queues(self) -> None:
@@ -128,16 +393,19 @@ class MultiProcessMonitor:
         This method processes performance metrics and logging messages from their
         respective queues in a non-blocking manner. Performance metrics are added
         to the running statistics, and logging messages are output through the
-        logger.
+        logger. Shared-memory timings are merged from a snapshot instead.
         """
-        # Process all items in the performance queue
-        while not self.performance_queue.empty():
-            try:
-                stream_id, operation, duration = self.performance_queue.get_nowait()
-                with self._metrics_lock:
-                    self.metrics[stream_id][operation].update(duration)
-            except Empty:
-                break
+        if isinstance(self.performance_queue, SharedTimingMetrics):
+            self._collect_shared_timings()
+        else:
+            # Process all items in the performance queue
+            while not self.performance_queue.empty():
+                try:
+                    stream_id, operation, duration = self.performance_queue.get_nowait()
+                    with self._metrics_lock:
+                        self.metrics[stream_id][operation].update(duration)
+                except Empty:
+                    break
             
         # Process all items in the logging queue
         while not self.logging_queue.empty():
@@ -150,6 +418,17 @@ class MultiProcessMonitor:
             except Empty:
                 break
 
+    def _collect_shared_timings(self) -> None:
+        """Merge what was recorded in shared memory since the last collection."""
+        snapshot = self.performance_queue.snapshot()
+        with self._metrics_lock:
+            for (stream_id, operation), (counts, total) in snapshot.items():
+                previous = self._last_snapshot.get((stream_id, operation))
+                if previous is not None:
+                    counts, total = counts - previous[0], total - previous[1]
+                self.metrics[stream_id][operation].add_buckets(counts, total)
+        self._last_snapshot = snapshot
+
     def should_log(self) -> bool:
         """
         Check if enough time has elapsed to log metrics.
@@ -159,40 +438,136 @@ class MultiProcessMonitor:
         """
         return time.time() - self.last_log_time >= self.log_interval
 
+    def window_metrics(self, window: float) -> Dict[str, Dict[str, TimingStats]]:
+        """
+        Merge the timing statistics of the last `window` seconds.
+
+        Windows are built from whole log intervals plus the current one, so
+        their edges move in steps of log_interval.
+
+        Args:
+            window (float): Window length in seconds.
+
+        Returns:
+            Dict[str, Dict[str, TimingStats]]: Merged statistics per stream and operation.
+        """
+        cutoff = time.time() - window
+        merged: Dict[str, Dict[str, TimingStats]] = defaultdict(lambda: defaultdict(TimingStats))
+        with self._metrics_lock:
+            intervals = [metrics for end, metrics in self._history if end > cutoff]
+            intervals.append(self.metrics)
+            for metrics in intervals:
+                for stream_id, operations in metrics.items():
+                    for op_name, stats in operations.items():
+                        merged[stream_id][op_name].merge(stats)
+        return merged
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Machine-readable view of the current metrics.
+
+        Returns:
+            Dict[str, Any]: Timing summaries (see TimingStats.to_dict) per window
+            ("interval" plus the rolling windows), stream and operation, along
+            with frame counters and queue usage.
+        """
+        with self._metrics_lock:
+            windows = {"interval": self.metrics}
+            windows.update({name: self.window_metrics(seconds) for name, seconds in ROLLING_WINDOWS.items()})
+            timings = {
+                name: {
+                    stream_id: {op_name: stats.to_dict() for op_name, stats in operations.items() if stats.count}
+                    for stream_id, operations in metrics.items()
+                }
+                for name, metrics in windows.items()
+            }
+        return {
+            "timestamp": time.time(),
+            "timings": timings,
+            "frames": {
+                component: {name: counter.value for name, counter in counters.items()}
+                for component, counters in self.frame_counters.items()
+            },
+            "queues": {name: queue.stats() for name, queue in self.queues.items()},
+        }
+
     def log_metrics(self) -> None:
         """
         Log the current performance metrics for all streams.
 
         Generates and logs a formatted report of all timing statistics, including
-        average, minimum, and maximum times for each operation within each stream.
-        The report is both printed to stdout and logged through the logger.
+        count, average, percentiles and maximum for each operation within each
+        stream over the last interval, plus p99 over the rolling windows. The
+        report is both printed to stdout and logged through the logger.
         """
         with self._metrics_lock:
+            rolling = {name: self.window_metrics(seconds) for name, seconds in ROLLING_WINDOWS.items()}
             for stream_id, operations in self.metrics.items():
                 report = [
-                    "\n" + "=" * 50,
+                    "\n" + "=" * 100,
                     f"Stream: {stream_id}",
-                    "=" * 50,
+                    "=" * 100,
                     "\nOperation Timings (ms):",
-                    f"{'Operation':<20} {'Average':>10} {'Min':>10} {'Max':>10}",
-                    "-" * 50
+                    f"{'Operation':<20} {'Count':>7} {'Average':>8} {'p50':>8} {'p90':>8} {'p99':>8} "
+                    f"{'p99.9':>8} {'Max':>8}"
+                    + "".join(f" {'p99 ' + name:>9}" for name in rolling),
+                    "-" * 100
                 ]
 
                 for op_name, stats in sorted(operations.items()):
                     if stats.count > 0:
+                        percentiles = stats.percentiles()
                         report.append(
-                            f"{op_name:<20} {stats.average*1000:>10.1f} "
-                            f"{stats.min*1000:>10.1f} {stats.max*1000:>10.1f}"
+                            f"{op_name:<20} {stats.count:>7} {stats.average*1000:>8.1f} "
+                            f"{percentiles['p50']*1000:>8.1f} {percentiles['p90']*1000:>8.1f} "
+                            f"{percentiles['p99']*1000:>8.1f} {percentiles['p999']*1000:>8.1f} "
+                            f"{stats.max*1000:>8.1f}"
+                            + "".join(
+                                f" {window[stream_id][op_name].percentile(0.99)*1000:>9.1f}"
+                                for window in rolling.values()
+                            )
                         )
 
                 report = "\n".join(report)
                 print(report)
                 self.logger.info(report)
 
+            if self.queues:
+                report = self._queue_report()
+                print(report)
+                self.logger.info(report)
+
             self._reset_metrics()
             self.last_log_time = time.time()
 
+    def _queue_report(self) -> str:
+        """
+        Format current and high-water usage of the monitored queues.
+
+        Returns:
+            str: One line per queue with items, MB used against the budget,
+            high-water marks and the total number of dropped items.
+        """
+        report = [
+            "\nQueue Usage:",
+            f"{'Queue':<10} {'Items':>6} {'MB':>8} {'Peak':>6} {'Peak MB':>8} {'Budget MB':>10} {'Dropped':>8}",
+            "-" * 62
+        ]
+        for name, queue in self.queues.items():
+            stats = queue.stats()
+            report.append(
+                f"{name:<10} {stats['items']:>6} {stats['bytes'] / 1024 ** 2:>8.1f} "
+                f"{stats['high_water_items']:>6} {stats['high_water_bytes'] / 1024 ** 2:>8.1f} "
+                f"{stats['max_bytes'] / 1024 ** 2:>10.0f} {stats['dropped']:>8}"
+            )
+        return "\n".join(report)
+
     def _reset_metrics(self) -> None:
-        """Reset all accumulated metrics to their initial values."""
+        """Close the current interval: keep it for the rolling windows and start a new one."""
         with self._metrics_lock:
-            self.metrics.clear()
+            now = time.time()
+            self._history.append((now, self.metrics))
+            longest = max(ROLLING_WINDOWS.values())
+            while self._history and self._history[0][0] <= now - longest:
+                self._history.popleft()
+            self.metrics = defaultdict(lambda: defaultdict(TimingStats))
@@ -1,31 +1,27 @@
-import subprocess
 import logging
 import multiprocessing as mp
 from typing import Optional, Tuple
-from ultralytics import YOLO
 import torch
 
 class ResourceManager:
     """Manages system resources and provides optimal processing configurations"""
 
     @staticmethod
-    def get_gpu_memory() -> Optional[Tuple[int, int]]:
+    def get_gpu_memory(device: Optional[int] = None) -> Optional[Tuple[int, int]]:
         """
-        Get GPU memory information using nvidia-smi
+        Get GPU memory information from the CUDA driver (no nvidia-smi subprocess)
+
+        Args:
+            device: CUDA device index, default the current device
 
         Returns:
             Tuple of (total_memory, used_memory) in MB, or None if GPU info unavailable
         """
+        if not torch.cuda.is_available():
+            return None
         try:
-            output = subprocess.check_output(
-                [
-                    "nvidia-smi",
-                    "--query-gpu=memory.total,memory.used",
-                    "--format=csv,nounits,noheader",
-                ]
-            )
-            total_memory, used_memory = map(int, output.decode().split(","))
-            return total_memory, used_memory
+            free_bytes, total_bytes = torch.cuda.mem_get_info(device)
+            return total_bytes // (1024 * 1024), (total_bytes - free_bytes) // (1024 * 1024)
         except Exception as e:
             logging.warning(f"Failed to get GPU memory info: {e}")
             return None
@@ -72,93 +68,160 @@ class ResourceManager:
 
         return recommended
 
-    @staticmethod
-    def calculate_optimal_batch_size(
-        model: YOLO,
-        image_width: int = 640,
-        image_height: int = 480,
-        memory_fraction: float = 0.5,
-        num_workers: int = 1,
+
+class AdaptiveBatchController:
+    """
+    Adjusts the inference batch size at runtime from observed load
+
+    After every batch the worker reports the batch size, its inference time
+    and the input queue depth:
+    - latency above target: shrink multiplicatively (x0.75) - overload hurts
+      every frame in the batch, so back off fast
+    - frames left waiting and latency comfortably under target: grow by one
+    - on CUDA the size is also capped by memory: the per-frame cost is taken
+      from torch.cuda.max_memory_allocated() of real batches, against the
+      share of device memory this worker may use; an out-of-memory error
+      halves the size and sets an OOM ceiling that the memory estimate cannot
+      lift (peaks from smaller batches tend to underestimate). The ceiling
+      is raised by one after every oom_recovery_periods settled periods
+      without another OOM, so a transient spike does not cap the size forever
+
+    Latency is smoothed with an EWMA and the size only changes after a few
+    batches at the current size, so a single slow frame does not cause a
+    step. On CPU only the latency target applies.
+    """
+
+    def __init__(
+        self,
+        device: str,
         min_batch_size: int = 1,
         max_batch_size: int = 16,
+        latency_target_ms: Optional[float] = None,
+        memory_fraction: float = 0.5,
+        num_workers: int = 1,
+        settle_batches: int = 5,
+        oom_recovery_periods: int = 10,
         logging_queue: mp.Queue = None,
-    ) -> int:
+    ) -> None:
         """
-        Calculate optimal batch size based on available GPU memory
-
         Args:
-            model: YOLO model
-            image_width: Width of input images, default 640
-            image_height: Height of input images, default 480
-            memory_fraction: Fraction of GPU memory to use, default 0.5
-            num_workers: Number of workers (for memory division), default 1
-            min_batch_size: Minimum batch size per worker, default 1
-            max_batch_size: Maximum batch size per worker, default 16
+            device: 'cuda' or 'cpu'
+            min_batch_size: Lower bound, default 1
+            max_batch_size: Upper bound, default 16
+            latency_target_ms: Max inference time per batch, default 150ms on CUDA, 400ms on CPU
+            memory_fraction: Fraction of GPU memory to share between workers, default 0.5
+            num_workers: Number of workers sharing the GPU, default 1
+            settle_batches: Batches to observe at a size before changing it, default 5
+            oom_recovery_periods: Settled periods without OOM before the OOM ceiling rises by one, default 10
             logging_queue: Queue for logging messages, default None
-
-        Returns:
-            int: Optimal batch size per worker
         """
-        gpu_info = ResourceManager.get_gpu_memory()
-
-        if gpu_info is None:
-            return min_batch_size
+        self.device = device
+        self.min_batch_size = min_batch_size
+        self.max_batch_size = max_batch_size
+        self.latency_target_ms = latency_target_ms or (150.0 if device == "cuda" else 400.0)
+        self.settle_batches = settle_batches
+        self.oom_recovery_periods = oom_recovery_periods
+        self.logging_queue = logging_queue
+
+        self.batch_size = min_batch_size
+        self.memory_cap = max_batch_size
+        self.oom_ceiling = max_batch_size
+        self._periods_since_oom = 0
+        self._latency_ms: Optional[float] = None
+        self._batches_at_size = 0
+
+        self._memory_budget = 0
+        self._baseline_memory = 0
+        if device == "cuda" and torch.cuda.is_available():
+            _, total_bytes = torch.cuda.mem_get_info()
+            self._memory_budget = int(total_bytes * memory_fraction / num_workers)
+            # Model weights and CUDA context are already resident
+            self._baseline_memory = torch.cuda.memory_allocated()
+            torch.cuda.reset_peak_memory_stats()
+
+    def update(self, batch_size: int, inference_seconds: float, queue_depth: int) -> int:
+        """
+        Record one inference batch and return the batch size for the next one
 
-        total_memory, used_memory = gpu_info
-        torch.cuda.empty_cache()
-        torch.cuda.reset_peak_memory_stats()
+        Args:
+            batch_size: Frames in the batch just processed
+            inference_seconds: Inference time for that batch
+            queue_depth: Frames waiting in the input queue after collecting it
 
-        # Test with both batch size 1 and 2 to estimate scaling
-        batch_1_input = torch.zeros((1, 3, image_height, image_width)).cuda()
-        batch_2_input = torch.zeros((2, 3, image_height, image_width)).cuda()
+        Returns:
+            int: Batch size to collect next
+        """
+        latency_ms = inference_seconds * 1000
+        self._latency_ms = latency_ms if self._latency_ms is None else 0.7 * self._latency_ms + 0.3 * latency_ms
+        if self._memory_budget:
+            self._update_memory_cap(batch_size)
+
+        # Partial batches say nothing about the configured size
+        if batch_size < self.batch_size and latency_ms <= self.latency_target_ms:
+            return self.batch_size
+
+        self._batches_at_size += 1
+        if self._batches_at_size < self.settle_batches:
+            return self.batch_size
+
+        self._relax_oom_ceiling()
+        target = self.batch_size
+        if self._latency_ms > self.latency_target_ms:
+            target = min(self.batch_size - 1, int(self.batch_size * 0.75))
+        elif queue_depth > 0 and self._latency_ms < 0.8 * self.latency_target_ms:
+            target = self.batch_size + 1
+        self._set_batch_size(target, f"latency {self._latency_ms:.0f}ms, queue depth {queue_depth}")
+        return self.batch_size
+
+    def on_out_of_memory(self, batch_size: int) -> int:
+        """
+        Back off after a CUDA out-of-memory error
 
-        # Measure memory for batch size 1
-        with torch.no_grad():
-            model(batch_1_input)
-        memory_batch_1 = torch.cuda.max_memory_allocated() / (1024 * 1024)  # MB
+        Args:
+            batch_size: Size of the batch that failed
 
+        Returns:
+            int: Batch size to collect next
+        """
+        self.oom_ceiling = max(self.min_batch_size, batch_size // 2)
+        self._periods_since_oom = 0
+        self.memory_cap = min(self.memory_cap, self.oom_ceiling)
         torch.cuda.empty_cache()
+        self._set_batch_size(self.oom_ceiling, f"CUDA out of memory at batch {batch_size}")
+        return self.batch_size
+
+    def _relax_oom_ceiling(self) -> None:
+        """Raise the OOM ceiling by one after enough settled periods without OOM"""
+        if self.oom_ceiling >= self.max_batch_size:
+            return
+        self._periods_since_oom += 1
+        if self._periods_since_oom < self.oom_recovery_periods:
+            return
+        self._periods_since_oom = 0
+        self.oom_ceiling += 1
+        if not self._memory_budget:
+            self.memory_cap = self.oom_ceiling
+
+    def _update_memory_cap(self, batch_size: int) -> None:
+        """Derive the largest batch that fits in the memory budget from this batch's peak"""
+        peak = torch.cuda.max_memory_allocated()
         torch.cuda.reset_peak_memory_stats()
-
-        # Measure memory for batch size 2
-        with torch.no_grad():
-            model(batch_2_input)
-        memory_batch_2 = torch.cuda.max_memory_allocated() / (1024 * 1024)  # MB
-
-        # Calculate memory scaling factor
-        memory_per_additional_image = memory_batch_2 - memory_batch_1
-
-        # Available memory for processing
-        available_memory = (total_memory - used_memory) * memory_fraction
-        memory_per_worker = available_memory / num_workers
-
-        # Calculate maximum possible batch size based on memory scaling
-        max_possible_batch = min(
-            int((memory_per_worker - memory_batch_1) / memory_per_additional_image + 1),
-            max_batch_size
-        )
-
-        batch_size = max(min_batch_size, max_possible_batch)
-        logs = [
-            f"GPU Memory Estimation:", f"\n\tBase Memory (batch=1): {memory_batch_1:.2f}MB",
-            f"\n\tMemory per additional image: {memory_per_additional_image:.2f}MB",
-            f"\n\tBatch size: {batch_size}",
-            f"\n\tGPU Memory - Total: {total_memory}MB",
-            f"\n\tAvailable: {memory_per_worker:.0f}MB per worker with {num_workers} workers",
-        ]
-        if logging_queue:
-            for log in logs:
-                logging_queue.put({
-                    "severity": "info",
-                    "message": log
-                })
-        logging.info(
-            f"GPU Memory Estimation:"
-            f"\n\tBase Memory (batch=1): {memory_batch_1:.2f}MB"
-            f"\n\tMemory per additional image: {memory_per_additional_image:.2f}MB"
-            f"\n\tBatch size: {batch_size}"
-            f"\n\tGPU Memory - Total: {total_memory}MB"
-            f"\n\tAvailable: {memory_per_worker:.0f}MB per worker with {num_workers} workers"
-        )
-
-        return batch_size
+        per_frame = (peak - self._baseline_memory) / max(1, batch_size)
+        if per_frame > 0:
+            fits = int((self._memory_budget - self._baseline_memory) / per_frame)
+            self.memory_cap = max(self.min_batch_size, min(self.max_batch_size, self.oom_ceiling, fits))
+
+    def _set_batch_size(self, target: int, reason: str) -> None:
+        target = max(self.min_batch_size, min(self.max_batch_size, self.memory_cap, target))
+        self._batches_at_size = 0
+        if target == self.batch_size:
+            return
+        message = f"Batch size {self.batch_size} -> {target} ({reason})"
+        self.batch_size = target
+        self._latency_ms = None  # Latency at the old size no longer applies
+        if self.logging_queue:
+            self.logging_queue.put({
+                "severity": "info",
+                "message": message
+            })
+        logging.info(message)
@@ -0,0 +1,94 @@
+"""Tests for the byte-bounded frame and result queue."""
+
+import sys
+import time
+import unittest
+from pathlib import Path
+from queue import Empty, Full
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from byteBudgetQueue import ByteBudgetQueue, payload_nbytes
+from frameRingBuffer import SharedFrame
+
+
+def _frame(nbytes: int) -> np.ndarray:
+    return np.zeros(nbytes, dtype=np.uint8)
+
+
+def _flush(queue: ByteBudgetQueue) -> None:
+    """Wait for the queue's feeder thread to hand queued items to the pipe"""
+    deadline = time.monotonic() + 1.0
+    while queue._queue.empty() and time.monotonic() < deadline:
+        time.sleep(0.001)
+
+
+class TestPayloadSize(unittest.TestCase):
+    def test_counts_arrays_and_buffers_in_containers(self):
+        item = {'frame': _frame(100), 'extra': [b'abcd', (_frame(10), 'label', 3)]}
+        self.assertEqual(payload_nbytes(item), 114)
+
+    def test_shared_frame_is_charged_its_frame_size(self):
+        """A slot reference pins the pixels in the ring, so it counts like the frame."""
+        ref = SharedFrame(slot=0, shape=(1080, 1920, 3))
+        self.assertEqual(payload_nbytes({'frame': ref}), 1080 * 1920 * 3)
+
+
+class TestByteBudget(unittest.TestCase):
+    """Items are admitted by payload bytes, with high-water marks and drop counts."""
+
+    def test_drop_newest_rejects_over_budget(self):
+        queue = ByteBudgetQueue(max_bytes=250)
+        first, second, third = _frame(100), _frame(100), _frame(100)
+
+        self.assertEqual(queue.put(first), [])
+        self.assertEqual(queue.put(second), [])
+        self.assertEqual(queue.put(third), [third])
+
+        stats = queue.stats()
+        self.assertEqual((stats['items'], stats['bytes'], stats['dropped']), (2, 200, 1))
+        with self.assertRaises(Full):
+            queue.put_nowait(_frame(100))
+
+    def test_drop_oldest_evicts_to_make_room(self):
+        queue = ByteBudgetQueue(max_bytes=250, drop_policy='drop_oldest')
+        frames = [np.full(100, value, dtype=np.uint8) for value in range(3)]
+        for frame in frames[:2]:
+            queue.put(frame)
+        _flush(queue)
+
+        dropped = queue.put(frames[2])
+
+        self.assertEqual([d[0] for d in dropped], [0])
+        self.assertEqual([queue.get(timeout=1)[0] for _ in range(2)], [1, 2])
+        self.assertEqual(queue.stats()['dropped'], 1)
+
+    def test_oversized_item_enters_an_empty_queue(self):
+        queue = ByteBudgetQueue(max_bytes=50)
+
+        self.assertEqual(queue.put(_frame(100)), [])
+        self.assertEqual(len(queue.get(timeout=1)), 100)
+
+    def test_get_returns_the_reservation(self):
+        queue = ByteBudgetQueue(max_bytes=1000, max_items=2)
+        queue.put(_frame(300))
+        queue.put(_frame(200))
+        self.assertEqual(len(queue.put(_frame(1))), 1)  # max_items reached
+
+        queue.get(timeout=1)
+
+        stats = queue.stats()
+        self.assertEqual((stats['items'], stats['bytes']), (1, 200))
+        self.assertEqual((stats['high_water_items'], stats['high_water_bytes']), (2, 500))
+        queue.get(timeout=1)
+        self.assertTrue(queue.empty())
+        with self.assertRaises(Empty):
+            queue.get_nowait()
+
+
+if __name__ == '__main__':
+    unittest.main()
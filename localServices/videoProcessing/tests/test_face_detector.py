@@ -0,0 +1,137 @@
+"""Tests for batched face detection with stub face and embedding models."""
+
+import queue
+import sys
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+import numpy as np
+import torch
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from faceDetector import faceDetector as face_module
+from faceDetector.faceDetector import FACE_SIZE, FaceDetector
+from faceDetector.faceDetectorManager import FaceDetectorManager
+from yoloProcessor import BoundingBox, Detection, ProcessedFrame
+
+FRAME_SIZE = 200
+# Every face sits at this box within its person crop
+FACE_IN_CROP = (4.0, 6.0, 24.0, 26.0)
+
+
+class _FaceModel:
+    """One face per person crop at FACE_IN_CROP, with level eyes."""
+
+    def predict(self, images, verbose=False):
+        x1, y1, x2, y2 = FACE_IN_CROP
+        eyes = [[x1 + 5, y1 + 8], [x2 - 5, y1 + 8]]
+        return [
+            SimpleNamespace(
+                boxes=SimpleNamespace(xyxy=torch.tensor([FACE_IN_CROP]), conf=torch.tensor([0.9])),
+                keypoints=SimpleNamespace(xy=torch.tensor([eyes])),
+            )
+            for _ in images
+        ]
+
+
+def _embedder(batch: torch.Tensor) -> torch.Tensor:
+    """Embedding = the aligned face's center pixel, so each face is identifiable."""
+    return batch[:, :, FACE_SIZE // 2, FACE_SIZE // 2]
+
+
+def _person(x1, y1, x2, y2) -> Detection:
+    return Detection(
+        bbox=BoundingBox(
+            x_center=(x1 + x2) / 2 / FRAME_SIZE, y_center=(y1 + y2) / 2 / FRAME_SIZE,
+            width=(x2 - x1) / FRAME_SIZE, height=(y2 - y1) / FRAME_SIZE,
+        ),
+        confidence=0.9, class_id=0, class_name='person', class_color=(0, 0, 0),
+    )
+
+
+def _frame(frame_id, people):
+    """A frame whose face for each (x1, y1, value) person is painted value."""
+    pixels = np.zeros((FRAME_SIZE, FRAME_SIZE, 3), dtype=np.uint8)
+    detections = []
+    for x1, y1, value in people:
+        fx1, fy1, fx2, fy2 = (int(c) for c in FACE_IN_CROP)
+        pixels[y1 + fy1:y1 + fy2, x1 + fx1:x1 + fx2] = value
+        detections.append(_person(x1, y1, x1 + 60, y1 + 100))
+    return ProcessedFrame(frame_id=frame_id, stream_id='cam', timestamp=0.0, frame=pixels, detections=detections)
+
+
+def _embedding(value: int) -> np.ndarray:
+    return np.full(3, (value - 127.5) / 128.0, dtype=np.float32)
+
+
+class _StubModels(unittest.TestCase):
+    def setUp(self):
+        patches = [
+            mock.patch.object(FaceDetector, 'load_model', return_value=_FaceModel()),
+            mock.patch.object(face_module, 'get_embedding_model', return_value=_embedder),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.frames = [
+            _frame(1, [(20, 30, 50)]),
+            _frame(2, []),
+            _frame(3, [(10, 10, 100), (120, 60, 200)]),
+        ]
+
+
+class TestFaceDetector(_StubModels):
+    """Faces map back to full-frame coordinates and keep their own embedding."""
+
+    def test_boxes_are_offset_to_the_frame(self):
+        detector = FaceDetector('face.pt', 'cpu', queue.Queue(), worker_id=0)
+
+        faces = detector.detect(self.frames)
+
+        self.assertEqual([len(f) for f in faces], [1, 0, 2])
+        box = faces[2][1].bbox
+        x1, y1, x2, y2 = FACE_IN_CROP
+        self.assertAlmostEqual(box.x_center * FRAME_SIZE, 120 + (x1 + x2) / 2, places=3)
+        self.assertAlmostEqual(box.y_center * FRAME_SIZE, 60 + (y1 + y2) / 2, places=3)
+        self.assertAlmostEqual(box.width * FRAME_SIZE, x2 - x1, places=3)
+        self.assertEqual(faces[2][1].frame_id, 3)
+
+    def test_embedding_i_belongs_to_face_i(self):
+        detector = FaceDetector('face.pt', 'cpu', queue.Queue(), worker_id=0)
+
+        faces = detector.detect(self.frames)
+
+        embeddings = [face.embedding for frame_faces in faces for face in frame_faces]
+        for embedding, value in zip(embeddings, (50, 100, 200)):
+            np.testing.assert_allclose(embedding, _embedding(value), atol=1e-6)
+
+    def test_alignment_fills_the_face_crop(self):
+        out = np.zeros((FACE_SIZE, FACE_SIZE, 3), dtype=np.uint8)
+        image = np.zeros((100, 100, 3), dtype=np.uint8)
+        image[40:60, 30:50] = 255
+
+        FaceDetector._align_face(image, (30, 40, 50, 60), np.array([[35, 45], [45, 45]], np.float32), out)
+
+        # 20px face scaled to FACE_SIZE / (1 + margin); the margin stays black
+        self.assertEqual(out[FACE_SIZE // 2, FACE_SIZE // 2, 0], 255)
+        self.assertEqual(out[2, 2, 0], 0)
+
+
+class TestFaceDetectorManager(_StubModels):
+    def test_batched_frames_come_back_in_order(self):
+        manager = FaceDetectorManager('face.pt', initial_workers=1, device='cpu', performance_queue=queue.Queue())
+        self.addCleanup(manager.shutdown)
+
+        faces = manager.process_frames_sync(self.frames)
+
+        self.assertEqual([[face.frame_id for face in f] for f in faces], [[1], [], [3, 3]])
+        np.testing.assert_allclose(faces[2][0].embedding, _embedding(100), atol=1e-6)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+"""Tests for the per-stream latest-frame mailbox."""
+
+import sys
+import time
+import unittest
+from dataclasses import dataclass
+from pathlib import Path
+from queue import Empty
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from frameMailbox import LatestFrameMailbox
+
+
+@dataclass
+class _Frame:
+    stream_id: str
+    frame_id: int
+
+
+def _flush(mailbox: LatestFrameMailbox, *stream_ids: str) -> None:
+    """Wait for the streams' feeder threads to hand their unread frames to the pipe"""
+    deadline = time.monotonic() + 1.0
+    while any(mailbox._slots[s].empty() for s in stream_ids) and time.monotonic() < deadline:
+        time.sleep(0.001)
+
+
+class TestLatestFrameMailbox(unittest.TestCase):
+    """Each stream holds only its newest frame and streams are read round-robin."""
+
+    def test_new_frame_supersedes_the_unread_one(self):
+        mailbox = LatestFrameMailbox(['a'])
+        mailbox.put(_Frame('a', 1))
+        _flush(mailbox, 'a')
+
+        superseded = mailbox.put(_Frame('a', 2))
+        _flush(mailbox, 'a')
+
+        self.assertEqual([f.frame_id for f in superseded], [1])
+        self.assertEqual(mailbox.get(timeout=1).frame_id, 2)
+        self.assertTrue(mailbox.empty())
+        self.assertEqual(mailbox.stats()['dropped'], 1)
+
+    def test_streams_are_read_round_robin(self):
+        mailbox = LatestFrameMailbox(['a', 'b', 'c'])
+        for stream_id in ('c', 'a', 'b'):
+            mailbox.put(_Frame(stream_id, 1))
+        _flush(mailbox, 'a', 'b', 'c')
+
+        self.assertEqual(mailbox.qsize(), 3)
+        self.assertEqual([mailbox.get(timeout=1).stream_id for _ in range(3)], ['a', 'b', 'c'])
+
+    def test_get_raises_empty(self):
+        mailbox = LatestFrameMailbox(['a'])
+        with self.assertRaises(Empty):
+            mailbox.get_nowait()
+        with self.assertRaises(Empty):
+            mailbox.get(timeout=0.01)
+
+    def test_stats_report_one_frame_per_stream(self):
+        mailbox = LatestFrameMailbox(['a', 'b'])
+        mailbox.put(_Frame('b', 1))
+        _flush(mailbox, 'b')
+
+        stats = mailbox.stats()
+
+        self.assertEqual((stats['items'], stats['high_water_items'], stats['dropped']), (1, 2, 0))
+        self.assertFalse(mailbox.full())
+
+    def test_needs_a_stream(self):
+        with self.assertRaises(ValueError):
+            LatestFrameMailbox([])
+
+
+if __name__ == '__main__':
+    unittest.main()
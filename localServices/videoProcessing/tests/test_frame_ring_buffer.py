@@ -0,0 +1,71 @@
+"""Tests for the shared-memory frame ring."""
+
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from frameRingBuffer import FrameRingBuffer, SharedFrame, release_frame, resolve_frame
+
+
+def _frame(value: int) -> np.ndarray:
+    return np.full((4, 6, 3), value, dtype=np.uint8)
+
+
+class TestFrameRingBuffer(unittest.TestCase):
+    """Slots are reused only once every holder has released them."""
+
+    def setUp(self):
+        self.ring = FrameRingBuffer(num_slots=2, slot_bytes=_frame(0).nbytes)
+        self.addCleanup(self.ring.close)
+
+    def test_view_reads_the_written_frame(self):
+        ref = self.ring.put(_frame(7))
+
+        self.assertEqual(ref, SharedFrame(slot=0, shape=(4, 6, 3), dtype='|u1'))
+        np.testing.assert_array_equal(self.ring.view(ref), _frame(7))
+        np.testing.assert_array_equal(resolve_frame(ref, self.ring), _frame(7))
+
+    def test_full_ring_and_oversized_frames_return_none(self):
+        self.assertIsNotNone(self.ring.put(_frame(1)))
+        self.assertIsNotNone(self.ring.put(_frame(2)))
+
+        self.assertIsNone(self.ring.put(_frame(3)))
+        self.assertIsNone(self.ring.acquire())
+        self.assertIsNone(self.ring.put(np.zeros((8, 6, 3), dtype=np.uint8)))
+
+    def test_slot_is_free_after_the_last_release(self):
+        ref = self.ring.put(_frame(1))
+        self.ring.put(_frame(2))
+        self.ring.retain(ref)  # A second consumer
+
+        release_frame(ref, self.ring)
+        self.assertIsNone(self.ring.acquire())
+        self.assertEqual(self.ring.in_use(), 2)
+
+        release_frame(ref, self.ring)
+        self.assertEqual(self.ring.in_use(), 1)
+        self.assertEqual(self.ring.put(_frame(3)).slot, ref.slot)
+
+    def test_extra_release_does_not_go_negative(self):
+        ref = self.ring.put(_frame(1))
+        self.ring.release(ref)
+        self.ring.release(ref)
+
+        self.assertEqual(self.ring.in_use(), 0)
+        with self.assertRaises(ValueError):
+            self.ring.retain(ref)
+
+    def test_inline_frames_pass_through(self):
+        frame = _frame(5)
+        self.assertIs(resolve_frame(frame, None), frame)
+        release_frame(frame, None)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,33 @@
+"""Smoke tests for the video processing entry point."""
+
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import main
+
+
+class TestMain(unittest.TestCase):
+    def test_shared_values_are_created_and_closed(self):
+        frame_queue, result_queue, *_, frame_ring = main.create_shared_values(['cam'])
+        self.addCleanup(frame_ring.close)
+
+        self.assertEqual(frame_ring.num_slots, main.FRAME_RING_SLOTS)
+        self.assertTrue(frame_queue.empty())
+        self.assertTrue(result_queue.empty())
+
+    def test_failed_startup_cleans_up_without_name_errors(self):
+        with mock.patch.object(main, 'create_shared_values', side_effect=RuntimeError('no shm')):
+            with self.assertLogs(main.__name__, 'ERROR') as logs:
+                main.main()
+
+        self.assertIn('no shm', logs.output[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
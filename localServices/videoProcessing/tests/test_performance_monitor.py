@@ -0,0 +1,178 @@
+"""Tests for shared-memory timings and log-bucket statistics."""
+
+import multiprocessing as mp
+import sys
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from performanceMonitor import (
+    BUCKET_GROWTH, NUM_BUCKETS, MultiProcessMonitor, SharedTimingMetrics, TimingStats, bucket_index,
+)
+
+
+def _record_in_child(timings: SharedTimingMetrics) -> None:
+    timings.record("cam", "decode", 0.002)
+
+
+class TestSharedTimingMetrics(unittest.TestCase):
+    """Recording goes to per-thread slots that the snapshot merges by name."""
+
+    def test_records_buckets_and_sums(self):
+        timings = SharedTimingMetrics(max_series=4)
+        timings.record("cam", "decode", 0.001)
+        timings.record("cam", "decode", 0.003)
+        timings.record("cam", "infer", 0.050)
+
+        snapshot = timings.snapshot()
+
+        counts, total = snapshot[("cam", "decode")]
+        self.assertEqual(counts.sum(), 2)
+        self.assertEqual(counts[bucket_index(0.003)], 1)
+        self.assertAlmostEqual(total, 0.004)
+        self.assertEqual(snapshot[("cam", "infer")][0].sum(), 1)
+
+    def test_threads_of_one_process_lose_no_increments(self):
+        timings = SharedTimingMetrics()
+
+        def record():
+            for _ in range(20_000):
+                timings.record("cam", "decode", 0.001)
+
+        threads = [threading.Thread(target=record) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        counts, total = timings.snapshot()[("cam", "decode")]
+        self.assertEqual(counts.sum(), 80_000)
+        self.assertAlmostEqual(total, 80.0, places=6)
+        self.assertEqual(timings._allocated.value, 4)  # One slot per thread
+
+    def test_snapshot_merges_slots_across_processes(self):
+        timings = SharedTimingMetrics()
+        timings.record("cam", "decode", 0.001)
+
+        child = mp.Process(target=_record_in_child, args=(timings,))
+        child.start()
+        child.join()
+
+        counts, total = timings.snapshot()[("cam", "decode")]
+        self.assertEqual(timings._allocated.value, 2)
+        self.assertEqual(counts.sum(), 2)
+        self.assertAlmostEqual(total, 0.003)
+
+    def test_new_pairs_overflow_when_slots_run_out(self):
+        timings = SharedTimingMetrics(max_series=1)
+        timings.record("cam", "decode", 0.001)
+        timings.record("cam", "infer", 0.001)
+        timings.record("cam", "infer", 0.001)
+
+        self.assertEqual(list(timings.snapshot()), [("cam", "decode")])
+        self.assertEqual(timings.overflow, 2)
+
+    def test_out_of_range_durations_land_in_edge_buckets(self):
+        timings = SharedTimingMetrics(max_series=1)
+        timings.record("cam", "decode", 0.0)
+        timings.record("cam", "decode", 1e6)
+
+        counts, _ = timings.snapshot()[("cam", "decode")]
+        self.assertEqual((counts[0], counts[NUM_BUCKETS - 1]), (1, 1))
+
+
+def _stats(values) -> TimingStats:
+    stats = TimingStats()
+    for value in values:
+        stats.update(float(value))
+    return stats
+
+
+class TestTimingStats(unittest.TestCase):
+    """Percentiles from log buckets stay within one bucket width of the truth."""
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.values = rng.lognormal(mean=np.log(0.02), sigma=1.0, size=20_000)
+
+    def test_percentiles_within_bucket_error_of_numpy(self):
+        stats = _stats(self.values)
+
+        for quantile in (0.5, 0.9, 0.99, 0.999):
+            exact = np.quantile(self.values, quantile)
+            self.assertLess(abs(stats.percentile(quantile) / exact - 1), BUCKET_GROWTH - 1, quantile)
+        self.assertEqual(stats.percentile(1.0), self.values.max())
+        self.assertEqual(stats.percentile(0.0), self.values.min())
+
+    def test_empty_stats(self):
+        self.assertEqual(TimingStats().percentile(0.99), 0.0)
+        self.assertEqual(TimingStats().to_dict()['min_ms'], 0.0)
+
+    def test_merge_equals_stats_of_all_values(self):
+        first, second = _stats(self.values[:5000]), _stats(self.values[5000:])
+        combined = _stats(self.values)
+
+        first.merge(second)
+
+        np.testing.assert_array_equal(first.buckets, combined.buckets)
+        self.assertEqual((first.count, first.min, first.max), (combined.count, combined.min, combined.max))
+        self.assertAlmostEqual(first.total, combined.total)
+        self.assertEqual(first.percentiles(), combined.percentiles())
+
+    def test_add_buckets_bounds_min_and_max_to_bucket_edges(self):
+        stats = TimingStats()
+        source = _stats([0.010, 0.030])
+
+        stats.add_buckets(source.buckets, source.total)
+        stats.add_buckets(np.zeros(NUM_BUCKETS, dtype=np.int64), 0.0)  # No-op
+
+        self.assertEqual(stats.count, 2)
+        self.assertAlmostEqual(stats.total, 0.040)
+        self.assertTrue(0.010 / BUCKET_GROWTH <= stats.min <= 0.010)
+        self.assertTrue(0.030 <= stats.max <= 0.030 * BUCKET_GROWTH)
+
+    def test_reset(self):
+        stats = _stats(self.values[:10])
+        stats.reset()
+
+        self.assertEqual((stats.count, stats.total, stats.max, stats.min), (0, 0.0, 0.0, float('inf')))
+        self.assertEqual(stats.buckets.sum(), 0)
+
+
+class TestRollingWindows(unittest.TestCase):
+    """Closed intervals count towards a window until they are older than it."""
+
+    def test_window_drops_intervals_older_than_it(self):
+        monitor = MultiProcessMonitor(
+            mp.Queue(), mp.Queue(), mp.Value('i'), mp.Value('i'), mp.Value('i'), mp.Value('i'),
+        )
+        clock = mock.patch('performanceMonitor.time.time').start()
+        self.addCleanup(mock.patch.stopall)
+
+        for now, duration in ((1000.0, 0.010), (1030.0, 0.020), (1090.0, 0.040)):
+            clock.return_value = now
+            monitor.metrics['cam']['decode'].update(duration)
+            monitor._reset_metrics()
+        clock.return_value = 1095.0
+        monitor.metrics['cam']['decode'].update(0.080)  # Current interval
+
+        one_minute = monitor.window_metrics(60.0)['cam']['decode']
+        five_minutes = monitor.window_metrics(300.0)['cam']['decode']
+
+        self.assertEqual((one_minute.count, one_minute.min), (2, 0.040))
+        self.assertEqual((five_minutes.count, five_minutes.min), (4, 0.010))
+
+        clock.return_value = 1400.0
+        monitor._reset_metrics()  # Intervals older than the longest window are dropped
+        self.assertEqual(len(monitor._history), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
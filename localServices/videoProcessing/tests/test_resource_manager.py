@@ -0,0 +1,81 @@
+"""Tests for the adaptive batch controller's memory and OOM limits."""
+
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from resourceManager import AdaptiveBatchController
+
+MB = 1024 ** 2
+
+
+class TestOutOfMemoryCeiling(unittest.TestCase):
+    """An OOM caps the size even when the memory estimate says more fits."""
+
+    def setUp(self):
+        self.controller = AdaptiveBatchController(
+            'cpu', min_batch_size=1, max_batch_size=32, latency_target_ms=1000.0,
+            settle_batches=1, oom_recovery_periods=3,
+        )
+        # Pretend to be on CUDA with 1GB of budget and a model using 100MB
+        self.controller._memory_budget = 1000 * MB
+        self.controller._baseline_memory = 100 * MB
+        self.peak = 100 * MB + 10 * MB  # 10MB per frame at batch 1 -> 90 fit
+        patches = [
+            mock.patch('torch.cuda.max_memory_allocated', side_effect=lambda: self.peak),
+            mock.patch('torch.cuda.reset_peak_memory_stats'),
+            mock.patch('torch.cuda.empty_cache'),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def _grow(self, batches: int) -> None:
+        for _ in range(batches):
+            self.peak = 100 * MB + 10 * MB * self.controller.batch_size
+            self.controller.update(self.controller.batch_size, 0.01, queue_depth=100)
+
+    def test_estimate_does_not_lift_the_oom_ceiling(self):
+        self._grow(10)
+        self.assertEqual(self.controller.batch_size, 11)
+
+        self.controller.on_out_of_memory(10)
+        self.assertEqual(self.controller.batch_size, 5)
+
+        self._grow(2)
+
+        self.assertEqual(self.controller.memory_cap, 5)
+        self.assertEqual(self.controller.batch_size, 5)
+
+    def test_ceiling_rises_after_periods_without_oom(self):
+        self.controller.on_out_of_memory(10)
+
+        self._grow(4)  # The memory cap follows the ceiling from the next batch
+        self.assertEqual(self.controller.oom_ceiling, 6)
+        self.assertEqual(self.controller.batch_size, 6)
+
+        self.controller.on_out_of_memory(6)
+        self._grow(2)
+
+        self.assertEqual(self.controller.oom_ceiling, 3)
+        self.assertEqual(self.controller.batch_size, 3)
+
+    def test_ceiling_rises_without_a_memory_budget(self):
+        self.controller._memory_budget = None
+        self.controller.on_out_of_memory(4)
+        self.assertEqual(self.controller.memory_cap, 2)
+
+        self._grow(6)
+
+        self.assertEqual(self.controller.oom_ceiling, 4)
+        self.assertEqual(self.controller.memory_cap, 4)
+        self.assertEqual(self.controller.batch_size, 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
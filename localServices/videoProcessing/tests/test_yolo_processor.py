@@ -0,0 +1,84 @@
+"""Tests for the YOLO worker's hand-off of ring-buffer frames."""
+
+import multiprocessing as mp
+import queue
+import sys
+import time
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import yoloProcessor
+from byteBudgetQueue import ByteBudgetQueue
+from frameGrabber import FrameData
+from frameRingBuffer import FrameRingBuffer
+from yoloProcessor import ProcessedFrame, YOLOProcessor
+
+SHAPE = (8, 8, 3)
+
+
+class _Model:
+    """Finds nothing, and stops the worker after `batches` calls."""
+
+    def __init__(self, running, batches):
+        self.running = running
+        self.batches = batches
+
+    def to(self, device):
+        return self
+
+    def __call__(self, frames, verbose=False):
+        self.batches -= 1
+        if self.batches == 0:
+            self.running.clear()
+        return [SimpleNamespace(boxes=[]) for _ in frames]
+
+
+def _flush(q: ByteBudgetQueue) -> None:
+    """Wait for the queue's feeder thread to hand queued items to the pipe"""
+    deadline = time.monotonic() + 1.0
+    while q._queue.empty() and time.monotonic() < deadline:
+        time.sleep(0.001)
+
+
+class TestResultHandOff(unittest.TestCase):
+    """Results evicted from the result queue free their own ring slot."""
+
+    def test_drop_oldest_releases_the_evicted_results(self):
+        ring = FrameRingBuffer(num_slots=4, slot_bytes=int(np.prod(SHAPE)))
+        self.addCleanup(ring.close)
+        frame_bytes = int(np.prod(SHAPE))
+        frames_in = ByteBudgetQueue(max_bytes=0)
+        results = ByteBudgetQueue(max_bytes=2 * frame_bytes, drop_policy='drop_oldest')
+
+        old = ring.put(np.zeros(SHAPE, dtype=np.uint8))
+        results.put(ProcessedFrame(frame_id=0, stream_id='cam', timestamp=0.0, frame=old, detections=[]))
+        new = [ring.put(np.full(SHAPE, i, dtype=np.uint8)) for i in (1, 2)]
+        for i, ref in enumerate(new, start=1):
+            frames_in.put(FrameData(frame_id=i, stream_id='cam', timestamp=0.0, frame=ref))
+        _flush(results)  # The old result can be evicted
+
+        running = mp.Event()
+        running.set()
+        dropped, processed = mp.Value('i', 0), mp.Value('i', 0)
+        with mock.patch.object(yoloProcessor, 'YOLO', return_value=_Model(running, batches=2)):
+            YOLOProcessor._inference_worker(
+                0, 'stub.pt', frames_in, results, queue.Queue(), processed, dropped,
+                queue.Queue(), running, 1, 0.5, 'cpu', ring,
+            )
+
+        self.assertEqual(ring._refcounts[old.slot], 0)  # Evicted result released
+        self.assertEqual([ring._refcounts[ref.slot] for ref in new], [1, 1])  # Still queued
+        self.assertEqual((processed.value, dropped.value), (2, 1))
+        self.assertEqual([results.get(timeout=1).frame_id for _ in range(2)], [1, 2])
+
+
+if __name__ == '__main__':
+    unittest.main()
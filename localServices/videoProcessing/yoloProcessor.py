@@ -2,16 +2,19 @@ from ultralytics import YOLO
 import multiprocessing as mp
 import numpy as np
 import time
-from typing import List, Optional, Dict, Any, Tuple, Literal
+from typing import List, Optional, Dict, Any, Tuple, Literal, Union
 from queue import Empty, Full
 import torch
 import logging
 from dataclasses import dataclass
-from resourceManager import ResourceManager
+from resourceManager import ResourceManager, AdaptiveBatchController
 from numpy.typing import NDArray
 import torch.cuda
 from collections import defaultdict
 from performanceMonitor import measure_operation
+from byteBudgetQueue import ByteBudgetQueue
+from frameRingBuffer import FrameRingBuffer, SharedFrame, resolve_frame, release_frame
+from frameMailbox import LatestFrameMailbox
 from yoloClasses import yolo_classes
 
 # Create a literal type from yolo_classes
@@ -37,20 +40,21 @@ class ProcessedFrame:
     frame_id: int
     stream_id: str
     timestamp: float
-    frame: NDArray[np.uint8]
+    frame: Union[NDArray[np.uint8], SharedFrame]  # SharedFrame: consumer releases the slot
     detections: List[Detection]
 
 class YOLOProcessor:
     def __init__(
         self,
         model_path: str,
-        shared_queue: mp.Queue,
-        result_queue: mp.Queue,
+        shared_queue: Union[ByteBudgetQueue, LatestFrameMailbox],
+        result_queue: ByteBudgetQueue,
         performance_queue: mp.Queue,
         logging_queue: mp.Queue,
         drop_frames: mp.Value,
         processed_frames: mp.Value,
         memory_fraction: float = 0.6,
+        frame_ring: Optional[FrameRingBuffer] = None,
     ) -> None:
         self.logger = logging.getLogger(__name__)
 
@@ -64,6 +68,7 @@ class YOLOProcessor:
         self.logging_queue = logging_queue
         self.drop_frames = drop_frames
         self.processed_frames = processed_frames
+        self.frame_ring = frame_ring
         self.device = 'cuda' if torch.cuda.is_available() else 'cpu'
         self.processes: List[mp.Process] = []
         self.running = mp.Event()
@@ -88,7 +93,8 @@ class YOLOProcessor:
                     self.running,
                     self.num_workers,
                     self.memory_fraction,
-                    self.device
+                    self.device,
+                    self.frame_ring
                 ),
                 daemon=True
             )
@@ -104,7 +110,7 @@ class YOLOProcessor:
         # Drain the shared queue to unblock workers
         while not self.shared_queue.empty():
             try:
-                self.shared_queue.get_nowait()
+                release_frame(self.shared_queue.get_nowait().frame, self.frame_ring)
             except Empty:
                 break
 
@@ -122,8 +128,8 @@ class YOLOProcessor:
     def _inference_worker(
         worker_id: int,
         model_path: str,
-        shared_queue: mp.Queue,
-        result_queue: mp.Queue,
+        shared_queue: Union[ByteBudgetQueue, LatestFrameMailbox],
+        result_queue: ByteBudgetQueue,
         performance_queue: mp.Queue,
         processed_frames: mp.Value,
         drop_frames: mp.Value,
@@ -132,8 +138,15 @@ class YOLOProcessor:
         num_workers: int,
         memory_fraction: float,
         device: str,
+        frame_ring: Optional[FrameRingBuffer] = None,
     ) -> None:
-        """Worker process for YOLO inference"""
+        """
+        Worker process for YOLO inference
+
+        Frames arriving as SharedFrame are read in place from the ring buffer.
+        The reference is forwarded with the result, so the slot stays held until
+        the result consumer releases it; dropped frames release it here.
+        """
         mp.current_process().name = f"YOLOProcessor-{worker_id}"
 
         stream_id = f"yoloProcessor-{worker_id}"  # Add stream ID for metrics
@@ -149,8 +162,9 @@ class YOLOProcessor:
                 model = YOLO(model_path)
                 model.to(device)
 
-            batch_size = ResourceManager.calculate_optimal_batch_size(
-                model, memory_fraction=memory_fraction, num_workers=num_workers, logging_queue=logging_queue
+            # Starts small and grows with load, within latency and memory limits
+            batch_controller = AdaptiveBatchController(
+                device, memory_fraction=memory_fraction, num_workers=num_workers, logging_queue=logging_queue
             )
 
             logging_queue.put({
@@ -166,16 +180,20 @@ class YOLOProcessor:
             return
 
         batch_frames: List[NDArray[np.uint8]] = []
+        batch_refs: List[Union[NDArray[np.uint8], SharedFrame]] = []
         batch_metadata: List[Dict[str, Any]] = []
 
         while running.is_set():
+            # Frames whose slot reference has been handed on or released
+            forwarded = 0
             try:
                 # Collect batch
                 with measure_operation(performance_queue, stream_id, "batch_collection"):
-                    while len(batch_frames) < batch_size:
+                    while len(batch_frames) < batch_controller.batch_size:
                         try:
                             frame_data = shared_queue.get(timeout=0.01)
-                            batch_frames.append(frame_data.frame)
+                            batch_refs.append(frame_data.frame)
+                            batch_frames.append(resolve_frame(frame_data.frame, frame_ring))
                             batch_metadata.append({
                                 'frame_id': frame_data.frame_id,
                                 'stream_id': frame_data.stream_id,
@@ -190,38 +208,52 @@ class YOLOProcessor:
 
                 # Process batch
                 with measure_operation(performance_queue, stream_id, "inference"):
+                    inference_start = time.perf_counter()
                     results: list[Any] = model(batch_frames, verbose=False)
+                    batch_controller.update(
+                        len(batch_frames), time.perf_counter() - inference_start, shared_queue.qsize()
+                    )
 
                 # Process results
                 with measure_operation(performance_queue, stream_id, "post_processing"):
-                    for frame, metadata, result in zip(batch_frames, batch_metadata, results):
+                    for frame_ref, metadata, result in zip(batch_refs, batch_metadata, results):
                         detections = YOLOProcessor._process_detections(result)
                         result_dict = ProcessedFrame(
                             **metadata,
-                            frame=frame,
+                            frame=frame_ref,
                             detections=detections
                         )
 
-                        try:
-                            result_queue.put(result_dict, timeout=0.1)
-                            processed_frames.value += 1
-                        except Full:
+                        # Rejected (drop_newest) or evicted older results (drop_oldest)
+                        dropped = result_queue.put(result_dict)
+                        for dropped_result in dropped:
+                            release_frame(dropped_result.frame, frame_ring)
+                        if dropped:
                             logging_queue.put({
                                 "severity": "warning",
-                                "message": f"Worker {worker_id}: Result queue full"
+                                "message": f"Worker {worker_id}: Result queue over byte budget"
                             })
-                            drop_frames.value += 1
+                            drop_frames.value += len(dropped)
+                        if not any(item is result_dict for item in dropped):
+                            processed_frames.value += 1
+                        forwarded += 1
 
                 batch_frames.clear()
+                batch_refs.clear()
                 batch_metadata.clear()
 
             except Exception as e:
+                if isinstance(e, torch.cuda.OutOfMemoryError):
+                    batch_controller.on_out_of_memory(len(batch_frames))
                 logging_queue.put({
                     "severity": "error",
                     "message": f"Worker {worker_id} error: {e}"
                 })
                 # Clear batches on error to prevent memory issues
+                for frame_ref in batch_refs[forwarded:]:
+                    release_frame(frame_ref, frame_ring)
                 batch_frames.clear()
+                batch_refs.clear()
                 batch_metadata.clear()
                 time.sleep(0.1)  # Brief pause before retrying
 
@@ -230,12 +262,14 @@ class YOLOProcessor:
         """Convert YOLO results to standard format"""
         detections: List[Detection] = []
         for box in result.boxes:
+            # Normalized to the actual frame size, as BoundingBox documents
+            x_center, y_center, width, height = map(float, box.xywhn[0])
             detections.append(Detection(
                 bbox=BoundingBox(
-                    x_center=float(box.xyxy[0][0]) / 640,
-                    y_center=float(box.xyxy[0][1]) / 480,
-                    width=float(box.xyxy[0][2]) / 640,
-                    height=float(box.xyxy[0][3]) / 480
+                    x_center=x_center,
+                    y_center=y_center,
+                    width=width,
+                    height=height
                 ),
                 confidence=float(box.conf[0]),
                 class_id=int(box.cls[0]),